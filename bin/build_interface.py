@@ -0,0 +1,16 @@
+#!/usr/bin/env python
+
+# Builds the interface documents of an application and persists them so that
+# server processes can load them instead of building them at startup. See
+# spyne.interface.store for details.
+
+import sys
+
+try:
+    import _preamble
+except ImportError:
+    pass
+
+from spyne.interface.store import main
+
+sys.exit(main())
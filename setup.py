@@ -208,10 +208,18 @@ class RunTests(ExtendedTestCommand):
             'interop/test_pyramid.py',
             'interop/test_soap_client_http_twisted.py',
 
-            'transport/test_msgpack.py'
+            'transport/test_msgpack.py',
+            'transport/test_http_compression.py',
+            'transport/test_batch.py',
+            'transport/test_admission.py',
+            'transport/test_metrics.py',
+            'transport/test_profiler.py',
+            'bench/test_bench.py',
+            'bench/test_imports.py',
 
             'test_null_server.py',
             'test_service.py',
+            'test_prefork.py',
             'test_soft_validation.py',
             'test_util.py',
             'test_sqlalchemy.py',
@@ -268,6 +276,15 @@ class RunPython3Tests(TestCommand):
             'protocol/test_xml.py',
             'protocol/test_soap11.py',
             'protocol/test_soap12.py',
+            'test_asgi.py',
+            'test_prefork.py',
+            'transport/test_http_compression.py',
+            'transport/test_batch.py',
+            'transport/test_admission.py',
+            'transport/test_metrics.py',
+            'transport/test_profiler.py',
+            'bench/test_bench.py',
+            'bench/test_imports.py',
         )
         ret = call_tox_subprocess('py%s-dj1{8,9,10}' % PYVER) or ret
 
@@ -325,6 +342,7 @@ setup(
     entry_points={
         'console_scripts': [
             'sort_wsdl=spyne.test.sort_wsdl:main',
+            'spyne_build_interface=spyne.interface.store:main',
         ]
     },
 
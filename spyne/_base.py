@@ -168,6 +168,17 @@ class MethodContext(object):
 
         Useful for benchmarking purposes."""
 
+        self.queue_wait = None
+        """The number of seconds the request waited for admission, when the
+        transport has an admission controller."""
+
+        self.phase_times = {}
+        """The number of seconds spent in each phase of request processing,
+        keyed by phase name. The phases recorded by
+        :class:`spyne.server.ServerBase` are ``create_in_document``,
+        ``decompose_incoming_envelope``, ``deserialize``, ``call`` (the user
+        function), ``serialize`` and ``create_out_string``."""
+
         self.is_closed = False
         """`True` means response is fully sent and request finalized."""
 
@@ -239,6 +250,13 @@ class MethodContext(object):
         self.in_string = None
         """Incoming bytestream as a sequence of ``str`` or ``bytes``
         instances."""
+        self.in_string_charset = None
+        """Charset of the incoming bytestream, as reported by the transport.
+        """
+
+        self.in_string_length = None
+        """Number of bytes read from ``in_string``. Only set when the
+        transport collects metrics."""
 
         # parsed
         self.in_document = None
@@ -316,6 +334,10 @@ class MethodContext(object):
         """The pull interface to the outgoing bytestream. It's a sequence of
         strings (which could also be a generator)."""
 
+        self.out_string_length = None
+        """Number of bytes written from ``out_string``. Only set when the
+        transport collects metrics."""
+
         self.out_stream = None
         """The push interface to the outgoing bytestream. It's a file-like
         object."""
@@ -327,6 +349,26 @@ class MethodContext(object):
         """The locale the request will use when needed for things like date
         formatting, html rendering and such."""
 
+        self.cache_key = None
+        """The key of the response in the response cache of the method, when
+        the response is going to be cached."""
+
+        self.cache_hit = False
+        """``True`` when ``out_string`` was read from the response cache of
+        the method."""
+
+        self.cache_headers = None
+        """The transport response headers as they were before serialization,
+        when the response is going to be cached."""
+
+        self.batch = None
+        """A list of ``(p_ctx, others)`` tuples with the contexts of the calls
+        when the incoming document is a batch request. See
+        :mod:`spyne.server.batch`."""
+
+        self.in_batch = False
+        """``True`` for the contexts of the calls in a batch request."""
+
         self._in_protocol = transport.app.in_protocol
         """The protocol that will be used to (de)serialize incoming input"""
 
@@ -444,7 +486,8 @@ class MethodDescriptor(object):
                  aux=None, patterns=None, body_style=None, args=None,
                  operation_name=None, no_self=None, translations=None, when=None,
                  in_message_name_override=True, out_message_name_override=True,
-                 service_class=None, href=None):
+                 service_class=None, href=None, cache=None,
+                 coalesce=None):
 
         self.__real_function = function
         """The original callable for the user code."""
@@ -560,6 +603,14 @@ class MethodDescriptor(object):
         boolean value. If true, the object can process that action.
         """
 
+        self.cache = cache
+        """None or a :class:`spyne.util.cache.ResponseCache` instance that
+        caches the serialized responses of this method."""
+
+        self.coalesce = coalesce
+        """None or a :class:`spyne.util.cache.SingleFlight` instance that
+        coalesces concurrent identical calls to this method."""
+
         # Method Customizations
         self.in_message_name_override = in_message_name_override
         """When False, no mangling of in message name will be performed by later
@@ -84,6 +84,15 @@ class Application(object):
             which in turn is called by the transport when the response is fully
             sent to the client (or in the client case, the response is fully
             received from server).
+
+        * ``method_cache_hit``, ``method_cache_miss``:
+            Called when a response is looked up in the response cache of a
+            method. See :class:`spyne.util.cache.ResponseCache`.
+
+        * ``method_cache_evict``:
+            Called when responses are evicted from the response cache of a
+            method to make room for a new one. The number of evicted responses
+            is passed as the second argument.
     """
 
     transport = None
@@ -228,8 +237,21 @@ class Application(object):
         """This method calls the call_wrapper method in the service definition.
         This can be overridden to make an application-wide custom exception
         management.
+
+        When the method has a request coalescer, concurrent identical calls
+        share the return value of the first one, unless it can only be
+        consumed once.
         """
 
+        coalesce = ctx.descriptor.coalesce
+        if coalesce is not None:
+            key = coalesce.get_key(ctx)
+            if key is not None:
+                return coalesce.call(key, self._call_wrapper, ctx)
+
+        return self._call_wrapper(ctx)
+
+    def _call_wrapper(self, ctx):
         retval = None
 
         # service rpc
@@ -40,3 +40,4 @@ This package is EXPERIMENTAL.
 
 from spyne.auxproc._base import process_contexts
 from spyne.auxproc._base import AuxProcBase
+from spyne.auxproc._base import AuxJob
@@ -26,7 +26,12 @@ executed.
 import logging
 logger = logging.getLogger(__name__)
 
+from time import time
+
 from spyne import AuxMethodContext
+from spyne import MethodContext
+from spyne import EventManager
+from spyne.error import ResourceNotFoundError
 
 
 def process_contexts(server, contexts, p_ctx, error=None):
@@ -38,6 +43,54 @@ def process_contexts(server, contexts, p_ctx, error=None):
             ctx.descriptor.aux.process_context(server, ctx)
 
 
+class AuxJob(object):
+    """A picklable snapshot of an auxiliary method call that is enough to
+    re-create its context from scratch, possibly in another process or after a
+    restart.
+
+    :param key: The ``internal_key`` of the auxiliary method descriptor.
+    :param in_string: The raw incoming request as a byte string.
+    :param in_string_charset: The charset of the incoming request.
+    """
+
+    def __init__(self, key, in_string, in_string_charset=None):
+        self.key = key
+        self.in_string = in_string
+        self.in_string_charset = in_string_charset
+
+        self.id = None
+        """Identifier assigned by the queue, if any."""
+
+        self.enqueued = time()
+        """The time the job was queued in seconds-since-epoch format."""
+
+        self.attempts = 0
+        """The number of times processing was attempted."""
+
+        self.depth = None
+        """Number of pending jobs in the queue when the last event for this
+        job was fired."""
+
+        self.latency = None
+        """Seconds from queueing to the end of the last processing attempt."""
+
+        self.error = None
+        """The error from the last processing attempt, if any."""
+
+    @classmethod
+    def from_context(cls, ctx):
+        if ctx.in_string is None:
+            raise ValueError("%r has no incoming request to replay."
+                                                              % ctx.descriptor)
+
+        return cls(ctx.descriptor.internal_key, b''.join(ctx.in_string),
+                                                         ctx.in_string_charset)
+
+    def __repr__(self):
+        return "%s(key=%r, id=%r, attempts=%r)" % (self.__class__.__name__,
+                                              self.key, self.id, self.attempts)
+
+
 class AuxProcBase(object):
     def __init__(self, process_exceptions=False):
         """Abstract Base class shared by all AuxProcs.
@@ -48,6 +101,7 @@ class AuxProcBase(object):
 
         self.methods = []
         self.process_exceptions = process_exceptions
+        self.event_manager = EventManager(self)
 
     def process(self, server, ctx, *args, **kwargs):
         """The method that does the actual processing. This should be called
@@ -70,6 +124,33 @@ class AuxProcBase(object):
 
         ctx.close()
 
+    def process_job(self, server, job):
+        """Re-creates the auxiliary method context described by the given
+        :class:`AuxJob` by deserializing the request again and processes it.
+
+        As the primary context is gone by then, ``ctx.aux.parent`` and
+        ``ctx.aux.error`` are ``None`` and ``ctx.transport`` is a generic
+        transport context.
+
+        :returns: The error, if any.
+        """
+
+        initial_ctx = MethodContext(server, MethodContext.SERVER)
+        initial_ctx.in_string = [job.in_string]
+
+        contexts = server.generate_contexts(initial_ctx, job.in_string_charset)
+        p_ctx, others = contexts[0], contexts[1:]
+        if p_ctx.in_error is not None:
+            logger.error(p_ctx.in_error)
+            return p_ctx.in_error
+
+        for ctx in others:
+            if ctx.descriptor.internal_key == job.key:
+                ctx.aux = AuxMethodContext(None, None)
+                return self.process(server, ctx)
+
+        return ResourceNotFoundError(job.key)
+
     def process_context(self, server, ctx, p_ctx, p_error):
         """Override this to implement your own auxiliary processor."""
 
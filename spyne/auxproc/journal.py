@@ -0,0 +1,253 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+import logging
+logger = logging.getLogger(__name__)
+
+import atexit
+import sqlite3
+
+from time import time
+from threading import Event
+from threading import Lock
+from threading import Thread
+
+from spyne.auxproc import AuxProcBase
+from spyne.auxproc import AuxJob
+
+
+class JournalAuxProc(AuxProcBase):
+    """JournalAuxProc writes auxiliary method calls to a journal in a local
+    SQLite database and processes them in batches in a background thread.
+    Jobs that were not processed when the server stopped are picked up when
+    it's started again.
+
+    Like :class:`spyne.auxproc.process.ProcessAuxProc`, only the raw request
+    (``ctx.in_string``) is stored, which is deserialized again when the job is
+    processed. See :meth:`AuxProcBase.process_job` for what's available in
+    the auxiliary context.
+
+    Failed jobs are retried up to ``max_attempts`` times. Jobs that still fail
+    after that are left in the journal with their last error for inspection.
+    :meth:`close` drains the journal and it's called on interpreter exit.
+
+    The following events are fired with an :class:`spyne.auxproc.AuxJob`
+    instance:
+
+        * ``aux_enqueue``: The job was written to the journal.
+        * ``aux_retry``: Processing the job failed, it will be retried.
+        * ``aux_done``: The job was processed or failed for the last time.
+          ``job.latency`` and ``job.error`` are set.
+
+    ``job.depth`` is the number of jobs in the journal that are waiting to be
+    processed.
+
+    :param path: Path to the SQLite database file.
+    :param batch_size: Max. number of jobs that are read from the journal at
+        once.
+    :param interval: Max. number of seconds between polls of the journal.
+    :param max_attempts: Max. number of times a job is processed.
+    :param retry_delay: Number of seconds to wait before retrying a failed
+        job, multiplied by the number of failed attempts.
+    """
+
+    TABLE_NAME = 'spyne_aux_journal'
+
+    def __init__(self, path, batch_size=10, interval=1.0, max_attempts=3,
+                                    retry_delay=5.0, process_exceptions=False):
+        super(JournalAuxProc, self).__init__(
+                                         process_exceptions=process_exceptions)
+
+        self.path = path
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+        self.server = None
+        self.db = None
+        self.thread = None
+
+        self.__lock = Lock()
+        self.__wake = Event()
+        self.__stopping = False
+
+    def initialize(self, server):
+        self.server = server
+        server.keep_in_string = True
+
+        if self.db is not None:
+            return
+
+        self.__stopping = False
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        with self.db:
+            self.db.execute("""
+                CREATE TABLE IF NOT EXISTS %s (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    key TEXT NOT NULL,
+                    in_string BLOB NOT NULL,
+                    in_string_charset TEXT,
+                    enqueued REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    not_before REAL NOT NULL DEFAULT 0,
+                    error TEXT
+                )""" % self.TABLE_NAME)
+
+        self.thread = Thread(target=self.__run, name='JournalAuxProc')
+        self.thread.daemon = True
+        self.thread.start()
+
+        atexit.register(self.close)
+
+    @property
+    def depth(self):
+        """The number of jobs that are waiting to be processed."""
+
+        with self.__lock:
+            return self.__get_depth()
+
+    def __get_depth(self):
+        return self.db.execute(
+                       "SELECT COUNT(*) FROM %s WHERE attempts < ?"
+                          % self.TABLE_NAME, (self.max_attempts,)).fetchone()[0]
+
+    def process_context(self, server, ctx, *args, **kwargs):
+        self.put(AuxJob.from_context(ctx))
+
+    def put(self, job):
+        """Writes the given job to the journal."""
+
+        with self.__lock:
+            with self.db:
+                cursor = self.db.execute(
+                    "INSERT INTO %s (key, in_string, in_string_charset, "
+                    "enqueued) VALUES (?, ?, ?, ?)" % self.TABLE_NAME,
+                    (job.key, sqlite3.Binary(job.in_string),
+                                         job.in_string_charset, job.enqueued))
+
+            job.id = cursor.lastrowid
+            job.depth = self.__get_depth()
+
+        self.event_manager.fire_event('aux_enqueue', job)
+        self.__wake.set()
+
+    def get_jobs(self):
+        """Returns the next batch of jobs that are ready to be processed."""
+
+        with self.__lock:
+            rows = self.db.execute(
+                "SELECT id, key, in_string, in_string_charset, enqueued, "
+                "attempts FROM %s WHERE attempts < ? AND not_before <= ? "
+                "ORDER BY id LIMIT ?" % self.TABLE_NAME,
+                   (self.max_attempts, time(), self.batch_size)).fetchall()
+
+        retval = []
+        for id, key, in_string, in_string_charset, enqueued, attempts in rows:
+            job = AuxJob(key, bytes(in_string), in_string_charset)
+            job.id = id
+            job.enqueued = enqueued
+            job.attempts = attempts
+            retval.append(job)
+
+        return retval
+
+    def process_jobs(self, jobs):
+        """Processes the given jobs and updates the journal with the
+        results."""
+
+        done = []
+        failed = []
+
+        for job in jobs:
+            job.attempts += 1
+            try:
+                job.error = self.process_job(self.server, job)
+            except Exception as e:
+                logger.exception(e)
+                job.error = e
+
+            job.latency = time() - job.enqueued
+
+            if job.error is None:
+                done.append(job)
+            else:
+                logger.error("Auxiliary method %r failed (attempt %d/%d): %s",
+                          job.key, job.attempts, self.max_attempts, job.error)
+                failed.append(job)
+
+        with self.__lock:
+            with self.db:
+                self.db.executemany("DELETE FROM %s WHERE id = ?"
+                              % self.TABLE_NAME, [(job.id,) for job in done])
+
+                self.db.executemany(
+                    "UPDATE %s SET attempts = ?, not_before = ?, error = ? "
+                    "WHERE id = ?" % self.TABLE_NAME,
+                    [(job.attempts,
+                      time() + self.retry_delay * job.attempts,
+                      repr(job.error),
+                      job.id) for job in failed])
+
+            depth = self.__get_depth()
+
+        for job in jobs:
+            job.depth = depth
+            if job.error is not None and job.attempts < self.max_attempts:
+                self.event_manager.fire_event('aux_retry', job)
+            else:
+                self.event_manager.fire_event('aux_done', job)
+
+    def __run(self):
+        while True:
+            self.__wake.wait(self.interval)
+            self.__wake.clear()
+
+            try:
+                jobs = self.get_jobs()
+                while len(jobs) > 0:
+                    self.process_jobs(jobs)
+                    jobs = self.get_jobs()
+
+            except Exception as e:
+                logger.exception(e)
+
+            if self.__stopping:
+                break
+
+    def close(self, timeout=None):
+        """Processes the jobs that are ready and stops the background thread.
+        Jobs that are waiting to be retried stay in the journal."""
+
+        if self.thread is None:
+            return
+
+        self.__stopping = True
+        self.__wake.set()
+        self.thread.join(timeout)
+        if self.thread.is_alive():
+            logger.warning("%r did not finish draining the journal in time.",
+                                                                        self)
+            return
+
+        self.thread = None
+
+        with self.__lock:
+            self.db.close()
+            self.db = None
@@ -0,0 +1,148 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+import logging
+logger = logging.getLogger(__name__)
+
+import multiprocessing
+
+from time import time
+from threading import Lock
+
+from spyne.auxproc import AuxProcBase
+from spyne.auxproc import AuxJob
+from spyne.util import six
+
+
+_worker = None
+
+
+def _init_worker(server, aux):
+    global _worker
+    _worker = server, aux
+
+
+def _process_job(job):
+    server, aux = _worker
+
+    job.attempts += 1
+    try:
+        error = aux.process_job(server, job)
+    except Exception as e:
+        logger.exception(e)
+        error = e
+
+    if error is not None:
+        # the exception itself may not survive the trip back to the parent
+        job.error = repr(error)
+
+    return job
+
+
+class ProcessAuxProc(AuxProcBase):
+    """ProcessAuxProc processes auxiliary methods in a pool of worker
+    processes so that cpu-heavy auxiliary methods don't compete with the
+    request threads for the GIL.
+
+    Only the raw request (``ctx.in_string``) is sent to the workers, which
+    deserialize it again using a copy of the server that is inherited by
+    forking. So this only works on platforms that support ``fork()`` and with
+    protocols that read the request from ``ctx.in_string`` (i.e. not with
+    ``HttpRpc``). See :meth:`AuxProcBase.process_job` for what's available in
+    the auxiliary context.
+
+    The following events are fired in the parent process with an
+    :class:`spyne.auxproc.AuxJob` instance:
+
+        * ``aux_enqueue``: The job was sent to the pool.
+        * ``aux_done``: The job was processed. ``job.latency`` and
+          ``job.error`` are set.
+
+    ``job.depth`` is the number of jobs that are waiting to be processed.
+
+    :param pool_size: Max. number of processes that can be used to process
+        methods in auxiliary queue in parallel.
+    """
+
+    def __init__(self, pool_size=1, process_exceptions=False):
+        super(ProcessAuxProc, self).__init__(
+                                         process_exceptions=process_exceptions)
+
+        self.pool = None
+        self.server = None
+        self.depth = 0
+
+        self.__pool_size = pool_size
+        self.__lock = Lock()
+
+    @property
+    def pool_size(self):
+        return self.__pool_size
+
+    def initialize(self, server):
+        self.server = server
+        server.keep_in_string = True
+
+    def get_pool(self):
+        # the pool is forked on first use so that the workers get a fully
+        # initialized server.
+        with self.__lock:
+            if self.pool is None:
+                if six.PY2:
+                    context = multiprocessing
+                else:
+                    context = multiprocessing.get_context('fork')
+
+                self.pool = context.Pool(self.__pool_size,
+                    initializer=_init_worker, initargs=(self.server, self))
+
+        return self.pool
+
+    def process_context(self, server, ctx, *args, **kwargs):
+        job = AuxJob.from_context(ctx)
+        pool = self.get_pool()
+
+        with self.__lock:
+            self.depth += 1
+            job.depth = self.depth
+
+        self.event_manager.fire_event('aux_enqueue', job)
+        pool.apply_async(_process_job, (job,), callback=self.__done)
+
+    def __done(self, job):
+        with self.__lock:
+            self.depth -= 1
+            job.depth = self.depth
+
+        job.latency = time() - job.enqueued
+        if job.error is not None:
+            logger.error("Auxiliary method %r failed: %s", job.key, job.error)
+
+        self.event_manager.fire_event('aux_done', job)
+
+    def close(self):
+        """Waits for the pending jobs to finish and terminates the worker
+        processes."""
+
+        with self.__lock:
+            pool, self.pool = self.pool, None
+
+        if pool is not None:
+            pool.close()
+            pool.join()
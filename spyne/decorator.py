@@ -278,6 +278,12 @@ def rpc(*params, **kparams):
     :param _args: the name of the arguments to expose.
     :param _service_class: A :class:`ServiceBase` subclass, if you feel like
         overriding it.
+    :param _cache: A :class:`spyne.util.cache.ResponseCache` instance to cache
+        the serialized responses of this method, or ``True`` to use one with
+        default settings.
+    :param _coalesce: A :class:`spyne.util.cache.SingleFlight` instance to
+        coalesce concurrent identical calls to this method, or ``True`` to use
+        one with default settings.
     """
 
     params = list(params)
@@ -304,6 +310,8 @@ def rpc(*params, **kparams):
             _when = kparams.pop("_when", None)
             _service_class = kparams.pop("_service_class", None)
             _href = kparams.pop("_href", None)
+            _cache = kparams.pop("_cache", None)
+            _coalesce = kparams.pop("_coalesce", None)
 
             _substitute_self_reference(params, kparams, kwargs, _no_self)
 
@@ -359,6 +367,14 @@ def rpc(*params, **kparams):
             if _pattern is not None:
                 _patterns = [_pattern]
 
+            if _cache is True:
+                from spyne.util.cache import ResponseCache
+                _cache = ResponseCache()
+
+            if _coalesce is True:
+                from spyne.util.cache import SingleFlight
+                _coalesce = SingleFlight()
+
             if body_style_str.endswith('bare'):
                 from spyne.model import ComplexModelBase
 
@@ -381,7 +397,8 @@ def rpc(*params, **kparams):
                 translations=_translations, when=_when,
                 in_message_name_override=_in_message_name_override,
                 out_message_name_override=_out_message_name_override,
-                service_class=_service_class, href=_href,
+                service_class=_service_class, href=_href, cache=_cache,
+                coalesce=_coalesce,
             )
 
             if _patterns is not None and _no_self:
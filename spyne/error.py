@@ -50,6 +50,19 @@ class RequestNotAllowed(Fault):
         super(RequestNotAllowed, self).__init__('Client.RequestNotAllowed', faultstring)
 
 
+class ServiceUnavailableError(Fault):
+    """Raised when the server is too busy to process the request."""
+
+    def __init__(self, fault_object, retry_after=None,
+                 fault_string="Service %r is not available, try again later."):
+        super(ServiceUnavailableError, self).__init__(
+            'Server.ServiceUnavailable', fault_string % (fault_object,))
+
+        self.retry_after = retry_after
+        """Number of seconds after which the request can be retried, if
+        known."""
+
+
 class ArgumentError(Fault):
     """Raised when there is a general problem with input data."""
 
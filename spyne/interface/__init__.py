@@ -27,8 +27,19 @@ from spyne.interface._base import Interface
 from spyne.interface._base import InterfaceDocumentBase
 from spyne.interface._base import AllYourInterfaceDocuments
 
-try:
-    from spyne.interface.wsdl.wsdl11 import Wsdl11
-    HAS_WSDL = True
-except ImportError:
-    HAS_WSDL = False
+from spyne.util.lazy import is_importable
+from spyne.util.lazy import enable_module_getattr
+
+HAS_WSDL = is_importable('lxml')
+
+
+def __getattr__(name):
+    # Wsdl11 pulls in lxml and the whole Xml Schema machinery, which
+    # applications that don't speak Xml don't need.
+    if name == 'Wsdl11':
+        from spyne.interface.wsdl.wsdl11 import Wsdl11
+        return Wsdl11
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+enable_module_getattr(__name__, ('Wsdl11',))
@@ -492,10 +492,24 @@ class Interface(object):
 class AllYourInterfaceDocuments(object):
     # AreBelongToUs
     def __init__(self, interface, wsdl11=None):
-        self.wsdl11 = wsdl11
-        if self.wsdl11 is None and spyne.interface.HAS_WSDL:
+        self.interface = interface
+        self._wsdl11 = wsdl11
+
+    @property
+    def wsdl11(self):
+        """The :class:`spyne.interface.wsdl.Wsdl11` instance for the interface.
+        It's only created on first access as it needs lxml. ``None`` when
+        lxml is not installed."""
+
+        if self._wsdl11 is None and spyne.interface.HAS_WSDL:
             from spyne.interface.wsdl import Wsdl11
-            self.wsdl11 = Wsdl11(interface)
+            self._wsdl11 = Wsdl11(self.interface)
+
+        return self._wsdl11
+
+    @wsdl11.setter
+    def wsdl11(self, value):
+        self._wsdl11 = value
 
 
 class InterfaceDocumentBase(object):
@@ -0,0 +1,431 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""The ``spyne.interface.store`` module persists the interface documents of an
+application, namely the Wsdl 1.1 document and the Xml Schema documents used
+for validation, to a directory so that processes that serve the same
+application don't have to build them again.
+
+Documents are stored in a subdirectory named after a content hash of the
+service and type definitions, so a stale document is never loaded for a
+changed application. Stored Wsdl documents come with a precompressed copy and
+an ETag.
+
+The ``spyne_build_interface`` script (also in ``bin/build_interface.py``)
+builds the documents of an application ahead of time: ::
+
+    $ spyne_build_interface myproject.app:application /var/cache/myproject \\
+                                                    http://example.com/soap
+
+Then the server process passes the store around: ::
+
+    store = InterfaceDocumentStore('/var/cache/myproject')
+    application = Application(..., in_protocol=Soap11(validator='lxml',
+                                                       schema_store=store))
+    wsgi_app = WsgiApplication(application, interface_store=store)
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import os
+import gzip
+import json
+import shutil
+import hashlib
+import tempfile
+
+from decimal import Decimal as D
+from inspect import isclass
+
+from lxml import etree
+
+import spyne
+
+from spyne.model import ModelBase, ComplexModelBase
+from spyne.util import six
+from spyne.util.six import BytesIO
+
+
+WSDL_FILE_NAME = 'wsdl.xml'
+META_FILE_NAME = 'meta.json'
+XSD_DIR_NAME = 'xsd'
+
+
+def _get_value_fingerprint(value):
+    if value is None or isinstance(value, (bool, float, D, six.binary_type,
+                                       six.text_type) + six.integer_types):
+        return repr(value)
+
+    if isclass(value):
+        if issubclass(value, ModelBase):
+            return '{%s}%s' % (value.get_namespace(), value.get_type_name())
+        return '%s.%s' % (value.__module__, value.__name__)
+
+    if isinstance(value, (list, tuple)):
+        return '[%s]' % ','.join(_get_value_fingerprint(v) for v in value)
+
+    if isinstance(value, (set, frozenset)):
+        return '{%s}' % ','.join(sorted(_get_value_fingerprint(v)
+                                                               for v in value))
+
+    if isinstance(value, dict):
+        return '{%s}' % ','.join(sorted('%s:%s' % (_get_value_fingerprint(k),
+                               _get_value_fingerprint(v))
+                                                  for k, v in value.items()))
+
+    # functions and the like: their address would make the hash useless.
+    return type(value).__name__
+
+
+def _get_attrs_fingerprint(attrs, memo):
+    retval = memo.get(attrs, None)
+    if retval is not None:
+        return retval
+
+    # Only look at what each class in the hierarchy defines so that the
+    # fingerprints of the shared bases are computed just once.
+    parts = [_get_attrs_fingerprint(b, memo) for b in attrs.__bases__
+                                                           if b is not object]
+
+    for k, v in sorted(vars(attrs).items()):
+        if k.startswith('_'):
+            continue
+        if callable(v) and not isclass(v):
+            continue
+
+        parts.append('%s=%s' % (k, _get_value_fingerprint(v)))
+
+    retval = memo[attrs] = hashlib.sha1(
+                                   '\0'.join(parts).encode('utf8')).hexdigest()
+
+    return retval
+
+
+def _get_class_fingerprint(cls, memo):
+    return '{%s}%s:%s' % (cls.get_namespace(), cls.get_type_name(),
+                                    _get_attrs_fingerprint(cls.Attributes, memo))
+
+
+def get_interface_hash(interface):
+    """Returns a hex digest of the service and type definitions in the given
+    :class:`spyne.interface.Interface` instance. It changes when anything that
+    can end up in the interface documents changes, except the transport and the
+    protocols of the application, which are only known once a server is
+    bound to it."""
+
+    app = interface.app
+    parts = [spyne.__version__, app.name, app.tns]
+
+    # the prefix map is not used as prefixes are assigned while building the
+    # documents.
+    for ns in sorted(interface.imports):
+        parts.append('%s:%s' % (ns, ','.join(sorted(interface.imports[ns]))))
+
+    memo = {}
+    for k in sorted(interface.classes):
+        cls = interface.classes[k]
+        parts.append(k)
+        parts.append(_get_class_fingerprint(cls, memo))
+
+        if issubclass(cls, ComplexModelBase):
+            for name, member in cls.get_flat_type_info(cls).items():
+                parts.append(name)
+                parts.append(_get_class_fingerprint(member, memo))
+
+    for s in interface.services:
+        parts.append(s.get_service_name())
+
+        for name in sorted(s.public_methods):
+            m = s.public_methods[name]
+            parts.extend((name, m.aux is None, m.body_style, m.port_type,
+                    _get_value_fingerprint(m.in_message),
+                    _get_value_fingerprint(m.out_message),
+                    _get_value_fingerprint(m.in_header),
+                    _get_value_fingerprint(m.out_header),
+                    _get_value_fingerprint(m.faults)))
+
+    sha = hashlib.sha1()
+    for p in parts:
+        sha.update(six.text_type(p).encode('utf8'))
+        sha.update(b'\0')
+
+    return sha.hexdigest()
+
+
+def gzip_bytes(data):
+    """Returns the gzipped version of the given byte string. The output does
+    not depend on the current time."""
+
+    stream = BytesIO()
+    with gzip.GzipFile(fileobj=stream, mode='wb', mtime=0) as f:
+        f.write(data)
+
+    return stream.getvalue()
+
+
+def get_etag(data):
+    """Returns a strong ETag for the given byte string."""
+
+    return '"%s"' % hashlib.sha1(data).hexdigest()
+
+
+class InterfaceDocument(object):
+    """An interface document that's ready to be served, along with its gzipped
+    version and its ETag. Both are computed on first access unless given.
+
+    :param data: The document as a byte string.
+    :param gzipped: The gzipped document.
+    :param etag: The ETag of the document, with the quotes.
+    """
+
+    def __init__(self, data, gzipped=None, etag=None):
+        self.data = data
+        self._gzipped = gzipped
+        self._etag = etag
+
+    @property
+    def gzipped(self):
+        if self._gzipped is None:
+            self._gzipped = gzip_bytes(self.data)
+        return self._gzipped
+
+    @property
+    def etag(self):
+        if self._etag is None:
+            self._etag = get_etag(self.data)
+        return self._etag
+
+
+class InterfaceDocumentStore(object):
+    """Persists the interface documents of applications under the given
+    directory.
+
+    :param path: The directory to store the documents in. It's created when
+        missing.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+
+    def get_path(self, interface):
+        """Returns the directory that has the documents for the given
+        interface, whether it exists or not."""
+
+        return os.path.join(self.path, get_interface_hash(interface))
+
+    def build(self, interface, url=None):
+        """Builds the interface documents of the given interface and writes
+        them to the store, replacing the ones that are already there.
+
+        :param interface: A :class:`spyne.interface.Interface` instance.
+        :param url: The url of the service, to be written to the Wsdl document.
+            The Wsdl document is not built when this is ``None``.
+        :returns: The directory that has the documents.
+        """
+
+        from spyne.interface.xml_schema import XmlSchema
+
+        path = self.get_path(interface)
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+
+        # Write everything to a temporary directory first so that other
+        # processes never see half-written documents.
+        tmp_path = tempfile.mkdtemp(prefix='.spyne', dir=self.path)
+        try:
+            meta = {'spyne': spyne.__version__}
+
+            schema = XmlSchema(interface)
+            schema.build_schema_nodes(with_schema_location=True)
+
+            xsd_path = os.path.join(tmp_path, XSD_DIR_NAME)
+            os.mkdir(xsd_path)
+            for pref, node in schema.schema_dict.items():
+                file_name = os.path.join(xsd_path, '%s.xsd' % pref)
+                with open(file_name, 'wb') as f:
+                    etree.ElementTree(node).write(f, pretty_print=True)
+
+            meta['tns'] = interface.get_namespace_prefix(interface.tns)
+
+            if url is not None:
+                from spyne.interface.wsdl import Wsdl11
+
+                wsdl11 = Wsdl11(interface)
+                wsdl11.build_interface_document(url)
+                doc = InterfaceDocument(wsdl11.get_interface_document())
+
+                self._write_wsdl(tmp_path, interface, doc, url, meta)
+
+            self._write_file(tmp_path, META_FILE_NAME,
+                                              json.dumps(meta).encode('utf8'))
+
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+            os.rename(tmp_path, path)
+
+        except Exception:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            raise
+
+        logger.debug("Interface documents written to %r", path)
+
+        return path
+
+    def set_wsdl(self, interface, data, url):
+        """Writes the given Wsdl document of the given interface to the store.
+
+        :param interface: A :class:`spyne.interface.Interface` instance.
+        :param data: The Wsdl document, either as a byte string or as an
+            :class:`InterfaceDocument` instance.
+        :param url: The url the document was built with.
+        :returns: The :class:`InterfaceDocument` instance that was written.
+        """
+
+        if not isinstance(data, InterfaceDocument):
+            data = InterfaceDocument(data)
+
+        path = self.get_path(interface)
+        meta = self._get_meta(path)
+        if meta is None:
+            path = self.build(interface)
+            meta = self._get_meta(path)
+
+        self._write_wsdl(path, interface, data, url, meta)
+        self._write_file(path, META_FILE_NAME, json.dumps(meta).encode('utf8'))
+
+        return data
+
+    def _write_wsdl(self, path, interface, doc, url, meta):
+        self._write_file(path, WSDL_FILE_NAME, doc.data)
+        self._write_file(path, WSDL_FILE_NAME + '.gz', doc.gzipped)
+
+        meta['url'] = url
+        meta['etag'] = doc.etag
+        meta['wsdl_key'] = self._get_wsdl_key(interface)
+
+    @staticmethod
+    def _write_file(path, file_name, data):
+        # Renaming is atomic, so readers see either the old or the new file.
+        fd, tmp_name = tempfile.mkstemp(prefix='.spyne', dir=path)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.rename(tmp_name, os.path.join(path, file_name))
+
+        except Exception:
+            os.unlink(tmp_name)
+            raise
+
+    @staticmethod
+    def _get_wsdl_key(interface):
+        app = interface.app
+        return [app.transport, app.in_protocol.__class__.__name__,
+                                          app.out_protocol.__class__.__name__]
+
+    def _get_meta(self, path):
+        try:
+            with open(os.path.join(path, META_FILE_NAME)) as f:
+                return json.load(f)
+
+        except (IOError, OSError, ValueError):
+            return None
+
+    def get_wsdl(self, interface):
+        """Returns the stored Wsdl document of the given interface as an
+        :class:`InterfaceDocument` instance, or ``None`` if it's not in the
+        store or it was built for another transport or protocol.
+
+        Just like a Wsdl document that's built before the first request, the
+        stored document has the url it was built with, no matter where it's
+        requested from."""
+
+        path = self.get_path(interface)
+        meta = self._get_meta(path)
+        if meta is None or not ('etag' in meta):
+            return None
+
+        if meta['wsdl_key'] != self._get_wsdl_key(interface):
+            logger.debug("Ignoring wsdl in %r built for %r", path,
+                                                               meta['wsdl_key'])
+            return None
+
+        file_name = os.path.join(path, WSDL_FILE_NAME)
+        with open(file_name, 'rb') as f:
+            data = f.read()
+        with open(file_name + '.gz', 'rb') as f:
+            gzipped = f.read()
+
+        logger.debug("Loaded wsdl for %r from %r", meta.get('url'), path)
+
+        return InterfaceDocument(data, gzipped=gzipped, etag=meta['etag'])
+
+    def get_validation_schema(self, interface):
+        """Returns the ``lxml.etree.XMLSchema`` instance for validating
+        documents against the given interface. The schema documents are built
+        and stored when they're not in the store."""
+
+        path = self.get_path(interface)
+        meta = self._get_meta(path)
+        if meta is None:
+            path = self.build(interface)
+            meta = self._get_meta(path)
+
+        file_name = os.path.join(path, XSD_DIR_NAME, '%s.xsd' % meta['tns'])
+        with open(file_name, 'rb') as f:
+            retval = etree.XMLSchema(etree.parse(f, base_url=file_name))
+
+        logger.debug("Loaded validation schema from %r", path)
+
+        return retval
+
+
+def main(argv=None):
+    import sys
+    import importlib
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Builds the interface documents of a "
+                                       "Spyne application and stores them.")
+    parser.add_argument('app', help="The application, as "
+                                  "'package.module:attribute'. The attribute "
+                                  "can also be a server transport instance.")
+    parser.add_argument('path', help="The directory to store the documents.")
+    parser.add_argument('url', nargs='?', help="The url of the service. The "
+                                             "Wsdl document is not built "
+                                             "when missing.")
+
+    args = parser.parse_args(argv)
+
+    module_name, _, attr_name = args.app.partition(':')
+    app = importlib.import_module(module_name)
+    for name in attr_name.split('.'):
+        app = getattr(app, name)
+
+    app = getattr(app, 'app', app)
+
+    path = InterfaceDocumentStore(args.path).build(app.interface, args.url)
+    sys.stdout.write(path + '\n')
+
+    return 0
+
+
+if __name__ == '__main__':
+    import sys
+    sys.exit(main())
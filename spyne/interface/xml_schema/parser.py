@@ -167,6 +167,9 @@ class XmlSchemaParser(object):
 
         self.pending_simple_types = defaultdict(set)
 
+        # shared with clones, see get_customized()
+        self.customizations = {}
+
     def clone(self, indent=0, base_dir=None):
         retval = copy(self)
 
@@ -186,6 +189,24 @@ class XmlSchemaParser(object):
 
         return retval
 
+    def get_customized(self, t, kwargs):
+        """Returns ``t.customize(**kwargs)``. Large schemas repeat the same few
+        customizations (like ``nillable=False``) for thousands of elements, so
+        each distinct one is only done once per parse and the resulting class
+        is shared."""
+
+        try:
+            key = (t, frozenset((k, type(v), v) for k, v in kwargs.items()))
+            retval = self.customizations.get(key, None)
+
+        except TypeError:  # unhashable default value
+            return t.customize(**kwargs)
+
+        if retval is None:
+            retval = self.customizations[key] = t.customize(**kwargs)
+
+        return retval
+
     def debug0(self, s, *args, **kwargs):
         logger.debug("%s%s" % ("  " *  self.indent, s), *args, **kwargs)
 
@@ -388,7 +409,7 @@ class XmlSchemaParser(object):
             kwargs['default'] = _prot.from_string(t, a.default)
 
         if len(kwargs) > 0:
-            t = t.customize(**kwargs)
+            t = self.get_customized(t, kwargs)
             self.debug2("t = t.customize(**%r)" % kwargs)
         return a.name, XmlAttribute(t)
 
@@ -428,14 +449,14 @@ class XmlSchemaParser(object):
                     kwargs['default'] = _prot.from_string(t, e.default)
 
                 if len(kwargs) > 0:
-                    t = t.customize(**kwargs)
+                    t = self.get_customized(t, kwargs)
 
             if attribute is not None:
                 if attribute.default is not None:
                     kwargs['default'] = _prot.from_string(t, a.default)
 
                 if len(kwargs) > 0:
-                    t = t.customize(**kwargs)
+                    t = self.get_customized(t, kwargs)
 
             ti.append( (name, wrapper(t)) )
             self.debug2("    found: %r(%s), c: %r", key, tn, kwargs)
@@ -199,6 +199,9 @@ class ModelBase(object):
     mainly used for defining constraints on input values.
     """
 
+    # lets ComplexModel subclasses with Attributes.slots do without __dict__
+    __slots__ = ()
+
     __orig__ = None
     """This holds the original class the class .customize()d from. Ie if this is
     None, the class is not a customize()d one."""
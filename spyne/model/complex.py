@@ -28,9 +28,13 @@ from __future__ import print_function
 import logging
 logger = logging.getLogger(__name__)
 
+import re
+import sys
 import decimal
 
 from copy import copy
+from types import MemberDescriptorType
+from keyword import iskeyword
 from weakref import WeakKeyDictionary
 from collections import deque
 from inspect import isclass
@@ -63,10 +67,13 @@ PSSM_VALUES = {'json': json, 'xml': xml, 'msgpack': msgpack, 'table': table}
 
 
 def _is_under_pydev_debugger():
-    import inspect
-    for frame in inspect.stack():
-        if frame[1].endswith("pydevd.py"):
+    # walks the frames by hand because inspect.stack() also reads the source
+    # of every frame, which makes it a noticeable part of import time.
+    frame = sys._getframe()
+    while frame is not None:
+        if frame.f_code.co_filename.endswith("pydevd.py"):
             return True
+        frame = frame.f_back
     return False
 
 
@@ -602,6 +609,185 @@ def _process_child_attrs(cls, retval, kwargs):
                 retval.Attributes._delayed_child_attrs[k] = v
 
 
+def _gen_slots(cls_name, cls_bases, cls_dict, _type_info, attrs):
+    """Sets ``__slots__`` in ``cls_dict`` for the fields in ``_type_info``
+    that don't already have a slot in a base class. Field declarations are
+    removed from ``cls_dict`` as they'd conflict with their slots."""
+
+    if cls_dict.get('__mixin__', False) or '__slots__' in cls_dict:
+        return
+    if cls_dict.get('__orig__', None) is not None:
+        return
+    if attrs.table_name is not None or attrs.sqla_table is not None:
+        return
+
+    existing = set()
+    for b in cls_bases:
+        for c in b.__mro__:
+            existing.update(c.__dict__.get('__slots__', ()))
+
+    slots = []
+    for k in _type_info:
+        if k in existing:
+            continue
+
+        v = cls_dict.get(k, None)
+        if v is not None and _get_spyne_type(cls_name, k, v) is None:
+            continue  # eg. a property
+
+        cls_dict.pop(k, None)
+        slots.append(k)
+
+    if not any(b.__dictoffset__ for b in cls_bases):
+        slots.append('__dict__')
+    if not any(b.__weakrefoffset__ for b in cls_bases):
+        slots.append('__weakref__')
+
+    cls_dict['__slots__'] = tuple(slots)
+
+
+_identifier_re = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def _is_generated_init(func):
+    return getattr(func, '_spyne_generated', False)
+
+
+def _can_gen_init(cls):
+    """Returns ``True`` when instances of ``cls`` are initialized by
+    ``ComplexModelBase.__init__`` or by a generated ``__init__``."""
+
+    if cls.__orig__ is not None or hasattr(cls, '_sa_class_manager'):
+        return False
+
+    if cls.__new__ is not object.__new__:
+        return False
+
+    for c in cls.__mro__:
+        init = c.__dict__.get('__init__', None)
+        if init is not None:
+            break
+
+    return init is ComplexModelBase.__dict__['__init__'] or \
+                                                        _is_generated_init(init)
+
+
+def _gen_init(cls):
+    """Returns the source and the globals of an ``__init__`` specialized for
+    the current fields of ``cls`` and of a ``new()`` function that returns an
+    instance with only the default values set. Returns ``None`` when ``cls``
+    must be initialized by ``ComplexModelBase.__init__``."""
+
+    fti = cls.get_flat_type_info(cls)
+
+    ns = {'cls': cls, 'generic': ComplexModelBase.__dict__['__init__'],
+                                                   'object_new': object.__new__}
+    with_kwargs = []
+    without_kwargs = []
+    for i, (k, v) in enumerate(fti.items()):
+        if not _identifier_re.match(k) or iskeyword(k):
+            return None
+
+        if isinstance(getattr(cls, k, None), property):
+            return None
+
+        attr = v.Attributes
+        def_fac = attr.default_factory
+        if def_fac is not None:
+            if six.PY2 and hasattr(def_fac, 'im_func'):
+                def_fac = def_fac.im_func
+            ns['f%d' % i] = def_fac
+            default = 'f%d()' % i
+
+        elif attr.default is not None:
+            ns['d%d' % i] = attr.default
+            default = 'd%d' % i
+
+        else:
+            default = 'None'
+
+        without_kwargs.append("self.%s = %s" % (k, default))
+        if attr.read_only:
+            # same as _safe_set: read only fields are not set from kwargs
+            with_kwargs.append("if '%s' not in kwargs: self.%s = %s" %
+                                                               (k, k, default))
+        else:
+            with_kwargs.append("self.%s = kwargs['%s'] if '%s' in kwargs "
+                                                "else %s" % (k, k, k, default))
+
+    lines = [
+        "def __init__(self, *args, **kwargs):",
+        "    if len(args) > 0 or self.__class__ is not cls:",
+        "        return generic(self, *args, **kwargs)",
+        "    if len(kwargs) > 0:",
+    ]
+    lines.extend("        " + l for l in with_kwargs or ['pass'])
+    lines.append("    else:")
+    lines.extend("        " + l for l in without_kwargs or ['pass'])
+
+    lines.append("def new():")
+    lines.append("    self = object_new(cls)")
+    lines.extend("    " + l for l in without_kwargs)
+    lines.append("    return self")
+
+    return '\n'.join(lines), ns
+
+
+def _set_init(cls):
+    """Installs a generated ``__init__`` to ``cls`` along with a
+    ``_new_instance`` factory for ``get_deserialization_instance``. Returns
+    the ``__init__`` to use for ``cls``."""
+
+    generic = ComplexModelBase.__dict__['__init__']
+
+    if not _can_gen_init(cls):
+        return generic
+
+    gen = _gen_init(cls)
+    if gen is None:
+        cls.__init__ = generic
+        if '_new_instance' in cls.__dict__:
+            del cls._new_instance
+        return generic
+
+    source, ns = gen
+    six.exec_(source, ns)
+
+    init = ns['__init__']
+    init._spyne_generated = True
+    cls.__init__ = init
+    # only ever looked up in cls.__dict__, so it's never bound
+    cls._new_instance = ns['new']
+
+    return init
+
+
+def _set_init_stub(cls):
+    """Installs an ``__init__`` to ``cls`` that generates the real one on
+    first use. This keeps class creation cheap for classes that are never
+    instantiated."""
+
+    if not _can_gen_init(cls):
+        return
+
+    def __init__(self, *args, **kwargs):
+        _set_init(cls)(self, *args, **kwargs)
+
+    __init__._spyne_generated = True
+    cls.__init__ = __init__
+
+    if '_new_instance' in cls.__dict__:
+        del cls._new_instance
+
+
+def _reset_inits(cls):
+    """Drops the generated ``__init__`` methods of ``cls`` and its subclasses,
+    to be called after fields change."""
+
+    for c in chain((cls,), cls.get_subclasses()):
+        _set_init_stub(c)
+
+
 class ComplexModelMeta(with_metaclass(Prepareable, type(ModelBase))):
     """This metaclass sets ``_type_info``, ``__type_name__`` and ``__extends__``
     which are going to be used for (de)serialization and schema generation.
@@ -631,6 +817,9 @@ class ComplexModelMeta(with_metaclass(Prepareable, type(ModelBase))):
         _sanitize_type_info(cls_name, _type_info, _type_info_alt)
         _sanitize_sqlalchemy_parameters(cls_dict, attrs)
 
+        if attrs.slots:
+            _gen_slots(cls_name, cls_bases, cls_dict, _type_info, attrs)
+
         return super(ComplexModelMeta, cls).__new__(cls,
                                                   cls_name, cls_bases, cls_dict)
 
@@ -728,6 +917,8 @@ class ComplexModelMeta(with_metaclass(Prepareable, type(ModelBase))):
 
             gen_sqla_info(self, cls_bases)
 
+        _set_init_stub(self)
+
         super(ComplexModelMeta, self).__init__(cls_name, cls_bases, cls_dict)
 
     #
@@ -767,6 +958,8 @@ class ComplexModelBase(ModelBase):
     from.
     """
 
+    __slots__ = ()
+
     __mixin__ = False
 
     class Attributes(ModelBase.Attributes):
@@ -826,7 +1019,8 @@ class ComplexModelBase(ModelBase):
         In order to get declared field order in Python 2, the
         :class:`spyne.util.meta.Preparable` class inspects the frame stack in
         order to locate the class definition, re-parses it to get declaration
-        order from the AST and uses that information to order elements.
+        order from the AST and uses that information to order elements. This
+        is skipped on Python 3.6+ and PyPy, where dicts keep insertion order.
 
         It's a horrible hack that we tested to work with CPython 2.6 through 3.3
         and PyPy. It breaks in Nuitka as Nuitka does away with code objects.
@@ -836,6 +1030,19 @@ class ComplexModelBase(ModelBase):
         unless you're sure you fully understand the consequences.
         """
 
+        slots = False
+        """When ``True``, instances keep their fields in ``__slots__`` instead
+        of the instance dict, which makes them considerably smaller and
+        faster to create. A ``__dict__`` is still available, and it is only
+        allocated when something sets an attribute that is not a slot, such
+        as a field added with ``append_field()`` after the class was
+        created. Ignored for classes mapped to a database table and for
+        mixins.
+
+        This is inherited by subclasses, so it's enough to set it on the
+        root of a class hierarchy.
+        """
+
         parent_variant = None
         """FIXME: document me yo."""
 
@@ -883,6 +1090,10 @@ class ComplexModelBase(ModelBase):
                                                    cls_getattr_ret.fset is None:
                     continue  # we skip read-only properties
 
+                elif isinstance(cls_getattr_ret, MemberDescriptorType) and \
+                                                               hasattr(self, k):
+                    continue  # slot that's already set
+
                 elif def_fac is not None:
                     if six.PY2 and hasattr(def_fac, 'im_func'):
                         # unbound-method error workaround. huh.
@@ -923,10 +1134,22 @@ class ComplexModelBase(ModelBase):
         return retval
 
     def __repr__(self):
-        return "%s(%s)" % (self.get_type_name(), ', '.join(
-               ['%s=%r' % (k, self.__dict__.get(k))
-                    for k in self.__class__.get_flat_type_info(self.__class__)
-                    if self.__dict__.get(k, None) is not None]))
+        cls = self.__class__
+        d = self.__dict__
+
+        values = []
+        for k in cls.get_flat_type_info(cls):
+            if k in d:
+                v = d[k]
+            elif isinstance(getattr(cls, k, None), MemberDescriptorType):
+                v = getattr(self, k, None)
+            else:
+                v = None
+
+            if v is not None:
+                values.append('%s=%r' % (k, v))
+
+        return "%s(%s)" % (self.get_type_name(), ', '.join(values))
 
     def _safe_set(self, key, value, t):
         if t.Attributes.read_only:
@@ -1009,9 +1232,13 @@ class ComplexModelBase(ModelBase):
         """Get an empty native type so that the deserialization logic can set
         its attributes.
         """
-        if cls.__orig__ is None:
+        if cls.__orig__ is not None:
+            cls = cls.__orig__
+
+        new = cls.__dict__.get('_new_instance', None)
+        if new is None:
             return cls()
-        return cls.__orig__()
+        return new()
 
     @classmethod
     @memoize_id
@@ -1217,6 +1444,8 @@ class ComplexModelBase(ModelBase):
         ComplexModelBase.get_flat_type_info.memo.clear()
         ComplexModelBase.get_simple_type_info.memo.clear()
 
+        _reset_inits(cls)
+
     @classmethod
     def _append_to_variants(cls, field_name, field_type):
         if cls.Attributes._variants is not None:
@@ -1254,6 +1483,8 @@ class ComplexModelBase(ModelBase):
         ComplexModelBase.get_flat_type_info.memo.clear()
         ComplexModelBase.get_simple_type_info.memo.clear()
 
+        _reset_inits(cls)
+
     @classmethod
     def insert_field(cls, index, field_name, field_type):
         cls._insert_field_impl(index, field_name, field_type)
@@ -1274,6 +1505,8 @@ class ComplexModelBase(ModelBase):
         ComplexModelBase.get_flat_type_info.memo.clear()
         ComplexModelBase.get_simple_type_info.memo.clear()
 
+        _reset_inits(cls)
+
     @classmethod
     def _replace_field(cls, field_name, field_type):
         cls._replace_field_impl(field_name, field_type)
@@ -1323,6 +1556,8 @@ class ComplexModel(ComplexModelBase):
     (see :class:``spyne.model.ModelBase``).
     """
 
+    __slots__ = ()
+
 
 @add_metaclass(ComplexModelMeta)
 class Array(ComplexModelBase):
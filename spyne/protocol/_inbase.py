@@ -27,20 +27,16 @@ import pytz
 import uuid
 
 from math import modf
+from weakref import WeakKeyDictionary
 from time import strptime, mktime
 from datetime import timedelta, time, datetime, date
 from decimal import Decimal as D, InvalidOperation
 
 from pytz import FixedOffset
 
-try:
-    from lxml import etree
-    from lxml import html
-except ImportError:
-    etree = None
-    html = None
-
 from spyne.protocol._base import ProtocolMixin
+from spyne.protocol._validation import gen_string_validator, \
+    gen_native_validator, gen_freq_validator
 from spyne.model import ModelBase, XmlAttribute, Array, Null, \
     ByteArray, File, ComplexModelBase, AnyXml, AnyHtml, Unicode, String, \
     Decimal, Double, Integer, Time, DateTime, Uuid, Date, Duration, Boolean
@@ -109,6 +105,9 @@ class InProtocolBase(ProtocolMixin):
         self.validator = None
         self.set_validator(validator)
 
+        self._validator_cache = WeakKeyDictionary()
+        self._freq_validator_cache = WeakKeyDictionary()
+
         if self.binary_encoding is None:
             self.binary_encoding = self.default_binary_encoding
 
@@ -205,6 +204,15 @@ class InProtocolBase(ProtocolMixin):
         if applicable.
         """
 
+    def decompose_incoming_batch(self, ctx):
+        """Returns the list of the documents of individual calls when
+        ``ctx.in_document`` is a batch request, or None otherwise. Protocols
+        that support batch requests override this. See
+        :mod:`spyne.server.batch`.
+        """
+
+        return None
+
     def deserialize(self, ctx, message):
         """Takes a MethodContext instance and a string containing ONE document
         instance in the ``ctx.in_string`` attribute.
@@ -226,6 +234,45 @@ class InProtocolBase(ProtocolMixin):
 
         self.validator = None
 
+    def get_validators(self, cls):
+        """Returns a ``(validate_string, validate_native)`` tuple of functions
+        that take only the value to validate and are equivalent to the
+        ``validate_string`` and ``validate_native`` static methods of the given
+        class. Either of them is None when it would accept any value.
+
+        The functions are compiled once per class and cached in the protocol
+        instance, so the class' ``Attributes`` should not be modified after its
+        first use.
+        """
+
+        try:
+            return self._validator_cache[cls]
+        except KeyError:
+            pass
+
+        retval = self._validator_cache[cls] = \
+                            (gen_string_validator(cls), gen_native_validator(cls))
+
+        return retval
+
+    def get_freq_validator(self, cls, fti=None):
+        """Returns a list of ``(key, min_occurs, max_occurs)`` tuples for the
+        members of the given ``ComplexModel`` subclass whose frequency
+        constraints can fail. It's recompiled when the class' fields change.
+        """
+
+        if fti is None:
+            fti = cls.get_flat_type_info(cls)
+
+        entry = self._freq_validator_cache.get(cls, None)
+        if entry is not None and entry[0] is fti:
+            return entry[1]
+
+        retval = gen_freq_validator(fti)
+        self._freq_validator_cache[cls] = (fti, retval)
+
+        return retval
+
     def from_string(self, class_, string, *args, **kwargs):
         if string is None:
             return None
@@ -257,12 +304,17 @@ class InProtocolBase(ProtocolMixin):
         return None
 
     def any_xml_from_string(self, cls, string):
+        from lxml import etree
+
         try:
             return etree.fromstring(string)
         except etree.XMLSyntaxError as e:
             raise ValidationError(string, "%%r: %r" % e)
 
     def any_html_from_string(self, cls, string):
+        from lxml import etree
+        from lxml import html
+
         try:
             return html.fromstring(string)
         except etree.ParserError as e:
@@ -415,9 +467,10 @@ class InProtocolBase(ProtocolMixin):
             raise ValidationError(string)
 
     def enum_base_from_string(self, cls, value):
-        if self.validator is self.SOFT_VALIDATION and not (
-                                        cls.validate_string(cls, value)):
-            raise ValidationError(value)
+        if self.validator is self.SOFT_VALIDATION:
+            validate_string = self.get_validators(cls)[0]
+            if validate_string is not None and not validate_string(value):
+                raise ValidationError(value)
         return getattr(cls, value)
 
     def model_base_from_string(self, cls, value):
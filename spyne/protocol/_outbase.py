@@ -33,13 +33,6 @@ from decimal import Decimal as D
 from mmap import mmap, ACCESS_READ
 from time import mktime, strftime
 
-try:
-    from lxml import etree
-    from lxml import html
-except ImportError:
-    etree = None
-    html = None
-
 from spyne.protocol._base import ProtocolMixin
 
 from spyne.model import ModelBase, XmlAttribute, SimpleModel, Null, \
@@ -47,10 +40,11 @@ from spyne.model import ModelBase, XmlAttribute, SimpleModel, Null, \
     Double, Integer, Time, DateTime, Uuid, Duration, Boolean, AnyDict, AnyUri
 
 from spyne.const.http import HTTP_400, HTTP_401, HTTP_404, HTTP_405, HTTP_413, \
-    HTTP_500
+    HTTP_500, HTTP_503
 
 from spyne.error import Fault, InternalError, ResourceNotFoundError, \
-    RequestTooLongError, RequestNotAllowed, InvalidCredentialsError
+    RequestTooLongError, RequestNotAllowed, InvalidCredentialsError, \
+    ServiceUnavailableError
 
 from spyne.model.binary import binary_encoding_handlers, \
     BINARY_ENCODING_USE_DEFAULT
@@ -169,6 +163,14 @@ class OutProtocolBase(ProtocolMixin):
     def create_out_string(self, ctx, out_string_encoding=None):
         """Uses ctx.out_document to set ctx.out_string"""
 
+    def compose_outgoing_batch(self, ctx, contexts):
+        """Sets ``ctx.out_document`` of a batch request using the
+        ``out_document`` attributes of the given call contexts, which are in
+        the same order as the calls in the request.
+        """
+
+        raise NotImplementedError("%r does not support batch requests" % self)
+
     def fault_to_http_response_code(self, fault):
         """Special function to convert native Python exceptions to Http response
         codes.
@@ -182,6 +184,8 @@ class OutProtocolBase(ProtocolMixin):
             return HTTP_405
         if isinstance(fault, InvalidCredentialsError):
             return HTTP_401
+        if isinstance(fault, ServiceUnavailableError):
+            return HTTP_503
         if isinstance(fault, Fault) and (fault.faultcode.startswith('Client.')
                                                 or fault.faultcode == 'Client'):
             return HTTP_400
@@ -235,18 +239,22 @@ class OutProtocolBase(ProtocolMixin):
         return ""
 
     def any_xml_to_bytes(self, cls, value, **_):
+        from lxml import etree
         return etree.tostring(value)
 
     def any_xml_to_unicode(self, cls, value, **_):
+        from lxml import etree
         return etree.tostring(value, encoding='unicode')
 
     def any_dict_to_unicode(self, cls, value, **_):
         return repr(value)
 
     def any_html_to_bytes(self, cls, value, **_):
+        from lxml import html
         return html.tostring(value)
 
     def any_html_to_unicode(self, cls, value, **_):
+        from lxml import html
         return html.tostring(value, encoding='unicode')
 
     def uuid_to_bytes(self, cls, value, suggested_encoding=None, **_):
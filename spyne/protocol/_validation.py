@@ -0,0 +1,258 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""Compiled counterparts of the ``validate_string`` and ``validate_native``
+static methods of spyne models, used by input protocols for soft validation.
+
+The validation methods of the built-in types call each other down the class
+hierarchy and read every constraint from ``cls.Attributes`` on every call. The
+functions here read the constraints once per class and return a single closure
+that checks only those that can fail. A class whose validator is not one of the
+built-in ones, e.g. because it was overridden in a user type, gets a closure
+that simply calls it.
+
+None is returned instead of a function when the validation would pass for any
+value, so that the callers can skip it altogether.
+"""
+
+import math
+
+from spyne.model import ModelBase, SimpleModel
+from spyne.model.enum import EnumBase
+from spyne.model.primitive import Unicode
+from spyne.model.primitive.number import Decimal, Integer, UnsignedInteger, \
+    PositiveInteger, Integer8, Integer16, Integer32, Integer64, \
+    UnsignedInteger8, UnsignedInteger16, UnsignedInteger32, UnsignedInteger64
+
+
+def _is_not_none(value):
+    return value is not None
+
+
+def _is_finite(num):
+    try:
+        return not (math.isinf(num) or math.isnan(num))
+    except (TypeError, ValueError, OverflowError):
+        return True
+
+
+def _len_check(attrs):
+    min_len, max_len = attrs.min_len, attrs.max_len
+    if min_len <= 0 and not _is_finite(max_len):
+        # len() is still called, just like in Unicode.validate_string, so that
+        # values without a length are rejected.
+        return lambda value: len(value) >= 0
+
+    if min_len <= 0:
+        return lambda value: len(value) <= max_len
+
+    return lambda value: min_len <= len(value) <= max_len
+
+
+def _str_len_check(attrs):
+    max_str_len = attrs.max_str_len
+    return lambda value: len(value) <= max_str_len
+
+
+def _enum_check(cls):
+    values = cls.__values__
+    return lambda value: value in values
+
+
+def _values_check(attrs):
+    values = attrs.values
+    if values is None or len(values) == 0:
+        return None
+
+    return lambda value: value in values
+
+
+def _pattern_check(attrs):
+    if attrs.pattern is None:
+        return None
+
+    match = attrs._pattern_re.match
+
+    def _check(value):
+        m = match(value)
+        return m is not None and m.end() == len(value)
+
+    return _check
+
+
+def _range_check(attrs):
+    # infinite bounds are compared as floats, which is much faster than
+    # comparing with Decimal('inf').
+    gt, ge, lt, le = [b if _is_finite(b) else float(b)
+                          for b in (attrs.gt, attrs.ge, attrs.lt, attrs.le)]
+
+    # the default inclusive bounds can only fail for NaN, which fails the
+    # exclusive ones too.
+    if ge == float('-inf') and le == float('inf'):
+        return lambda value: gt < value < lt
+
+    return lambda value: gt < value and ge <= value and value < lt \
+                                                               and value <= le
+
+
+def _integral_check(attrs):
+    return lambda value: int(value) == value
+
+
+def _non_negative_check(attrs):
+    return lambda value: value >= 0
+
+
+def _positive_check(attrs):
+    return lambda value: value > 0
+
+
+def _bound_check(attrs):
+    min_b, max_b = attrs.min_bound, attrs.max_bound
+    return lambda value: min_b <= value <= max_b
+
+
+def _unsigned_bound_check(attrs):
+    # UnsignedIntegerNN.validate_native excludes the upper bound.
+    min_b, max_b = attrs.min_bound, attrs.max_bound
+    return lambda value: min_b <= value < max_b
+
+
+_DECIMAL_CHECKS = (_values_check, _range_check)
+_INTEGER_CHECKS = _DECIMAL_CHECKS + (_integral_check,)
+_UNSIGNED_CHECKS = _INTEGER_CHECKS + (_non_negative_check,)
+
+NATIVE_CHECKS = {
+    ModelBase.validate_native: (),
+    SimpleModel.validate_native: (_values_check,),
+    Unicode.validate_native: (_values_check, _pattern_check),
+    Decimal.validate_native: _DECIMAL_CHECKS,
+    Integer.validate_native: _INTEGER_CHECKS,
+    UnsignedInteger.validate_native: _UNSIGNED_CHECKS,
+    PositiveInteger.validate_native: _INTEGER_CHECKS + (_positive_check,),
+}
+"""Maps built-in ``validate_native`` implementations to the functions that
+return the checks they run on values that are not None. A check builder can
+return None when its constraint is not set."""
+
+for _cls in (Integer8, Integer16, Integer32, Integer64):
+    NATIVE_CHECKS[_cls.validate_native] = _INTEGER_CHECKS + (_bound_check,)
+
+for _cls in (UnsignedInteger8, UnsignedInteger16, UnsignedInteger32,
+                                                             UnsignedInteger64):
+    NATIVE_CHECKS[_cls.validate_native] = \
+                                     _UNSIGNED_CHECKS + (_unsigned_bound_check,)
+
+del _cls
+
+STRING_CHECKS = {
+    ModelBase.validate_string: (),
+    Unicode.validate_string: (_len_check,),
+    Decimal.validate_string: (_str_len_check,),
+}
+"""Same as :data:`NATIVE_CHECKS`, for ``validate_string``."""
+
+
+def _gen_validator(none_result, checks):
+    checks = [c for c in checks if c is not None]
+
+    if len(checks) == 0:
+        if none_result:
+            return None
+        return _is_not_none
+
+    if len(checks) == 1:
+        check, = checks
+
+        def _validate(value):
+            if value is None:
+                return none_result
+            return check(value)
+
+        return _validate
+
+    if len(checks) == 2:
+        check1, check2 = checks
+
+        def _validate(value):
+            if value is None:
+                return none_result
+            return check1(value) and check2(value)
+
+        return _validate
+
+    def _validate(value):
+        if value is None:
+            return none_result
+
+        for check in checks:
+            if not check(value):
+                return False
+
+        return True
+
+    return _validate
+
+
+def gen_string_validator(cls):
+    """Returns a function that takes a value and returns the same thing as
+    ``cls.validate_string(cls, value)``, or None when that's always truthy."""
+
+    func = cls.validate_string
+    attrs = cls.Attributes
+
+    if func is EnumBase.validate_string:
+        # returns False for None unless it's one of the enum values.
+        nillable = attrs.nillable
+        check = _enum_check(cls)
+        return lambda value: (nillable or value is not None) and check(value)
+
+    builders = STRING_CHECKS.get(func, None)
+    if builders is None:
+        return lambda value: func(cls, value)
+
+    return _gen_validator(attrs.nillable, [b(attrs) for b in builders])
+
+
+def gen_native_validator(cls):
+    """Returns a function that takes a value and returns the same thing as
+    ``cls.validate_native(cls, value)``, or None when that's always truthy."""
+
+    func = cls.validate_native
+    attrs = cls.Attributes
+
+    builders = NATIVE_CHECKS.get(func, None)
+    if builders is None:
+        return lambda value: func(cls, value)
+
+    return _gen_validator(attrs.nullable, [b(attrs) for b in builders])
+
+
+def gen_freq_validator(fti):
+    """Returns a list of ``(key, min_occurs, max_occurs)`` tuples for members
+    of the given flat type info dict whose occurrence constraints can fail."""
+
+    retval = []
+    for k, v in fti.items():
+        attrs = v.Attributes
+        min_o, max_o = attrs.min_occurs, attrs.max_occurs
+        if min_o > 0 or _is_finite(max_o):
+            retval.append((k, min_o, max_o))
+
+    return retval
@@ -64,6 +64,7 @@ def _complex_to_csv(prot, ctx):
                 writer.writerow([r])
 
         yield queue.getvalue()
+        queue.seek(0)
         queue.truncate(0)
 
     else:
@@ -77,6 +78,7 @@ def _complex_to_csv(prot, ctx):
             writer.writerow(titles)
 
         yield queue.getvalue()
+        queue.seek(0)
         queue.truncate(0)
 
         if ctx.out_object[0] is not None:
@@ -90,6 +92,7 @@ def _complex_to_csv(prot, ctx):
                 writer.writerow(d)
                 yval = queue.getvalue()
                 yield yval
+                queue.seek(0)
                 queue.truncate(0)
 
 
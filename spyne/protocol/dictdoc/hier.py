@@ -24,6 +24,8 @@ import re
 RE_HTTP_ARRAY_INDEX = re.compile("\\[([0-9]+)\\]")
 
 from collections import defaultdict, Iterable as AbcIterable
+from threading import RLock
+from weakref import WeakKeyDictionary
 
 from spyne.util import six
 from spyne.error import ValidationError
@@ -40,8 +42,28 @@ class HierDictDocument(DictDocument):
     hierarchical dictionaries. Examples include: Json, MessagePack and Yaml.
 
     Implement ``create_in_document()`` and ``create_out_string()`` to use this.
+
+    Subclasses that can write their output incrementally should set
+    ``stream_output`` to ``True``. Arrays in ``ctx.out_document`` are then
+    generators instead of lists, and they're consumed only when
+    ``create_out_string()`` walks the document.
+
+    ``ComplexModel`` subclasses are (de)serialized by encoder and decoder
+    functions that are compiled once per class and cached in the protocol
+    instance, so that type dispatch happens once per class instead of once per
+    value. They're recompiled when the class' fields change.
     """
 
+    stream_output = False
+
+    def __init__(self, *args, **kwargs):
+        super(HierDictDocument, self).__init__(*args, **kwargs)
+
+        self._encoder_cache = WeakKeyDictionary()
+        self._decoder_cache = {}
+        self._compile_lock = RLock()
+        self._compiling = set()
+
     from_serstr = DictDocument.from_unicode
     to_serstr = DictDocument.to_unicode
 
@@ -138,6 +160,7 @@ class HierDictDocument(DictDocument):
     def _from_dict_value(self, key, cls, inst, validator):
         if validator is self.SOFT_VALIDATION:
             self.validate(key, cls, inst)
+            validate_string, validate_native = self.get_validators(cls)
 
         cls_attr = self.get_cls_attrs(cls)
         complex_as = self.get_complex_as(cls_attr)
@@ -157,8 +180,9 @@ class HierDictDocument(DictDocument):
                 inst = None
 
             if (validator is self.SOFT_VALIDATION
+                                        and validate_string is not None
                                         and isinstance(inst, six.string_types)
-                                        and not cls.validate_string(cls, inst)):
+                                        and not validate_string(inst)):
                 raise ValidationError((key, inst))
 
             if issubclass(cls, (ByteArray, File, Uuid)):
@@ -168,7 +192,7 @@ class HierDictDocument(DictDocument):
 
         # validate native type
         if validator is self.SOFT_VALIDATION and \
-                                           not cls.validate_native(cls, retval):
+                      validate_native is not None and not validate_native(retval):
             raise ValidationError([key, retval])
 
         return retval
@@ -224,60 +248,7 @@ class HierDictDocument(DictDocument):
                                                             cls.get_type_name())
                 cls = subcls
 
-        inst = cls.get_deserialization_instance()
-
-        # get all class attributes, including the ones coming from parent classes.
-        flat_type_info = cls.get_flat_type_info(cls)
-
-        # this is for validating cls.Attributes.{min,max}_occurs
-        frequencies = defaultdict(int)
-
-        try:
-            items = doc.items()
-        except AttributeError:
-            # Input is not a dict, so we assume it's a sequence that we can pair
-            # with the incoming sequence with field names.
-            # TODO: cache this
-            try:
-                items = zip([k for k, v in flat_type_info.items()
-                                         if not self.get_cls_attrs(v).exc], doc)
-            except TypeError:
-                logger.error("Invalid document %r for %r", doc, cls)
-                raise
-
-        # parse input to set incoming data to related attributes.
-        for k, v in items:
-            if not six.PY2 and isinstance(k, bytes):
-                k = k.decode('utf8')
-            member = flat_type_info.get(k, None)
-            if member is None:
-                member, k = flat_type_info.alt.get(k, (None, k))
-                if member is None:
-                    continue
-
-            attr = self.get_cls_attrs(member)
-
-            mo = attr.max_occurs
-            if mo > 1:
-                subinst = getattr(inst, k, None)
-                if subinst is None:
-                    subinst = []
-
-                for a in v:
-                    subinst.append(self._from_dict_value(k, member, a, validator))
-
-            else:
-                subinst = self._from_dict_value(k, member, v, validator)
-
-            inst._safe_set(k, subinst, member)
-
-            frequencies[k] += 1
-
-        attrs = self.get_cls_attrs(cls)
-        if validator is self.SOFT_VALIDATION and attrs.validate_freq:
-            self._check_freq_dict(cls, frequencies, flat_type_info)
-
-        return inst
+        return self._get_complex_decoder(cls, validator)(doc)
 
     def _object_to_doc(self, cls, inst):
         retval = None
@@ -297,7 +268,10 @@ class HierDictDocument(DictDocument):
         # transform the results into a dict:
         if cls.Attributes.max_occurs > 1:
             if inst is not None:
-                retval = [self._to_dict_value(cls, inst) for inst in inst]
+                if self.stream_output:
+                    retval = (self._to_dict_value(cls, i) for i in inst)
+                else:
+                    retval = [self._to_dict_value(cls, inst) for inst in inst]
         else:
             retval = self._to_dict_value(cls, inst)
 
@@ -366,6 +340,10 @@ class HierDictDocument(DictDocument):
         return self.to_serstr(cls, inst)
 
     def _complex_to_doc(self, cls, inst):
+        encoder = self._get_complex_encoder(cls)
+        if encoder is not None:
+            return encoder(inst)
+
         cls_attrs = self.get_cls_attrs(cls)
         sf = cls_attrs.simple_field
         if sf is not None:
@@ -403,3 +381,336 @@ class HierDictDocument(DictDocument):
 
         for k, v in self._get_member_pairs(cls, inst):
             yield v
+
+    def _get_complex_encoder(self, cls):
+        """Returns a function that serializes instances of the given
+        ``ComplexModel`` subclass to a dict (or a list, see ``complex_as``).
+        Returns ``None`` when the class must go through ``_complex_to_doc``
+        instead.
+        """
+
+        fti = cls.get_flat_type_info(cls)
+        entry = self._encoder_cache.get(cls, None)
+        if entry is not None and entry[0] is fti:
+            return entry[1]
+
+        with self._compile_lock:
+            entry = self._encoder_cache.get(cls, None)
+            if entry is not None and entry[0] is fti:
+                return entry[1]
+
+            key = ('enc', cls)
+            if key in self._compiling:
+                # recursive class, to be looked up during serialization.
+                return None
+
+            self._compiling.add(key)
+            try:
+                if self.polymorphic or \
+                               self.get_cls_attrs(cls).simple_field is not None:
+                    encoder = None
+                else:
+                    encoder = self._gen_complex_encoder(cls, fti)
+
+            finally:
+                self._compiling.discard(key)
+
+            self._encoder_cache[cls] = (fti, encoder)
+
+        return encoder
+
+    def _gen_complex_encoder(self, cls, fti):
+        members = tuple(self._gen_member_encoders(cls))
+
+        complex_as = self.get_complex_as(self.get_cls_attrs(cls))
+        as_list = complex_as is list or \
+                        getattr(cls.Attributes, 'serialize_as', False) is list
+        get_serialization_instance = cls.get_serialization_instance
+        get_flat_type_info = cls.get_flat_type_info
+        ignore_wrappers = self.ignore_wrappers
+        type_name = cls.get_type_name()
+
+        def _encode(inst):
+            if get_flat_type_info(cls) is not fti:
+                return self._complex_to_doc(cls, inst)
+
+            inst = get_serialization_instance(inst)
+
+            pairs = []
+            for k, sub_name, encode, default, keep in members:
+                try:
+                    subinst = getattr(inst, k, None)
+                # to guard against e.g. sqlalchemy throwing NoSuchColumnError
+                except Exception as e:
+                    logger.error("Error getting %r: %r" % (k, e))
+                    subinst = None
+
+                if subinst is None:
+                    subinst = default
+
+                val = encode(subinst)
+                if val is not None or keep:
+                    pairs.append((sub_name, val))
+
+            if as_list:
+                return [v for _, v in pairs]
+
+            d = complex_as(pairs)
+            if ignore_wrappers:
+                return d
+            return {type_name: d}
+
+        return _encode
+
+    def _gen_member_encoders(self, cls):
+        parent_cls = getattr(cls, '__extends__', None)
+        if parent_cls is not None:
+            for r in self._gen_member_encoders(parent_cls):
+                yield r
+
+        for k, v in cls._type_info.items():
+            attr = self.get_cls_attrs(v)
+            if attr.exc:
+                continue
+
+            sub_name = attr.sub_name
+            if sub_name is None:
+                sub_name = k
+
+            keep = attr.min_occurs > 0 or self.get_complex_as(attr) is list
+
+            yield k, sub_name, self._gen_doc_encoder(v), attr.default, keep
+
+    def _gen_doc_encoder(self, cls):
+        """The compiled counterpart of ``_object_to_doc``."""
+
+        keys = []
+        if self.ignore_wrappers:
+            ti = getattr(cls, '_type_info', {})
+
+            while cls.Attributes._wrapper and len(ti) == 1:
+                key, = ti.keys()
+                if not issubclass(cls, Array):
+                    keys.append(key)
+                cls, = ti.values()
+                ti = getattr(cls, '_type_info', {})
+
+        encode = self._gen_value_encoder(cls)
+
+        if cls.Attributes.max_occurs > 1:
+            stream_output = self.stream_output
+
+            def _encode(inst):
+                for key in keys:
+                    inst = getattr(inst, key, None)
+
+                if inst is None:
+                    return None
+                if stream_output:
+                    return (encode(i) for i in inst)
+                return [encode(i) for i in inst]
+
+            return _encode
+
+        if len(keys) > 0:
+            def _encode(inst):
+                for key in keys:
+                    inst = getattr(inst, key, None)
+                return encode(inst)
+
+            return _encode
+
+        return encode
+
+    def _gen_value_encoder(self, cls):
+        """The compiled counterpart of ``_to_dict_value``."""
+
+        if issubclass(cls, (Any, AnyDict)):
+            return lambda inst: inst
+
+        if issubclass(cls, Array):
+            st, = cls._type_info.values()
+            return self._gen_doc_encoder(st)
+
+        if issubclass(cls, ComplexModelBase):
+            encoder = self._get_complex_encoder(cls)
+            if encoder is None:
+                return lambda inst: self._complex_to_doc(cls, inst)
+            return encoder
+
+        if issubclass(cls, File):
+            return lambda inst: self._to_dict_value(cls, inst)
+
+        to_serstr = self.to_serstr
+
+        if issubclass(cls, (ByteArray, Uuid)):
+            binary_encoding = self.binary_encoding
+            return lambda inst: to_serstr(cls, inst, binary_encoding)
+
+        return lambda inst: to_serstr(cls, inst)
+
+    def _get_complex_decoder(self, cls, validator):
+        """Returns a function that deserializes a dict (or a sequence, see
+        ``complex_as``) to an instance of the given ``ComplexModel`` subclass.
+        Wrapper documents are handled by ``_doc_to_object``.
+        """
+
+        cache = self._decoder_cache.get(validator, None)
+        if cache is None:
+            cache = self._decoder_cache[validator] = WeakKeyDictionary()
+
+        fti = cls.get_flat_type_info(cls)
+        entry = cache.get(cls, None)
+        if entry is not None and entry[0] is fti:
+            return entry[1]
+
+        with self._compile_lock:
+            entry = cache.get(cls, None)
+            if entry is not None and entry[0] is fti:
+                return entry[1]
+
+            key = ('dec', cls, validator)
+            if key in self._compiling:
+                # recursive class, to be looked up during deserialization.
+                return lambda doc: \
+                               self._get_complex_decoder(cls, validator)(doc)
+
+            self._compiling.add(key)
+            try:
+                decoder = self._gen_complex_decoder(cls, fti, validator)
+            finally:
+                self._compiling.discard(key)
+
+            cache[cls] = (fti, decoder)
+
+        return decoder
+
+    def _gen_complex_decoder(self, cls, fti, validator):
+        members = {}
+        for k, v in fti.items():
+            members[k] = (k, v, self.get_cls_attrs(v).max_occurs > 1,
+                                         self._gen_value_decoder(v, validator))
+
+        for alt_k, (v, k) in fti.alt.items():
+            if not (alt_k in members):
+                members[alt_k] = (k, v, self.get_cls_attrs(v).max_occurs > 1,
+                                         self._gen_value_decoder(v, validator))
+
+        # for pairing incoming sequences with field names.
+        seq_keys = [k for k, v in fti.items() if not self.get_cls_attrs(v).exc]
+
+        validate_freq = validator is self.SOFT_VALIDATION and \
+                                           self.get_cls_attrs(cls).validate_freq
+        get_deserialization_instance = cls.get_deserialization_instance
+        get_flat_type_info = cls.get_flat_type_info
+
+        def _decode(doc):
+            if get_flat_type_info(cls) is not fti:
+                return self._get_complex_decoder(cls, validator)(doc)
+
+            inst = get_deserialization_instance()
+
+            # this is for validating cls.Attributes.{min,max}_occurs
+            if validate_freq:
+                frequencies = defaultdict(int)
+
+            try:
+                items = doc.items()
+            except AttributeError:
+                # Input is not a dict, so we assume it's a sequence that we can
+                # pair with the incoming sequence with field names.
+                try:
+                    items = zip(seq_keys, doc)
+                except TypeError:
+                    logger.error("Invalid document %r for %r", doc, cls)
+                    raise
+
+            # parse input to set incoming data to related attributes.
+            for k, v in items:
+                if not six.PY2 and isinstance(k, bytes):
+                    k = k.decode('utf8')
+
+                member = members.get(k, None)
+                if member is None:
+                    continue
+
+                k, member, is_array, decode = member
+                if is_array:
+                    subinst = getattr(inst, k, None)
+                    if subinst is None:
+                        subinst = []
+
+                    for a in v:
+                        subinst.append(decode(k, a))
+
+                else:
+                    subinst = decode(k, v)
+
+                inst._safe_set(k, subinst, member)
+
+                if validate_freq:
+                    frequencies[k] += 1
+
+            if validate_freq:
+                self._check_freq_dict(cls, frequencies, fti)
+
+            return inst
+
+        return _decode
+
+    def _gen_value_decoder(self, cls, validator):
+        """The compiled counterpart of ``_from_dict_value``."""
+
+        if validator is not None or issubclass(cls, File):
+            return lambda key, inst: \
+                               self._from_dict_value(key, cls, inst, validator)
+
+        if issubclass(cls, (Any, AnyDict)):
+            return lambda key, inst: inst
+
+        if issubclass(cls, Array):
+            serializer, = cls._type_info.values()
+            decode = self._gen_value_decoder(serializer, validator)
+
+            def _decode(key, inst):
+                if inst is None:
+                    return []
+                if not isinstance(inst, AbcIterable):
+                    raise ValidationError(inst)
+                return [decode(i, child) for i, child in enumerate(inst)]
+
+            return _decode
+
+        if issubclass(cls, ComplexModelBase):
+            if not self.ignore_wrappers:
+                return lambda key, inst: \
+                                       self._doc_to_object(cls, inst, validator)
+
+            decoder = self._get_complex_decoder(cls, validator)
+
+            def _decode(key, inst):
+                if inst is None:
+                    return []
+                return decoder(inst)
+
+            return _decode
+
+        empty_is_none = cls.Attributes.empty_is_none
+        from_serstr = self.from_serstr
+
+        if issubclass(cls, (ByteArray, Uuid)):
+            binary_encoding = self.binary_encoding
+
+            def _decode(key, inst):
+                if empty_is_none and inst in (u'', b''):
+                    inst = None
+                return from_serstr(cls, inst, binary_encoding)
+
+            return _decode
+
+        def _decode(key, inst):
+            if empty_is_none and inst in (u'', b''):
+                inst = None
+            return from_serstr(cls, inst)
+
+        return _decode
@@ -96,6 +96,10 @@ class SimpleDictDocument(DictDocument):
     def _to_native_values(self, cls, member, orig_k, k, v, req_enc, validator):
         value = []
 
+        validate_string = validate_native = None
+        if validator is self.SOFT_VALIDATION:
+            validate_string, validate_native = self.get_validators(member.type)
+
         for v2 in v:
             # some wsgi implementations pass unicode strings, some pass str
             # strings. we get unicode here when we can and should.
@@ -110,8 +114,7 @@ class SimpleDictDocument(DictDocument):
 
             # validate raw data (before deserialization)
             try:
-                if (validator is self.SOFT_VALIDATION and not
-                                  member.type.validate_string(member.type, v2)):
+                if validate_string is not None and not validate_string(v2):
                     raise ValidationError([orig_k, v2])
 
             except TypeError:
@@ -137,8 +140,7 @@ class SimpleDictDocument(DictDocument):
                                   "Validation failed for %s.%s: %%s" % (ns, k))
 
             # validate native data (after deserialization)
-            if (validator is self.SOFT_VALIDATION and not
-                           member.type.validate_native(member.type, native_v2)):
+            if validate_native is not None and not validate_native(native_v2):
                 raise ValidationError([orig_k, v2])
 
             value.append(native_v2)
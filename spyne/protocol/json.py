@@ -40,6 +40,18 @@ is always "from outside to inside" whereas ``object_pairs_hook`` is passed
 ``dict``\s basically in any order "from inside to outside".
 
 .. [#] http://docs.python.org/2/library/json.html#json.loads
+
+Backends
+========
+
+By default, ``JsonDocument`` uses ``simplejson`` when it's installed and the
+``json`` package from the standard library otherwise. Pass ``backend='orjson'``,
+``backend='ujson'`` or ``backend='rapidjson'`` to use one of the faster
+alternatives instead. Backends are only imported when they're selected. Any
+additional keyword arguments passed to ``JsonDocument`` are handed to the
+``loads`` and ``dumps`` functions of the selected backend. You can register
+your own backend by adding a :class:`JsonBackend` subclass to the
+``json_backends`` dict.
 """
 
 from __future__ import absolute_import
@@ -49,7 +61,10 @@ logger = logging.getLogger(__name__)
 
 from spyne.util import six
 
+from inspect import isgenerator
 from itertools import chain
+from decimal import Decimal as D
+from datetime import date, time
 
 try:
     import simplejson as json
@@ -72,21 +87,216 @@ from spyne.model.fault import Fault
 from spyne.protocol.dictdoc import HierDictDocument
 
 
+def _json_default(o):
+    """Converts objects the json encoders don't know about. Only ``Any`` and
+    ``AnyDict`` values and generators can end up here, as everything else is
+    already converted to json-friendly types by the protocol."""
+
+    if isinstance(o, D):
+        return str(o)
+
+    if isinstance(o, (date, time)):
+        return o.isoformat()
+
+    if hasattr(o, '__iter__'):
+        return list(o)
+
+    raise TypeError("%r is not JSON serializable" % (o,))
+
+
 class JsonEncoder(json.JSONEncoder):
     def default(self, o):
-        try:
-            return super(JsonEncoder, self).default(o)
+        return _json_default(o)
+
+
+class _BackendEncoder(object):
+    """Quacks like ``json.JSONEncoder`` as far as streaming output in
+    :class:`JsonDocument` is concerned."""
+
+    sort_keys = False
+
+    def __init__(self, backend, kwargs):
+        self.dumps = backend.dumps
+        self.kwargs = kwargs
+        self.item_separator = backend.item_separator
+        self.key_separator = backend.key_separator
+
+    def encode(self, o):
+        retval = self.dumps(o, **self.kwargs)
+        if isinstance(retval, six.binary_type):
+            retval = retval.decode('utf8')
+        return retval
+
+
+class JsonBackend(object):
+    """Base class for json backends. Subclasses are expected to import the
+    backend module in their constructor and raise ``ImportError`` when it's
+    missing.
+
+    ``dumps`` must return ``six.text_type`` or, when ``dumps_bytes`` is
+    ``True``, utf8-encoded ``bytes``. ``decode_error`` is the exception class
+    that ``loads`` raises for invalid input. Backends that can't handle
+    integers outside the 64-bit range should set ``huge_numbers_as_string``,
+    those are then (de)serialized as strings.
+    """
+
+    name = None
+    dumps_bytes = False
+    huge_numbers_as_string = False
+    decode_error = ValueError
+    item_separator = ','
+    key_separator = ':'
+
+    # passed to dumps when the protocol is used for serializing responses
+    out_kwargs = {}
+
+    def loads(self, s, **kwargs):
+        raise NotImplementedError()
+
+    def dumps(self, o, **kwargs):
+        raise NotImplementedError()
+
+    def get_encoder(self, kwargs):
+        return _BackendEncoder(self, kwargs)
+
+
+class StdJsonBackend(JsonBackend):
+    """Uses ``simplejson`` when available, the ``json`` module from the
+    standard library otherwise."""
+
+    name = 'json'
+    decode_error = JSONDecodeError
+    out_kwargs = {'cls': JsonEncoder}
+
+    def loads(self, s, **kwargs):
+        return json.loads(s, **kwargs)
+
+    def dumps(self, o, **kwargs):
+        return json.dumps(o, **kwargs)
 
-        except TypeError as e:
-            # if json can't serialize it, it's possibly a generator. If not,
-            # additional hacks are welcome :)
-            if logger.level == logging.DEBUG:
-                logger.exception(e)
-            return list(o)
+    def get_encoder(self, kwargs):
+        kwargs = dict(kwargs)
+        cls = kwargs.pop('cls', None)
+        if cls is None:
+            cls = json.JSONEncoder
+        return cls(**kwargs)
+
+
+class OrJsonBackend(JsonBackend):
+    """Uses ``orjson``. Note that orjson refuses non-string dict keys unless
+    told otherwise via the ``option`` argument."""
+
+    name = 'orjson'
+    dumps_bytes = True
+    huge_numbers_as_string = True
+
+    def __init__(self):
+        import orjson
+        self._loads = orjson.loads
+        self._dumps = orjson.dumps
+        self.decode_error = orjson.JSONDecodeError
+
+    def loads(self, s, **kwargs):
+        return self._loads(s, **kwargs)
+
+    def dumps(self, o, **kwargs):
+        kwargs.setdefault('default', _json_default)
+        return self._dumps(o, **kwargs)
+
+
+class UJsonBackend(JsonBackend):
+    """Uses ``ujson``. Note that ujson serializes ``Decimal`` instances as
+    floats."""
+
+    name = 'ujson'
+    huge_numbers_as_string = True
+
+    def __init__(self):
+        import ujson
+        self._loads = ujson.loads
+        self._dumps = ujson.dumps
+
+    def loads(self, s, **kwargs):
+        return self._loads(s, **kwargs)
+
+    def dumps(self, o, **kwargs):
+        kwargs.setdefault('default', _json_default)
+        return self._dumps(o, **kwargs)
+
+
+class RapidJsonBackend(JsonBackend):
+    """Uses ``python-rapidjson``."""
+
+    name = 'rapidjson'
+
+    def __init__(self):
+        import rapidjson
+        self._loads = rapidjson.loads
+        self._dumps = rapidjson.dumps
+        self.decode_error = getattr(rapidjson, 'JSONDecodeError', ValueError)
+
+    def loads(self, s, **kwargs):
+        return self._loads(s, **kwargs)
+
+    def dumps(self, o, **kwargs):
+        kwargs.setdefault('default', _json_default)
+        return self._dumps(o, **kwargs)
+
+
+json_backends = {
+    'json': StdJsonBackend,
+    'orjson': OrJsonBackend,
+    'ujson': UJsonBackend,
+    'rapidjson': RapidJsonBackend,
+}
+
+
+def get_json_backend(backend=None):
+    """Returns a :class:`JsonBackend` instance.
+
+    :param backend: ``None`` for the default backend, a key from the
+        ``json_backends`` dict or a :class:`JsonBackend` instance.
+    """
+
+    if backend is None:
+        backend = 'json'
+
+    if isinstance(backend, JsonBackend):
+        return backend
+
+    if not (backend in json_backends):
+        raise ValueError("Unknown json backend %r. Accepted ones are: %r" %
+                                               (backend, tuple(json_backends)))
+
+    return json_backends[backend]()
 
 
 NON_NUMBER_TYPES = tuple({list, dict, six.text_type, six.binary_type})
 
+INT64_MIN = -(1 << 63)
+UINT64_MAX = (1 << 64) - 1
+
+_CONTAINER_TYPES = (dict, list, tuple)
+
+
+def _is_flat(o):
+    """Returns ``True`` when ``o`` can be passed to the json encoder without
+    materializing a generator or recursing into more than one level."""
+
+    if isgenerator(o):
+        return False
+
+    if isinstance(o, dict):
+        o = o.values()
+    elif not isinstance(o, (list, tuple)):
+        return True
+
+    for v in o:
+        if isinstance(v, _CONTAINER_TYPES) or isgenerator(v):
+            return False
+
+    return True
+
 
 class JsonDocument(HierDictDocument):
     """An implementation of the json protocol that uses simplejson package when
@@ -95,6 +305,15 @@ class JsonDocument(HierDictDocument):
     :param ignore_wrappers: Does not serialize wrapper objects.
     :param complex_as: One of (list, dict). When list, the complex objects are
         serialized to a list of values instead of a dict of key/value pairs.
+    :param backend: The json backend. One of ``None`` (simplejson or json),
+        ``'orjson'``, ``'ujson'``, ``'rapidjson'`` or a :class:`JsonBackend`
+        instance.
+    :param stream_output: When ``True``, the response document is written out
+        in chunks of roughly ``stream_chunk_size`` bytes while the object
+        graph is being walked, so arrays (especially generators returned for
+        ``Iterable`` return types) are never materialized in memory as a
+        whole. Serialization errors are then only raised once the transport
+        starts consuming ``ctx.out_string``. Can't be used with ``indent``.
     """
 
     mime_type = 'application/json'
@@ -108,12 +327,14 @@ class JsonDocument(HierDictDocument):
     # flags used just for tests
     _decimal_as_string = True
 
+    stream_chunk_size = 8192
+
     def __init__(self, app=None, validator=None, mime_type=None,
                         ignore_uncap=False,
                         # DictDocument specific
                         ignore_wrappers=True, complex_as=dict, ordered=False,
                         default_string_encoding=None, polymorphic=False,
-                        **kwargs):
+                        backend=None, stream_output=False, **kwargs):
 
         super(JsonDocument, self).__init__(app, validator, mime_type, ignore_uncap,
                                ignore_wrappers, complex_as, ordered, polymorphic)
@@ -131,8 +352,17 @@ class JsonDocument(HierDictDocument):
         self._to_unicode_handlers[Integer] = self._ret
 
         self.default_string_encoding = default_string_encoding
+        self.backend = get_json_backend(backend)
         self.kwargs = kwargs
 
+        if self.backend.huge_numbers_as_string:
+            self._from_unicode_handlers[Integer] = self._ret_huge_number
+            self._to_unicode_handlers[Integer] = self._ret_huge_number_str
+
+        if stream_output and kwargs.get('indent', None) is not None:
+            raise ValueError("stream_output can't be used with indent")
+        self.stream_output = stream_output
+
     def _ret(self, cls, value):
         return value
 
@@ -143,6 +373,19 @@ class JsonDocument(HierDictDocument):
             return int(value)
         return value
 
+    def _ret_huge_number(self, cls, value):
+        if isinstance(value, six.string_types):
+            try:
+                return int(value)
+            except ValueError:
+                raise ValidationError(value)
+        return self._ret_number(cls, value)
+
+    def _ret_huge_number_str(self, cls, value):
+        if value is not None and not (INT64_MIN <= value <= UINT64_MAX):
+            return str(value)
+        return value
+
     def _ret_bool(self, cls, value):
         if value is None or value in (True, False):
             return value
@@ -162,8 +405,9 @@ class JsonDocument(HierDictDocument):
 
     @message.setter
     def message(self, val):
-        if val is self.RESPONSE and not ('cls' in self.kwargs):
-            self.kwargs['cls'] = JsonEncoder
+        if val is self.RESPONSE:
+            for k, v in self.backend.out_kwargs.items():
+                self.kwargs.setdefault(k, v)
         self.__message = val
 
     def create_in_document(self, ctx, in_string_encoding=None):
@@ -176,21 +420,119 @@ class JsonDocument(HierDictDocument):
                     in_string_encoding = self.default_string_encoding
                 if in_string_encoding is not None:
                     in_string = in_string.decode(in_string_encoding)
-            ctx.in_document = json.loads(in_string, **self.kwargs)
+            ctx.in_document = self.backend.loads(in_string, **self.kwargs)
 
-        except JSONDecodeError as e:
+        except self.backend.decode_error as e:
             raise Fault('Client.JsonDecodeError', repr(e))
 
     def create_out_string(self, ctx, out_string_encoding='utf8'):
         """Sets ``ctx.out_string`` using ``ctx.out_document``."""
-        if out_string_encoding is None:
-            ctx.out_string = (json.dumps(o, **self.kwargs)
+        dumps = self.backend.dumps
+
+        if self.stream_output:
+            ctx.out_string = self._gen_out_string(ctx.out_document,
+                                                            out_string_encoding)
+
+        elif self.backend.dumps_bytes:
+            if out_string_encoding is None:
+                ctx.out_string = (dumps(o, **self.kwargs).decode('utf8')
+                                                      for o in ctx.out_document)
+
+            elif out_string_encoding.lower().replace('-', '') == 'utf8':
+                ctx.out_string = (dumps(o, **self.kwargs)
+                                                      for o in ctx.out_document)
+
+            else:
+                ctx.out_string = (dumps(o, **self.kwargs).decode('utf8')
+                                .encode(out_string_encoding)
+                                                      for o in ctx.out_document)
+
+        elif out_string_encoding is None:
+            ctx.out_string = (dumps(o, **self.kwargs)
                                                       for o in ctx.out_document)
         else:
             ctx.out_string = (
-                json.dumps(o, **self.kwargs).encode(out_string_encoding)
+                dumps(o, **self.kwargs).encode(out_string_encoding)
                                                       for o in ctx.out_document)
 
+    def _gen_out_string(self, out_document, out_string_encoding):
+        encoder = self.backend.get_encoder(self.kwargs)
+        chunk_size = self.stream_chunk_size
+
+        for doc in out_document:
+            buf = []
+            buf_len = 0
+            for s in self._iterencode(encoder, doc):
+                buf.append(s)
+                buf_len += len(s)
+                if buf_len >= chunk_size:
+                    s = ''.join(buf)
+                    if out_string_encoding is not None:
+                        s = s.encode(out_string_encoding)
+                    yield s
+                    buf = []
+                    buf_len = 0
+
+            s = ''.join(buf)
+            if out_string_encoding is not None:
+                s = s.encode(out_string_encoding)
+            yield s
+
+    def _iterencode(self, encoder, o):
+        """Yields json fragments for the given document. Values without
+        nested containers or generators are passed to the encoder in one go.
+        """
+
+        if _is_flat(o):
+            yield encoder.encode(o)
+            return
+
+        encode = encoder.encode
+        item_separator = encoder.item_separator
+        key_separator = encoder.key_separator
+
+        if isinstance(o, dict):
+            items = o.items()
+            if encoder.sort_keys:
+                items = sorted(items)
+
+            sep = '{'
+            for k, v in items:
+                if not isinstance(k, six.string_types):
+                    # json coerces non-string keys to their literal form
+                    k = encode(k)
+
+                if _is_flat(v):
+                    yield sep + encode(k) + key_separator + encode(v)
+                else:
+                    yield sep + encode(k) + key_separator
+                    for s in self._iterencode(encoder, v):
+                        yield s
+
+                sep = item_separator
+
+            if sep == '{':
+                yield '{}'
+            else:
+                yield '}'
+
+        else:
+            sep = '['
+            for v in o:
+                if _is_flat(v):
+                    yield sep + encode(v)
+                else:
+                    yield sep
+                    for s in self._iterencode(encoder, v):
+                        yield s
+
+                sep = item_separator
+
+            if sep == '[':
+                yield '[]'
+            else:
+                yield ']'
+
 
 class JsonP(JsonDocument):
     """The JsonP protocol puts the reponse document inside a designated
@@ -229,12 +571,39 @@ class JsonP(JsonDocument):
 
 
 class _SpyneJsonRpc1(JsonDocument):
+    """Spyne's flavour of JSON-RPC. A request looks like
+    ``{"ver": 1, "body": {"method_name": {...}}, "head": ...}`` and a response
+    like ``{"ver": 1, "body": ...}`` or ``{"ver": 1, "fault": {...}}``.
+
+    When the server has a :class:`spyne.server.batch.BatchProcessor`, a list of
+    requests is processed as a batch and answered with the list of their
+    responses, in the same order.
+    """
+
     version = 1
     VERSION = 'ver'
     BODY = 'body'
     HEAD = 'head'
     FAULT = 'fault'
 
+    def decompose_incoming_batch(self, ctx):
+        if isinstance(ctx.in_document, list):
+            return ctx.in_document
+
+    def compose_outgoing_batch(self, ctx, contexts):
+        ctx.out_document = [c.out_document for c in contexts]
+
+    def create_out_string(self, ctx, out_string_encoding='utf8'):
+        # ctx.out_document is a single envelope (or a list of them), not a
+        # sequence of documents like it is for JsonDocument.
+        out_document = ctx.out_document
+        ctx.out_document = [out_document]
+        try:
+            super(_SpyneJsonRpc1, self).create_out_string(ctx,
+                                                            out_string_encoding)
+        finally:
+            ctx.out_document = out_document
+
     def decompose_incoming_envelope(self, ctx, message=JsonDocument.REQUEST):
         indoc = ctx.in_document
         if not isinstance(indoc, dict):
@@ -29,15 +29,29 @@ from __future__ import absolute_import
 import logging
 logger = logging.getLogger(__name__)
 
-import msgpack
-
 from spyne import ValidationError
+from spyne.error import RequestTooLongError
 from spyne.util import six
 from spyne.model.fault import Fault
 from spyne.model.primitive import Double
 from spyne.model.primitive import Boolean
 from spyne.model.primitive import Integer
+from spyne.model.binary import ByteArray
+from spyne.model.binary import File
 from spyne.protocol.dictdoc import HierDictDocument
+from spyne.util.lazy import enable_module_getattr
+
+
+def __getattr__(name):
+    # msgpack is imported when the first protocol instance is created, but
+    # the module attribute is kept for code that used it.
+    if name == 'msgpack':
+        import msgpack
+        return msgpack
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+enable_module_getattr(__name__, ('msgpack',))
 
 
 class MessagePackDecodeError(Fault):
@@ -48,8 +62,44 @@ class MessagePackDecodeError(Fault):
 NON_NUMBER_TYPES = tuple({list, dict, six.text_type, six.binary_type})
 
 
+def _get_buffer(s):
+    """Returns an object that supports the buffer protocol for the given
+    chunk, without copying it when possible."""
+
+    if isinstance(s, (six.binary_type, bytearray, memoryview)):
+        return s
+
+    try:
+        # e.g. mmap objects as returned by TwistedWebResource.handle_rpc
+        return memoryview(s)
+    except TypeError:
+        pass
+
+    if hasattr(s, 'read'):
+        if hasattr(s, 'size'):
+            return s.read(s.size())
+        return s.read()
+
+    return s
+
+
 class MessagePackDocument(HierDictDocument):
-    """An integration class for the msgpack protocol."""
+    """An integration class for the msgpack protocol.
+
+    :param use_list: When ``False``, incoming arrays are deserialized to
+        tuples, which is cheaper. ``None`` means the protocol default, which is
+        ``True`` for ``MessagePackDocument`` and ``False`` for
+        ``MessagePackRpc``.
+    :param raw: When ``False``, msgpack strings are decoded to unicode by the
+        unpacker instead of being passed around as bytes, and outgoing
+        documents use the bin type for binary data and the str type for
+        everything else.
+    :param max_buffer_size: Maximum size of incoming documents, in bytes.
+        Larger documents are rejected with ``RequestTooLongError``. ``None``
+        means no limit.
+    :param unpacker_kwargs: Additional arguments to ``msgpack.unpackb``, like
+        ``max_bin_len`` or ``max_str_len``.
+    """
 
     mime_type = 'application/x-msgpack'
     text_based = False
@@ -61,6 +111,8 @@ class MessagePackDocument(HierDictDocument):
     from_serstr = HierDictDocument.from_string
     to_serstr = HierDictDocument.to_bytes
 
+    default_use_list = True
+
     # flags to be used in tests
     _decimal_as_string = True
     _huge_numbers_as_string = True
@@ -73,12 +125,30 @@ class MessagePackDocument(HierDictDocument):
                                         ordered=False,
                                         polymorphic=False,
                                         # MessagePackDocument specific
-                                        use_list=False):
+                                        use_list=None,
+                                        raw=True,
+                                        max_buffer_size=None,
+                                        unpacker_kwargs=None):
 
         super(MessagePackDocument, self).__init__(app, validator, mime_type,
                 ignore_uncap, ignore_wrappers, complex_as, ordered, polymorphic)
 
+        # imported here rather than at module level so that merely importing
+        # spyne.protocol.msgpack (e.g. via spyne.util.dictdoc) stays cheap.
+        import msgpack
+        self._packb = msgpack.packb
+        self._unpackb = msgpack.unpackb
+
+        if use_list is None:
+            use_list = self.default_use_list
+
         self.use_list = use_list
+        self.raw = raw
+        self.max_buffer_size = max_buffer_size
+
+        if unpacker_kwargs is None:
+            unpacker_kwargs = {}
+        self.unpacker_kwargs = dict(unpacker_kwargs, use_list=use_list, raw=raw)
 
         self._from_string_handlers[Double] = self._ret_number
         self._from_string_handlers[Boolean] = self._ret_bool
@@ -88,6 +158,25 @@ class MessagePackDocument(HierDictDocument):
         self._to_bytes_handlers[Boolean] = self._ret_bool
         self._to_bytes_handlers[Integer] = self.integer_to_bytes
 
+        if not raw:
+            self.from_serstr = self._from_serstr_unicode
+            self.to_serstr = self.to_unicode
+
+            self._from_unicode_handlers[Double] = self._ret_number
+            self._from_unicode_handlers[Boolean] = self._ret_bool
+            self._from_unicode_handlers[Integer] = self.integer_from_string
+
+            self._to_unicode_handlers[Double] = self._ret_number
+            self._to_unicode_handlers[Boolean] = self._ret_bool
+            self._to_unicode_handlers[Integer] = self.integer_to_bytes
+            self._to_unicode_handlers[ByteArray] = self.byte_array_to_bytes
+            self._to_unicode_handlers[File] = self.file_to_bytes
+
+    def _from_serstr_unicode(self, cls, value, *args, **kwargs):
+        if isinstance(value, six.text_type):
+            return self.from_unicode(cls, value, *args, **kwargs)
+        return self.from_string(cls, value, *args, **kwargs)
+
     def _ret(self, _, value):
         return value
 
@@ -105,7 +194,7 @@ class MessagePackDocument(HierDictDocument):
 
     def get_class_name(self, cls):
         class_name = cls.get_type_name()
-        if not six.PY2:
+        if not six.PY2 and self.raw:
             if not isinstance(class_name, bytes):
                 class_name = class_name.encode('utf8')
 
@@ -119,17 +208,35 @@ class MessagePackDocument(HierDictDocument):
             argument is ignored.
         """
 
-        # TODO: Use feed api as msgpack's implementation reads everything in one
-        # go anyway.
+        ctx.in_document = self._unpack(ctx.in_string)
+
+    def _unpack(self, in_string):
+        """Returns the object in the given iterable of chunks. A lone chunk is
+        unpacked in place without being copied. The size limit is enforced
+        before multiple chunks are joined."""
+
+        max_buffer_size = self.max_buffer_size
+
+        buffers = []
+        total = 0
+        for s in in_string:
+            s = _get_buffer(s)
+            total += len(s)
+            if max_buffer_size and total > max_buffer_size:
+                raise RequestTooLongError()
+            buffers.append(s)
+
+        if len(buffers) == 1:
+            data, = buffers
+        else:
+            data = b''.join(buffers)
+        del buffers
 
-        # handle mmap objects from in ctx.in_string as returned by
-        # TwistedWebResource.handle_rpc.
-        in_string = ((s.read(s.size()) if hasattr(s, 'read') else s)
-                                                         for s in ctx.in_string)
         try:
-            ctx.in_document = msgpack.unpackb(b''.join(in_string))
+            return self._unpackb(data, **self.unpacker_kwargs)
+
         except ValueError as e:
-            raise MessagePackDecodeError(''.join(e.args))
+            raise MessagePackDecodeError(str(e))
 
     def gen_method_request_string(self, ctx):
         """Uses information in context object to return a method_request_string.
@@ -138,13 +245,15 @@ class MessagePackDocument(HierDictDocument):
         """
 
         mrs, = ctx.in_body_doc.keys()
-        if six.PY3:
+        if six.PY3 and isinstance(mrs, bytes):
             mrs = mrs.decode('utf8')
 
         return '{%s}%s' % (self.app.interface.get_tns(), mrs)
 
     def create_out_string(self, ctx, out_string_encoding='utf8'):
-        ctx.out_string = (msgpack.packb(o) for o in ctx.out_document)
+        packb = self._packb
+        ctx.out_string = (packb(o, use_bin_type=not self.raw)
+                                                      for o in ctx.out_document)
 
     def integer_from_string(self, cls, value):
         if isinstance(value, (six.text_type, six.binary_type)):
@@ -161,16 +270,25 @@ class MessagePackDocument(HierDictDocument):
 
 
 class MessagePackRpc(MessagePackDocument):
-    """An integration class for the msgpack-rpc protocol."""
+    """An integration class for the msgpack-rpc protocol.
+
+    When the server has a :class:`spyne.server.batch.BatchProcessor`, an array
+    of request messages is processed as a batch and answered with the array of
+    their response messages, in the same order.
+    """
 
     mime_type = 'application/x-msgpack'
 
+    default_use_list = False
+
     MSGPACK_REQUEST = 0
     MSGPACK_RESPONSE = 1
     MSGPACK_NOTIFY = 2
 
     def create_out_string(self, ctx, out_string_encoding='utf8'):
-        ctx.out_string = (msgpack.packb(o) for o in ctx.out_document)
+        packb = self._packb
+        ctx.out_string = (packb(o, use_bin_type=not self.raw)
+                                                      for o in ctx.out_document)
 
     def create_in_document(self, ctx, in_string_encoding=None):
         """Sets ``ctx.in_document``,  using ``ctx.in_string``.
@@ -180,23 +298,47 @@ class MessagePackRpc(MessagePackDocument):
             argument is ignored.
         """
 
-        # TODO: Use feed api
-        try:
-            ctx.in_document = msgpack.unpackb(b''.join(ctx.in_string),
-                                                         use_list=self.use_list)
-        except ValueError as e:
-            raise MessagePackDecodeError(''.join(e.args))
+        ctx.in_document = self._unpack(ctx.in_string)
 
         try:
             len(ctx.in_document)
         except TypeError:
             raise MessagePackDecodeError("Input must be a sequence.")
 
-        if not (3 <= len(ctx.in_document) <= 4):
+        if not self._is_batch(ctx.in_document):
+            self._check_message(ctx.in_document)
+
+    @staticmethod
+    def _is_batch(doc):
+        # a message starts with its type, which is an integer.
+        return len(doc) > 0 and isinstance(doc[0], (list, tuple))
+
+    @staticmethod
+    def _check_message(doc):
+        try:
+            len(doc)
+        except TypeError:
+            raise MessagePackDecodeError("Input must be a sequence.")
+
+        if not (3 <= len(doc) <= 4):
             raise MessagePackDecodeError("Length of input iterable must be "
                                                                 "either 3 or 4")
 
+    def decompose_incoming_batch(self, ctx):
+        if self._is_batch(ctx.in_document):
+            return ctx.in_document
+
+    def compose_outgoing_batch(self, ctx, contexts):
+        # every out_document here is a list with a single message
+        ctx.out_document = [[c.out_document[0] for c in contexts]]
+
     def decompose_incoming_envelope(self, ctx, message):
+        if ctx.batch is None and self._is_batch(ctx.in_document):
+            # a batch request without a server that supports it.
+            raise MessagePackDecodeError("Batch requests are not enabled")
+
+        self._check_message(ctx.in_document)
+
         # FIXME: For example: {0: 0, 1: 0, 2: "some_call", 3: [1,2,3]} will also
         # work. Is this a problem?
 
@@ -56,6 +56,7 @@ from spyne.error import RequestNotAllowed
 from spyne.model.fault import Fault
 from spyne.model.primitive import Date, Time, DateTime
 from spyne.protocol.xml import XmlDocument
+from spyne.protocol.xml import XmlPullSource
 from spyne.protocol.soap.mime import collapse_swa
 from spyne.server.http import HttpTransportContext
 
@@ -197,6 +198,20 @@ class Soap11(XmlDocument):
             content_type = cgi.parse_header(content_type)
             collapse_swa(content_type, ctx.in_string)
 
+        if self.stream_input:
+            # Parse until the first child of the soap body starts. The header
+            # is complete at that point. href resolution is not supported.
+            body_tag = '{%s}Body' % self.ns_soap_env
+            source = XmlPullSource(ctx.in_string, self.parser_kwargs)
+            source.pull_until_start(lambda e, d: d == 2 and
+                                              e.getparent().tag == body_tag)
+            if source.root is None:
+                raise Fault('Client.XMLSyntaxError', "Document is empty")
+
+            ctx.in_document = (source.root, None)
+            ctx.inprot_ctx.pull_source = source
+            return
+
         ctx.in_document = _parse_xml_string(ctx.in_string,
                                             XMLParser(**self.parser_kwargs),
                                                                         charset)
@@ -230,7 +245,7 @@ class Soap11(XmlDocument):
 
         if ctx.in_body_doc.tag == "{%s}Fault" % self.ns_soap_env:
             ctx.in_object = None
-            ctx.in_error = self.from_element(ctx, Fault, ctx.in_body_doc)
+            ctx.in_error = self.body_from_element(ctx, Fault, ctx.in_body_doc)
 
         else:
             if message is self.REQUEST:
@@ -265,7 +280,8 @@ class Soap11(XmlDocument):
             if ctx.in_body_doc is None:
                 ctx.in_object = [None] * len(body_class._type_info)
             else:
-                ctx.in_object = self.from_element(ctx, body_class, ctx.in_body_doc)
+                ctx.in_object = self.body_from_element(ctx, body_class,
+                                                               ctx.in_body_doc)
 
         self.event_manager.fire_event('after_deserialize', ctx)
 
@@ -35,6 +35,7 @@ logger = logging.getLogger('spyne.protocol.xml')
 logger_invalid = logging.getLogger('spyne.protocol.xml.invalid')
 
 from inspect import isgenerator
+from weakref import WeakKeyDictionary
 from collections import defaultdict
 
 from lxml import etree
@@ -44,6 +45,7 @@ from lxml.etree import XMLSyntaxError
 from lxml.etree import XMLParser
 
 from spyne import BODY_STYLE_WRAPPED
+from spyne import ProtocolContext
 
 from spyne.util import Break, coroutine
 from spyne.util.six import text_type, string_types
@@ -99,6 +101,91 @@ def _gen_tagname(ns, name):
     return name
 
 
+class _PushFound(Exception):
+    """Raised when serialization without coroutines runs into a value that
+    needs them."""
+
+
+class XmlProtocolContext(ProtocolContext):
+    def __init__(self, parent, transport, type=None):
+        super(XmlProtocolContext, self).__init__(parent, transport, type)
+
+        self.pull_source = None
+        """The :class:`XmlPullSource` instance that's still parsing the
+        incoming document. Only set when the protocol is streaming its
+        input."""
+
+
+class XmlPullSource(object):
+    """Feeds the given iterable of string fragments to an
+    ``lxml.etree.XMLPullParser`` only as far as the consumer asks for it.
+
+    Iterating over an instance yields ``(event, element, depth)`` tuples where
+    ``event`` is either ``'start'`` or ``'end'`` and ``depth`` is the depth of
+    ``element``, the root element being at depth 0.
+    """
+
+    def __init__(self, chunks, parser_kwargs):
+        self.parser = etree.XMLPullParser(events=('start', 'end'),
+                                                                **parser_kwargs)
+        self.root = None
+        self.depth = 0
+        self._events = self._gen_events(iter(chunks))
+
+    def _gen_events(self, chunks):
+        parser = self.parser
+
+        try:
+            for chunk in chunks:
+                parser.feed(chunk)
+                for event, elt in parser.read_events():
+                    yield event, elt
+
+            parser.close()
+            for event, elt in parser.read_events():
+                yield event, elt
+
+        except XMLSyntaxError as e:
+            logger_invalid.error("%r in incoming stream", e)
+            raise Fault('Client.XMLSyntaxError', str(e))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        event, elt = next(self._events)
+
+        if event == 'start':
+            if self.root is None:
+                self.root = elt
+
+            depth = self.depth
+            self.depth += 1
+
+        else:
+            self.depth -= 1
+            depth = self.depth
+
+        return event, elt, depth
+
+    next = __next__  # Python 2
+
+    def pull_until_start(self, predicate):
+        """Parses the incoming stream until an element that satisfies the
+        given predicate starts and returns it. Returns ``None`` when the
+        document ends before that."""
+
+        for event, elt, depth in self:
+            if event == 'start' and predicate(elt, depth):
+                return elt
+
+    def drain(self):
+        """Parses the rest of the incoming stream."""
+
+        for _ in self:
+            pass
+
+
 class SchemaValidationError(Fault):
     """Raised when the input stream could not be validated by the Xml Schema."""
 
@@ -222,6 +309,22 @@ class XmlDocument(SubXmlBase):
     :param compact: use compact storage for short text content. On by default.
     :param parse_xsi_type: Set to ``False`` to disable parsing of ``xsi:type``
         attribute, effectively disabling polymorphism. Defaults to True.
+    :param compile_plans: When ``True``, the member list of every
+        ``ComplexModel`` subclass is resolved only once per class and cached as
+        a flat tuple of serialization instructions. This makes serializing
+        large lists of complex objects considerably faster. The output is the
+        same. Defaults to False.
+    :param stream_input: When ``True``, the incoming string fragments are fed
+        to an incremental parser instead of being joined and parsed in one go.
+        If the last argument of the requested method is an ``Iterable``, the
+        method gets a generator that parses and deserializes the items of that
+        argument one by one, dropping them from the document tree once they
+        are deserialized. Not compatible with schema validation. Defaults to
+        False.
+    :param schema_store: A
+        :class:`spyne.interface.store.InterfaceDocumentStore` instance to load
+        the schema for the ``'lxml'`` validator from, instead of building it
+        every time the protocol is bound to an application.
     """
 
     SCHEMA_VALIDATION = type("Schema", (object,), {})
@@ -254,6 +357,9 @@ class XmlDocument(SubXmlBase):
                 binary_encoding=None,
                 parse_xsi_type=True,
                 polymorphic=False,
+                compile_plans=False,
+                stream_input=False,
+                schema_store=None,
             ):
 
         super(XmlDocument, self).__init__(app, validator,
@@ -271,6 +377,16 @@ class XmlDocument(SubXmlBase):
         self.polymorphic = polymorphic
         self.pretty_print = pretty_print
         self.parse_xsi_type = parse_xsi_type
+        self.compile_plans = compile_plans
+        self.stream_input = stream_input
+        self.schema_store = schema_store
+
+        if stream_input and self.validator is self.SCHEMA_VALIDATION:
+            raise ValueError("Schema validation needs the whole document. It "
+                                         "can't be used with stream_input=True")
+
+        self._plancache = WeakKeyDictionary()
+        self._pushcache = WeakKeyDictionary()
 
         self.serialization_handlers = cdict({
             AnyXml: self.xml_to_parent,
@@ -362,6 +478,11 @@ class XmlDocument(SubXmlBase):
         self.validation_schema = None
 
         if self.validator is self.SCHEMA_VALIDATION and value is not None:
+            if self.schema_store is not None:
+                self.validation_schema = \
+                       self.schema_store.get_validation_schema(value.interface)
+                return
+
             from spyne.interface.xml_schema import XmlSchema
 
             xml_schema = XmlSchema(value.interface)
@@ -378,10 +499,22 @@ class XmlDocument(SubXmlBase):
             raise SchemaValidationError(error_text.encode('ascii',
                                                            'xmlcharrefreplace'))
 
+    def get_context(self, parent, transport):
+        return XmlProtocolContext(parent, transport)
+
     def create_in_document(self, ctx, charset=None):
         """Uses the iterable of string fragments in ``ctx.in_string`` to set
         ``ctx.in_document``."""
 
+        if self.stream_input:
+            source = XmlPullSource(ctx.in_string, self.parser_kwargs)
+            ctx.in_document = source.pull_until_start(lambda e, d: True)
+            if ctx.in_document is None:
+                raise Fault('Client.XMLSyntaxError', "Document is empty")
+
+            ctx.inprot_ctx.pull_source = source
+            return
+
         string = b''.join(ctx.in_string)
         try:
             try:
@@ -442,6 +575,78 @@ class XmlDocument(SubXmlBase):
         handler = self.deserialization_handlers[cls]
         return handler(ctx, cls, element)
 
+    def body_from_element(self, ctx, cls, element):
+        """Deserializes the body element of the incoming message. When the
+        input is being streamed, it's the only place where the rest of the
+        incoming document gets parsed."""
+
+        source = getattr(ctx.inprot_ctx, 'pull_source', None)
+        if source is None:
+            return self.from_element(ctx, cls, element)
+
+        lazy = self._get_lazy_member(cls)
+        if lazy is None:
+            source.drain()
+            return self.from_element(ctx, cls, element)
+
+        key, member, names = lazy
+        body_depth = source.depth - 1
+        child = source.pull_until_start(lambda e, d: d == body_depth + 1 and
+                                         e.tag.split('}')[-1] in names)
+
+        # The lazy member is the last one so everything else is already parsed.
+        retval = self.from_element(ctx, cls, element)
+
+        if child is not None and not bool(child.get('{%s}nil' % _ns_xsi)):
+            setattr(retval, key, self._iterable_from_source(ctx, member,
+                                                                child, source))
+
+        return retval
+
+    def _get_lazy_member(self, cls):
+        """Returns a ``(key, member, names)`` tuple for the last member of
+        ``cls`` if it's an ``Iterable``, where ``names`` is the set of tag
+        names the member can appear as. Returns ``None`` otherwise."""
+
+        if not issubclass(cls, ComplexModelBase):
+            return None
+
+        fti = cls.get_flat_type_info(cls)
+        if len(fti) == 0:
+            return None
+
+        key = fti.keys()[-1]
+        member = fti[key]
+        if not issubclass(member, Iterable):
+            return None
+
+        names = set((key,))
+        if member.Attributes.sub_name is not None:
+            names.add(member.Attributes.sub_name)
+
+        return key, member, names
+
+    def _iterable_from_source(self, ctx, cls, element, source):
+        (serializer,) = cls._type_info.values()
+        depth = source.depth - 1
+
+        for event, child, d in source:
+            if event != 'end':
+                continue
+
+            if d == depth:
+                break
+
+            if d == depth + 1:
+                yield self.from_element(ctx, serializer, child)
+
+                # Deserialized items are not needed anymore.
+                child.clear()
+                while child.getprevious() is not None:
+                    del element[0]
+
+        source.drain()
+
     def to_parent(self, ctx, cls, inst, parent, ns, *args, **kwargs):
         cls, add_type = self.get_polymorphic_target(cls, inst)
         cls_attrs = self.get_cls_attrs(cls)
@@ -495,7 +700,8 @@ class XmlDocument(SubXmlBase):
         if ctx.in_body_doc is None:
             ctx.in_object = [None] * len(body_class._type_info)
         else:
-            ctx.in_object = self.from_element(ctx, body_class, ctx.in_body_doc)
+            ctx.in_object = self.body_from_element(ctx, body_class,
+                                                               ctx.in_body_doc)
 
         if logger.level == logging.DEBUG and message is self.REQUEST:
             line_header = '%sRequest%s' % (LIGHT_GREEN, END_COLOR)
@@ -667,9 +873,141 @@ class XmlDocument(SubXmlBase):
         _append(parent, E(_gen_tagname(ns, name),
                     ''.join([b.decode('ascii') for b in cls.to_base64(inst)])))
 
-    @coroutine
     def gen_members_parent(self, ctx, cls, inst, parent, tag_name, subelts,
                                                                       add_type):
+        """Serializes ``inst`` as a ``tag_name`` element inside ``parent``.
+
+        Returns a coroutine waiting for more input when ``inst`` contains a
+        ``PushBase`` instance. Otherwise, the members are serialized with plain
+        recursive calls and ``None`` is returned.
+
+        Whether coroutines are needed is decided from the type hierarchy of
+        ``cls`` (see :func:`can_push`) and, when the parent is an element, by
+        starting over with coroutines once a ``PushBase`` instance is found
+        in an array.
+        """
+
+        is_element = isinstance(parent, etree._Element)
+
+        # incremental output can't be taken back, so any array member is
+        # assumed to hold a PushBase instance in that case.
+        if self.can_push(cls, arrays=not is_element):
+            return self._gen_members_parent_push(ctx, cls, inst, parent,
+                                                  tag_name, subelts, add_type)
+
+        attrib = {}
+        if add_type:
+            attrib[XSI_TYPE] = cls.get_type_name_ns(self.app.interface)
+
+        if is_element:
+            elt = etree.SubElement(parent, tag_name, attrib=attrib)
+            elt.extend(subelts)
+
+            try:
+                self._members_to_parent(ctx, cls, inst, elt)
+
+            except _PushFound:
+                # nothing has been pushed yet, so it's enough to drop what
+                # was serialized so far
+                del elt[:]
+                elt.text = None
+                elt.attrib.clear()
+                elt.attrib.update(attrib)
+                elt.extend(subelts)
+                return self._get_members_etree(ctx, cls, inst, elt)
+
+        else:
+            with parent.element(tag_name, attrib=attrib):
+                for e in subelts:
+                    parent.write(e)
+                self._members_to_parent(ctx, cls, inst, parent)
+
+    def can_push(self, cls, arrays=False):
+        """Returns ``True`` when an instance of ``cls`` is expected to contain
+        a ``PushBase`` instance somewhere in its hierarchy, ie. when ``cls``
+        has an ``Iterable`` member. When the protocol is polymorphic,
+        subclasses of the member types are also considered.
+
+        A ``PushBase`` instance can also be assigned to any member with
+        ``max_occurs > 1``. Pass ``arrays=True`` to count those as well.
+        """
+
+        if not issubclass(cls, ComplexModelBase):
+            return False
+
+        fti = cls.get_flat_type_info(cls)
+        cached = self._pushcache.get(cls, None)
+        if cached is None or cached[0] is not fti:
+            cached = self._pushcache[cls] = (fti,) + self._can_push(cls)
+
+        if arrays:
+            return cached[2]
+        return cached[1]
+
+    def _can_push(self, cls):
+        has_array = False
+        tags = set()
+        queue = [cls]
+        while len(queue) > 0:
+            c = queue.pop()
+            if c in tags or not issubclass(c, ComplexModelBase):
+                continue
+            tags.add(c)
+
+            if issubclass(c, Iterable):
+                return True, True
+
+            members = c.get_flat_type_info(c).values()
+            if not has_array:
+                has_array = any(v.Attributes.max_occurs > 1 for v in members)
+
+            queue.extend(members)
+            if self.polymorphic:
+                queue.extend(c.get_orig().get_subclasses())
+
+        return False, has_array
+
+    def _members_to_parent(self, ctx, cls, inst, parent):
+        """The non-coroutine version of :func:`_get_members_etree`. Raises
+        :class:`_PushFound` when a member needs the coroutine version."""
+
+        parent_cls = getattr(cls, '__extends__', None)
+        if not (parent_cls is None):
+            self._members_to_parent(ctx, parent_cls, inst, parent)
+
+        if self.compile_plans:
+            members = self.get_member_plan(cls)
+        else:
+            members = self._gen_member_plan(cls)
+
+        for k, v, sub_ns, sub_name, is_array, is_mandatory, to_parent \
+                                                                   in members:
+            try:
+                subvalue = getattr(inst, k, None)
+            except:  # e.g. SqlAlchemy could throw NoSuchColumnError
+                subvalue = None
+
+            if subvalue is not None and is_array:
+                if isinstance(subvalue, PushBase):
+                    raise _PushFound()
+
+                for sv in subvalue:
+                    ret = to_parent(ctx, v, sv, parent, sub_ns, sub_name)
+                    if ret is not None:
+                        ret.close()
+                        raise _PushFound()
+
+            # Don't include empty values for
+            # non-nillable optional attributes.
+            elif subvalue is not None or is_mandatory:
+                ret = to_parent(ctx, v, subvalue, parent, sub_ns, sub_name)
+                if ret is not None:
+                    ret.close()
+                    raise _PushFound()
+
+    @coroutine
+    def _gen_members_parent_push(self, ctx, cls, inst, parent, tag_name,
+                                                             subelts, add_type):
         attrib = {}
         if add_type:
             attrib[XSI_TYPE] = cls.get_type_name_ns(self.app.interface)
@@ -708,6 +1046,74 @@ class XmlDocument(SubXmlBase):
                         except StopIteration:
                             pass
 
+    def _gen_member_plan(self, cls, compiled=False):
+        """Yields a ``(attr_name, field_cls, sub_ns, sub_name, is_array,
+        is_mandatory, to_parent)`` tuple for every serializable member of
+        ``cls``. Members inherited from ``cls.__extends__`` are not included.
+        """
+
+        for k, v in cls._type_info.items():
+            sub_cls_attrs = self.get_cls_attrs(v)
+            if sub_cls_attrs.exc:
+                continue
+
+            sub_ns = v.Attributes.sub_ns
+            if sub_ns is None:
+                sub_ns = cls.get_namespace()
+
+            sub_name = v.Attributes.sub_name
+            if sub_name is None:
+                sub_name = k
+
+            if compiled:
+                to_parent = self._compile_to_parent(v, sub_cls_attrs)
+            else:
+                to_parent = self.to_parent
+
+            yield k, v, sub_ns, sub_name, v.Attributes.max_occurs > 1, \
+                                       v.Attributes.min_occurs > 0, to_parent
+
+    def _compile_to_parent(self, cls, cls_attrs):
+        """Returns a callable with the signature of :func:`to_parent` that
+        skips the per-value dispatch whenever it's safe to do so."""
+
+        subprot = cls_attrs.prot
+        if self.polymorphic or isinstance(subprot, SubXmlBase):
+            return self.to_parent
+
+        handler = self.serialization_handlers[cls]
+        null_to_parent = self.null_to_parent
+        default = cls.Attributes.default
+
+        def _to_parent(ctx, cls, inst, parent, ns, name):
+            if inst is None:
+                inst = default
+
+            if inst is None:
+                return null_to_parent(ctx, cls, inst, parent, ns, name)
+
+            return handler(ctx, cls, inst, parent, ns, name, add_type=False)
+
+        return _to_parent
+
+    def get_member_plan(self, cls):
+        """Returns the cached serialization plan of the members of ``cls``. See
+        :func:`_gen_member_plan` for the format.
+
+        The plan is rebuilt once the flat type info of ``cls`` is invalidated,
+        which is what ``append_field``, ``insert_field`` and ``customize`` do.
+        """
+
+        fti = cls.get_flat_type_info(cls)
+        plan = self._plancache.get(cls, None)
+        if plan is not None and plan[0] is fti:
+            return plan[1]
+
+        members = tuple(self._gen_member_plan(cls, compiled=True))
+        self._plancache[cls] = (fti, members)
+
+        return members
+
     @coroutine
     def _get_members_etree(self, ctx, cls, inst, parent):
         try:
@@ -727,11 +1133,13 @@ class XmlDocument(SubXmlBase):
                         except StopIteration:
                             pass
 
-            for k, v in cls._type_info.items():
-                sub_cls_attrs = self.get_cls_attrs(v)
-                if sub_cls_attrs.exc:
-                    continue
+            if self.compile_plans:
+                members = self.get_member_plan(cls)
+            else:
+                members = self._gen_member_plan(cls)
 
+            for k, v, sub_ns, sub_name, is_array, is_mandatory, to_parent \
+                                                                   in members:
                 try:
                     subvalue = getattr(inst, k, None)
                 except:  # e.g. SqlAlchemy could throw NoSuchColumnError
@@ -740,20 +1148,11 @@ class XmlDocument(SubXmlBase):
                 # This is a tight loop, so enable this only when necessary.
                 # logger.debug("get %r(%r) from %r: %r" % (k, v, inst, subvalue))
 
-                sub_ns = v.Attributes.sub_ns
-                if sub_ns is None:
-                    sub_ns = cls.get_namespace()
-
-                sub_name = v.Attributes.sub_name
-                if sub_name is None:
-                    sub_name = k
-
-                mo = v.Attributes.max_occurs
-                if subvalue is not None and mo > 1:
+                if subvalue is not None and is_array:
                     if isinstance(subvalue, PushBase):
                         while True:
                             sv = (yield)
-                            ret = self.to_parent(ctx, v, sv, parent, sub_ns,
+                            ret = to_parent(ctx, v, sv, parent, sub_ns,
                                                                        sub_name)
                             if ret is not None:
                                 try:
@@ -769,7 +1168,7 @@ class XmlDocument(SubXmlBase):
 
                     else:
                         for sv in subvalue:
-                            ret = self.to_parent(ctx, v, sv, parent, sub_ns,
+                            ret = to_parent(ctx, v, sv, parent, sub_ns,
                                                                        sub_name)
 
                             if ret is not None:
@@ -786,8 +1185,8 @@ class XmlDocument(SubXmlBase):
 
                 # Don't include empty values for
                 # non-nillable optional attributes.
-                elif subvalue is not None or v.Attributes.min_occurs > 0:
-                    ret = self.to_parent(ctx, v, subvalue, parent, sub_ns,
+                elif subvalue is not None or is_mandatory:
+                    ret = to_parent(ctx, v, subvalue, parent, sub_ns,
                                                                        sub_name)
                     if ret is not None:
                         try:
@@ -971,10 +1370,10 @@ class XmlDocument(SubXmlBase):
             setattr(inst, key, value)
 
         if self.validator is self.SOFT_VALIDATION:
-            for key, c in flat_type_info.items():
+            for key, min_o, max_o in self.get_freq_validator(cls,
+                                                               flat_type_info):
                 val = frequencies.get(key, 0)
-                attr = c.Attributes
-                if val < attr.min_occurs or val > attr.max_occurs:
+                if val < min_o or val > max_o:
                     raise Fault('Client.ValidationError', '%r member does not '
                                          'respect frequency constraints.' % key)
 
@@ -996,9 +1395,11 @@ class XmlDocument(SubXmlBase):
             yield self.from_element(ctx, serializer, child)
 
     def enum_from_element(self, ctx, cls, element):
-        if self.validator is self.SOFT_VALIDATION and not (
-                                        cls.validate_string(cls, element.text)):
-            raise ValidationError(element.text)
+        if self.validator is self.SOFT_VALIDATION:
+            validate_string = self.get_validators(cls)[0]
+            if validate_string is not None and \
+                                          not validate_string(element.text):
+                raise ValidationError(element.text)
         return getattr(cls, element.text)
 
     def fault_from_element(self, ctx, cls, element):
@@ -1042,8 +1443,14 @@ class XmlDocument(SubXmlBase):
         return None
 
     def unicode_from_element(self, ctx, cls, element):
-        if self.validator is self.SOFT_VALIDATION and not (
-                                        cls.validate_string(cls, element.text)):
+        if self.validator is not self.SOFT_VALIDATION:
+            s = element.text
+            if s is None:
+                s = ''
+            return self.from_unicode(cls, s)
+
+        validate_string, validate_native = self.get_validators(cls)
+        if validate_string is not None and not validate_string(element.text):
             raise ValidationError(element.text)
 
         s = element.text
@@ -1052,34 +1459,37 @@ class XmlDocument(SubXmlBase):
 
         retval = self.from_unicode(cls, s)
 
-        if self.validator is self.SOFT_VALIDATION and not (
-                                              cls.validate_native(cls, retval)):
+        if validate_native is not None and not validate_native(retval):
             raise ValidationError(retval)
 
         return retval
 
     def base_from_element(self, ctx, cls, element):
-        if self.validator is self.SOFT_VALIDATION and not (
-                                        cls.validate_string(cls, element.text)):
+        if self.validator is not self.SOFT_VALIDATION:
+            return self.from_unicode(cls, element.text)
+
+        validate_string, validate_native = self.get_validators(cls)
+        if validate_string is not None and not validate_string(element.text):
             raise ValidationError(element.text)
 
         retval = self.from_unicode(cls, element.text)
 
-        if self.validator is self.SOFT_VALIDATION and not (
-                                            cls.validate_native(cls, retval)):
+        if validate_native is not None and not validate_native(retval):
             raise ValidationError(retval)
 
         return retval
 
     def byte_array_from_element(self, ctx, cls, element):
-        if self.validator is self.SOFT_VALIDATION and not (
-                                        cls.validate_string(cls, element.text)):
+        if self.validator is not self.SOFT_VALIDATION:
+            return self.from_unicode(cls, element.text, self.binary_encoding)
+
+        validate_string, validate_native = self.get_validators(cls)
+        if validate_string is not None and not validate_string(element.text):
             raise ValidationError(element.text)
 
         retval = self.from_unicode(cls, element.text, self.binary_encoding)
 
-        if self.validator is self.SOFT_VALIDATION and not (
-                                            cls.validate_native(cls, retval)):
+        if validate_native is not None and not validate_native(retval):
             raise ValidationError(retval)
 
         return retval
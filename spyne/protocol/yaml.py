@@ -36,21 +36,48 @@ from spyne.model.primitive import Integer
 from spyne.model.primitive import Double
 from spyne.model.fault import Fault
 from spyne.protocol.dictdoc import HierDictDocument
+from spyne.util.lazy import enable_module_getattr
 
-import yaml
 
-from yaml.parser import ParserError
-try:
-    from yaml import CLoader as Loader
-    from yaml import CDumper as Dumper
-    from yaml import CSafeLoader as SafeLoader
-    from yaml import CSafeDumper as SafeDumper
+def _import_yaml():
+    """Returns the ``yaml`` module along with the fastest available
+    ``(Loader, Dumper, SafeLoader, SafeDumper)`` classes. PyYaml is imported
+    when the first :class:`YamlDocument` is created, not when this module is.
+    """
+
+    import yaml
+
+    try:
+        from yaml import CLoader as Loader
+        from yaml import CDumper as Dumper
+        from yaml import CSafeLoader as SafeLoader
+        from yaml import CSafeDumper as SafeDumper
+
+    except ImportError:
+        from yaml import Loader
+        from yaml import Dumper
+        from yaml import SafeLoader
+        from yaml import SafeDumper
+
+    return yaml, (Loader, Dumper, SafeLoader, SafeDumper)
+
 
-except ImportError:
-    from yaml import Loader
-    from yaml import Dumper
-    from yaml import SafeLoader
-    from yaml import SafeDumper
+_LAZY_NAMES = ('yaml', 'ParserError', 'Loader', 'Dumper', 'SafeLoader',
+                                                                   'SafeDumper')
+
+
+def __getattr__(name):
+    if name in _LAZY_NAMES:
+        yaml, classes = _import_yaml()
+        if name == 'yaml':
+            return yaml
+        if name == 'ParserError':
+            return yaml.parser.ParserError
+        return classes[_LAZY_NAMES.index(name) - 2]
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+enable_module_getattr(__name__, _LAZY_NAMES)
 
 
 NON_NUMBER_TYPES = tuple({list, dict, six.text_type, six.binary_type})
@@ -107,6 +134,11 @@ class YamlDocument(HierDictDocument):
         self._to_unicode_handlers[Boolean] = self._ret
         self._to_unicode_handlers[Integer] = self._ret
 
+        yaml, (Loader, Dumper, SafeLoader, SafeDumper) = _import_yaml()
+        self._load = yaml.load
+        self._dump = yaml.dump
+        self._parser_error = yaml.parser.ParserError
+
         self.in_kwargs = dict(kwargs)
         self.out_kwargs = dict(kwargs)
 
@@ -151,20 +183,21 @@ class YamlDocument(HierDictDocument):
             except TypeError:
                 s = ''.join(ctx.in_string)
 
-            ctx.in_document = yaml.load(s, **self.in_kwargs)
+            ctx.in_document = self._load(s, **self.in_kwargs)
 
-        except ParserError as e:
+        except self._parser_error as e:
             raise Fault('Client.YamlDecodeError', repr(e))
 
     def create_out_string(self, ctx, out_string_encoding='utf8'):
         """Sets ``ctx.out_string`` using ``ctx.out_document``."""
 
+        dump = self._dump
         if self.out_string_encoding is None:
-            ctx.out_string = (yaml.dump(o, **self.out_kwargs)
+            ctx.out_string = (dump(o, **self.out_kwargs)
                                                       for o in ctx.out_document)
         else:
             ctx.out_string = (
-                yaml.dump(o, **self.out_kwargs).encode(self.out_string_encoding)
+                dump(o, **self.out_kwargs).encode(self.out_string_encoding)
                                                       for o in ctx.out_document)
 
 
@@ -21,6 +21,7 @@ import logging
 logger = logging.getLogger(__name__)
 
 from inspect import isgenerator
+from time import time
 
 from spyne import EventManager
 from spyne.auxproc import process_contexts
@@ -45,6 +46,28 @@ class ServerBase(object):
     """The transport type, which is a URI string to its definition by
     convention."""
 
+    batch = None
+    """A :class:`spyne.server.batch.BatchProcessor` instance when batch
+    requests are enabled."""
+
+    admission = None
+    """A :class:`spyne.server.admission.AdmissionController` instance when
+    admission control is enabled."""
+
+    metrics = None
+    """A :class:`spyne.server.metrics.Metrics` instance when request metrics
+    are collected."""
+
+    profiler = None
+    """A :class:`spyne.server.profiler.Profiler` instance when requests are
+    profiled."""
+
+    keep_in_string = False
+    """When True, ``ctx.in_string`` is materialized as a list before being
+    parsed so that it can be read again, e.g. by auxiliary processors that
+    ship the raw request elsewhere. Set by those processors during
+    initialization."""
+
     def __init__(self, app):
         self.app = app
         self.app.transport = self.transport  # FIXME: this is weird
@@ -61,18 +84,41 @@ class ServerBase(object):
         method_request string in order to generate contexts.
         """
 
+        ctx.in_string_charset = in_string_charset
+        if self.keep_in_string and ctx.in_string is not None:
+            ctx.in_string = list(ctx.in_string)
+        if self.metrics is not None:
+            self.metrics.count_in_string(ctx)
+
         try:
             # sets ctx.in_document
+            t = time()
             self.app.in_protocol.create_in_document(ctx, in_string_charset)
+            ctx.phase_times['create_in_document'] = time() - t
+
+            # sets ctx.batch when the document contains multiple calls. the
+            # request context is then processed as a whole.
+            if self.batch is not None:
+                docs = self.app.in_protocol.decompose_incoming_batch(ctx)
+                if docs is not None:
+                    self.batch.generate_contexts(self, ctx, docs)
+                    return (ctx,)
 
             # sets ctx.in_body_doc, ctx.in_header_doc and
             # ctx.method_request_string
+            t = time()
             self.app.in_protocol.decompose_incoming_envelope(ctx,
                                                            ProtocolBase.REQUEST)
+            ctx.phase_times['decompose_incoming_envelope'] = time() - t
 
             # returns a list of contexts. multiple contexts can be returned
             # when the requested method also has bound auxiliary methods.
             retval = self.app.in_protocol.generate_method_contexts(ctx)
+            for c in retval[1:]:
+                c.phase_times = dict(c.phase_times)
+
+            if self.profiler is not None:
+                self.profiler.start(retval[0])
 
         except Fault as e:
             ctx.in_object = None
@@ -83,10 +129,34 @@ class ServerBase(object):
 
         return retval
 
+    def admit(self, ctx, block=True):
+        """Marks the context as active once the admission controller, if any,
+        lets it in. The context gets an ``in_error`` when it's rejected.
+
+        :param block: When ``False``, requests are rejected instead of waiting
+            for admission.
+        """
+
+        if self.admission is not None and ctx.in_error is None:
+            try:
+                self.admission.admit(ctx, block=block)
+
+            except Fault as e:
+                ctx.in_error = e
+                ctx.out_error = e
+                return
+
+        ctx.active = True
+
     def get_in_object(self, ctx):
         """Uses the ``ctx.in_string`` to set ``ctx.in_body_doc``, which in turn
         is used to set ``ctx.in_object``."""
 
+        if ctx.batch is not None:
+            # calls in batch requests are deserialized by the batch processor.
+            return
+
+        t = time()
         try:
             # sets ctx.in_object and ctx.in_header
             self.app.in_protocol.deserialize(ctx,
@@ -99,13 +169,30 @@ class ServerBase(object):
             ctx.in_error = e
             ctx.out_error = e
 
+        ctx.phase_times['deserialize'] = time() - t
+
     def get_out_object(self, ctx):
         """Calls the matched user function by passing it the ``ctx.in_object``
         to set ``ctx.out_object``."""
 
-        if ctx.in_error is None:
+        if ctx.batch is not None:
+            self.batch.process(self, ctx)
+
+        elif ctx.in_error is None:
+            # the responses of calls in batches are documents, not strings,
+            # so they can't come from the response cache.
+            cache = ctx.descriptor.cache
+            if cache is not None and not ctx.in_batch:
+                t = time()
+                hit = cache.get_response(ctx)
+                ctx.phase_times['cache'] = time() - t
+                if hit:
+                    return
+
             # event firing is done in the spyne.application.Application
+            t = time()
             self.app.process_request(ctx)
+            ctx.phase_times['call'] = time() - t
         else:
             raise ctx.in_error
 
@@ -131,13 +218,23 @@ class ServerBase(object):
         """Uses the ``ctx.out_object`` to set ``ctx.out_document`` and later
         ``ctx.out_string``."""
 
+        # Cached responses only need what comes after serialization.
+        if ctx.cache_hit:
+            self.finalize_context(ctx)
+            return
+
         # This means the user wanted to override the way Spyne generates the
         # outgoing byte stream. So we leave it alone.
         if ctx.out_string is not None:
             return
 
+        if ctx.cache_key is not None:
+            ctx.descriptor.cache.snapshot_headers(ctx)
+
         if ctx.out_document is None:
+            t = time()
             ret = ctx.out_protocol.serialize(ctx, message=ProtocolBase.RESPONSE)
+            ctx.phase_times['serialize'] = time() - t
 
             if isgenerator(ret) and ctx.out_object is not None and \
                                                        len(ctx.out_object) == 1:
@@ -157,7 +254,10 @@ class ServerBase(object):
                 ctx.service_class.event_manager.fire_event(
                                             'method_exception_document', ctx)
 
-        ctx.out_protocol.create_out_string(ctx)
+        if not ctx.cache_hit:
+            t = time()
+            ctx.out_protocol.create_out_string(ctx)
+            ctx.phase_times['create_out_string'] = time() - t
 
         if ctx.service_class != None:
             if ctx.out_error is None:
@@ -170,6 +270,15 @@ class ServerBase(object):
         if ctx.out_string is None:
             ctx.out_string = (b'',)
 
+        if self.metrics is not None:
+            self.metrics.count_out_string(ctx)
+
+        if self.profiler is not None:
+            self.profiler.stop(ctx)
+
+        if ctx.cache_key is not None and ctx.out_error is None:
+            ctx.descriptor.cache.set_response(ctx)
+
 
     # for backwards compatibility
     get_out_string = get_out_string_pull
@@ -178,6 +287,9 @@ class ServerBase(object):
     def get_out_string_push(self, ctx):
         """Uses the ``ctx.out_object`` to directly set ``ctx.out_string``."""
 
+        if ctx.cache_key is not None:
+            ctx.descriptor.cache.snapshot_headers(ctx)
+
         ret = ctx.out_protocol.serialize(ctx, message=ProtocolBase.RESPONSE)
         if isgenerator(ret):
             try:
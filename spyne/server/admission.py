@@ -0,0 +1,272 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""The ``spyne.server.admission`` module contains the admission controller
+that transports use to limit the number of requests they process at the same
+time and the rate at which they accept them.
+
+Limits are defined with :class:`Limit` instances, which can be assigned to
+the whole server, to service classes and to individual methods via an
+:class:`AdmissionController` instance that's passed to the transport: ::
+
+    admission = AdmissionController(
+        default=Limit(max_in_flight=64, max_queued=128, timeout=5),
+        services={ReportService: Limit(max_in_flight=4)},
+        methods={'get_user': Limit(rate=100, burst=20)},
+    )
+
+    WsgiApplication(app, admission=admission)
+
+A request has to be admitted by all the limits that apply to it. Requests
+that can't be admitted in time are rejected with a
+:class:`spyne.error.ServiceUnavailableError`, which HTTP transports send as a
+``503 Service Unavailable`` response with a ``Retry-After`` header.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+from time import time
+from threading import Condition
+
+from spyne.error import ServiceUnavailableError
+
+
+class Limit(object):
+    """Limits the number of requests in flight with a counter and the request
+    rate with a token bucket. A ``Limit`` instance is shared by all requests
+    it's assigned to.
+
+    :param max_in_flight: Max. number of requests that are processed at the
+        same time. ``None`` means no limit.
+    :param rate: Max. number of requests per second on average. ``None``
+        means no limit.
+    :param burst: Max. number of requests that can be admitted at once when
+        the rate limit was not hit for a while. Defaults to ``rate``.
+    :param max_queued: Max. number of requests that can wait for admission.
+        Requests are rejected right away when the queue is full.
+    :param timeout: Max. number of seconds a request can wait for admission.
+    """
+
+    def __init__(self, max_in_flight=None, rate=None, burst=None,
+                                                     max_queued=0, timeout=1.0):
+        if burst is None and rate is not None:
+            burst = max(1, rate)
+
+        self.max_in_flight = max_in_flight
+        self.rate = rate
+        self.burst = burst
+        self.max_queued = max_queued
+        self.timeout = timeout
+
+        self.in_flight = 0
+        """The number of requests that are being processed."""
+
+        self.queued = 0
+        """The number of requests that are waiting for admission."""
+
+        self.tokens = burst
+        self.last_refill = time()
+
+        self.__cond = Condition()
+
+    def __refill(self, now):
+        if self.rate is not None:
+            self.tokens = min(self.burst,
+                             self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def __try_acquire(self, now):
+        if self.max_in_flight is not None and \
+                                          self.in_flight >= self.max_in_flight:
+            return False
+
+        if self.rate is not None:
+            self.__refill(now)
+            if self.tokens < 1:
+                return False
+
+            self.tokens -= 1
+
+        self.in_flight += 1
+        return True
+
+    def __get_wait(self, now):
+        """Returns the number of seconds until the next token is available
+        when it's the only thing that's missing."""
+
+        if self.rate is None or self.tokens >= 1:
+            return None
+
+        if self.max_in_flight is not None and \
+                                          self.in_flight >= self.max_in_flight:
+            return None
+
+        return (1 - self.tokens) / float(self.rate)
+
+    def acquire(self, block=True):
+        """Tries to admit a request. Returns ``True`` on success, in which case
+        :meth:`release` must be called once the request is processed.
+
+        :param block: When ``False``, the request is not queued.
+        """
+
+        with self.__cond:
+            now = time()
+            if self.queued == 0 and self.__try_acquire(now):
+                return True
+
+            if not block or self.queued >= self.max_queued:
+                return False
+
+            deadline = now + self.timeout
+            self.queued += 1
+            try:
+                while True:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        return False
+
+                    wait = self.__get_wait(now)
+                    if wait is None or wait > remaining:
+                        wait = remaining
+
+                    self.__cond.wait(wait)
+
+                    now = time()
+                    if self.__try_acquire(now):
+                        return True
+
+            finally:
+                self.queued -= 1
+
+    def release(self):
+        """Marks a request admitted by :meth:`acquire` as done."""
+
+        with self.__cond:
+            self.in_flight -= 1
+            self.__cond.notify()
+
+    def get_retry_after(self):
+        """Returns an estimate of the number of seconds after which a rejected
+        request could be admitted."""
+
+        with self.__cond:
+            self.__refill(time())
+
+            wait = self.__get_wait(self.last_refill)
+            if wait is not None:
+                return wait
+
+            return self.timeout
+
+    def __repr__(self):
+        return "%s(max_in_flight=%r, rate=%r, in_flight=%r, queued=%r)" % (
+                    self.__class__.__name__, self.max_in_flight, self.rate,
+                                                   self.in_flight, self.queued)
+
+
+class _Admission(object):
+    """Releases the limits that admitted a request when its context is
+    closed."""
+
+    def __init__(self, limits):
+        self.limits = limits
+
+    def close(self):
+        limits, self.limits = self.limits, ()
+        for limit in limits:
+            limit.release()
+
+
+class AdmissionController(object):
+    """Decides whether a request is going to be processed, queued or rejected
+    according to the :class:`Limit` instances that apply to it.
+
+    :param default: A :class:`Limit` that applies to all requests.
+    :param services: A dict of :class:`spyne.service.ServiceBase` subclasses
+        to :class:`Limit` instances that apply to all methods of the service.
+    :param methods: A dict of method names (public names or ``'{ns}name'``
+        keys) to :class:`Limit` instances.
+    """
+
+    def __init__(self, default=None, services=None, methods=None):
+        self.default = default
+        self.services = dict(services or {})
+        self.methods = dict(methods or {})
+
+    def get_limits(self, ctx, default=True):
+        """Returns the list of limits that apply to the given context.
+
+        :param default: When ``False``, the default limit is left out.
+        """
+
+        retval = []
+        if default and self.default is not None:
+            retval.append(self.default)
+
+        d = ctx.descriptor
+        if d is None:
+            return retval
+
+        limit = self.services.get(d.service_class)
+        if limit is not None:
+            retval.append(limit)
+
+        limit = self.methods.get(d.name)
+        if limit is None and len(self.methods) > 0:
+            limit = self.methods.get(d.key)
+        if limit is not None:
+            retval.append(limit)
+
+        return retval
+
+    def admit(self, ctx, block=True, default=True):
+        """Admits the given context or raises
+        :class:`spyne.error.ServiceUnavailableError`. The time spent waiting
+        for admission is stored in ``ctx.queue_wait``. The limits are released
+        when the context is closed.
+
+        :param block: When ``False``, requests are not queued, which is what
+            transports that run in an event loop need.
+        :param default: When ``False``, the default limit is not applied. The
+            calls in a batch request are admitted this way, as the request
+            itself was already admitted by the default limit.
+        """
+
+        start = time()
+        acquired = []
+
+        for limit in self.get_limits(ctx, default=default):
+            if not limit.acquire(block):
+                for l in acquired:
+                    l.release()
+
+                ctx.queue_wait = time() - start
+                logger.warning("Rejecting %r: %r is saturated.",
+                                               ctx.method_request_string, limit)
+
+                raise ServiceUnavailableError(ctx.method_request_string,
+                                             retry_after=limit.get_retry_after())
+
+            acquired.append(limit)
+
+        ctx.queue_wait = time() - start
+        if len(acquired) > 0:
+            ctx.files.append(_Admission(acquired))
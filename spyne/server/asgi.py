@@ -0,0 +1,611 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""The ``spyne.server.asgi`` module contains an `ASGI
+<https://asgi.readthedocs.io>`_ application that exposes a Spyne application
+to asyncio servers like uvicorn or hypercorn: ::
+
+    from spyne.server.asgi import AsgiApplication
+
+    asgi_app = AsgiApplication(application)
+
+and then run it with e.g. ``uvicorn module:asgi_app``.
+
+Service methods can be coroutine functions. They are awaited in the event
+loop, so a single process can serve many concurrent requests that mostly wait
+for I/O: ::
+
+    class SomeService(ServiceBase):
+        @rpc(Unicode, _returns=Unicode)
+        async def fetch(ctx, key):
+            return await some_async_client.get(key)
+
+Regular methods are run in a thread pool so that they don't block the event
+loop. Request parsing and response serialization happen in the event loop.
+
+This module requires Python 3.5 or newer.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import asyncio
+import cgi
+
+from io import BytesIO
+
+from inspect import isawaitable
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+
+from spyne import BODY_STYLE_WRAPPED
+from spyne.application import get_fault_string_from_exception
+from spyne.auxproc import process_contexts
+from spyne.error import RequestTooLongError, Redirect
+from spyne.model.fault import Fault
+from spyne.protocol.http import HttpRpc
+from spyne.server.http import HttpBase
+from spyne.server.http import HttpMethodContext
+from spyne.server.wsgi import WsgiApplication
+from spyne.server.wsgi import WsgiTransportContext
+from spyne.server.wsgi import _reconstruct_url
+from spyne.server.wsgi import _gen_http_headers
+
+from spyne.const.http import HTTP_200
+from spyne.const.http import HTTP_304
+from spyne.const.http import HTTP_404
+from spyne.const.http import HTTP_500
+
+
+def _scope_to_environ(scope):
+    """Builds a wsgi environment from the given ASGI connection scope. This is
+    what Spyne's http protocols and transport contexts understand."""
+
+    server = scope.get('server') or ('localhost', 80)
+
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        # wsgi wants the raw path decoded as latin1
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': 'HTTP/%s' % scope.get('http_version', '1.1'),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'asgi.scope': scope,
+    }
+
+    client = scope.get('client')
+    if client is not None:
+        environ['REMOTE_ADDR'] = client[0]
+        environ['REMOTE_PORT'] = str(client[1])
+
+    for k, v in scope.get('headers', ()):
+        k = k.decode('latin1')
+        v = v.decode('latin1')
+
+        if k == 'content-type':
+            k = 'CONTENT_TYPE'
+        elif k == 'content-length':
+            k = 'CONTENT_LENGTH'
+        else:
+            k = 'HTTP_' + k.upper().replace('-', '_')
+
+        if k in environ:
+            v = environ[k] + ',' + v
+        environ[k] = v
+
+    return environ
+
+
+def _is_coroutine_method(descriptor):
+    return descriptor is not None and \
+                               asyncio.iscoroutinefunction(descriptor.function)
+
+
+class AsgiTransportContext(WsgiTransportContext):
+    """The class that is used in the transport attribute of the
+    :class:`AsgiMethodContext` class. The ``req_env`` attribute contains a
+    wsgi environment that is built from the ASGI scope."""
+
+    def __init__(self, parent, transport, req_env, content_type):
+        super(AsgiTransportContext, self).__init__(parent, transport, req_env,
+                                                                   content_type)
+
+        self.scope = req_env['asgi.scope']
+        """The ASGI connection scope."""
+
+
+class AsgiMethodContext(HttpMethodContext):
+    """The ASGI-Specific method context. ASGI-Specific information is stored
+    in the transport attribute using the :class:`AsgiTransportContext` class.
+    """
+
+    default_transport_context = AsgiTransportContext
+
+
+class AsgiApplication(HttpBase):
+    """An ASGI (version 3) compliant callable class.
+
+    :param app: A :class:`spyne.application.Application` instance.
+    :param chunked: When ``False``, the response is buffered to set the
+        ``Content-Length`` header.
+    :param max_content_length: Maximum request size, in bytes.
+    :param block_length: Unused, for signature compatibility with
+        :class:`spyne.server.wsgi.WsgiApplication`.
+    :param executor: A :class:`concurrent.futures.Executor` that runs the
+        methods that are not coroutine functions. Defaults to a
+        :class:`concurrent.futures.ThreadPoolExecutor`.
+    :param max_threads: The ``max_workers`` argument of the default
+        executor.
+    :param compression: ``True`` or a
+        :class:`spyne.server.http.HttpCompression` instance to compress
+        responses for clients that accept it. Request bodies with a
+        ``Content-Encoding`` header are always decompressed, up to
+        ``max_content_length`` bytes.
+    :param batch: ``True`` or a :class:`spyne.server.batch.BatchProcessor`
+        instance to process batch requests of protocols that support them.
+        The calls in a batch run concurrently, coroutine methods in the event
+        loop and the others in ``executor``.
+    :param admission: A :class:`spyne.server.admission.AdmissionController`
+        instance to limit the number of concurrent requests and the request
+        rate per service or method. Requests are never queued as that would
+        block the event loop, they are rejected with
+        ``503 Service Unavailable`` right away.
+    :param metrics: ``True`` or a :class:`spyne.server.metrics.Metrics`
+        instance to collect request metrics, which are served in the
+        Prometheus text format under ``metrics.path``.
+    :param profiler: A :class:`spyne.server.profiler.Profiler` instance to
+        profile a sample of the requests.
+
+    Supported events:
+        * ``wsdl``
+            Called right before the wsdl data is returned to the client.
+
+        * ``wsdl_exception``
+            Called right after an exception is thrown during wsdl generation.
+            The exception object is stored in ctx.transport.wsdl_error
+            attribute.
+
+        * ``asgi_call``
+            Called first when the incoming http request is identified as a rpc
+            request.
+
+        * ``asgi_return``
+            Called right before the response headers are sent.
+
+        * ``asgi_exception``
+            Called right before returning the exception to the client.
+
+        * ``asgi_close``
+            Called after the whole data has been returned to the client. It's
+            called both from success and error cases.
+    """
+
+    def __init__(self, app, chunked=True, max_content_length=2 * 1024 * 1024,
+                      block_length=8 * 1024, executor=None, max_threads=None,
+                               compression=None, batch=None, admission=None,
+                                                   metrics=None, profiler=None):
+        super(AsgiApplication, self).__init__(app, chunked, max_content_length,
+                             block_length, compression=compression, batch=batch,
+                     admission=admission, metrics=metrics, profiler=profiler)
+
+        if executor is None:
+            executor = ThreadPoolExecutor(max_threads)
+
+        self.executor = executor
+
+        # The wsdl is built on the first request for it. Touching
+        # self.doc.wsdl11 here would import lxml for nothing.
+        self._wsdl = None
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.handle_lifespan(scope, receive, send)
+
+        if scope['type'] != 'http':
+            raise ValueError("Unsupported ASGI scope type %r" % scope['type'])
+
+        req_env = _scope_to_environ(scope)
+
+        if self.is_metrics_request(req_env['REQUEST_METHOD'],
+                                                        req_env['PATH_INFO']):
+            data = self.metrics.to_text()
+            return await self._send_response(send, HTTP_200,
+                                {'Content-Type': self.metrics.CONTENT_TYPE,
+                                 'Content-Length': str(len(data))}, [data])
+
+        if self.is_wsdl_request(req_env):
+            url = _reconstruct_url(req_env).split('.wsdl')[0]
+            return await self.handle_wsdl_request(req_env, send, url)
+
+        return await self.handle_rpc(req_env, receive, send)
+
+    is_wsdl_request = WsgiApplication.is_wsdl_request
+
+    def decompose_incoming_envelope(self, prot, ctx, message):
+        """This function is only called by the HttpRpc protocol to have the
+        request parsed into ``ctx.in_body_doc`` and ``ctx.in_header_doc``.
+        """
+
+        req_env = ctx.in_document
+        if 'wsgi.input' not in req_env:
+            data = b''.join(ctx.in_string)
+            req_env['wsgi.input'] = BytesIO(data)
+            # the body may have been decompressed
+            req_env['CONTENT_LENGTH'] = str(len(data))
+
+        WsgiApplication.decompose_incoming_envelope(self, prot, ctx, message)
+
+    async def handle_lifespan(self, scope, receive, send):
+        while True:
+            message = await receive()
+
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def handle_wsdl_request(self, req_env, send, url):
+        ctx = AsgiMethodContext(self, req_env, 'text/xml; charset=utf-8')
+
+        if self.doc.wsdl11 is None:
+            await self._send_response(send, HTTP_404,
+                                         ctx.transport.resp_headers, [HTTP_404])
+            return
+
+        if self._wsdl is None:
+            self._wsdl = self.doc.wsdl11.get_interface_document()
+
+        if self._wsdl is None:
+            # everything runs in the event loop thread, so there is no need
+            # for locking here.
+            try:
+                self.doc.wsdl11.build_interface_document(url)
+                self._wsdl = self.doc.wsdl11.get_interface_document()
+
+            except Exception as e:
+                logger.exception(e)
+                ctx.transport.wsdl_error = e
+
+                self.event_manager.fire_event('wsdl_exception', ctx)
+
+                await self._send_response(send, HTTP_500,
+                                         ctx.transport.resp_headers, [HTTP_500])
+                return
+
+        ctx.transport.wsdl = self._wsdl
+
+        self.event_manager.fire_event('wsdl', ctx)
+
+        retval = ctx.transport.wsdl
+        headers = ctx.transport.resp_headers
+
+        # the wsdl event handlers may have replaced the document.
+        if retval is self._wsdl:
+            retval = self.prepare_wsdl_response(ctx, retval)
+            if retval is None:
+                try:
+                    await self._send_response(send, HTTP_304, headers, [])
+                finally:
+                    ctx.close()
+                return
+
+        headers['Content-Length'] = str(len(retval))
+        try:
+            await self._send_response(send, HTTP_200, headers, [retval])
+        finally:
+            ctx.close()
+
+    async def handle_error(self, p_ctx, others, error, send):
+        """Serialize errors and send them to the client.
+
+        :param p_ctx: Primary (non-aux) context.
+        :param others: List if auxiliary contexts (can be empty).
+        :param error: One of ctx.{in,out}_error.
+        :param send: The ASGI send callable.
+        """
+
+        if p_ctx.transport.resp_code is None:
+            p_ctx.transport.resp_code = \
+                p_ctx.out_protocol.fault_to_http_response_code(error)
+
+        self.get_out_string(p_ctx)
+        self.compress_out_string(p_ctx,
+                                   p_ctx.transport.req.get('HTTP_ACCEPT_ENCODING'))
+
+        # consume the generator to get the length
+        p_ctx.out_string = list(p_ctx.out_string)
+
+        p_ctx.transport.resp_headers['Content-Length'] = \
+                                    str(sum((len(s) for s in p_ctx.out_string)))
+        self.event_manager.fire_event('asgi_exception', p_ctx)
+
+        try:
+            await self._send_response(send, p_ctx.transport.resp_code,
+                                 p_ctx.transport.resp_headers, p_ctx.out_string)
+
+            try:
+                process_contexts(self, others, p_ctx, error=error)
+            except Exception as e:
+                # Report but ignore any exceptions from auxiliary methods.
+                logger.exception(e)
+
+        finally:
+            self.__finalize(p_ctx)
+
+    async def handle_rpc(self, req_env, receive, send):
+        initial_ctx = AsgiMethodContext(self, req_env,
+                                                self.app.out_protocol.mime_type)
+
+        self.event_manager.fire_event('asgi_call', initial_ctx)
+
+        try:
+            initial_ctx.in_string = await self.read_request_body(req_env,
+                                                                        receive)
+        except RequestTooLongError as e:
+            initial_ctx.in_error = initial_ctx.out_error = e
+            return await self.handle_error(initial_ctx, [], e, send)
+
+        if initial_ctx.in_string is None:
+            logger.debug("client disconnected before sending the request")
+            initial_ctx.close()
+            return
+
+        charset = None
+        content_type = req_env.get('CONTENT_TYPE')
+        if content_type is not None:
+            charset = cgi.parse_header(content_type)[1].get('charset', None)
+
+        initial_ctx.in_string = self.decompress_in_string(initial_ctx.in_string,
+                                           req_env.get('HTTP_CONTENT_ENCODING'))
+
+        contexts = self.generate_contexts(initial_ctx, charset)
+        p_ctx, others = contexts[0], contexts[1:]
+
+        self.admit(p_ctx, block=False)
+
+        if p_ctx.in_error:
+            return await self.handle_error(p_ctx, others, p_ctx.in_error, send)
+
+        self.get_in_object(p_ctx)
+        if p_ctx.in_error:
+            logger.error(p_ctx.in_error)
+            return await self.handle_error(p_ctx, others, p_ctx.in_error, send)
+
+        if p_ctx.batch is not None:
+            await self.process_batch(p_ctx)
+
+        else:
+            await self.process_call(p_ctx)
+
+        if p_ctx.out_error:
+            return await self.handle_error(p_ctx, others, p_ctx.out_error, send)
+
+        if p_ctx.transport.resp_code is None:
+            p_ctx.transport.resp_code = HTTP_200
+
+        try:
+            self.get_out_string(p_ctx)
+
+            # Makes user generators run until their first yield, which lets
+            # them set response headers before the response is started.
+            out_string = iter(p_ctx.out_string)
+            out_string = chain((next(out_string, b''),), out_string)
+
+        except Exception as e:
+            logger.exception(e)
+            p_ctx.out_error = Fault('Server', get_fault_string_from_exception(e))
+            return await self.handle_error(p_ctx, others, p_ctx.out_error, send)
+
+        if isinstance(p_ctx.out_protocol, HttpRpc) and \
+                                               p_ctx.out_header_doc is not None:
+            p_ctx.transport.resp_headers.update(p_ctx.out_header_doc)
+
+        self.event_manager.fire_event('asgi_return', p_ctx)
+
+        p_ctx.out_string = out_string
+        self.compress_out_string(p_ctx, req_env.get('HTTP_ACCEPT_ENCODING'))
+        out_string = p_ctx.out_string
+
+        if self.chunked:
+            # the user has not set a content-length, so we delete it as the
+            # input is just an iterable.
+            if 'Content-Length' in p_ctx.transport.resp_headers:
+                del p_ctx.transport.resp_headers['Content-Length']
+        else:
+            out_string = [b''.join(out_string)]
+
+            p_ctx.transport.resp_headers['Content-Length'] = \
+                                                       str(len(out_string[0]))
+
+        try:
+            await self._send_response(send, p_ctx.transport.resp_code,
+                                         p_ctx.transport.resp_headers, out_string)
+
+            try:
+                process_contexts(self, others, p_ctx, error=None)
+            except Exception as e:
+                # Report but ignore any exceptions from auxiliary methods.
+                logger.exception(e)
+
+        finally:
+            self.__finalize(p_ctx)
+
+    async def process_call(self, ctx):
+        """Runs the method in ``ctx``, in the event loop for coroutine
+        methods and in the executor for the others, and sets
+        ``ctx.out_object``."""
+
+        if _is_coroutine_method(ctx.descriptor):
+            # this just creates the coroutine object
+            self.get_out_object(ctx)
+
+        else:
+            await asyncio.get_event_loop().run_in_executor(self.executor,
+                                                       self.get_out_object, ctx)
+
+        await self.await_out_object(ctx)
+
+    async def process_batch(self, p_ctx):
+        """Runs the calls in a batch request concurrently and puts the
+        batch response document to ``p_ctx.out_document``."""
+
+        batch = self.batch
+
+        async def _process(c_ctx, c_others):
+            if c_ctx.in_error is None:
+                self.get_in_object(c_ctx)
+
+            if c_ctx.in_error is None:
+                await self.process_call(c_ctx)
+
+            batch.serialize_call(self, c_ctx, c_others)
+
+        await asyncio.gather(*[_process(c_ctx, c_others)
+                                           for c_ctx, c_others in p_ctx.batch])
+
+        batch.compose(self, p_ctx)
+
+    async def read_request_body(self, req_env, receive):
+        """Returns the request body as a list of chunks or ``None`` if the
+        client disconnects before sending the whole body."""
+
+        length = req_env.get('CONTENT_LENGTH')
+        if length and int(length) > self.max_content_length:
+            raise RequestTooLongError()
+
+        retval = []
+        bytes_read = 0
+
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+
+            data = message.get('body', b'')
+            if len(data) > 0:
+                bytes_read += len(data)
+                if bytes_read > self.max_content_length:
+                    raise RequestTooLongError()
+
+                retval.append(data)
+
+            if not message.get('more_body', False):
+                return retval
+
+    async def await_out_object(self, ctx):
+        """Awaits the return value of coroutine methods and puts the result
+        to ``ctx.out_object``. Exceptions are handled the way
+        :meth:`spyne.application.Application.process_request` handles them
+        for regular methods."""
+
+        if ctx.out_object is None:
+            return
+
+        descriptor = ctx.descriptor
+        single = descriptor.body_style is not BODY_STYLE_WRAPPED or \
+                                  len(descriptor.out_message._type_info) <= 1
+
+        if single:
+            ret, = ctx.out_object
+        else:
+            ret = ctx.out_object
+
+        if not isawaitable(ret):
+            return
+
+        app = ctx.app
+        try:
+            ret = await ret
+
+        except Redirect as e:
+            try:
+                e.do_redirect()
+                ctx.out_object = [None]
+
+                app.event_manager.fire_event('method_redirect', ctx)
+                if ctx.service_class is not None:
+                    ctx.service_class.event_manager.fire_event(
+                                                         'method_redirect', ctx)
+
+            except Exception as e:
+                logger.exception(e)
+                ctx.out_error = Fault('Server',
+                                             get_fault_string_from_exception(e))
+
+                app.event_manager.fire_event('method_redirect_exception', ctx)
+                if ctx.service_class is not None:
+                    ctx.service_class.event_manager.fire_event(
+                                               'method_redirect_exception', ctx)
+
+        except Fault as e:
+            logger.exception(e)
+            ctx.out_error = e
+
+            app.event_manager.fire_event('method_exception_object', ctx)
+            if ctx.service_class is not None:
+                ctx.service_class.event_manager.fire_event(
+                                               'method_exception_object', ctx)
+
+        except Exception as e:
+            logger.critical(e, exc_info=1)
+            ctx.out_error = Fault('Server', get_fault_string_from_exception(e))
+
+            app.event_manager.fire_event('method_exception_object', ctx)
+            if ctx.service_class is not None:
+                ctx.service_class.event_manager.fire_event(
+                                               'method_exception_object', ctx)
+
+        else:
+            if single:
+                ctx.out_object = [ret]
+            else:
+                ctx.out_object = ret
+
+    async def _send_response(self, send, resp_code, resp_headers, out_string):
+        await send({
+            'type': 'http.response.start',
+            'status': int(resp_code[:3]),
+            'headers': [(k.encode('latin1'), str(v).encode('latin1'))
+                                   for k, v in _gen_http_headers(resp_headers)],
+        })
+
+        for data in out_string:
+            if len(data) == 0:
+                continue
+
+            if not isinstance(data, bytes):
+                data = data.encode('utf8')
+
+            await send({
+                'type': 'http.response.body',
+                'body': data,
+                'more_body': True,
+            })
+
+        await send({'type': 'http.response.body', 'body': b''})
+
+    def __finalize(self, p_ctx):
+        p_ctx.close()
+        self.event_manager.fire_event('asgi_close', p_ctx)
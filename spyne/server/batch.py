@@ -0,0 +1,225 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""The ``spyne.server.batch`` module contains :class:`BatchProcessor`, which
+lets server transports process requests that carry multiple calls in one
+document.
+
+A batch request is detected by the input protocol, see
+:meth:`spyne.protocol.InProtocolBase.decompose_incoming_batch`. Every call in
+the batch gets its own :class:`spyne.MethodContext`, and the responses are put
+together, in the order of the calls, by
+:meth:`spyne.protocol.OutProtocolBase.compose_outgoing_batch`. Failing calls
+are reported as faults in their own entries, they don't fail the whole
+request.
+
+Currently :class:`spyne.protocol.json.JsonRpc` and
+:class:`spyne.protocol.msgpack.MessagePackRpc` support batch requests.
+
+>>> from spyne.server.wsgi import WsgiApplication
+>>> wsgi_app = WsgiApplication(app, batch=BatchProcessor(max_workers=8))
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+from copy import copy
+from threading import Lock
+from multiprocessing.pool import ThreadPool
+
+from spyne import EventContext
+from spyne.auxproc import process_contexts
+from spyne.error import Fault, ValidationError, RequestTooLongError
+from spyne.protocol import ProtocolBase
+from spyne.application import get_fault_string_from_exception
+
+
+class BatchProcessor(object):
+    """Processes the calls in batch requests concurrently in a thread pool.
+
+    Transports that have their own concurrency primitives (like Twisted's
+    Deferreds) only use the thread pool for regular methods.
+
+    :param max_workers: The number of threads that process the calls.
+    :param max_size: The maximum number of calls in a batch. Larger batches
+        are rejected with ``Client.RequestTooLong``.
+    """
+
+    def __init__(self, max_workers=4, max_size=100):
+        self.max_workers = max_workers
+        self.max_size = max_size
+
+        self._pool = None
+        self._pool_lock = Lock()
+
+    @property
+    def pool(self):
+        # the pool is created lazily so that forked workers (see
+        # spyne.server.prefork) don't inherit dead threads.
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ThreadPool(self.max_workers)
+
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def generate_contexts(self, server, ctx, docs):
+        """Sets ``ctx.batch`` to a list of ``(p_ctx, others)`` tuples, one for
+        each document in the ``docs`` list, where ``p_ctx`` is the primary
+        context of the call and ``others`` the contexts of its auxiliary
+        methods. Errors in the envelopes of individual calls are put in their
+        ``in_error`` attributes.
+
+        Every call is admitted by the admission controller of the server, if
+        any, without waiting. Calls that are rejected get a
+        ``ServiceUnavailableError`` in their own entries."""
+
+        if len(docs) == 0:
+            raise ValidationError(docs, "Empty batch request")
+
+        if len(docs) > self.max_size:
+            raise RequestTooLongError("Batch request with %d calls, max. is %d"
+                                                     % (len(docs), self.max_size))
+
+        in_protocol = server.app.in_protocol
+        admission = server.admission
+
+        retval = []
+        for doc in docs:
+            c_ctx = self.get_call_context(ctx)
+            c_ctx.in_document = doc
+
+            try:
+                in_protocol.decompose_incoming_envelope(c_ctx,
+                                                           ProtocolBase.REQUEST)
+                contexts = in_protocol.generate_method_contexts(c_ctx)
+
+            except Fault as e:
+                c_ctx.in_object = None
+                c_ctx.in_error = e
+                c_ctx.out_error = e
+
+                contexts = (c_ctx,)
+
+            p_ctx = contexts[0]
+            if admission is not None and p_ctx.in_error is None:
+                try:
+                    admission.admit(p_ctx, block=False, default=False)
+
+                except Fault as e:
+                    p_ctx.in_error = e
+                    p_ctx.out_error = e
+
+            retval.append((p_ctx, contexts[1:]))
+
+            # the call contexts are closed along with the request context,
+            # which also releases their admission limits.
+            ctx.files.append(p_ctx)
+
+        ctx.batch = retval
+
+    def get_call_context(self, ctx):
+        """Returns a new context for a call in the batch request in ``ctx``.
+        It shares the transport context with ``ctx`` but has its own protocol
+        and event contexts."""
+
+        retval = copy(ctx)
+
+        transport = ctx.transport.itself
+        app = ctx.app
+
+        retval.inprot_ctx = retval.outprot_ctx = None
+        if app.in_protocol is not None:
+            retval.inprot_ctx = app.in_protocol.get_context(retval, transport)
+        if app.out_protocol is not None:
+            retval.outprot_ctx = app.out_protocol.get_context(retval, transport)
+
+        retval.protocol = retval.inprot_ctx
+        retval.event = EventContext(retval)
+        retval.files = []
+        retval.pusher_stack = []
+        retval.batch = None
+        retval.in_batch = True
+        retval.phase_times = {}
+        retval.in_string_length = retval.out_string_length = None
+
+        return retval
+
+    def process(self, server, ctx):
+        """Processes all calls in ``ctx.batch`` in the thread pool and puts the
+        batch response document to ``ctx.out_document``."""
+
+        self.pool.map(lambda entry: self.process_call(server, *entry),
+                                                                     ctx.batch)
+
+        self.compose(server, ctx)
+
+    def process_call(self, server, ctx, others):
+        """Processes a call in a batch request from deserialization to the
+        serialization of the response document."""
+
+        if ctx.in_error is None:
+            server.get_in_object(ctx)
+
+        if ctx.in_error is None:
+            try:
+                server.get_out_object(ctx)
+
+            except Exception as e:
+                logger.exception(e)
+                ctx.out_error = Fault('Server',
+                                             get_fault_string_from_exception(e))
+
+        self.serialize_call(server, ctx, others)
+
+    def serialize_call(self, server, ctx, others):
+        """Serializes the response of a call in a batch request to
+        ``ctx.out_document`` and processes its auxiliary methods."""
+
+        if ctx.out_error is None and ctx.in_error is not None:
+            ctx.out_error = ctx.in_error
+
+        try:
+            ctx.out_protocol.serialize(ctx, message=ProtocolBase.RESPONSE)
+
+        except Exception as e:
+            logger.exception(e)
+            ctx.out_error = Fault('Server', get_fault_string_from_exception(e))
+            ctx.out_document = None
+            ctx.out_protocol.serialize(ctx, message=ProtocolBase.RESPONSE)
+
+        try:
+            process_contexts(server, others, ctx, error=ctx.out_error)
+        except Exception as e:
+            # Report but ignore any exceptions from auxiliary methods.
+            logger.exception(e)
+
+    def compose(self, server, ctx):
+        """Puts the response documents of the calls in ``ctx.batch`` together
+        in ``ctx.out_document``."""
+
+        contexts = [c_ctx for c_ctx, _ in ctx.batch]
+
+        ctx.out_object = [c_ctx.out_object for c_ctx in contexts]
+        ctx.out_protocol.compose_outgoing_batch(ctx, contexts)
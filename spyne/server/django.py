@@ -121,6 +121,9 @@ class DjangoHttpTransportContext(HttpTransportContext):
     def get_cookie(self, key):
         return self.req.COOKIES[key]
 
+    def get_request_header(self, name):
+        return self.req.META.get('HTTP_' + name.upper().replace('-', '_'))
+
 
 class DjangoHttpMethodContext(HttpMethodContext):
     default_transport_context = DjangoHttpTransportContext
@@ -129,8 +132,9 @@ class DjangoHttpMethodContext(HttpMethodContext):
 class DjangoServer(HttpBase):
     """Server talking in Django request/response objects."""
 
-    def __init__(self, app, chunked=False, cache_wsdl=True):
-        super(DjangoServer, self).__init__(app, chunked=chunked)
+    def __init__(self, app, chunked=False, cache_wsdl=True, admission=None):
+        super(DjangoServer, self).__init__(app, chunked=chunked,
+                                                           admission=admission)
         self._wsdl = None
         self._cache_wsdl = cache_wsdl
 
@@ -144,8 +148,7 @@ class DjangoServer(HttpBase):
         contexts = self.get_contexts(request)
         p_ctx, others = contexts[0], contexts[1:]
 
-        # TODO: Rate limiting
-        p_ctx.active = True
+        self.admit(p_ctx)
 
         if p_ctx.in_error:
             return self.handle_error(p_ctx, others, p_ctx.in_error)
@@ -17,15 +17,28 @@
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
 #
 
+import re
+
 from collections import defaultdict
+from fnmatch import fnmatchcase
+from itertools import chain
+from math import ceil
+from operator import itemgetter
 
 from email import utils
 from email.utils import encode_rfc2231
 from email.message import tspecials
 
 from spyne import TransportContext, MethodDescriptor, MethodContext, Redirect
+from spyne.util import six
+from spyne.error import ServiceUnavailableError
 from spyne.server import ServerBase
+from spyne.server.batch import BatchProcessor
+from spyne.server.metrics import Metrics
+from spyne.util.compress import get_codings, compress_chunks, \
+    decompress_chunks
 from spyne.protocol.http import HttpPattern
+from spyne.protocol.http import _fragment_pattern_re, _full_pattern_re
 from spyne.const.http import gen_body_redirect, HTTP_301, HTTP_302, HTTP_303, \
     HTTP_307
 
@@ -84,6 +97,134 @@ def _formatparam(param, value=None, quote=True):
     return '%s=%s' % (param, value)
 
 
+def _parse_accept_encoding(accept_encoding):
+    retval = {}
+
+    for coding in accept_encoding.split(','):
+        coding, _, params = coding.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                pass
+
+        retval[coding] = q
+
+    return retval
+
+
+def negotiate_encoding(accept_encoding, codings):
+    """Returns the content coding from the given sequence that the given value
+    of an ``Accept-Encoding`` header prefers, or ``None`` when none of them is
+    acceptable. Ties are broken by the order of the given sequence."""
+
+    if not accept_encoding:
+        return None
+
+    accepted = _parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get('*', 0)
+
+    retval = None
+    retval_q = 0
+    for coding in codings:
+        # an explicit entry takes precedence over the wildcard.
+        q = accepted.get(coding, wildcard)
+        if q > retval_q:
+            retval, retval_q = coding, q
+
+    return retval
+
+
+def accepts_encoding(accept_encoding, encoding):
+    """Returns ``True`` when the given value of an ``Accept-Encoding`` header
+    allows the given content coding."""
+
+    return negotiate_encoding(accept_encoding, (encoding,)) is not None
+
+
+def etag_matches(if_none_match, etag):
+    """Returns ``True`` when the given value of an ``If-None-Match`` header
+    matches the given ETag."""
+
+    if not if_none_match:
+        return False
+
+    for tag in if_none_match.split(','):
+        tag = tag.strip()
+        if tag == '*':
+            return True
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+
+    return False
+
+
+class HttpCompression(object):
+    """Settings for compressing the responses of :class:`HttpBase`
+    transports.
+
+    :param codings: The content codings to offer, in the order of preference.
+        Defaults to all that are available, see
+        :func:`spyne.util.compress.get_codings`.
+    :param min_length: Responses shorter than this many bytes are sent
+        uncompressed. Only as much of a streamed response is buffered as is
+        needed to decide.
+    :param mime_types: The mime types of the responses to compress. A pattern
+        like ``'text/*'`` can be used as well. Defaults to
+        :attr:`MIME_TYPES`.
+    :param level: The compression level, between 1 and 9.
+    """
+
+    MIME_TYPES = (
+        'text/*',
+        'application/json',
+        'application/javascript',
+        'application/xml',
+        'application/*+xml',
+        'application/x-yaml',
+        'application/yaml',
+    )
+
+    def __init__(self, codings=None, min_length=1024, mime_types=None,
+                                                                     level=6):
+        if codings is None:
+            codings = get_codings()
+
+        if mime_types is None:
+            mime_types = self.MIME_TYPES
+
+        self.codings = tuple(codings)
+        self.min_length = min_length
+        self.mime_types = tuple(mime_types)
+        self.level = level
+
+    def is_compressible(self, mime_type):
+        """Returns ``True`` if responses of the given mime type should be
+        compressed."""
+
+        if not mime_type:
+            return False
+
+        if isinstance(mime_type, six.binary_type):
+            mime_type = mime_type.decode('latin1')
+
+        mime_type = mime_type.partition(';')[0].strip().lower()
+
+        for pattern in self.mime_types:
+            if fnmatchcase(mime_type, pattern):
+                return True
+
+        return False
+
+
 class HttpTransportContext(TransportContext):
     """The abstract base class that is used in the transport attribute of the
     :class:`HttpMethodContext` class and its subclasses."""
@@ -142,6 +283,9 @@ class HttpTransportContext(TransportContext):
     def get_cookie(self, key):
         raise NotImplementedError()
 
+    def get_request_header(self, name):
+        raise NotImplementedError()
+
     @staticmethod
     def gen_header(_value, **kwargs):
         parts = []
@@ -218,17 +362,245 @@ class HttpMethodContext(MethodContext):
     """Assigning an out protocol overrides the mime type of the transport."""
 
 
+_RE_SPECIAL = frozenset('.^$*+?{}[]\\|()')
+_placeholder_re = re.compile('^(?:<([A-Za-z0-9_]+)>|{([A-Za-z0-9_]+)})$')
+
+
+def _is_literal(s):
+    return _RE_SPECIAL.isdisjoint(s) and \
+                           _fragment_pattern_re.search(s) is None
+
+
+def _full_match(regex, s):
+    match = regex.match(s)
+    if match is None or match.span() != (0, len(s)):
+        return None
+    return match
+
+
+def _match_regex(patt, method, path, host, params):
+    """Matches the given pattern by running its regular expressions. The
+    named groups of the verb and host patterns are added to ``params`` even
+    when the address does not match."""
+
+    if patt.verb is not None:
+        match = _full_match(patt.verb_re, method)
+        if match is None:
+            return False
+
+        for k, v in match.groupdict().items():
+            params[k].append(v)
+
+    if patt.host is not None:
+        match = _full_match(patt.host_re, host)
+        if match is None:
+            return False
+
+        for k, v in match.groupdict().items():
+            params[k].append(v)
+
+    assert patt.address is not None
+
+    match = _full_match(patt.address_re, path)
+    if match is None:
+        return False
+
+    for k, v in match.groupdict().items():
+        params[k].append(v)
+
+    return True
+
+
+class _Node(object):
+    __slots__ = ('literals', 'wildcard', 'entries')
+
+    def __init__(self):
+        self.literals = {}
+        self.wildcard = None
+        self.entries = []
+
+
+class _Entry(object):
+    __slots__ = ('index', 'pattern', 'names', 'verb', 'host')
+
+    def __init__(self, index, pattern, names):
+        self.index = index
+        self.pattern = pattern
+        self.names = names
+
+        # a string when the pattern is a literal, a regex otherwise.
+        self.verb = _Entry._get_matcher(pattern.verb, pattern.verb_re)
+        self.host = _Entry._get_matcher(pattern.host, pattern.host_re)
+
+    @staticmethod
+    def _get_matcher(s, regex):
+        if s is None or _is_literal(s):
+            return s
+        return regex
+
+    @staticmethod
+    def _check(matcher, s):
+        if matcher is None:
+            return True
+        if isinstance(matcher, six.string_types):
+            return matcher == s
+        return _full_match(matcher, s) is not None
+
+    def check(self, method, host):
+        return _Entry._check(self.verb, method) and \
+                                                  _Entry._check(self.host, host)
+
+
+class HttpPatternRouter(object):
+    """Finds the first matching :class:`spyne.protocol.http.HttpPattern` in
+    the given sequence without evaluating every pattern's regular expressions.
+
+    Addresses that consist of literal path segments and whole-segment
+    placeholders are stored in a trie which is walked one path segment at a
+    time. Their verb and host patterns are compared as strings when they are
+    literals. All other patterns, e.g. ones with regular expression syntax in
+    their addresses or with placeholders in their verb or host patterns, are
+    matched using their regular expressions.
+
+    The first matching pattern in the given sequence wins, just like when
+    evaluating all patterns in order.
+    """
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+
+        self._root = _Node()
+        self._others = []
+
+        for i, patt in enumerate(self.patterns):
+            assert isinstance(patt, HttpPattern)
+
+            segments = self._parse_address(patt)
+            if segments is None:
+                self._others.append((i, patt))
+                continue
+
+            node = self._root
+            names = []
+            for literal, name in segments:
+                if name is None:
+                    child = node.literals.get(literal)
+                    if child is None:
+                        child = node.literals[literal] = _Node()
+
+                else:
+                    names.append(name)
+                    child = node.wildcard
+                    if child is None:
+                        child = node.wildcard = _Node()
+
+                node = child
+
+            node.entries.append(_Entry(i, patt, tuple(names)))
+
+    @staticmethod
+    def _parse_address(patt):
+        """Returns a list of ``(literal, placeholder_name)`` tuples, or
+        ``None`` when the pattern needs regular expression matching."""
+
+        for regex in (patt.verb_re, patt.host_re):
+            if regex is not None and len(regex.groupindex) > 0:
+                # the named groups of a non-matching pattern can end up in
+                # the resulting params
+                return None
+
+        if patt.address is None:
+            return None
+
+        retval = []
+        for segment in patt.address.split('/'):
+            match = _placeholder_re.match(segment)
+            if match is not None:
+                retval.append((None, match.group(1) or match.group(2)))
+
+            elif _is_literal(segment):
+                retval.append((segment, None))
+
+            else:
+                return None
+
+        return retval
+
+    def _collect(self, node, segments, i, values, retval):
+        if i == len(segments):
+            for entry in node.entries:
+                retval.append((entry.index, entry, tuple(values)))
+            return
+
+        segment = segments[i]
+
+        child = node.literals.get(segment)
+        if child is not None:
+            self._collect(child, segments, i + 1, values, retval)
+
+        child = node.wildcard
+        if child is not None:
+            values.append(segment)
+            self._collect(child, segments, i + 1, values, retval)
+            values.pop()
+
+    def match(self, method, path, host):
+        """Returns a ``(pattern, params)`` tuple where ``pattern`` is the first
+        matching pattern or ``None``, and ``params`` is a dict of lists with
+        the values of the placeholders."""
+
+        params = defaultdict(list)
+
+        candidates = []
+        self._collect(self._root, path.split('/'), 0, [], candidates)
+        candidates.extend((i, patt, None) for i, patt in self._others)
+        candidates.sort(key=itemgetter(0))
+
+        for _, entry, values in candidates:
+            if values is None:
+                if _match_regex(entry, method, path, host, params):
+                    return entry, params
+
+            elif entry.check(method, host):
+                for k, v in zip(entry.names, values):
+                    params[k].append(v)
+
+                return entry.pattern, params
+
+        return None, params
+
+
 class HttpBase(ServerBase):
     transport = 'http://schemas.xmlsoap.org/soap/http'
 
     def __init__(self, app, chunked=False,
                 max_content_length=2 * 1024 * 1024,
-                block_length=8 * 1024):
+                block_length=8 * 1024, compression=None, batch=None,
+                admission=None, metrics=None, profiler=None):
         super(HttpBase, self).__init__(app)
 
+        if compression is True:
+            compression = HttpCompression()
+
+        if batch is True:
+            batch = BatchProcessor()
+
+        if metrics is True:
+            metrics = Metrics()
+
         self.chunked = chunked
         self.max_content_length = max_content_length
         self.block_length = block_length
+        self.compression = compression
+        self.batch = batch
+        self.admission = admission
+        self.metrics = metrics
+        if metrics is not None:
+            metrics.install(self)
+
+        self.profiler = profiler
+
+        self._wsdl_doc = None
 
         self._http_patterns = set()
 
@@ -245,9 +617,11 @@ class HttpBase(ServerBase):
         self._http_patterns = list(reversed(sorted(self._http_patterns,
                                           key=lambda x: (x.address, x.host) )))
 
+        self._http_router = HttpPatternRouter(self._http_patterns)
+
     def match_pattern(self, ctx, method='', path='', host=''):
-        """Sets ctx.method_request_string if there's a match. It's O(n) which
-        means you should keep your number of patterns as low as possible.
+        """Sets ctx.method_request_string if there's a match. See
+        :class:`HttpPatternRouter` for how patterns are matched.
 
         :param ctx: A MethodContext instance
         :param method: The verb in the HTTP Request (GET, POST, etc.)
@@ -259,40 +633,9 @@ class HttpBase(ServerBase):
         if not path.startswith('/'):
             path = '/' + path
 
-        params = defaultdict(list)
-        for patt in self._http_patterns:
-            assert isinstance(patt, HttpPattern)
-
-            if patt.verb is not None:
-                match = patt.verb_re.match(method)
-                if match is None:
-                    continue
-                if not (match.span() == (0, len(method))):
-                    continue
-
-                for k,v in match.groupdict().items():
-                    params[k].append(v)
-
-            if patt.host is not None:
-                match = patt.host_re.match(host)
-                if match is None:
-                    continue
-                if not (match.span() == (0, len(host))):
-                    continue
-
-                for k, v in match.groupdict().items():
-                    params[k].append(v)
-
-            assert patt.address is not None
-
-            match = patt.address_re.match(path)
-            if match is None:
-                continue
-            if not (match.span() == (0, len(path))):
-                continue
-            for k,v in match.groupdict().items():
-                params[k].append(v)
+        patt, params = self._http_router.match(method, path, host)
 
+        if patt is not None:
             d = patt.endpoint
             assert isinstance(d, MethodDescriptor)
             if d.parent_class is not None and d.in_message_name_override:
@@ -300,10 +643,137 @@ class HttpBase(ServerBase):
                                            d.in_message.get_type_name(), d.name)
             else:
                 ctx.method_request_string = patt.endpoint.name
-            break
 
         return params
 
+    def admit(self, ctx, block=True):
+        """Adds a ``Retry-After`` header to the response when the request is
+        rejected by the admission controller. See :meth:`ServerBase.admit`."""
+
+        super(HttpBase, self).admit(ctx, block=block)
+
+        error = ctx.in_error
+        if isinstance(error, ServiceUnavailableError) and \
+                                                error.retry_after is not None:
+            ctx.transport.resp_headers['Retry-After'] = \
+                                       str(max(1, int(ceil(error.retry_after))))
+
+    def is_metrics_request(self, method, path):
+        """Returns ``True`` when the request is for the metrics collected by
+        ``self.metrics``."""
+
+        if self.metrics is None or method.upper() != 'GET':
+            return False
+
+        return path.strip('/') == self.metrics.path
+
     @property
     def has_patterns(self):
         return len(self._http_patterns) > 0
+
+    def compress_out_string(self, ctx, accept_encoding):
+        """Compresses ``ctx.out_string`` with the content coding the given
+        value of the ``Accept-Encoding`` header prefers, as configured by
+        ``self.compression``, and sets the response headers accordingly. The
+        output stays an iterable that's compressed chunk by chunk.
+
+        Returns ``True`` when the response is compressed."""
+
+        compression = self.compression
+        if compression is None:
+            return False
+
+        headers = ctx.transport.resp_headers
+        if 'Content-Encoding' in headers:
+            return False
+
+        if not compression.is_compressible(headers.get('Content-Type', None)):
+            return False
+
+        vary = headers.get('Vary', None)
+        if vary is None:
+            headers['Vary'] = 'Accept-Encoding'
+        elif not ('accept-encoding' in vary.lower()):
+            headers['Vary'] = '%s, Accept-Encoding' % vary
+
+        coding = negotiate_encoding(accept_encoding, compression.codings)
+        if coding is None:
+            return False
+
+        head = []
+        length = 0
+        out_string = iter(ctx.out_string)
+        for chunk in out_string:
+            head.append(chunk)
+            length += len(chunk)
+            if length >= compression.min_length:
+                break
+
+        else:
+            # the whole response was consumed and it's too short.
+            ctx.out_string = head
+            return False
+
+        ctx.out_string = compress_chunks(chain(head, out_string), coding,
+                                                              compression.level)
+
+        headers['Content-Encoding'] = coding
+        headers.pop('Content-Length', None)
+
+        return True
+
+    def get_wsdl_doc(self, wsdl):
+        """Returns a :class:`spyne.interface.store.InterfaceDocument` for the
+        given wsdl document. It's reused for as long as the same document is
+        passed."""
+
+        doc = self._wsdl_doc
+        if doc is None or doc.data is not wsdl:
+            from spyne.interface.store import InterfaceDocument
+            doc = self._wsdl_doc = InterfaceDocument(wsdl)
+
+        return doc
+
+    def prepare_wsdl_response(self, ctx, wsdl):
+        """Sets the ``ETag`` response header of the given wsdl document and
+        returns the body to send. That's the document gzipped when the client
+        accepts it, or ``None`` when the client's copy matches the ETag, in
+        which case the response should be ``304 Not Modified``."""
+
+        doc = self.get_wsdl_doc(wsdl)
+        headers = ctx.transport.resp_headers
+        headers['ETag'] = doc.etag
+
+        if etag_matches(ctx.transport.get_request_header('If-None-Match'),
+                                                                     doc.etag):
+            return None
+
+        headers['Vary'] = 'Accept-Encoding'
+        if accepts_encoding(ctx.transport.get_request_header('Accept-Encoding'),
+                                                                        'gzip'):
+            headers['Content-Encoding'] = 'gzip'
+            return doc.gzipped
+
+        return wsdl
+
+    def decompress_in_string(self, in_string, content_encoding):
+        """Returns an iterable that decompresses the given request body
+        according to the given value of the ``Content-Encoding`` header. The
+        length of the decompressed body is limited by
+        ``self.max_content_length``."""
+
+        if not content_encoding:
+            return in_string
+
+        if isinstance(content_encoding, six.binary_type):
+            content_encoding = content_encoding.decode('latin1')
+
+        codings = [c.strip().lower() for c in content_encoding.split(',')]
+        for coding in reversed(codings):
+            if coding in ('', 'identity'):
+                continue
+
+            in_string = decompress_chunks(in_string, coding,
+                                                        self.max_content_length)
+
+        return in_string
@@ -0,0 +1,306 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""The ``spyne.server.metrics`` module contains the :class:`Metrics` class
+that aggregates the per-phase timings, byte counts and errors of the requests
+a transport processes and exports them in the Prometheus text format: ::
+
+    server = WsgiApplication(app, metrics=True)
+
+Then ``GET /metrics`` (relative to where the application is mounted) returns
+the following metrics, labelled by method name:
+
+    * ``spyne_request_duration_seconds``: Histogram of request durations, from
+      the creation of the context until it's closed.
+    * ``spyne_phase_duration_seconds``: Histogram of the time spent in each
+      phase of request processing (see :attr:`spyne.MethodContext.phase_times`)
+      with an additional ``phase`` label.
+    * ``spyne_queue_wait_seconds``: Histogram of the time spent waiting for
+      admission (see :mod:`spyne.server.admission`).
+    * ``spyne_request_bytes_total`` and ``spyne_response_bytes_total``:
+      Counters of the request and response payload sizes, before compression.
+    * ``spyne_errors_total``: Counter of errors with the fault code as the
+      ``code`` label.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import threading
+
+from bisect import bisect_left
+from collections import defaultdict
+
+from spyne.model.fault import Fault
+from spyne.util import six
+
+
+class _Store(object):
+    """Metric values recorded by a single thread."""
+
+    def __init__(self):
+        self.histograms = {}
+        self.counters = defaultdict(int)
+
+
+def _count_chunks(ctx, attr, chunks, cb=None):
+    for chunk in chunks:
+        setattr(ctx, attr, getattr(ctx, attr) + len(chunk))
+        yield chunk
+
+    if cb is not None:
+        cb(ctx)
+
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels, extra=None):
+    labels = list(labels)
+    if extra is not None:
+        labels.append(extra)
+
+    if len(labels) == 0:
+        return ''
+
+    return '{%s}' % ','.join('%s="%s"' % (k, _escape(v)) for k, v in labels)
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        if value == float('inf'):
+            return '+Inf'
+        return repr(value)
+
+    return str(value)
+
+
+class Metrics(object):
+    """Collects request metrics. Every thread records values to its own
+    store without any locking, the stores are merged when the metrics are
+    exported.
+
+    :param path: The path relative to the application where the metrics are
+        served.
+    :param buckets: The upper bounds of the histogram buckets, in seconds.
+    :param prefix: The prefix of the metric names.
+    """
+
+    CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+    DEFAULT_BUCKETS = (.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5,
+                                                           1.0, 2.5, 5.0, 10.0)
+
+    HELP = {
+        'request_duration_seconds': 'Request duration.',
+        'phase_duration_seconds': 'Time spent in request processing phases.',
+        'queue_wait_seconds': 'Time spent waiting for admission.',
+        'request_bytes_total': 'Request payload size.',
+        'response_bytes_total': 'Response payload size.',
+        'errors_total': 'Number of failed requests.',
+    }
+
+    def __init__(self, path='metrics', buckets=DEFAULT_BUCKETS,
+                                                               prefix='spyne_'):
+        self.path = path.strip('/')
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+
+        self.__local = threading.local()
+        self.__stores = []
+
+    def install(self, server):
+        """Makes this instance record the requests of the given transport."""
+
+        server.app.event_manager.add_listener('method_context_closed',
+                                                                  self.observe)
+
+    def get_store(self):
+        try:
+            return self.__local.store
+
+        except AttributeError:
+            store = self.__local.store = _Store()
+            self.__stores.append(store)
+            return store
+
+    def observe_histogram(self, name, labels, value):
+        """Adds the given value to the histogram with the given name and
+        labels, which is a tuple of ``(name, value)`` pairs."""
+
+        histograms = self.get_store().histograms
+        key = (name, labels)
+
+        entry = histograms.get(key)
+        if entry is None:
+            entry = histograms[key] = [[0] * (len(self.buckets) + 1), 0.0]
+
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def inc(self, name, labels, value=1):
+        """Increments the counter with the given name and labels."""
+
+        self.get_store().counters[(name, labels)] += value
+
+    def count_in_string(self, ctx):
+        """Counts the bytes in ``ctx.in_string`` to ``ctx.in_string_length``
+        as they're read."""
+
+        ctx.in_string_length = 0
+        if isinstance(ctx.in_string, (list, tuple)):
+            ctx.in_string_length = sum(len(s) for s in ctx.in_string)
+        elif ctx.in_string is not None:
+            ctx.in_string = _count_chunks(ctx, 'in_string_length',
+                                                                 ctx.in_string)
+
+    def count_out_string(self, ctx):
+        """Counts the bytes in ``ctx.out_string`` to ``ctx.out_string_length``
+        as they're written. As transports may close the context before the
+        response is fully written, the response size is recorded once
+        ``ctx.out_string`` is exhausted."""
+
+        if ctx.aux is not None:
+            return
+
+        ctx.out_string_length = 0
+        if isinstance(ctx.out_string, (list, tuple)):
+            ctx.out_string_length = sum(len(s) for s in ctx.out_string)
+            self.observe_out_string(ctx)
+
+        elif ctx.out_string is not None:
+            ctx.out_string = _count_chunks(ctx, 'out_string_length',
+                                         ctx.out_string, self.observe_out_string)
+
+    def observe_out_string(self, ctx):
+        self.inc('response_bytes_total', (('method', ctx.method_name or ''),),
+                                                          ctx.out_string_length)
+
+    def observe(self, ctx):
+        """Records the metrics of the given closed context. Auxiliary method
+        contexts and contexts of other transports are ignored."""
+
+        if ctx.aux is not None or ctx.in_string is None:
+            return
+
+        transport = ctx.transport
+        if transport is None or \
+                           getattr(transport.itself, 'metrics', None) is not self:
+            return
+
+        labels = (('method', ctx.method_name or ''),)
+
+        if ctx.call_end is not None:
+            self.observe_histogram('request_duration_seconds', labels,
+                                                   ctx.call_end - ctx.call_start)
+
+        for phase, value in ctx.phase_times.items():
+            self.observe_histogram('phase_duration_seconds',
+                                              labels + (('phase', phase),), value)
+
+        if ctx.queue_wait is not None:
+            self.observe_histogram('queue_wait_seconds', labels, ctx.queue_wait)
+
+        if ctx.in_string_length is not None:
+            self.inc('request_bytes_total', labels, ctx.in_string_length)
+
+        error = ctx.out_error
+        if error is not None:
+            if isinstance(error, Fault):
+                code = error.faultcode
+            else:
+                code = error.__class__.__name__
+
+            self.inc('errors_total', labels + (('code', code),))
+
+    def collect(self):
+        """Merges the per-thread stores. Returns a tuple of dicts of
+        histograms and counters."""
+
+        histograms = {}
+        counters = defaultdict(int)
+
+        for store in list(self.__stores):
+            for key, (counts, total) in list(store.histograms.items()):
+                entry = histograms.get(key)
+                if entry is None:
+                    entry = histograms[key] = [[0] * len(counts), 0.0]
+
+                merged = entry[0]
+                for i, c in enumerate(list(counts)):
+                    merged[i] += c
+                entry[1] += total
+
+            for key, value in list(store.counters.items()):
+                counters[key] += value
+
+        return histograms, counters
+
+    def to_text(self):
+        """Returns the metrics in the Prometheus text format as bytes."""
+
+        histograms, counters = self.collect()
+
+        by_name = defaultdict(list)
+        for (name, labels), value in histograms.items():
+            by_name[name].append((labels, value))
+        for (name, labels), value in counters.items():
+            by_name[name].append((labels, value))
+
+        bounds = self.buckets + (float('inf'),)
+        histogram_names = set(name for name, _ in histograms)
+
+        lines = []
+        for name in sorted(by_name):
+            full_name = self.prefix + name
+            descr = self.HELP.get(name)
+            if descr is not None:
+                lines.append('# HELP %s %s' % (full_name, descr))
+
+            is_histogram = name in histogram_names
+            lines.append('# TYPE %s %s' % (full_name,
+                                 'histogram' if is_histogram else 'counter'))
+
+            for labels, value in sorted(by_name[name], key=lambda x: x[0]):
+                if not is_histogram:
+                    lines.append('%s%s %s' % (full_name,
+                                                 _format_labels(labels), value))
+                    continue
+
+                counts, total = value
+                cumulative = 0
+                for bound, count in zip(bounds, counts):
+                    cumulative += count
+                    lines.append('%s_bucket%s %d' % (full_name,
+                          _format_labels(labels, ('le', _format_value(bound))),
+                                                                   cumulative))
+
+                lines.append('%s_sum%s %r' % (full_name,
+                                                 _format_labels(labels), total))
+                lines.append('%s_count%s %d' % (full_name,
+                                            _format_labels(labels), cumulative))
+
+        lines.append('')
+
+        retval = '\n'.join(lines)
+        if not isinstance(retval, six.binary_type):
+            retval = retval.encode('utf8')
+
+        return retval
@@ -0,0 +1,513 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""The ``spyne.server.prefork`` module contains a pre-forking http server for
+:class:`spyne.server.wsgi.WsgiApplication` instances.
+
+The parent process builds the application and its interface documents, binds
+the listening socket and forks the given number of workers which all accept
+connections from that socket. Workers don't share any state. Spyne
+applications are mostly CPU-bound during (de)serialization, so this is a
+simple way of using more than one core without an external application
+server: ::
+
+    from spyne.server.prefork import PreforkServer
+
+    PreforkServer(application, host='0.0.0.0', port=8000, workers=4,
+                        url='http://example.com:8000/').serve_forever()
+
+The parent process handles the following signals:
+
+    * ``SIGTERM``, ``SIGINT``: Graceful shutdown. Workers finish the request
+      they are processing and exit. Workers that don't exit in
+      ``graceful_timeout`` seconds are killed.
+    * ``SIGQUIT``: Immediate shutdown.
+    * ``SIGHUP``: Graceful restart of all workers.
+
+This module works only on platforms that have ``os.fork()``.
+"""
+
+from __future__ import absolute_import
+
+import logging
+logger = logging.getLogger(__name__)
+
+import gc
+import os
+import errno
+import mmap
+import time
+import select
+import signal
+import socket
+import struct
+
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler
+
+from spyne import Application, EventManager
+from spyne.util.six.moves.socketserver import BaseServer
+from spyne.server.wsgi import WsgiApplication
+
+
+_COUNTER = struct.Struct('Q')
+
+_WILDCARD_HOSTS = ('', '0.0.0.0')
+
+
+class _WorkerRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+class _WorkerServer(WSGIServer):
+    """Serves requests from an already bound and listening socket."""
+
+    def __init__(self, sock, app, worker):
+        # skip TCPServer.__init__ as it creates and binds a new socket
+        BaseServer.__init__(self, sock.getsockname()[:2],
+                                                          _WorkerRequestHandler)
+        self.socket = sock
+        self.worker = worker
+
+        host, port = sock.getsockname()[:2]
+        self.server_name = socket.getfqdn(host)
+        self.server_port = port
+        self.setup_environ()
+        self.set_app(app)
+
+    def get_request(self):
+        conn, addr = self.socket.accept()
+        # the listening socket has a timeout, the connection must not have one
+        conn.settimeout(None)
+        return conn, addr
+
+    def process_request(self, request, client_address):
+        WSGIServer.process_request(self, request, client_address)
+        self.worker.on_request()
+
+    def server_close(self):
+        # the listening socket belongs to the parent
+        pass
+
+
+class PreforkWorker(object):
+    """Represents a worker process. The parent process keeps one instance per
+    worker slot. A worker that's respawned reuses the slot of the worker it
+    replaces.
+
+    :param server: The :class:`PreforkServer` instance.
+    :param index: The slot number of the worker, between ``0`` and
+        ``server.workers - 1``.
+    """
+
+    def __init__(self, server, index):
+        self.server = server
+        self.index = index
+
+        self.pid = None
+        """The pid of the worker process. ``None`` when the worker is not
+        running."""
+
+        self.started_at = None
+        """``time.time()`` value when the worker was spawned."""
+
+        self.exit_status = None
+        """The exit status of the last worker process in this slot, as returned
+        by ``os.waitpid()``."""
+
+        self.running = False
+
+    @property
+    def requests(self):
+        """Number of requests served by the current process in this slot. This
+        is readable from the parent and the worker processes."""
+
+        return _COUNTER.unpack_from(self.server._counters,
+                                                 self.index * _COUNTER.size)[0]
+
+    def _set_requests(self, value):
+        _COUNTER.pack_into(self.server._counters, self.index * _COUNTER.size,
+                                                                          value)
+
+    def on_request(self):
+        self._set_requests(self.requests + 1)
+        self.server.event_manager.fire_event('worker_request', self)
+
+    def __repr__(self):
+        return "%s(index=%d, pid=%r)" % (self.__class__.__name__, self.index,
+                                                                       self.pid)
+
+
+class PreforkServer(object):
+    """A pre-forking http server.
+
+    :param app: A :class:`spyne.application.Application`, a
+        :class:`spyne.server.wsgi.WsgiApplication` or any other wsgi callable.
+        The wsdl document is built before forking only in the first two cases
+        and only when its url is known (see ``url``).
+    :param host: The interface to bind to.
+    :param port: The port to bind to. Pass ``0`` to pick a free port, which is
+        then available in the ``address`` attribute after :meth:`bind`.
+    :param workers: Number of worker processes. Defaults to the cpu count.
+    :param backlog: The backlog argument to ``socket.listen()``.
+    :param max_requests: When positive, workers exit after serving this many
+        requests and get replaced by fresh ones. Useful for containing memory
+        leaks.
+    :param graceful_timeout: Number of seconds workers have to finish
+        processing their current request during shutdown or restart.
+    :param url: The url that the wsdl document will have. Defaults to
+        ``http://host:port/``, unless ``host`` is a wildcard address like
+        ``'0.0.0.0'``. Then every worker builds the wsdl on the first request
+        it gets, with the url of that request.
+    :param wsgi_kwargs: Passed to :class:`spyne.server.wsgi.WsgiApplication`
+        when ``app`` is an :class:`spyne.application.Application`.
+
+    Supported events:
+        * ``worker_spawn``
+            Called in the parent process after a worker is forked.
+
+        * ``worker_start``
+            Called in the worker process, before it starts accepting requests.
+
+        * ``worker_request``
+            Called in the worker process after every request. The ``requests``
+            attribute of the worker has the updated request count.
+
+        * ``worker_stop``
+            Called in the worker process when it stops accepting requests.
+
+        * ``worker_exit``
+            Called in the parent process after a worker process exits. The
+            ``exit_status`` and ``requests`` attributes of the worker are still
+            those of the process that exited.
+
+    All events receive the relevant :class:`PreforkWorker` instance as their
+    only argument.
+    """
+
+    poll_interval = 1.0
+    """Maximum number of seconds the parent and the workers wait before
+    checking their state."""
+
+    respawn_delay = 1.0
+    """Minimum number of seconds between two consecutive spawns of a worker
+    whose predecessor has crashed."""
+
+    def __init__(self, app, host='127.0.0.1', port=8000, workers=None,
+                    backlog=128, max_requests=0, graceful_timeout=30, url=None,
+                                                             wsgi_kwargs=None):
+        if isinstance(app, Application):
+            app = WsgiApplication(app, **(wsgi_kwargs or {}))
+        else:
+            assert callable(app), "%r is not a valid wsgi app." % app
+
+        if workers is None:
+            import multiprocessing
+            workers = multiprocessing.cpu_count()
+
+        self.app = app
+        self.host = host
+        self.port = port
+        self.backlog = backlog
+        self.max_requests = max_requests
+        self.graceful_timeout = graceful_timeout
+        self.url = url
+
+        self.event_manager = EventManager(self)
+
+        self.address = None
+        """The ``(host, port)`` tuple the server is listening on."""
+
+        self.socket = None
+        self.workers = [PreforkWorker(self, i) for i in range(workers)]
+
+        self._counters = mmap.mmap(-1, max(1, workers) * _COUNTER.size)
+        self._pids = {}
+        self._running = False
+        self._graceful = True
+        self._restart = False
+        self._pipe = None
+        self._old_handlers = {}
+
+    def bind(self):
+        """Creates the listening socket and builds the interface document
+        when its url is known. Called by :meth:`serve_forever` when it was not
+        called before."""
+
+        if self.socket is not None:
+            return
+
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(self.backlog)
+
+        # All workers are woken up for every connection and only one of them
+        # gets it. The others must not block in accept() forever, as they
+        # would not notice they were asked to stop.
+        sock.settimeout(self.poll_interval)
+
+        self.socket = sock
+        self.address = sock.getsockname()[:2]
+
+        # The address of a wildcard socket is not one clients can use.
+        if self.url is None and not (self.host in _WILDCARD_HOSTS):
+            self.url = 'http://%s:%d/' % self.address
+
+        if self.url is not None and isinstance(self.app, WsgiApplication) \
+                                           and self.app.doc.wsdl11 is not None:
+            self.app.doc.wsdl11.build_interface_document(self.url)
+
+        logger.info("listening on: %s:%d", *self.address)
+
+    def get_request_counts(self):
+        """Returns a list with the request count of every worker slot."""
+
+        return [w.requests for w in self.workers]
+
+    def serve_forever(self):
+        """Runs the parent process until it's asked to stop via a signal or
+        via :meth:`stop`."""
+
+        self.bind()
+
+        # Keep the objects built so far out of the garbage collector's way so
+        # that their pages stay shared between the parent and the workers.
+        if hasattr(gc, 'freeze'):
+            gc.freeze()
+
+        self._running = True
+        self._graceful = True
+        self._setup_parent()
+
+        try:
+            while self._running:
+                self._reap_workers()
+
+                if self._restart:
+                    self._restart = False
+                    logger.info("restarting workers")
+                    self._kill_workers(signal.SIGTERM)
+
+                self._spawn_workers()
+                self._wait(self.poll_interval)
+
+        finally:
+            self._stop_workers()
+            self._teardown_parent()
+
+    def stop(self, graceful=True):
+        """Makes :meth:`serve_forever` return. Safe to call from signal
+        handlers and event handlers that run in the parent process."""
+
+        self._running = False
+        self._graceful = self._graceful and graceful
+        self._wakeup()
+
+    def restart_workers(self):
+        """Gracefully replaces all workers with new ones."""
+
+        self._restart = True
+        self._wakeup()
+
+    def _setup_parent(self):
+        self._pipe = os.pipe()
+        for fd in self._pipe:
+            _set_nonblocking(fd)
+
+        handlers = {
+            signal.SIGTERM: lambda signum, frame: self.stop(),
+            signal.SIGINT: lambda signum, frame: self.stop(),
+            signal.SIGQUIT: lambda signum, frame: self.stop(graceful=False),
+            signal.SIGHUP: lambda signum, frame: self.restart_workers(),
+            signal.SIGCHLD: lambda signum, frame: self._wakeup(),
+        }
+
+        for signum, handler in handlers.items():
+            self._old_handlers[signum] = signal.signal(signum, handler)
+
+    def _teardown_parent(self):
+        for signum, handler in self._old_handlers.items():
+            signal.signal(signum, handler)
+        self._old_handlers.clear()
+
+        for fd in self._pipe:
+            os.close(fd)
+        self._pipe = None
+
+        self.socket.close()
+        self.socket = None
+
+    def _wakeup(self):
+        if self._pipe is None:
+            return
+
+        try:
+            os.write(self._pipe[1], b'.')
+        except OSError:
+            pass  # the pipe is full, so a wakeup is pending anyway.
+
+    def _wait(self, timeout):
+        try:
+            select.select([self._pipe[0]], [], [], timeout)
+        except (select.error, OSError) as e:
+            if e.args[0] != errno.EINTR:
+                raise
+
+        try:
+            while os.read(self._pipe[0], 4096):
+                pass
+        except OSError as e:
+            if e.errno != errno.EAGAIN:
+                raise
+
+    def _spawn_workers(self):
+        now = time.time()
+
+        for worker in self.workers:
+            if worker.pid is not None:
+                continue
+
+            if worker.exit_status and worker.started_at is not None and \
+                              now - worker.started_at < self.respawn_delay:
+                continue
+
+            self._spawn_worker(worker)
+
+    def _spawn_worker(self, worker):
+        worker._set_requests(0)
+        worker.started_at = time.time()
+
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                self._run_worker(worker)
+            except BaseException as e:
+                logger.exception(e)
+                status = 1
+            finally:
+                logging.shutdown()
+                os._exit(status)
+
+        worker.pid = pid
+        self._pids[pid] = worker
+
+        logger.debug("spawned worker %d with pid %d", worker.index, pid)
+        self.event_manager.fire_event('worker_spawn', worker)
+
+    def _run_worker(self, worker):
+        for signum in self._old_handlers:
+            signal.signal(signum, signal.SIG_DFL)
+
+        def _stop(signum, frame):
+            worker.running = False
+
+        signal.signal(signal.SIGTERM, _stop)
+        signal.signal(signal.SIGINT, _stop)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+        for fd in self._pipe:
+            os.close(fd)
+        self._pipe = None
+
+        worker.pid = os.getpid()
+        worker.running = True
+
+        server = _WorkerServer(self.socket, self.app, worker)
+        server.timeout = self.poll_interval
+
+        self.event_manager.fire_event('worker_start', worker)
+
+        while worker.running:
+            server.handle_request()
+
+            if self.max_requests > 0 and worker.requests >= self.max_requests:
+                logger.debug("worker %d reached max_requests", worker.index)
+                break
+
+        self.event_manager.fire_event('worker_stop', worker)
+
+    def _reap_workers(self):
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                if e.errno == errno.ECHILD:
+                    break
+                raise
+
+            if pid == 0:
+                break
+
+            worker = self._pids.pop(pid, None)
+            if worker is None:
+                continue
+
+            worker.exit_status = status
+            if status != 0:
+                logger.error("worker %d (pid %d) exited with status %d",
+                                                   worker.index, pid, status)
+            else:
+                logger.debug("worker %d (pid %d) exited", worker.index, pid)
+
+            self.event_manager.fire_event('worker_exit', worker)
+            worker.pid = None
+
+    def _kill_workers(self, signum):
+        for pid in list(self._pids):
+            try:
+                os.kill(pid, signum)
+            except OSError as e:
+                if e.errno != errno.ESRCH:
+                    raise
+
+    def _stop_workers(self):
+        if self._graceful:
+            self._kill_workers(signal.SIGTERM)
+            deadline = time.time() + self.graceful_timeout
+
+            while self._pids:
+                self._reap_workers()
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self._pids:
+                    break
+
+                self._wait(min(remaining, self.poll_interval))
+
+        if self._pids:
+            logger.warning("killing %d worker(s)", len(self._pids))
+            self._kill_workers(signal.SIGKILL)
+
+            while self._pids:
+                pid, status = os.waitpid(-1, 0)
+                worker = self._pids.pop(pid, None)
+                if worker is not None:
+                    worker.exit_status = status
+                    self.event_manager.fire_event('worker_exit', worker)
+                    worker.pid = None
+
+
+def _set_nonblocking(fd):
+    import fcntl
+
+    flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+    fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
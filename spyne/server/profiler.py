@@ -0,0 +1,221 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""The ``spyne.server.profiler`` module contains the :class:`Profiler` class
+that runs ``cProfile`` for a sample of the requests of chosen methods and
+dumps the aggregated statistics per method: ::
+
+    profiler = Profiler('/var/tmp/profiles', methods=['get_report'], rate=0.05)
+    WsgiApplication(app, profiler=profiler)
+
+The dumped files can be loaded with :class:`pstats.Stats` or tools like
+``snakeviz``.
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import os
+import re
+import pstats
+import threading
+
+from collections import defaultdict
+from cProfile import Profile
+from random import random
+from time import strftime
+
+
+_unsafe_re = re.compile(r'[^A-Za-z0-9_-]')
+
+
+class _Session(object):
+    """Profiles a single request. It's put to ``ctx.files`` so that it's
+    stopped when the context is closed, if not before."""
+
+    def __init__(self, profiler, ctx, profile):
+        self.profiler = profiler
+        self.ctx = ctx
+        self.profile = profile
+
+    def close(self):
+        self.profiler.stop_session(self)
+
+
+class Profiler(object):
+    """Profiles requests with ``cProfile`` from the moment the requested
+    method is known until the response is serialized. Aggregated statistics
+    are dumped to ``path`` every ``dump_every`` profiled requests of a
+    method and when :meth:`dump` is called.
+
+    Only one request per thread is profiled at a time, so requests that are
+    processed concurrently in an event loop may show up in each other's
+    statistics.
+
+    :param path: The directory where the statistics are dumped.
+    :param methods: Names of the methods to profile. ``None`` means all
+        methods.
+    :param rate: The fraction of the requests of the selected methods that
+        are profiled.
+    :param header: The name of the request header that makes HTTP transports
+        profile a request, regardless of ``methods`` and ``rate``.
+    :param token: The value ``header`` must have. The header is ignored
+        unless this is set.
+    :param dump_every: The number of profiled requests of a method after
+        which its statistics are dumped.
+    :param max_files: The number of dumps that are kept per method.
+    """
+
+    def __init__(self, path, methods=None, rate=0.01, header='X-Spyne-Profile',
+                                 token=None, dump_every=100, max_files=10):
+        if methods is not None:
+            methods = frozenset(methods)
+
+        self.path = path
+        self.methods = methods
+        self.rate = rate
+        self.header = header
+        self.token = token
+        self.dump_every = dump_every
+        self.max_files = max_files
+
+        self.stats = {}
+        """Statistics that are not dumped yet, keyed by method name."""
+
+        self.counts = defaultdict(int)
+        """Number of profiled requests that are not dumped yet, keyed by method
+        name."""
+
+        self.__seq = 0
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def is_requested(self, ctx):
+        """Returns ``True`` when the request has the profiling header with the
+        right token."""
+
+        if self.token is None:
+            return False
+
+        get_header = getattr(ctx.transport, 'get_request_header', None)
+        if get_header is None:
+            return False
+
+        return get_header(self.header) == self.token
+
+    def should_profile(self, ctx):
+        if self.methods is None or ctx.method_name in self.methods:
+            if self.rate >= 1 or random() < self.rate:
+                return True
+
+        return self.is_requested(ctx)
+
+    def start(self, ctx):
+        """Starts profiling the given context if it's selected."""
+
+        if getattr(self.__local, 'session', None) is not None:
+            return
+
+        if ctx.in_error is not None or not self.should_profile(ctx):
+            return
+
+        session = self.__local.session = _Session(self, ctx, Profile())
+        ctx.files.append(session)
+        session.profile.enable()
+
+    def stop(self, ctx):
+        """Stops profiling the given context if it's being profiled."""
+
+        session = getattr(self.__local, 'session', None)
+        if session is not None and session.ctx is ctx:
+            self.stop_session(session)
+
+    def stop_session(self, session):
+        if getattr(self.__local, 'session', None) is session:
+            self.__local.session = None
+
+        profile, session.profile = session.profile, None
+        if profile is None:
+            return
+
+        profile.disable()
+        self.add(session.ctx.method_name or '', profile)
+
+    def add(self, method_name, profile):
+        """Adds the statistics of the given profile to the ones of the given
+        method."""
+
+        with self.__lock:
+            stats = self.stats.get(method_name)
+
+            try:
+                if stats is None:
+                    self.stats[method_name] = pstats.Stats(profile)
+                else:
+                    stats.add(profile)
+
+            except TypeError:  # raised when nothing was recorded
+                return
+
+            self.counts[method_name] += 1
+            if self.counts[method_name] >= self.dump_every:
+                self.__dump(method_name)
+
+    def dump(self, method_name=None):
+        """Dumps the statistics of the given method or of all methods. Returns
+        the paths of the files that were written."""
+
+        with self.__lock:
+            if method_name is not None:
+                return [self.__dump(method_name)]
+
+            return [self.__dump(k) for k in list(self.stats)]
+
+    def get_file_name(self, method_name):
+        return _unsafe_re.sub('_', method_name) or '_'
+
+    def __dump(self, method_name):
+        stats = self.stats.pop(method_name, None)
+        self.counts.pop(method_name, None)
+        if stats is None:
+            return None
+
+        self.__seq += 1
+        name = self.get_file_name(method_name)
+        path = os.path.join(self.path, '%s.%s-%06d.pstats' % (name,
+                                      strftime('%Y%m%d%H%M%S'), self.__seq))
+        stats.dump_stats(path)
+        logger.debug("Dumped profile of %r to %r", method_name, path)
+
+        self.__rotate(name)
+
+        return path
+
+    def __rotate(self, name):
+        pattern = re.compile(r'^%s\.\d{14}-\d{6}\.pstats$' % re.escape(name))
+        files = sorted(f for f in os.listdir(self.path) if pattern.match(f))
+
+        for f in files[:-self.max_files]:
+            try:
+                os.unlink(os.path.join(self.path, f))
+            except OSError as e:
+                logger.warning("Could not remove %r: %r", f, e)
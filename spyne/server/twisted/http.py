@@ -61,7 +61,7 @@ from twisted.python.log import err
 from twisted.python.failure import Failure
 from twisted.internet import reactor
 from twisted.internet.task import deferLater
-from twisted.internet.defer import Deferred
+from twisted.internet.defer import Deferred, DeferredList
 from twisted.internet.threads import deferToThread
 
 from spyne import Redirect
@@ -180,6 +180,9 @@ class TwistedHttpTransportContext(HttpTransportContext):
     def get_request_content_type(self):
         return self.req.getHeader("Content-Type")
 
+    def get_request_header(self, name):
+        return self.req.getHeader(name)
+
 
 class TwistedHttpMethodContext(HttpMethodContext):
     default_transport_context = TwistedHttpTransportContext
@@ -187,9 +190,12 @@ class TwistedHttpMethodContext(HttpMethodContext):
 
 class TwistedHttpTransport(HttpBase):
     def __init__(self, app, chunked=False, max_content_length=2 * 1024 * 1024,
-                                                         block_length=8 * 1024):
+                           block_length=8 * 1024, compression=None, batch=None,
+                                   admission=None, metrics=None, profiler=None):
         super(TwistedHttpTransport, self).__init__(app, chunked=chunked,
-               max_content_length=max_content_length, block_length=block_length)
+               max_content_length=max_content_length, block_length=block_length,
+                     compression=compression, batch=batch, admission=admission,
+                                            metrics=metrics, profiler=profiler)
 
         self.reactor_thread = None
         def _cb():
@@ -379,21 +385,71 @@ def _has_fd(istr):
         return True
 
 
+class MetricsResource(Resource):
+    """Serves the request metrics collected by a
+    :class:`spyne.server.metrics.Metrics` instance in the Prometheus text
+    format."""
+
+    isLeaf = True
+
+    def __init__(self, metrics):
+        Resource.__init__(self)
+        self.metrics = metrics
+
+    def render_GET(self, request):
+        request.setHeader('Content-Type', self.metrics.CONTENT_TYPE)
+        return self.metrics.to_text()
+
+
 class TwistedWebResource(Resource):
     """A server transport that exposes the application as a twisted web
     Resource.
+
+    Pass ``compression=True`` or a :class:`spyne.server.http.HttpCompression`
+    instance to compress responses for clients that accept it. Request bodies
+    with a ``Content-Encoding`` header are always decompressed, up to
+    ``max_content_length`` bytes.
+
+    Pass ``batch=True`` or a :class:`spyne.server.batch.BatchProcessor`
+    instance to process batch requests of protocols that support them. The
+    calls in a batch are run in the reactor thread like any other call, and
+    the response is sent when the Deferreds returned by all of them fire.
+
+    Pass a :class:`spyne.server.admission.AdmissionController` instance as
+    ``admission`` to limit the number of concurrent requests and the request
+    rate per service or method. Requests are never queued as that would block
+    the reactor, they are rejected with ``503 Service Unavailable`` right away.
+
+    Pass ``metrics=True`` or a :class:`spyne.server.metrics.Metrics` instance
+    to collect request metrics. They are served in the Prometheus text format
+    by a :class:`MetricsResource` child named after ``metrics.path``.
+
+    Pass a :class:`spyne.server.profiler.Profiler` instance as ``profiler`` to
+    profile a sample of the requests.
     """
 
     def __init__(self, app, chunked=False, max_content_length=2 * 1024 * 1024,
-                                           block_length=8 * 1024, prepath=None):
+           block_length=8 * 1024, prepath=None, compression=None, batch=None,
+                                   admission=None, metrics=None, profiler=None):
         Resource.__init__(self)
         self.app = app
 
         self.http_transport = TwistedHttpTransport(app, chunked,
-                                            max_content_length, block_length)
+                                    max_content_length, block_length,
+                                    compression=compression, batch=batch,
+                                    admission=admission, metrics=metrics,
+                                    profiler=profiler)
         self._wsdl = None
         self.prepath = prepath
 
+        metrics = self.http_transport.metrics
+        if metrics is not None:
+            path = metrics.path
+            if not isinstance(path, bytes):
+                path = path.encode('utf8')
+
+            self.putChild(path, MetricsResource(metrics))
+
     def getChildWithDefault(self, path, request):
         # this hack is necessary because twisted takes the slash character in
         # http requests too seriously. i.e. it insists that a leaf node can only
@@ -442,7 +498,11 @@ class TwistedWebResource(Resource):
         p_ctx.out_object = error
         self.http_transport.get_out_string(p_ctx)
 
-        retval = ''.join(p_ctx.out_string)
+        self.http_transport.compress_out_string(p_ctx,
+                                           request.getHeader('Accept-Encoding'))
+        _set_response_headers(request, p_ctx.transport.resp_headers)
+
+        retval = b''.join(p_ctx.out_string)
 
         p_ctx.close()
 
@@ -466,15 +526,16 @@ class TwistedWebResource(Resource):
             request.content.seek(0)
             initial_ctx.in_string = [request.content.read()]
 
+        initial_ctx.in_string = self.http_transport.decompress_in_string(
+                  initial_ctx.in_string, request.getHeader('Content-Encoding'))
+
         initial_ctx.transport.file_info = _get_file_info(initial_ctx)
 
         contexts = self.http_transport.generate_contexts(initial_ctx)
         p_ctx, others = contexts[0], contexts[1:]
 
-        p_ctx.active = True
         p_ctx.out_stream = request
-        # TODO: Rate limiting
-        p_ctx.active = True
+        self.http_transport.admit(p_ctx, block=False)
 
         if p_ctx.in_error:
             return self.handle_rpc_error(p_ctx, others, p_ctx.in_error, request)
@@ -486,6 +547,9 @@ class TwistedWebResource(Resource):
                 return self.handle_rpc_error(p_ctx, others, p_ctx.in_error,
                                                                         request)
 
+            if p_ctx.batch is not None:
+                return self.handle_batch(p_ctx, others, request)
+
             self.http_transport.get_out_object(p_ctx)
             if p_ctx.out_error:
                 return self.handle_rpc_error(p_ctx, others, p_ctx.out_error,
@@ -506,6 +570,50 @@ class TwistedWebResource(Resource):
 
         return retval
 
+    def handle_batch(self, p_ctx, others, request):
+        """Runs the calls in a batch request in the reactor thread and sends
+        the response when the Deferreds returned by all of them fire."""
+
+        http_transport = self.http_transport
+        batch = http_transport.batch
+
+        deferreds = []
+        for c_ctx, c_others in p_ctx.batch:
+            if c_ctx.in_error is None:
+                http_transport.get_in_object(c_ctx)
+
+            if c_ctx.in_error is None:
+                http_transport.get_out_object(c_ctx)
+
+            ret = None
+            if c_ctx.out_error is None and c_ctx.out_object is not None:
+                ret = c_ctx.out_object[0]
+
+            if isinstance(ret, Deferred):
+                ret.addCallbacks(_set_out_object, _eb_batch_call,
+                                 callbackArgs=(c_ctx,), errbackArgs=(c_ctx,))
+                ret.addCallback(lambda _, c_ctx=c_ctx, c_others=c_others:
+                                  batch.serialize_call(http_transport, c_ctx,
+                                                                      c_others))
+                deferreds.append(ret)
+
+            else:
+                batch.serialize_call(http_transport, c_ctx, c_others)
+
+        def _cb_batch(_):
+            batch.compose(http_transport, p_ctx)
+            return _cb_deferred(p_ctx.out_object, request, p_ctx, others, self,
+                                                                       cb=False)
+
+        if len(deferreds) == 0:
+            return _cb_batch(None)
+
+        DeferredList(deferreds) \
+            .addCallback(_cb_batch) \
+            .addErrback(_eb_request_finished, request, p_ctx)
+
+        return NOT_DONE_YET
+
     def __handle_wsdl_request(self, request):
         ctx = TwistedHttpMethodContext(self.http_transport, request,
                                                       "text/xml; charset=utf-8")
@@ -552,6 +660,35 @@ def _eb_request_finished(retval, request, p_ctx):
     request.finish()
 
 
+def _set_out_object(ret, ctx):
+    """Puts the value a Deferred returned by user code fires with to
+    ``ctx.out_object``, the way ``Application.process_request`` does for
+    regular return values."""
+
+    om = ctx.descriptor.out_message
+    if ctx.descriptor.is_out_bare():
+        ctx.out_object = [ret]
+
+    elif (not issubclass(om, ComplexModelBase)) or len(om._type_info) <= 1:
+        ctx.out_object = [ret]
+
+    else:
+        ctx.out_object = ret
+
+
+def _eb_batch_call(ret, ctx):
+    if issubclass(ret.type, Fault):
+        ctx.out_error = ret.value
+    else:
+        ret.printTraceback()
+        ctx.out_error = InternalError(ret.value)
+
+    ctx.app.event_manager.fire_event('method_exception_object', ctx)
+    if ctx.service_class is not None:
+        ctx.service_class.event_manager.fire_event(
+                                               'method_exception_object', ctx)
+
+
 def _cb_deferred(ret, request, p_ctx, others, resource, cb=True):
     ### set response headers
     resp_code = p_ctx.transport.resp_code
@@ -564,18 +701,15 @@ def _cb_deferred(ret, request, p_ctx, others, resource, cb=True):
     _set_response_headers(request, p_ctx.transport.resp_headers)
 
     ### normalize response data
-    om = p_ctx.descriptor.out_message
+    om = None
+    if p_ctx.descriptor is not None:  # it's None for batch requests.
+        om = p_ctx.descriptor.out_message
+
     single_class = None
     if cb:
-        if p_ctx.descriptor.is_out_bare():
-            p_ctx.out_object = [ret]
-
-        elif (not issubclass(om, ComplexModelBase)) or len(om._type_info) <= 1:
-            p_ctx.out_object = [ret]
-            if len(om._type_info) == 1:
-                single_class, = om._type_info.values()
-        else:
-            p_ctx.out_object = ret
+        _set_out_object(ret, p_ctx)
+        if not p_ctx.descriptor.is_out_bare() and len(om._type_info) == 1:
+            single_class, = om._type_info.values()
     else:
         p_ctx.out_object = ret
 
@@ -608,6 +742,11 @@ def _cb_deferred(ret, request, p_ctx, others, resource, cb=True):
         ret = resource.http_transport.get_out_string(p_ctx)
 
         if not isinstance(ret, Deferred):
+            if resource.http_transport.compress_out_string(p_ctx,
+                                      request.getHeader('Accept-Encoding')):
+                request.responseHeaders.removeHeader('Content-Length')
+            _set_response_headers(request, p_ctx.transport.resp_headers)
+
             producer = Producer(p_ctx.out_string, request)
             producer.deferred.addCallback(_cb_request_finished, request, p_ctx)
             producer.deferred.addErrback(_eb_request_finished, request, p_ctx)
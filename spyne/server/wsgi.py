@@ -49,21 +49,21 @@ from spyne.util.odict import odict
 from spyne.const.ansi_color import LIGHT_GREEN
 from spyne.const.ansi_color import END_COLOR
 from spyne.const.http import HTTP_200
+from spyne.const.http import HTTP_304
 from spyne.const.http import HTTP_404
 from spyne.const.http import HTTP_500
 
 
-try:
+def apply_mtom(*args, **kwargs):
+    # Mtom is only used by Soap services and its implementation needs lxml, so
+    # it's imported on first use.
     from spyne.protocol.soap.mime import apply_mtom
-except ImportError as _import_error_1:
-    def apply_mtom(*args, **kwargs):
-        raise _import_error_1
+    return apply_mtom(*args, **kwargs)
 
-try:
+
+def parse_form_data(*args, **kwargs):
     from werkzeug.formparser import parse_form_data
-except ImportError as _import_error_2:
-    def parse_form_data(*args, **kwargs):
-        raise _import_error_2
+    return parse_form_data(*args, **kwargs)
 
 
 def _reconstruct_url(environ, protocol=True, server_name=True, path=True,
@@ -201,6 +201,9 @@ class WsgiTransportContext(HttpTransportContext):
     def get_request_method(self):
         return self.req['REQUEST_METHOD'].upper()
 
+    def get_request_header(self, name):
+        return self.req_env.get('HTTP_' + name.upper().replace('-', '_'))
+
     def get_request_content_type(self):
         return self.req.get("CONTENT_TYPE", None)
 
@@ -236,6 +239,35 @@ class WsgiApplication(HttpBase):
     Wsdl from another location, which can make testing a bit difficult. Use in
     moderation.
 
+    The wsdl document is served with an ``ETag`` header, gzipped to clients
+    that accept it. Pass a
+    :class:`spyne.interface.store.InterfaceDocumentStore` instance as
+    ``interface_store`` to load a previously built wsdl document along with its
+    gzipped version, or to persist the one that's built on the first request
+    for later processes.
+
+    Pass ``compression=True`` or a :class:`spyne.server.http.HttpCompression`
+    instance to compress responses for clients that accept it. Request bodies
+    with a ``Content-Encoding`` header are always decompressed, up to
+    ``max_content_length`` bytes.
+
+    Pass ``batch=True`` or a :class:`spyne.server.batch.BatchProcessor`
+    instance to process batch requests of protocols that support them. The
+    calls in a batch run concurrently in the processor's thread pool.
+
+    Pass a :class:`spyne.server.admission.AdmissionController` instance as
+    ``admission`` to limit the number of concurrent requests and the request
+    rate per service or method. Requests that can't be admitted wait in a
+    bounded queue and are rejected with ``503 Service Unavailable`` when it's
+    full or when they time out.
+
+    Pass ``metrics=True`` or a :class:`spyne.server.metrics.Metrics` instance
+    to collect request metrics, which are served in the Prometheus text format
+    under ``metrics.path``.
+
+    Pass a :class:`spyne.server.profiler.Profiler` instance as ``profiler`` to
+    profile a sample of the requests.
+
     Supported events:
         * ``wsdl``
             Called right before the wsdl data is returned to the client.
@@ -262,16 +294,27 @@ class WsgiApplication(HttpBase):
     """
 
     def __init__(self, app, chunked=True, max_content_length=2 * 1024 * 1024,
-                                                         block_length=8 * 1024):
+                                   block_length=8 * 1024, interface_store=None,
+                               compression=None, batch=None, admission=None,
+                                                   metrics=None, profiler=None):
         super(WsgiApplication, self).__init__(app, chunked, max_content_length,
-                                                                   block_length)
+                             block_length, compression=compression, batch=batch,
+                     admission=admission, metrics=metrics, profiler=profiler)
 
         self._mtx_build_interface_document = threading.Lock()
+        self.interface_store = interface_store
 
+        # self.doc.wsdl11 needs lxml and is created on first access, so it's
+        # only consulted here when there's an interface store to look into.
         self._wsdl = None
-        if self.doc.wsdl11 is not None:
+        if interface_store is not None and self.doc.wsdl11 is not None:
             self._wsdl = self.doc.wsdl11.get_interface_document()
 
+            if self._wsdl is None and interface_store is not None:
+                self._wsdl_doc = interface_store.get_wsdl(self.app.interface)
+                if self._wsdl_doc is not None:
+                    self._wsdl = self._wsdl_doc.data
+
     def __call__(self, req_env, start_response, wsgi_url=None):
         """This method conforms to the WSGI spec for callable wsgi applications
         (PEP 333). It looks in environ['wsgi.input'] for a fully formed rpc
@@ -283,6 +326,10 @@ class WsgiApplication(HttpBase):
         if url is None:
             url = _reconstruct_url(req_env).split('.wsdl')[0]
 
+        if self.is_metrics_request(req_env['REQUEST_METHOD'],
+                                                 req_env.get('PATH_INFO', '')):
+            return self.handle_metrics_request(req_env, start_response)
+
         if self.is_wsdl_request(req_env):
             return self.handle_wsdl_request(req_env, start_response, url)
 
@@ -303,6 +350,16 @@ class WsgiApplication(HttpBase):
         )
 
 
+    def handle_metrics_request(self, req_env, start_response):
+        data = self.metrics.to_text()
+
+        start_response(HTTP_200, [
+            ('Content-Type', self.metrics.CONTENT_TYPE),
+            ('Content-Length', str(len(data))),
+        ])
+
+        return [data]
+
     def handle_wsdl_request(self, req_env, start_response, url):
         ctx = WsgiMethodContext(self, req_env, 'text/xml; charset=utf-8')
 
@@ -327,6 +384,9 @@ class WsgiApplication(HttpBase):
                     ctx.transport.wsdl = self._wsdl = \
                                         self.doc.wsdl11.get_interface_document()
 
+                    if self.interface_store is not None:
+                        self._store_wsdl(url)
+
             except Exception as e:
                 logger.exception(e)
                 ctx.transport.wsdl_error = e
@@ -343,16 +403,33 @@ class WsgiApplication(HttpBase):
 
         self.event_manager.fire_event('wsdl', ctx)
 
-        ctx.transport.resp_headers['Content-Length'] = \
-                                                    str(len(ctx.transport.wsdl))
-        start_response(HTTP_200, _gen_http_headers(ctx.transport.resp_headers))
-
         retval = ctx.transport.wsdl
+        headers = ctx.transport.resp_headers
+
+        # the wsdl event handlers may have replaced the document.
+        if retval is self._wsdl:
+            retval = self.prepare_wsdl_response(ctx, retval)
+            if retval is None:
+                start_response(HTTP_304, _gen_http_headers(headers))
+                ctx.close()
+                return []
+
+        headers['Content-Length'] = str(len(retval))
+        start_response(HTTP_200, _gen_http_headers(headers))
 
         ctx.close()
 
         return [retval]
 
+    def _store_wsdl(self, url):
+        try:
+            self._wsdl_doc = self.interface_store.set_wsdl(self.app.interface,
+                                                               self._wsdl, url)
+        except Exception as e:
+            logger.exception(e)
+            logger.error("Could not write the wsdl document to %r",
+                                                     self.interface_store.path)
+
     def handle_error(self, p_ctx, others, error, start_response):
         """Serialize errors to an iterable of strings and return them.
 
@@ -367,6 +444,8 @@ class WsgiApplication(HttpBase):
                 p_ctx.out_protocol.fault_to_http_response_code(error)
 
         self.get_out_string(p_ctx)
+        self.compress_out_string(p_ctx,
+                              p_ctx.transport.req.get('HTTP_ACCEPT_ENCODING'))
 
         # consume the generator to get the length
         p_ctx.out_string = list(p_ctx.out_string)
@@ -397,8 +476,7 @@ class WsgiApplication(HttpBase):
         contexts = self.generate_contexts(initial_ctx, in_string_charset)
         p_ctx, others = contexts[0], contexts[1:]
 
-        # TODO: rate limiting
-        p_ctx.active = True
+        self.admit(p_ctx)
 
         if p_ctx.in_error:
             return self.handle_error(p_ctx, others, p_ctx.in_error,
@@ -463,6 +541,8 @@ class WsgiApplication(HttpBase):
 
         self.event_manager.fire_event('wsgi_return', p_ctx)
 
+        self.compress_out_string(p_ctx, req_env.get('HTTP_ACCEPT_ENCODING'))
+
         if self.chunked:
             # the user has not set a content-length, so we delete it as the
             # input is just an iterable.
@@ -510,7 +590,8 @@ class WsgiApplication(HttpBase):
             content_type = cgi.parse_header(content_type)
             charset = content_type[1].get('charset', None)
 
-        return self.__wsgi_input_to_iterable(http_env), charset
+        return self.decompress_in_string(self.__wsgi_input_to_iterable(http_env),
+                                  http_env.get('HTTP_CONTENT_ENCODING')), charset
 
     def __wsgi_input_to_iterable(self, http_env):
         istream = http_env.get('wsgi.input')
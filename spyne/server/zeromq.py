@@ -35,16 +35,23 @@ class ZmqMethodContext(MethodContext):
 
 
 class ZeroMQServer(ServerBase):
-    """The ZeroMQ server transport."""
+    """The ZeroMQ server transport.
+
+    Pass a :class:`spyne.server.admission.AdmissionController` instance as
+    ``admission`` to limit the request rate per service or method. Rejected
+    requests get a ``Server.ServiceUnavailable`` fault.
+    """
     transport = 'http://rfc.zeromq.org/'
 
-    def __init__(self, app, app_url, wsdl_url=None, ctx=None, socket=None):
+    def __init__(self, app, app_url, wsdl_url=None, ctx=None, socket=None,
+                                                                admission=None):
         if ctx and socket and ctx is not socket.context:
             raise ValueError("ctx should be the same as socket.context")
         super(ZeroMQServer, self).__init__(app)
 
         self.app_url = app_url
         self.wsdl_url = wsdl_url
+        self.admission = admission
 
         if ctx:
             self.ctx = ctx
@@ -79,8 +86,7 @@ class ZeroMQServer(ServerBase):
             contexts = self.generate_contexts(initial_ctx)
             p_ctx, others = contexts[0], contexts[1:]
 
-            # TODO: Rate limiting
-            p_ctx.active = True
+            self.admit(p_ctx)
 
             if p_ctx.in_error:
                 p_ctx.out_object = p_ctx.in_error
@@ -113,11 +119,13 @@ class ZeroMQThreadPoolServer(object):
 
     More details on the pattern http://zguide.zeromq.org/page:all#Shared-Queue-DEALER-and-ROUTER-sockets"""
 
-    def __init__(self, app, app_url, pool_size, wsdl_url=None, ctx=None, socket=None):
+    def __init__(self, app, app_url, pool_size, wsdl_url=None, ctx=None,
+                                                   socket=None, admission=None):
         if ctx and socket and ctx is not socket.context:
             raise ValueError("ctx should be the same as socket.context")
 
         self.app = app
+        self.admission = admission
 
         if ctx:
             self.ctx = ctx
@@ -146,7 +154,8 @@ class ZeroMQThreadPoolServer(object):
     def create_worker(self, i, be_url):
         socket = self.ctx.socket(zmq.REP)
         socket.connect(be_url)
-        worker = ZeroMQServer(self.app, be_url, socket=socket)
+        worker = ZeroMQServer(self.app, be_url, socket=socket,
+                                                      admission=self.admission)
         job = threading.Thread(target=worker.serve_forever)
         job.daemon = True
         return worker, job
@@ -0,0 +1,40 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""A benchmark suite that covers the main protocols with representative
+payloads and compares the results against a stored baseline.
+
+Run it with: ::
+
+    python -m spyne.test.bench [-k substring] [--update] [--threshold 3.0]
+
+``--update`` overwrites ``baseline.json`` with the new results. Measure on a
+quiet machine before committing a new baseline.
+
+The unit tests in this package only check that the cases work. They compare
+measurements against the baselines when the ``SPYNE_BENCH`` environment
+variable is set: ::
+
+    SPYNE_BENCH=1 py.test spyne/test/bench
+
+The import time audit in :mod:`spyne.test.bench.imports` checks which heavy
+dependencies the main entry points pull in: ::
+
+    python -m spyne.test.bench.imports [-k substring] [--update]
+"""
@@ -0,0 +1,90 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+import sys
+import logging
+
+from spyne.test.bench import harness
+
+
+def main(argv=None):
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Runs the Spyne benchmark suite and "
+                                        "compares it against the baseline.")
+    parser.add_argument('-k', dest='filter', default=None,
+                        help="Only run cases whose name contains this string.")
+    parser.add_argument('--min-time', type=float, default=0.2,
+                        help="Minimum duration of a measurement round, "
+                             "in seconds.")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="The number of measurement rounds per case.")
+    parser.add_argument('--threshold', type=float, default=None,
+                        help="The regression factor. Defaults to the value "
+                             "of the %s environment variable or %.1f." %
+                             (harness.THRESHOLD_ENV_VAR,
+                                                  harness.DEFAULT_THRESHOLD))
+    parser.add_argument('--baseline', default=harness.BASELINE_PATH,
+                        help="Path to the baseline file.")
+    parser.add_argument('--update', action='store_true',
+                        help="Write the results as the new baseline.")
+
+    args = parser.parse_args(argv)
+
+    logging.disable(logging.WARNING)
+
+    from spyne.test.bench.cases import get_cases
+
+    cases = get_cases()
+    if args.filter is not None:
+        cases = [(n, f) for n, f in cases if args.filter in n]
+
+    try:
+        baseline = harness.load_baseline(args.baseline)
+    except (IOError, OSError):
+        baseline = None
+
+    results = harness.run(cases, args.min_time, args.repeat)
+    sys.stdout.write(harness.format_results(results, baseline) + '\n')
+
+    if args.update:
+        if baseline is not None and args.filter is not None:
+            # keep the cases that were not run
+            new_names = set(r.name for r in results)
+            for name, case in baseline.get('cases', {}).items():
+                if not name in new_names:
+                    results.append(harness.Result(name, None, case['cost'],
+                                                          case.get('peak'), 0))
+
+        harness.save_baseline(results, args.baseline, baseline)
+        sys.stdout.write("Baseline written to %s\n" % args.baseline)
+        return 0
+
+    if baseline is None:
+        return 0
+
+    regressions = harness.compare(results, baseline, args.threshold)
+    for r in regressions:
+        sys.stdout.write("REGRESSION: %s\n" % r)
+
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,519 @@
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""Benchmark cases. Every case is a callable that processes a single request
+and returns the response as a byte string.
+
+Output cases call the services through :class:`spyne.server.null.NullServer`
+and measure serialization. The ``out.xml.nested_arrays`` cases call
+:meth:`XmlDocument.to_parent` directly, with and without coroutines.
+
+Input cases send a prebuilt request to a
+:class:`spyne.server.wsgi.WsgiApplication` in the same process and measure
+the whole request cycle, including deserialization. The
+``in.json.echo_flats`` cases do this once per installed json backend. The
+``in.xml.soft_validation`` cases call :meth:`XmlDocument.from_element`
+directly, with compiled and uncompiled soft validators.
+
+The schema case parses a generated xml schema document with many complex
+types and returns the names of the generated classes. The ``model.complex``
+cases create many ComplexModel instances and return the repr of the last one.
+"""
+
+import json
+
+from datetime import datetime
+from decimal import Decimal as D
+
+from lxml import etree
+
+from spyne.util.six import BytesIO
+
+from spyne import Application, ServiceBase, rpc
+from spyne.model import Array, Boolean, ByteArray, ComplexModel, \
+    ComplexModelBase, DateTime, Decimal, Double, Enum, File, Integer, \
+    SelfReference, Unicode
+from spyne.protocol.csv import Csv
+from spyne.protocol.html import HtmlCloth
+from spyne.protocol.http import HttpRpc
+from spyne.protocol.json import JsonDocument
+from spyne.protocol.json import json_backends
+from spyne.protocol.json import get_json_backend
+from spyne.protocol.soap import Soap11
+from spyne.protocol.xml import XmlDocument
+from spyne.server.null import NullServer
+from spyne.server.wsgi import WsgiApplication
+from spyne.util.xml import get_object_as_xml
+from spyne.util.xml import parse_schema_string
+
+try:
+    import msgpack
+    from spyne.protocol.msgpack import MessagePackDocument
+except ImportError:
+    msgpack = MessagePackDocument = None
+
+
+TNS = 'spyne.test.bench'
+
+ARRAY_SIZE = 10000
+FLAT_ARRAY_SIZE = 1000
+POLY_ARRAY_SIZE = 1000
+DEPTH = 20
+BLOB_SIZE = 256 * 1024
+SCHEMA_SIZE = 200
+INSTANCE_COUNT = 10000
+NESTED_ARRAY_SIZE = 1000
+
+
+class Flat(ComplexModel):
+    __namespace__ = TNS
+
+    i = Integer
+    s = Unicode
+    d = Decimal
+    f = Double
+    b = Boolean
+    dt = DateTime
+
+
+class Deep(ComplexModel):
+    __namespace__ = TNS
+
+    value = Integer
+    name = Unicode
+    children = SelfReference.customize(max_occurs='unbounded')
+
+
+class Leaf(ComplexModel):
+    __namespace__ = TNS
+
+    i = Integer
+    s = Unicode
+
+
+class Node(ComplexModel):
+    __namespace__ = TNS
+
+    leaves = Array(Leaf)
+
+
+class Address(ComplexModel):
+    __namespace__ = TNS
+
+    street = Unicode(max_len=50, min_occurs=1)
+    zip = Unicode(pattern='[0-9]{5}')
+    number = Integer(ge=1, le=10000)
+
+
+class Person(ComplexModel):
+    __namespace__ = TNS
+
+    name = Unicode(min_len=1, max_len=40, min_occurs=1)
+    age = Integer(ge=0, le=150)
+    score = Decimal(gt=0, lt=100)
+    email = Unicode(pattern=r'[^@]+@[^@]+')
+    color = Enum('red', 'green', type_name='Color')
+    addresses = Array(Address)
+    tags = Unicode(max_len=10, max_occurs=20)
+
+
+class Record(ComplexModel):
+    __namespace__ = TNS
+
+    i = Integer
+    s = Unicode
+    f = Double
+    dt = DateTime(default=datetime(2020, 1, 2))
+
+
+class SlotsRecord(ComplexModel):
+    __namespace__ = TNS
+
+    class Attributes(ComplexModel.Attributes):
+        slots = True
+
+    i = Integer
+    s = Unicode
+    f = Double
+    dt = DateTime(default=datetime(2020, 1, 2))
+
+
+class Base(ComplexModel):
+    __namespace__ = TNS
+
+    id = Integer
+
+
+class Derived(Base):
+    name = Unicode
+    value = Double
+
+
+def _flat(i=0):
+    return Flat(i=i, s=u'some string %d' % i, d=D('123.456'), f=1.5 * i,
+                                 b=i % 2 == 0, dt=datetime(2020, 1, 2, 3, 4, 5))
+
+
+def _deep(depth=DEPTH):
+    retval = None
+    for i in range(depth):
+        retval = Deep(value=i, name=u'level %d' % i,
+                                  children=None if retval is None else [retval])
+    return retval
+
+
+FLAT = _flat()
+DEEP = _deep()
+INTEGERS = list(range(ARRAY_SIZE))
+FLATS = [_flat(i) for i in range(FLAT_ARRAY_SIZE)]
+DERIVEDS = [Derived(id=i, name=u'derived %d' % i, value=i / 2.0)
+                                                for i in range(POLY_ARRAY_SIZE)]
+NODES = [Node(leaves=[Leaf(i=i, s=u'x'), Leaf(i=i, s=u'y')])
+                                             for i in range(NESTED_ARRAY_SIZE)]
+PERSON = Person(name=u'John', age=30, score=D('55.5'), email=u'a@b.c',
+    color='red', tags=[u't%d' % i for i in range(10)],
+    addresses=[Address(street=u'Main %d' % i, zip=u'12345', number=i + 1)
+                                                           for i in range(10)])
+BLOB = bytes(bytearray(range(256))) * (BLOB_SIZE // 256)
+
+
+class BenchService(ServiceBase):
+    @rpc(_returns=Flat)
+    def get_flat(ctx):
+        return FLAT
+
+    @rpc(_returns=Deep)
+    def get_deep(ctx):
+        return DEEP
+
+    @rpc(_returns=Array(Integer))
+    def get_integers(ctx):
+        return INTEGERS
+
+    @rpc(_returns=Array(Flat))
+    def get_flats(ctx):
+        return FLATS
+
+    @rpc(_returns=Array(Base))
+    def get_polymorphic(ctx):
+        return DERIVEDS
+
+    @rpc(_returns=ByteArray)
+    def get_byte_array(ctx):
+        return [BLOB]
+
+    @rpc(_returns=File)
+    def get_file(ctx):
+        return File.Value(data=[BLOB], type='application/octet-stream')
+
+    @rpc(Flat, _returns=Flat)
+    def echo_flat(ctx, flat):
+        return flat
+
+    @rpc(Array(Flat), _returns=Array(Flat))
+    def echo_flats(ctx, flats):
+        return flats
+
+    @rpc(Array(Integer), _returns=Integer)
+    def sum_integers(ctx, integers):
+        return sum(integers)
+
+    @rpc(Integer, Unicode, Double, Boolean, _returns=Unicode)
+    def echo_args(ctx, i, s, f, b):
+        return s
+
+
+_ALL_METHODS = ('get_flat', 'get_deep', 'get_integers', 'get_flats',
+                'get_polymorphic', 'get_byte_array', 'get_file')
+
+
+def _get_out_protocols():
+    retval = [
+        ('soap11', lambda: Soap11(polymorphic=True), _ALL_METHODS),
+        ('xml', lambda: XmlDocument(polymorphic=True), _ALL_METHODS),
+        ('json', lambda: JsonDocument(polymorphic=True), _ALL_METHODS),
+    ]
+
+    if MessagePackDocument is not None:
+        retval.append(('msgpack',
+               lambda: MessagePackDocument(polymorphic=True), _ALL_METHODS))
+
+    retval.extend((
+        ('csv', Csv, ('get_flats',)),
+        ('html', HtmlCloth, ('get_flat', 'get_flats', 'get_polymorphic')),
+    ))
+
+    return retval
+
+
+def _flat_dict(flat):
+    return {'i': flat.i, 's': flat.s, 'd': str(flat.d), 'f': flat.f,
+                                       'b': flat.b, 'dt': flat.dt.isoformat()}
+
+
+def _xml_request(app, method_name, **kwargs):
+    in_message = app.interface.service_method_map[
+                                '{%s}%s' % (TNS, method_name)][0].in_message
+    elt = get_object_as_xml(in_message(**kwargs), in_message)
+    return etree.tostring(elt)
+
+
+def _soap_request(app, method_name, **kwargs):
+    return b''.join((
+        b'<soap11env:Envelope xmlns:soap11env='
+        b'"http://schemas.xmlsoap.org/soap/envelope/"><soap11env:Body>',
+        _xml_request(app, method_name, **kwargs),
+        b'</soap11env:Body></soap11env:Envelope>',
+    ))
+
+
+def _get_in_requests():
+    app = Application([BenchService], TNS)
+    flat = _flat_dict(FLAT)
+
+    retval = [
+        ('soap11', Soap11, (
+            ('echo_flat', _soap_request(app, 'echo_flat', flat=FLAT)),
+            ('sum_integers',
+                        _soap_request(app, 'sum_integers', integers=INTEGERS)),
+        )),
+        ('xml', XmlDocument, (
+            ('echo_flat', _xml_request(app, 'echo_flat', flat=FLAT)),
+            ('sum_integers',
+                         _xml_request(app, 'sum_integers', integers=INTEGERS)),
+        )),
+        ('json', JsonDocument, (
+            ('echo_flat', json.dumps({'echo_flat': {'flat': flat}})
+                                                              .encode('utf8')),
+            ('sum_integers', json.dumps({'sum_integers':
+                                    {'integers': INTEGERS}}).encode('utf8')),
+        )),
+    ]
+
+    if MessagePackDocument is not None:
+        retval.append(('msgpack', lambda: MessagePackDocument(raw=False), (
+            ('echo_flat', msgpack.packb({'echo_flat': {'flat': flat}},
+                                                           use_bin_type=True)),
+            ('sum_integers', msgpack.packb({'sum_integers':
+                                {'integers': INTEGERS}}, use_bin_type=True)),
+        )))
+
+    return retval
+
+
+def _get_json_backends():
+    retval = []
+
+    for backend in sorted(json_backends):
+        try:
+            get_json_backend(backend)
+        except ImportError:
+            continue
+
+        retval.append(backend)
+
+    return retval
+
+
+def _null_case(server, method_name):
+    method = getattr(server.service, method_name)
+
+    def call():
+        retval = list(method())
+        # Csv returns native strings
+        if len(retval) > 0 and not isinstance(retval[0], bytes):
+            return u''.join(retval).encode('utf8')
+        return b''.join(retval)
+
+    return call
+
+
+def _wsgi_case(server, data, method='POST', path='/', qs=''):
+    def start_response(status, headers):
+        assert status.startswith('200'), status
+
+    def call():
+        return b''.join(server({
+            'REQUEST_METHOD': method,
+            'PATH_INFO': path,
+            'QUERY_STRING': qs,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '7000',
+            'CONTENT_TYPE': 'text/xml; charset=utf-8',
+            'CONTENT_LENGTH': str(len(data)),
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': BytesIO(data),
+        }, start_response))
+
+    return call
+
+
+class CoroutineXmlDocument(XmlDocument):
+    """Serializes everything with coroutines, like XmlDocument did before it
+    got a separate path for objects without ``Iterable`` members."""
+
+    def can_push(self, cls, arrays=False):
+        return True
+
+
+def _to_parent_case(prot, cls, inst):
+    def call():
+        parent = etree.Element('parent')
+        prot.to_parent(None, cls, inst, parent, TNS)
+        return etree.tostring(parent)
+
+    return call
+
+
+class UncompiledXmlDocument(XmlDocument):
+    """Calls the soft validators the way XmlDocument did before it compiled
+    them."""
+
+    def get_validators(self, cls):
+        return (lambda v: cls.validate_string(cls, v),
+                lambda v: cls.validate_native(cls, v))
+
+
+def _from_element_case(prot, cls, inst):
+    elt = get_object_as_xml(inst, cls)
+
+    def call():
+        return repr(prot.from_element(None, cls, elt)).encode('utf8')
+
+    return call
+
+
+def _new_case(cls, count=INSTANCE_COUNT):
+    def call():
+        insts = [cls(i=i, s=u'x', f=1.5) for i in range(count)]
+        return repr(insts[-1]).encode('utf8')
+
+    return call
+
+
+def _generic_new_case(cls, count=INSTANCE_COUNT):
+    """Creates instances with the generic ``__init__`` that ComplexModel
+    classes used before they got generated ones."""
+
+    def call():
+        insts = []
+        for i in range(count):
+            inst = object.__new__(cls)
+            ComplexModelBase.__init__(inst, i=i, s=u'x', f=1.5)
+            insts.append(inst)
+        return repr(insts[-1]).encode('utf8')
+
+    return call
+
+
+def _gen_schema(size=SCHEMA_SIZE):
+    """Returns a schema document with ``size`` complex types. Every type has
+    the same few simple members and a reference to the previous type."""
+
+    retval = ['<xs:schema xmlns:xs="http://www.w3.org/2001/XMLSchema" '
+              'xmlns:tns="%s" targetNamespace="%s" '
+              'elementFormDefault="qualified">' % (TNS, TNS)]
+
+    for i in range(size):
+        prev = ''
+        if i > 0:
+            prev = '<xs:element name="prev" type="tns:T%d" minOccurs="0"/>' \
+                                                                       % (i - 1)
+
+        retval.append(
+            '<xs:complexType name="T%d"><xs:sequence>'
+            '<xs:element name="id" type="xs:int" minOccurs="0"/>'
+            '<xs:element name="name" type="xs:string" minOccurs="0"/>'
+            '<xs:element name="ts" type="xs:dateTime" minOccurs="0"/>'
+            '<xs:element name="tags" type="xs:string" minOccurs="0" '
+                                                       'maxOccurs="unbounded"/>'
+            '%s</xs:sequence><xs:attribute name="a" type="xs:string"/>'
+            '</xs:complexType>' % (i, prev))
+
+    retval.append('</xs:schema>')
+
+    return ''.join(retval)
+
+
+def _schema_case(schema):
+    def call():
+        types = parse_schema_string(schema)[TNS].types
+        return ' '.join(sorted(types)).encode('ascii')
+
+    return call
+
+
+def get_cases():
+    """Returns a list of ``(name, callable)`` tuples. Case names look like
+    ``<direction>.<protocol>.<method>``, with ``schema`` and ``model`` as the
+    direction of the cases that don't process requests. Cases that measure a variant of another case
+    get the name of the variant as a fourth component."""
+
+    retval = []
+
+    for prot_name, prot_factory, method_names in _get_out_protocols():
+        app = Application([BenchService], TNS, in_protocol=Soap11(),
+                                                   out_protocol=prot_factory())
+        server = NullServer(app, ostr=True)
+
+        for method_name in method_names:
+            retval.append(('out.%s.%s' % (prot_name, method_name),
+                                             _null_case(server, method_name)))
+
+    for prot_name, prot_factory, requests in _get_in_requests():
+        app = Application([BenchService], TNS, in_protocol=prot_factory(),
+                                                   out_protocol=prot_factory())
+        server = WsgiApplication(app)
+
+        for method_name, data in requests:
+            retval.append(('in.%s.%s' % (prot_name, method_name),
+                                                     _wsgi_case(server, data)))
+
+    data = json.dumps({'echo_flats': {'flats': [_flat_dict(f)
+                                        for f in FLATS]}}).encode('utf8')
+    for backend in _get_json_backends():
+        app = Application([BenchService], TNS,
+                                 in_protocol=JsonDocument(backend=backend),
+                                 out_protocol=JsonDocument(backend=backend))
+        server = WsgiApplication(app)
+        retval.append(('in.json.echo_flats.%s' % backend,
+                                                     _wsgi_case(server, data)))
+
+    app = Application([BenchService], TNS, in_protocol=HttpRpc(),
+                                                         out_protocol=HttpRpc())
+    server = WsgiApplication(app)
+    retval.append(('in.http.echo_args', _wsgi_case(server, b'', method='GET',
+                 path='/echo_args', qs='i=42&s=some%20string&f=1.5&b=true')))
+
+    retval.append(('out.xml.nested_arrays', _to_parent_case(XmlDocument(),
+                                                       Array(Node), NODES)))
+    retval.append(('out.xml.nested_arrays.coroutines',
+              _to_parent_case(CoroutineXmlDocument(), Array(Node), NODES)))
+
+    retval.append(('in.xml.soft_validation',
+        _from_element_case(XmlDocument(validator='soft'), Person, PERSON)))
+    retval.append(('in.xml.soft_validation.uncompiled', _from_element_case(
+                   UncompiledXmlDocument(validator='soft'), Person, PERSON)))
+
+    retval.append(('model.complex.new', _new_case(Record)))
+    retval.append(('model.complex.new.slots', _new_case(SlotsRecord)))
+    retval.append(('model.complex.new.generic', _generic_new_case(Record)))
+
+    retval.append(('schema.xml.parse_types', _schema_case(_gen_schema())))
+
+    return retval
@@ -0,0 +1,254 @@
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""Measurement and baseline comparison.
+
+Wall clock times are not portable between machines, so every time is divided
+by the time a fixed pure-python workload takes on the same machine. The
+resulting ``cost`` is what gets stored in and compared against the baseline.
+"""
+
+import os
+import gc
+import json
+import logging
+
+from timeit import default_timer
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+DEFAULT_THRESHOLD = 3.0
+"""A case regresses when its cost or peak allocation exceeds its baseline
+value multiplied by this factor."""
+
+THRESHOLD_ENV_VAR = 'SPYNE_BENCH_THRESHOLD'
+
+ENABLE_ENV_VAR = 'SPYNE_BENCH'
+"""The unit tests only compare measurements against the baseline when this
+environment variable is set to a non-empty value other than ``0``. Timings
+depend on the machine and its load, so they are not part of the default test
+run."""
+
+PEAK_SLACK = 64 * 1024
+"""Peak allocations may exceed the threshold by this many bytes. Keeps cases
+with small peaks from failing due to allocator noise."""
+
+
+def _calibration_workload():
+    d = {}
+    for i in range(20000):
+        d['key %d' % i] = [i, str(i)]
+    return sum(len(v[1]) for v in d.values())
+
+
+def _time(func, number):
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        start = default_timer()
+        for _ in range(number):
+            func()
+        return default_timer() - start
+
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+
+def best_time(func, min_time=0.2, repeat=3):
+    """Returns the best time per call of ``func``, in seconds. The number of
+    calls per round is picked so that each round takes at least ``min_time``
+    seconds."""
+
+    func()  # warmup
+
+    number = 1
+    elapsed = _time(func, number)
+    while elapsed < min_time:
+        factor = min(10.0, 1.2 * min_time / max(elapsed, 1e-9))
+        number = int(number * factor) + 1
+        elapsed = _time(func, number)
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        best = min(best, _time(func, number))
+
+    return best / number
+
+
+def peak_allocation(func):
+    """Returns the peak number of bytes allocated during a single call to
+    ``func``, or ``None`` when ``tracemalloc`` is not available."""
+
+    if tracemalloc is None or tracemalloc.is_tracing():
+        return None
+
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+
+    finally:
+        tracemalloc.stop()
+
+
+class Result(object):
+    def __init__(self, name, time, cost, peak, size):
+        self.name = name
+        self.time = time
+        """Seconds per call."""
+
+        self.cost = cost
+        """Time per call divided by the calibration time."""
+
+        self.peak = peak
+        """Peak allocation during one call in bytes, may be ``None``."""
+
+        self.size = size
+        """Length of the response in bytes."""
+
+    @property
+    def ops(self):
+        return 1.0 / self.time
+
+    def to_dict(self):
+        return {'cost': round(self.cost, 4), 'peak': self.peak}
+
+    def __repr__(self):
+        return "Result(%r, time=%r, cost=%r, peak=%r, size=%r)" % \
+                          (self.name, self.time, self.cost, self.peak, self.size)
+
+
+def run(cases, min_time=0.2, repeat=3):
+    """Runs the given ``(name, callable)`` pairs and returns a list of
+    :class:`Result` instances."""
+
+    disabled = logging.root.manager.disable
+    logging.disable(logging.WARNING)
+
+    try:
+        unit = best_time(_calibration_workload, min_time, repeat)
+
+        retval = []
+        for name, func in cases:
+            size = len(func())
+            peak = peak_allocation(func)
+            time = best_time(func, min_time, repeat)
+
+            retval.append(Result(name, time, time / unit, peak, size))
+
+        return retval
+
+    finally:
+        logging.disable(disabled)
+
+
+def get_threshold(threshold=None):
+    if threshold is not None:
+        return threshold
+
+    threshold = os.environ.get(THRESHOLD_ENV_VAR, None)
+    if threshold is not None:
+        return float(threshold)
+
+    return DEFAULT_THRESHOLD
+
+
+def is_enabled():
+    return os.environ.get(ENABLE_ENV_VAR, '') not in ('', '0')
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH, old=None):
+    """Writes the given results as the new baseline. Per-case thresholds in
+    the ``old`` baseline are kept."""
+
+    cases = {}
+    old_cases = {} if old is None else old.get('cases', {})
+    for r in results:
+        case = cases[r.name] = r.to_dict()
+        old_threshold = old_cases.get(r.name, {}).get('threshold', None)
+        if old_threshold is not None:
+            case['threshold'] = old_threshold
+
+    with open(path, 'w') as f:
+        json.dump({'cases': cases}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(results, baseline, threshold=None):
+    """Returns a list of human readable regression descriptions, one per
+    offending measurement. An empty list means no regressions.
+
+    A case's own ``threshold`` entry in the baseline takes precedence over
+    the ``threshold`` argument, which in turn defaults to the value of the
+    ``SPYNE_BENCH_THRESHOLD`` environment variable or
+    :data:`DEFAULT_THRESHOLD`. Cases missing from the baseline are
+    ignored."""
+
+    threshold = get_threshold(threshold)
+    cases = baseline.get('cases', {})
+
+    retval = []
+    for r in results:
+        base = cases.get(r.name, None)
+        if base is None:
+            continue
+
+        limit = base.get('threshold', threshold)
+
+        if r.cost > base['cost'] * limit:
+            retval.append("%s: cost %.4f is more than %.1f times the "
+                      "baseline %.4f" % (r.name, r.cost, limit, base['cost']))
+
+        base_peak = base.get('peak', None)
+        if r.peak is not None and base_peak is not None and \
+                                    r.peak > base_peak * limit + PEAK_SLACK:
+            retval.append("%s: peak allocation of %d bytes is more than %.1f "
+                       "times the baseline %d" % (r.name, r.peak, limit,
+                                                                     base_peak))
+
+    return retval
+
+
+def format_results(results, baseline=None):
+    cases = {} if baseline is None else baseline.get('cases', {})
+
+    lines = ["%-32s %10s %12s %10s %12s %10s" % ('case', 'ops/s', 'cost',
+                                                'vs base', 'peak', 'size')]
+    for r in results:
+        base = cases.get(r.name, None)
+        if base is None:
+            ratio = '-'
+        else:
+            ratio = '%.2fx' % (r.cost / base['cost'])
+
+        lines.append("%-32s %10.1f %12.4f %10s %12s %10d" % (r.name, r.ops,
+                                   r.cost, ratio, r.peak or '-', r.size))
+
+    return '\n'.join(lines)
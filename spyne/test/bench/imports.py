@@ -0,0 +1,303 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""Import time audit.
+
+Every target module is imported in a fresh interpreter and the third party
+packages it pulls in are checked against ``imports.json``. Importing a module
+must not load heavy optional dependencies like lxml or msgpack unless the
+baseline allows it, and the number of Spyne modules it loads must not grow
+beyond :data:`MODULE_THRESHOLD` times its baseline value.
+
+Run it with: ::
+
+    python -m spyne.test.bench.imports [-k substring] [--update]
+
+On Python 3.7 and later, the interpreter is run with ``-X importtime`` and the
+modules that took the longest to import are included in the report.
+"""
+
+import os
+import re
+import sys
+import json
+import subprocess
+
+from os.path import abspath, dirname, join
+
+import spyne
+
+
+BASELINE_PATH = join(dirname(__file__), 'imports.json')
+
+TARGETS = (
+    'spyne',
+    'spyne.model',
+    'spyne.protocol.json',
+    'spyne.protocol.http',
+    'spyne.protocol.msgpack',
+    'spyne.protocol.yaml',
+    'spyne.protocol.xml',
+    'spyne.protocol.soap',
+    'spyne.server.null',
+    'spyne.server.wsgi',
+    'spyne.util.dictdoc',
+    'spyne.server.twisted',
+)
+
+HEAVY = ('lxml', 'msgpack', 'yaml', 'sqlalchemy', 'pyparsing', 'twisted',
+                                                                    'werkzeug')
+"""Third party packages that must only be imported by the modules that
+actually need them."""
+
+MODULE_THRESHOLD = 1.2
+"""A target regresses when it loads more than this many times the number of
+Spyne modules in its baseline."""
+
+TOP = 5
+"""The number of slowest modules to list per target when ``-X importtime`` is
+available."""
+
+_SCRIPT = """
+import sys
+before = set(sys.modules)
+from timeit import default_timer
+start = default_timer()
+try:
+    __import__(sys.argv[1])
+except ImportError as e:
+    sys.stdout.write('\\n' + repr({'error': str(e)}) + '\\n')
+else:
+    elapsed = default_timer() - start
+    sys.stdout.write('\\n' + repr({'time': elapsed,
+                   'modules': sorted(set(sys.modules) - before)}) + '\\n')
+"""
+
+_importtime_re = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)')
+
+
+def has_importtime():
+    return sys.version_info >= (3, 7)
+
+
+def parse_importtime(text):
+    """Parses the ``-X importtime`` output in ``text`` into a list of
+    ``(name, self_us, cumulative_us, depth)`` tuples in output order."""
+
+    retval = []
+    for line in text.splitlines():
+        m = _importtime_re.match(line)
+        if m is None:
+            continue
+
+        self_us, cumulative_us, indent, name = m.groups()
+        retval.append((name, int(self_us), int(cumulative_us),
+                                                            len(indent) // 2))
+
+    return retval
+
+
+class ImportResult(object):
+    def __init__(self, target, time=None, modules=(), timings=(), error=None):
+        self.target = target
+
+        self.time = time
+        """Wall clock duration of the import, in seconds."""
+
+        self.modules = modules
+        """Names of the modules that were loaded by the import."""
+
+        self.timings = timings
+        """Output of :func:`parse_importtime` limited to :attr:`modules`.
+        Empty when ``-X importtime`` is not available."""
+
+        self.error = error
+        """The ImportError message when the target can't be imported, e.g.
+        because of a missing optional dependency."""
+
+    @property
+    def heavy(self):
+        roots = set(m.split('.', 1)[0] for m in self.modules)
+        return [h for h in HEAVY if h in roots]
+
+    @property
+    def spyne_modules(self):
+        return len([m for m in self.modules
+                                  if m == 'spyne' or m.startswith('spyne.')])
+
+    def slowest(self, n=TOP):
+        return sorted(self.timings, key=lambda t: -t[1])[:n]
+
+    def to_dict(self):
+        return {'heavy': self.heavy, 'spyne_modules': self.spyne_modules}
+
+    def __repr__(self):
+        return "ImportResult(%r, time=%r, modules=%d, heavy=%r, error=%r)" % \
+                   (self.target, self.time, len(self.modules), self.heavy,
+                                                                     self.error)
+
+
+def measure(target, python=None):
+    """Imports ``target`` in a new interpreter and returns an
+    :class:`ImportResult`."""
+
+    if python is None:
+        python = sys.executable
+
+    args = [python]
+    if has_importtime():
+        args.extend(('-X', 'importtime'))
+    args.extend(('-c', _SCRIPT, target))
+
+    # make sure the child process imports this very copy of Spyne
+    env = dict(os.environ)
+    path = dirname(dirname(abspath(spyne.__file__)))
+    env['PYTHONPATH'] = os.pathsep.join(p for p in
+                                 (path, env.get('PYTHONPATH')) if p)
+
+    proc = subprocess.Popen(args, stdout=subprocess.PIPE,
+                               stderr=subprocess.PIPE, env=env, cwd=path)
+    out, err = proc.communicate()
+    out = out.decode('utf8', 'replace')
+    err = err.decode('utf8', 'replace')
+
+    if proc.returncode != 0:
+        raise RuntimeError("Importing %r failed:\n%s" % (target, err))
+
+    data = eval(out.strip().splitlines()[-1], {})
+    if 'error' in data:
+        return ImportResult(target, error=data['error'])
+
+    modules = data['modules']
+    module_set = set(modules)
+    timings = [t for t in parse_importtime(err) if t[0] in module_set]
+
+    return ImportResult(target, data['time'], modules, timings)
+
+
+def run(targets=TARGETS, python=None):
+    return [measure(t, python) for t in targets]
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(results, path=BASELINE_PATH, old=None):
+    """Writes the given results as the new baseline. Targets that could not be
+    imported keep their entries from the ``old`` baseline."""
+
+    targets = {} if old is None else dict(old.get('targets', {}))
+    for r in results:
+        if r.error is None:
+            targets[r.target] = r.to_dict()
+
+    with open(path, 'w') as f:
+        json.dump({'targets': targets}, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def compare(results, baseline):
+    """Returns a list of human readable regression descriptions. An empty list
+    means no regressions. Targets that could not be imported or that are
+    missing from the baseline are ignored."""
+
+    targets = baseline.get('targets', {})
+
+    retval = []
+    for r in results:
+        base = targets.get(r.target, None)
+        if base is None or r.error is not None:
+            continue
+
+        allowed = set(base.get('heavy', ()))
+        for h in r.heavy:
+            if not h in allowed:
+                retval.append("%s: imports %s" % (r.target, h))
+
+        limit = base['spyne_modules'] * MODULE_THRESHOLD
+        if r.spyne_modules > limit:
+            retval.append("%s: loads %d Spyne modules, the baseline is %d" %
+                                 (r.target, r.spyne_modules, base['spyne_modules']))
+
+    return retval
+
+
+def format_results(results):
+    lines = ["%-24s %10s %8s %8s  %s" % ('target', 'time (ms)', 'modules',
+                                                        'spyne', 'heavy')]
+    for r in results:
+        if r.error is not None:
+            lines.append("%-24s skipped: %s" % (r.target, r.error))
+            continue
+
+        lines.append("%-24s %10.1f %8d %8d  %s" % (r.target, r.time * 1000,
+                     len(r.modules), r.spyne_modules, ', '.join(r.heavy) or '-'))
+
+        for name, self_us, cumulative_us, _ in r.slowest():
+            lines.append("    %-36s self %8.1f ms  cumulative %8.1f ms" %
+                                  (name, self_us / 1000.0, cumulative_us / 1000.0))
+
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Audits the modules that importing "
+                                   "Spyne's main entry points pulls in.")
+    parser.add_argument('-k', dest='filter', default=None,
+                      help="Only check targets whose name contains this string.")
+    parser.add_argument('--baseline', default=BASELINE_PATH,
+                        help="Path to the baseline file.")
+    parser.add_argument('--update', action='store_true',
+                        help="Write the results as the new baseline.")
+
+    args = parser.parse_args(argv)
+
+    targets = TARGETS
+    if args.filter is not None:
+        targets = [t for t in targets if args.filter in t]
+
+    try:
+        baseline = load_baseline(args.baseline)
+    except (IOError, OSError):
+        baseline = None
+
+    results = run(targets)
+    sys.stdout.write(format_results(results) + '\n')
+
+    if args.update:
+        save_baseline(results, args.baseline, baseline)
+        sys.stdout.write("Baseline written to %s\n" % args.baseline)
+        return 0
+
+    if baseline is None:
+        return 0
+
+    regressions = compare(results, baseline)
+    for r in regressions:
+        sys.stdout.write("REGRESSION: %s\n" % r)
+
+    return 1 if len(regressions) > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+
+import os
+import json
+import shutil
+import tempfile
+import unittest
+
+from spyne.test.bench import harness
+from spyne.test.bench.cases import get_cases, msgpack, ARRAY_SIZE, \
+    FLAT_ARRAY_SIZE
+from spyne.test.bench.cases import _gen_schema, _get_json_backends, \
+    _schema_case
+from spyne.test.bench.__main__ import main
+
+
+class TestBenchmarkCases(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.cases = dict(get_cases())
+
+    def test_coverage(self):
+        prots = set(n.split('.')[1] for n in self.cases
+                                             if n.split('.')[0] in ('in', 'out'))
+        expected = set(('soap11', 'xml', 'json', 'http', 'csv', 'html'))
+        if msgpack is not None:
+            expected.add('msgpack')
+
+        assert prots == expected
+
+    def test_out(self):
+        assert len(json.loads(self.cases['out.json.get_integers']())) \
+                                                                 == ARRAY_SIZE
+        if msgpack is not None:
+            assert len(msgpack.unpackb(
+                    self.cases['out.msgpack.get_flats']())) == FLAT_ARRAY_SIZE
+
+        csv = self.cases['out.csv.get_flats']()
+        assert csv.count(b'\r\n') == FLAT_ARRAY_SIZE + 1
+        assert not b'\0' in csv
+
+    def test_in(self):
+        assert self.cases['in.json.sum_integers']() == \
+                                            str(sum(range(ARRAY_SIZE))).encode()
+        assert self.cases['in.http.echo_args']() == b'some string'
+        assert b'some string 0' in self.cases['in.soap11.echo_flat']()
+
+    def test_variants(self):
+        assert self.cases['out.xml.nested_arrays']() == \
+                               self.cases['out.xml.nested_arrays.coroutines']()
+        assert self.cases['in.xml.soft_validation']() == \
+                              self.cases['in.xml.soft_validation.uncompiled']()
+        assert self.cases['model.complex.new']().replace(b'Record', b'') == \
+             self.cases['model.complex.new.slots']().replace(b'SlotsRecord', b'')
+        assert self.cases['model.complex.new']() == \
+                                      self.cases['model.complex.new.generic']()
+
+        docs = [json.loads(f().decode('utf8'))
+                            for n, f in sorted(self.cases.items())
+                                      if n.startswith('in.json.echo_flats.')]
+        assert len(docs) == len(_get_json_backends())
+        for d in docs[1:]:
+            assert d == docs[0]
+
+    def test_schema(self):
+        # the full size case is only parsed by the benchmark itself
+        assert 'schema.xml.parse_types' in self.cases
+
+        names = _schema_case(_gen_schema(5))().split()
+        assert names == [b'T0', b'T1', b'T2', b'T3', b'T4']
+
+    def test_baseline_cases(self):
+        baseline = harness.load_baseline()
+        names = set(self.cases)
+
+        # cases of optional dependencies that are not installed here
+        backends = _get_json_backends()
+        for n in baseline['cases']:
+            parts = n.split('.')
+            if parts[1] == 'msgpack' and msgpack is None:
+                names.add(n)
+            elif parts[:3] == ['in', 'json', 'echo_flats'] and \
+                                                    not parts[3] in backends:
+                names.add(n)
+
+        assert set(baseline['cases']) == names
+
+    @unittest.skipUnless(harness.is_enabled(), "set %s=1 to run the "
+                                   "benchmarks" % harness.ENABLE_ENV_VAR)
+    def test_baseline(self):
+        baseline = harness.load_baseline()
+
+        results = harness.run(sorted(self.cases.items()), min_time=0.05,
+                                                                    repeat=2)
+        print(harness.format_results(results, baseline))
+
+        regressions = harness.compare(results, baseline)
+        assert regressions == [], '\n'.join(regressions)
+
+
+class TestHarness(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'baseline.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_compare(self):
+        baseline = {'cases': {
+            'a': {'cost': 1.0, 'peak': 100000},
+            'b': {'cost': 1.0, 'peak': 100000, 'threshold': 10.0},
+        }}
+
+        results = [
+            harness.Result('a', 1e-3, 2.5, 400000, 1),
+            harness.Result('b', 1e-3, 5.0, 500000, 1),
+            harness.Result('c', 1e-3, 1e6, 1e6, 1),
+        ]
+
+        regressions = harness.compare(results, baseline, threshold=3.0)
+        assert len(regressions) == 1
+        assert regressions[0].startswith('a: peak')
+
+        assert len(harness.compare(results, baseline, threshold=2.0)) == 2
+
+        os.environ[harness.THRESHOLD_ENV_VAR] = '4.0'
+        try:
+            assert harness.compare(results, baseline) == []
+        finally:
+            del os.environ[harness.THRESHOLD_ENV_VAR]
+
+    def test_update(self):
+        with open(self.path, 'w') as f:
+            json.dump({'cases': {
+                'out.json.get_deep': {'cost': 1e-9, 'peak': 1,
+                                                         'threshold': 1000.0},
+                'some.other.case': {'cost': 1.0, 'peak': 1},
+            }}, f)
+
+        args = ['-k', 'out.json.get_deep', '--min-time', '0.01',
+                                   '--repeat', '1', '--baseline', self.path]
+
+        assert main(args) == 1
+
+        assert main(args + ['--update']) == 0
+        cases = harness.load_baseline(self.path)['cases']
+        assert cases['out.json.get_deep']['cost'] > 1e-9
+        assert cases['out.json.get_deep']['threshold'] == 1000.0
+        assert cases['some.other.case'] == {'cost': 1.0, 'peak': 1}
+
+        assert main(args) == 0
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+
+import unittest
+
+from spyne.test.bench import harness, imports
+from spyne.test.bench.imports import ImportResult
+
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _json
+import time:       845 |        965 | json.decoder
+import time:      5321 |      18236 | spyne
+"""
+
+
+class TestImports(unittest.TestCase):
+    def test_parse_importtime(self):
+        assert imports.parse_importtime(IMPORTTIME_OUTPUT) == [
+            ('_json', 120, 120, 1),
+            ('json.decoder', 845, 965, 0),
+            ('spyne', 5321, 18236, 0),
+        ]
+
+    def test_lazy(self):
+        for target in ('spyne', 'spyne.protocol.json', 'spyne.server.wsgi'):
+            r = imports.measure(target)
+            assert r.error is None, r.error
+            assert r.heavy == [], (target, r.heavy)
+            assert 'spyne.interface.xml_schema' not in r.modules
+
+    @unittest.skipUnless(harness.is_enabled(), "set %s=1 to run the "
+                                   "import time audit" % harness.ENABLE_ENV_VAR)
+    def test_baseline(self):
+        results = imports.run()
+        print(imports.format_results(results))
+
+        regressions = imports.compare(results, imports.load_baseline())
+        assert regressions == [], '\n'.join(regressions)
+
+    def test_compare(self):
+        baseline = {'targets': {
+            'a': {'heavy': [], 'spyne_modules': 10},
+            'b': {'heavy': ['lxml'], 'spyne_modules': 10},
+        }}
+
+        ok = [
+            ImportResult('a', 0.1, ['spyne', 'spyne.a']),
+            ImportResult('b', 0.1, ['spyne', 'lxml', 'lxml.etree']),
+            ImportResult('c', 0.1, ['yaml']),
+            ImportResult('a', error="No module named 'a'"),
+        ]
+        assert imports.compare(ok, baseline) == []
+
+        bad = [
+            ImportResult('a', 0.1, ['spyne', 'msgpack']),
+            ImportResult('b', 0.1, ['spyne.%d' % i for i in range(13)]),
+        ]
+        assert imports.compare(bad, baseline) == [
+            "a: imports msgpack",
+            "b: loads 13 Spyne modules, the baseline is 10",
+        ]
+
+
+if __name__ == '__main__':
+    unittest.main()
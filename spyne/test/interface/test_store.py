@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from lxml import etree
+
+from spyne.util.six import StringIO
+
+from spyne import Application, ServiceBase, rpc
+from spyne.model import ComplexModel, Integer, Unicode
+from spyne.protocol.soap import Soap11
+from spyne.server.wsgi import WsgiApplication
+from spyne.interface.store import InterfaceDocumentStore, get_interface_hash, \
+    main
+from spyne.const.xml_ns import wsdl as NS_WSDL
+
+
+def _get_app(max_len=10, validator=None, schema_store=None):
+    class SomeClass(ComplexModel):
+        __namespace__ = 'some_ns'
+
+        i = Integer
+        s = Unicode(max_len=max_len)
+
+    class SomeService(ServiceBase):
+        @rpc(SomeClass, _returns=Unicode)
+        def some_call(ctx, c):
+            return c.s
+
+    return Application([SomeService], 'tns', in_protocol=Soap11(
+                         validator=validator, schema_store=schema_store),
+                                                      out_protocol=Soap11())
+
+
+def _get_wsdl(wsgi_app):
+    status = []
+    def start_response(code, headers):
+        status.append(code)
+
+    return b''.join(wsgi_app({
+        'PATH_INFO': '/',
+        'QUERY_STRING': 'wsdl',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '7000',
+        'REQUEST_METHOD': 'GET',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': StringIO(),
+    }, start_response))
+
+
+class TestInterfaceDocumentStore(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp(prefix='spyne_test')
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_hash(self):
+        h1 = get_interface_hash(_get_app().interface)
+        h2 = get_interface_hash(_get_app().interface)
+        h3 = get_interface_hash(_get_app(max_len=11).interface)
+
+        assert h1 == h2
+        assert h1 != h3
+
+    def test_wsdl(self):
+        store = InterfaceDocumentStore(self.path)
+
+        app = _get_app()
+        WsgiApplication(app)  # sets the transport
+        path = store.build(app.interface, 'http://example.com/soap')
+
+        assert os.listdir(self.path) == [os.path.basename(path)]
+        assert sorted(os.listdir(os.path.join(path, 'xsd'))) == \
+                                                        ['s0.xsd', 'tns.xsd']
+
+        wsgi_app = WsgiApplication(_get_app(), interface_store=store)
+        assert wsgi_app._wsdl is not None
+
+        wsdl = etree.fromstring(_get_wsdl(wsgi_app))
+        assert wsdl.tag == '{%s}definitions' % NS_WSDL
+        assert b'http://example.com/soap' in etree.tostring(wsdl)
+
+        # another type definition means another document.
+        wsgi_app = WsgiApplication(_get_app(max_len=11), interface_store=store)
+        assert wsgi_app._wsdl is None
+
+    def test_wsdl_write_through(self):
+        store = InterfaceDocumentStore(self.path)
+
+        wsgi_app = WsgiApplication(_get_app(), interface_store=store)
+        assert wsgi_app._wsdl is None
+        data = _get_wsdl(wsgi_app)
+
+        wsgi_app = WsgiApplication(_get_app(), interface_store=store)
+        assert wsgi_app._wsdl == data
+        assert wsgi_app._wsdl_doc.etag == \
+                             store.get_wsdl(wsgi_app.app.interface).etag
+
+    def test_validation_schema(self):
+        store = InterfaceDocumentStore(self.path)
+
+        app = _get_app(validator='lxml', schema_store=store)
+        assert app.in_protocol.validation_schema is not None
+        assert len(os.listdir(self.path)) == 1
+
+        # loaded from the store this time
+        xsd_path = os.path.join(store.get_path(app.interface), 'xsd')
+        mtime = os.path.getmtime(os.path.join(xsd_path, 'tns.xsd'))
+
+        app = _get_app(validator='lxml', schema_store=store)
+        schema = app.in_protocol.validation_schema
+        assert mtime == os.path.getmtime(os.path.join(xsd_path, 'tns.xsd'))
+
+        doc = etree.fromstring(
+            b'<some_call xmlns="tns"><c><i xmlns="some_ns">5</i>'
+            b'<s xmlns="some_ns">abc</s></c></some_call>')
+        assert schema.validate(doc)
+
+        doc = etree.fromstring(
+            b'<some_call xmlns="tns"><c><i xmlns="some_ns">5</i>'
+            b'<s xmlns="some_ns">abcdefghijk</s></c></some_call>')
+        assert not schema.validate(doc)
+
+    def test_main(self):
+        import sys
+        from spyne.util.six import StringIO as _StringIO
+
+        module = type(sys)('_spyne_test_store_app')
+        module.application = WsgiApplication(_get_app())
+        sys.modules[module.__name__] = module
+
+        stdout, sys.stdout = sys.stdout, _StringIO()
+        try:
+            main(['_spyne_test_store_app:application', self.path,
+                                                  'http://example.com/soap'])
+            path = sys.stdout.getvalue().strip()
+        finally:
+            sys.stdout = stdout
+            del sys.modules[module.__name__]
+
+        assert os.path.isfile(os.path.join(path, 'wsdl.xml'))
+        assert os.path.isfile(os.path.join(path, 'wsdl.xml.gz'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -87,5 +87,52 @@ class Test(unittest.TestCase):
 
         assert etree.fromstring(retval).tag == '{%s}definitions' % NS_WSDL
 
+    def test_wsgi_etag_gzip(self):
+        import gzip
+        from spyne.util.six import BytesIO
+
+        def get_wsdl(**kwargs):
+            env = {
+                'PATH_INFO': '/',
+                'QUERY_STRING': 'wsdl',
+                'SERVER_NAME': 'localhost',
+                'SERVER_PORT': '7000',
+                'REQUEST_METHOD': 'GET',
+                'wsgi.url_scheme': 'http',
+                'wsgi.input': StringIO(),
+            }
+            env.update(kwargs)
+
+            status = []
+            def _start_response(code, headers):
+                status.append((code, dict(headers)))
+
+            retval = b''.join(self.wsgi_app(env, _start_response))
+            return status[0][0], status[0][1], retval
+
+        code, headers, data = get_wsdl()
+        assert code.startswith('200')
+        assert not ('Content-Encoding' in headers)
+        etag = headers['ETag']
+
+        code, headers, gzipped = get_wsdl(HTTP_ACCEPT_ENCODING='deflate, gzip')
+        assert code.startswith('200')
+        assert headers['Content-Encoding'] == 'gzip'
+        assert headers['Content-Length'] == str(len(gzipped))
+        assert gzip.GzipFile(fileobj=BytesIO(gzipped)).read() == data
+
+        code, headers, _ = get_wsdl(HTTP_ACCEPT_ENCODING='gzip;q=0')
+        assert not ('Content-Encoding' in headers)
+
+        code, headers, body = get_wsdl(HTTP_IF_NONE_MATCH=etag)
+        assert code.startswith('304')
+        assert headers['ETag'] == etag
+        assert body == b''
+
+        code, headers, body = get_wsdl(HTTP_IF_NONE_MATCH='"other"')
+        assert code.startswith('200')
+        assert body == data
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -520,6 +520,38 @@ class TestParseForeignXmlSchema(unittest.TestCase):
         assert issubclass(ti['attr'], XmlAttribute)
         assert ti['attr'].type is Unicode
 
+    def test_shared_customizations(self):
+        tns = 'some_ns'
+
+        parts = ['<xsd:schema xmlns:xsd="http://www.w3.org/2001/XMLSchema" '
+                 'xmlns:tns="%s" targetNamespace="%s" '
+                 'elementFormDefault="qualified">' % (tns, tns)]
+        for i in range(3):
+            prev = ''
+            if i > 0:
+                prev = '<xsd:element name="prev" type="tns:T%d" ' \
+                                                   'minOccurs="0"/>' % (i - 1)
+
+            parts.append(
+                '<xsd:complexType name="T%d"><xsd:sequence>'
+                '<xsd:element name="id" type="xsd:int" minOccurs="0"/>'
+                '<xsd:element name="tags" type="xsd:string" minOccurs="0" '
+                                                      'maxOccurs="unbounded"/>'
+                '%s</xsd:sequence>'
+                '<xsd:attribute name="a" type="xsd:string"/>'
+                '</xsd:complexType>' % (i, prev))
+        parts.append('</xsd:schema>')
+
+        types = parse_schema_string(''.join(parts))[tns].types
+
+        t1, t2 = types['T1'], types['T2']
+        assert list(t2._type_info) == ['id', 'tags', 'prev', 'a']
+        assert t2._type_info['prev'].__orig__ is t1
+
+        # identical customizations are only done once
+        assert t1._type_info['id'] is t2._type_info['id']
+        assert t1._type_info['tags'] is t2._type_info['tags']
+
 
 class TestCodeGeneration(unittest.TestCase):
     def _get_schema(self, *args):
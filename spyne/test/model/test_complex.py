@@ -1059,6 +1059,195 @@ class TestCustomize(unittest.TestCase):
                     "have conflicting names.")
 
 
+class TestSlots(unittest.TestCase):
+    def _get_classes(self):
+        class SlotsBase(ComplexModel):
+            class Attributes(ComplexModel.Attributes):
+                slots = True
+
+            i = Integer
+            s = Unicode(default=u'x')
+            a = Array(Integer).customize(default_factory=list)
+
+        class SlotsChild(SlotsBase):
+            d = DateTime
+
+        return SlotsBase, SlotsChild
+
+    def test_layout(self):
+        SlotsBase, SlotsChild = self._get_classes()
+
+        assert SlotsBase.__slots__ == ('i', 's', 'a', '__dict__', '__weakref__')
+        assert SlotsChild.__slots__ == ('d',)
+
+        inst = SlotsChild(i=1, d=datetime.datetime(2020, 1, 2))
+        assert inst.__dict__ == {}
+        assert inst.i == 1
+        assert inst.s == u'x'
+        assert inst.a == []
+        assert inst.a is not SlotsChild().a
+
+    def test_init(self):
+        SlotsBase, SlotsChild = self._get_classes()
+
+        inst = SlotsBase(s=None, some_unknown_kwarg=5)
+        assert inst.i is None
+        assert inst.s is None
+
+        class ReadOnly(SlotsBase):
+            r = Integer(default=3, read_only=True)
+
+        assert ReadOnly().r == 3
+        assert getattr(ReadOnly(r=5), 'r', None) is None  # like _safe_set
+
+        class OwnInit(SlotsBase):
+            def __init__(self, *args, **kwargs):
+                self.i = 42
+                super(OwnInit, self).__init__(*args, **kwargs)
+
+        assert OwnInit().i == 42
+        assert OwnInit().s == u'x'
+
+    def test_compat(self):
+        SlotsBase, SlotsChild = self._get_classes()
+
+        inst = SlotsChild(i=1)
+        assert inst.as_dict() == {'i': 1, 's': u'x', 'a': []}
+        assert SlotsBase(i=1)[0] == 1
+        assert SlotsBase(i=1)[0:2] == [1, u'x']
+        assert inst._safe_set('i', 2, Integer)
+        assert inst.i == 2
+        assert repr(inst) == "SlotsChild(i=2, s='x', a=[])"
+
+        inst.some_unknown_attr = 5
+        assert inst.__dict__ == {'some_unknown_attr': 5}
+
+        from copy import copy, deepcopy
+        assert copy(inst).as_dict() == inst.as_dict()
+        assert deepcopy(inst).as_dict() == inst.as_dict()
+        assert deepcopy(inst).some_unknown_attr == 5
+
+    def test_append_field(self):
+        SlotsBase, SlotsChild = self._get_classes()
+
+        SlotsBase.append_field('z', Unicode(default=u'z'))
+        SlotsBase.insert_field(0, 'y', Integer)
+
+        assert SlotsBase().z == u'z'
+        assert SlotsChild().z == u'z'
+        assert SlotsChild().y is None
+        assert SlotsChild(y=1).as_dict() == \
+                                     {'y': 1, 's': u'x', 'a': [], 'z': u'z'}
+
+    def test_protocols(self):
+        SlotsBase, SlotsChild = self._get_classes()
+        SlotsChild.__namespace__ = 'tns'
+
+        from spyne.util.xml import get_object_as_xml, get_xml_as_object
+        from spyne.util.dictdoc import get_object_as_json, json_loads, \
+            get_object_as_dict, get_dict_as_object
+
+        inst = SlotsChild(i=1, s=u'y', a=[1, 2],
+                                         d=datetime.datetime(2020, 1, 2, 3, 4))
+
+        ret = get_xml_as_object(get_object_as_xml(inst, SlotsChild),
+                                                                     SlotsChild)
+        assert ret.__dict__ == {}
+        assert ret.as_dict() == inst.as_dict()
+
+        ret = json_loads(get_object_as_json(inst, SlotsChild,
+                                          complex_as=dict), SlotsChild)
+        assert ret.as_dict() == inst.as_dict()
+
+        ret = get_dict_as_object(get_object_as_dict(inst, SlotsChild),
+                                                 SlotsChild, complex_as=dict)
+        assert ret.as_dict() == inst.as_dict()
+
+
+class TestGeneratedInit(unittest.TestCase):
+    def test_init(self):
+        class SomeClass(ComplexModel):
+            i = Integer
+            s = Unicode(default=u'x')
+            a = Array(Integer).customize(default_factory=list)
+            r = Integer(default=3, read_only=True)
+
+        assert SomeClass.__dict__['__init__']._spyne_generated
+
+        inst = SomeClass(i=1, r=5, some_unknown_kwarg=5)
+        assert inst.__dict__ == {'i': 1, 's': u'x', 'a': []}
+
+        inst = SomeClass()
+        assert inst.__dict__ == {'i': None, 's': u'x', 'a': [], 'r': 3}
+        assert inst.a is not SomeClass().a
+
+        inst = SomeClass.get_deserialization_instance()
+        assert inst.__dict__ == {'i': None, 's': u'x', 'a': [], 'r': 3}
+        assert '_new_instance' in SomeClass.__dict__
+
+    def test_field_changes(self):
+        class SomeClass(ComplexModel):
+            i = Integer
+
+        class SomeChild(SomeClass):
+            j = Integer
+
+        assert SomeChild(i=1).__dict__ == {'i': 1, 'j': None}
+
+        SomeClass.append_field('k', Unicode(default=u'k'))
+        assert SomeClass().__dict__ == {'i': None, 'k': u'k'}
+        assert SomeChild(i=1).__dict__ == {'i': 1, 'k': u'k', 'j': None}
+        assert SomeChild.get_deserialization_instance().k == u'k'
+
+        SomeClass.insert_field(0, 'h', Integer(default=0))
+        assert SomeClass().h == 0
+
+        SomeClass._replace_field('h', Integer(default=1))
+        assert SomeClass().h == 1
+        assert SomeChild.get_deserialization_instance().h == 1
+
+    def test_fallback(self):
+        class OwnInit(ComplexModel):
+            i = Integer
+
+            def __init__(self, *args, **kwargs):
+                super(OwnInit, self).__init__(*args, **kwargs)
+                self.j = 42
+
+        class OwnInitChild(OwnInit):
+            k = Integer
+
+        assert not '__init__' in OwnInitChild.__dict__
+        assert OwnInitChild.get_deserialization_instance().j == 42
+
+        class WithData(ComplexModel):
+            d = XmlData(Unicode)
+            a = XmlAttribute(Integer)
+
+        assert WithData(u'x', a=1).d == u'x'
+
+        WithDataCust = WithData.customize(nillable=False)
+        assert WithDataCust.get_deserialization_instance().__class__ \
+                                                                    is WithData
+
+    def test_generic(self):
+        from spyne.model.complex import ComplexModelBase
+
+        class SomeClass(ComplexModel):
+            i = Integer
+            s = Unicode
+            f = Float
+            d = DateTime(default=datetime.datetime(2020, 1, 2))
+            a = Array(Integer).customize(default_factory=list)
+
+        generic = object.__new__(SomeClass)
+        ComplexModelBase.__init__(generic, i=1, s=u'x', f=1.5)
+
+        assert SomeClass(i=1, s=u'x', f=1.5).__dict__ == generic.__dict__
+        assert SomeClass().__dict__ == \
+                                SomeClass.get_deserialization_instance().__dict__
+
+
 class TestAdditional(unittest.TestCase):
     def test_time_segment(self):
         data = TimeSegment.from_string("[11:12:13.123456,14:15:16.789012]")
@@ -173,6 +173,47 @@ class TestComplexModel(unittest.TestCase):
         self.assertEquals(["field3", "field1", "field2", "new_field"],
                           list(MyModelWithDeclaredOrder._type_info))
 
+    def test_declare_order_dynamic(self):
+        from spyne.util.meta import DICTS_ARE_ORDERED
+        if not DICTS_ARE_ORDERED:
+            raise unittest.SkipTest("plain dicts are not ordered")
+
+        class Base(ComplexModel):
+            class Attributes(ComplexModel.Attributes):
+                declare_order = 'declared'
+
+            field3 = Integer
+            field1 = Integer
+
+        # no class statement to find in the frame stack, so this only works
+        # when the attributes dict is trusted to be ordered
+        Dynamic = ComplexModelMeta('Dynamic', (Base,),
+                        {'field6': Integer, 'field4': Integer, 'field5': Integer})
+
+        self.assertEquals(["field6", "field4", "field5"],
+                          list(Dynamic._type_info))
+
+    def test_declare_order_add_metaclass(self):
+        from spyne.util.meta import DICTS_ARE_ORDERED
+        if not DICTS_ARE_ORDERED:
+            raise unittest.SkipTest("plain dicts are not ordered")
+
+        class Base(ComplexModel):
+            class Attributes(ComplexModel.Attributes):
+                declare_order = 'declared'
+
+            field3 = Integer
+            field1 = Integer
+
+        @add_metaclass(ComplexModelMeta)
+        class Decorated(Base):
+            field6 = Integer
+            field4 = Integer
+            field5 = Integer
+
+        self.assertEquals(["field6", "field4", "field5"],
+                          list(Decorated._type_info))
+
 
 if __name__ == '__main__':
     import sys
@@ -48,6 +48,7 @@ from spyne.application import Application
 from spyne.decorator import srpc, rpc
 from spyne.error import ValidationError
 from spyne.model.binary import binary_encoding_handlers, File
+from spyne.model.complex import Array
 from spyne.model.complex import ComplexModel
 from spyne.model.complex import Iterable
 from spyne.model.fault import Fault
@@ -1334,4 +1335,38 @@ def TDictDocumentTest(serializer, _DictDocumentChild, dumps_kwargs=None,
             assert ctx.in_object.s.b == 'default'
             assert ctx.in_error is None
 
+        def test_recursive_roundtrip(self):
+            class Node(ComplexModel):
+                i = Integer
+
+            Node.append_field('children', Array(Node))
+
+            prot = _DictDocumentChild()
+            inst = Node(i=1, children=[Node(i=2), Node(i=3, children=[
+                                                                  Node(i=4)])])
+
+            ret = prot._doc_to_object(Node, prot._object_to_doc(Node, inst))
+            assert ret.i == 1
+            assert [c.i for c in ret.children] == [2, 3]
+            assert ret.children[1].children[0].i == 4
+
+        def test_compiled_invalidation(self):
+            class C(ComplexModel):
+                i = Integer
+
+            class D(ComplexModel):
+                c = C
+
+            prot = _DictDocumentChild()
+            ret = prot._doc_to_object(D, prot._object_to_doc(D, D(c=C(i=1))))
+            assert ret.c.i == 1
+
+            # must be picked up even though D's encoder and decoder are cached
+            C.append_field('j', Integer)
+
+            inst = D(c=C(i=1, j=2))
+            ret = prot._doc_to_object(D, prot._object_to_doc(D, inst))
+            assert ret.c.i == 1
+            assert ret.c.j == 2
+
     return Test
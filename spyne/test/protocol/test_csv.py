@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+
+import unittest
+
+from spyne import Application, ServiceBase, rpc
+from spyne.model import ComplexModel, Iterable, Unicode
+from spyne.protocol.csv import Csv
+from spyne.protocol.soap import Soap11
+from spyne.server.null import NullServer
+
+
+class TestCsv(unittest.TestCase):
+    def test_rows_of_decreasing_length(self):
+        class Row(ComplexModel):
+            s = Unicode
+
+        class SomeService(ServiceBase):
+            @rpc(_returns=Iterable(Row))
+            def some_call(ctx):
+                return [Row(s=u'a-very-long-value-here'), Row(s=u'b'),
+                                                               Row(s=u'cc')]
+
+        app = Application([SomeService], 'tns', in_protocol=Soap11(),
+                                                          out_protocol=Csv())
+        server = NullServer(app, ostr=True)
+
+        ret = ''.join(server.service.some_call())
+        assert ret == 's\r\na-very-long-value-here\r\nb\r\ncc\r\n', repr(ret)
+
+
+if __name__ == '__main__':
+    unittest.main()
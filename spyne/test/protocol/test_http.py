@@ -40,7 +40,7 @@ from spyne.model import ByteArray, DateTime, Uuid, String, Integer, Integer8, \
 from spyne.protocol.http import HttpRpc, HttpPattern
 from spyne.service import ServiceBase
 from spyne.server.wsgi import WsgiApplication, WsgiMethodContext
-from spyne.server.http import HttpTransportContext
+from spyne.server.http import HttpTransportContext, HttpPatternRouter
 from spyne.util.test import call_wsgi_app_kwargs
 
 
@@ -806,6 +806,43 @@ class TestHttpPatterns(unittest.TestCase):
         server.get_out_object(ctx)
         assert ctx.out_error is None
 
+    def test_router(self):
+        patterns = [
+            HttpPattern('/a/<x>/b', verb='GET'),
+            HttpPattern('/a/<x>/b'),
+            HttpPattern('/a/c/b', verb='GET|POST'),
+            HttpPattern('/a/{y}', host='example.com'),
+            HttpPattern('/file.json'),
+            HttpPattern('/q<z>'),
+            HttpPattern('/v', verb='<verb>'),
+            HttpPattern('/w'),
+        ]
+
+        router = HttpPatternRouter(patterns)
+
+        def match(method, path, host='example.com'):
+            patt, params = router.match(method, path, host)
+            if patt is None:
+                return None, dict(params)
+            return patterns.index(patt), dict(params)
+
+        # the first matching pattern wins, whether it's a literal or not
+        assert match('GET', '/a/c/b') == (0, {'x': ['c']})
+        assert match('POST', '/a/c/b') == (1, {'x': ['c']})
+        assert match('GET', '/a//b') == (0, {'x': ['']})
+
+        assert match('GET', '/a/c') == (3, {'y': ['c']})
+        assert match('GET', '/a/c', host='other') == (None, {'verb': ['GET']})
+
+        # addresses are regular expressions
+        assert match('GET', '/file.json') == (4, {})
+        assert match('GET', '/fileXjson') == (4, {})
+        assert match('GET', '/qrs') == (5, {'z': ['rs']})
+
+        # verb and host groups are kept from patterns that don't match
+        assert match('PUT', '/w') == (7, {'verb': ['PUT']})
+        assert match('PUT', '/v') == (6, {'verb': ['PUT']})
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -28,13 +28,17 @@ from spyne import MethodContext
 from spyne import Application
 from spyne import rpc,srpc
 from spyne import ServiceBase
-from spyne.model import Integer, Unicode, ComplexModel
+from spyne.model import Integer, Unicode, ComplexModel, Array, Iterable
 from spyne.protocol.json import JsonP
 from spyne.protocol.json import JsonDocument
 from spyne.protocol.json import JsonEncoder
 from spyne.protocol.json import _SpyneJsonRpc1
+from spyne.protocol.json import json_backends
+from spyne.protocol.json import get_json_backend
 from spyne.server import ServerBase
 from spyne.server.null import NullServer
+from spyne.server.wsgi import WsgiApplication
+from spyne.protocol.http import HttpRpc
 
 from spyne.test.protocol._test_dictdoc import TDictDocumentTest
 from spyne.test.protocol._test_dictdoc import TDry
@@ -48,6 +52,65 @@ class TestDictDocument(TDictDocumentTest(json, JsonDocument,
     def loads(self, o):
         return super(TestDictDocument, self).loads(o.decode('utf8'))
 
+
+def _has_backend(backend):
+    try:
+        get_json_backend(backend)
+    except ImportError:
+        return False
+    return True
+
+
+def _json_document(**defaults):
+    class _JsonDocument(JsonDocument):
+        def __init__(self, *args, **kwargs):
+            for k, v in defaults.items():
+                kwargs.setdefault(k, v)
+            super(_JsonDocument, self).__init__(*args, **kwargs)
+
+    backend = defaults.get('backend', None)
+    if backend is not None and _has_backend(backend):
+        _JsonDocument._huge_numbers_as_string = \
+                               get_json_backend(backend).huge_numbers_as_string
+
+    return _JsonDocument
+
+
+class _Utf8Mixin(object):
+    def dumps(self, o):
+        return super(_Utf8Mixin, self).dumps(o).encode('utf8')
+
+    def loads(self, o):
+        return super(_Utf8Mixin, self).loads(o.decode('utf8'))
+
+
+class TestStreamingDictDocument(_Utf8Mixin, TDictDocumentTest(json,
+                                         _json_document(stream_output=True),
+                                         dumps_kwargs=dict(cls=JsonEncoder))):
+    pass
+
+
+@unittest.skipIf(not _has_backend('orjson'), "orjson is not installed")
+class TestOrJsonDictDocument(_Utf8Mixin, TDictDocumentTest(json,
+                                         _json_document(backend='orjson'),
+                                         dumps_kwargs=dict(cls=JsonEncoder))):
+    pass
+
+
+@unittest.skipIf(not _has_backend('ujson'), "ujson is not installed")
+class TestUJsonDictDocument(_Utf8Mixin, TDictDocumentTest(json,
+                                         _json_document(backend='ujson'),
+                                         dumps_kwargs=dict(cls=JsonEncoder))):
+    pass
+
+
+@unittest.skipIf(not _has_backend('rapidjson'), "rapidjson is not installed")
+class TestRapidJsonDictDocument(_Utf8Mixin, TDictDocumentTest(json,
+                                         _json_document(backend='rapidjson'),
+                                         dumps_kwargs=dict(cls=JsonEncoder))):
+    pass
+
+
 _dry_sjrpc1 = TDry(json, _SpyneJsonRpc1)
 
 class TestSpyneJsonRpc1(unittest.TestCase):
@@ -65,6 +128,18 @@ class TestSpyneJsonRpc1(unittest.TestCase):
         print(list(ctx.out_string))
         assert ctx.out_document == {"ver": 1, "body": 5}
 
+    def test_out_string(self):
+        class SomeService(ServiceBase):
+            @srpc(Integer, _returns=Integer)
+            def yay(i):
+                return i
+
+        ctx = _dry_sjrpc1([SomeService],
+                    {"ver": 1, "body": {"yay": {"i":5}}}, True)
+
+        assert json.loads(b''.join(ctx.out_string).decode('utf8')) == \
+                                                          {"ver": 1, "body": 5}
+
     def test_call_with_header(self):
         class SomeHeader(ComplexModel):
             i = Integer
@@ -138,6 +213,152 @@ class TestJsonDocument(unittest.TestCase):
         ctx, = server.generate_contexts(initial_ctx, in_string_charset='utf8')
         assert ctx.in_error.faultcode == 'Client.JsonDecodeError'
 
+    def test_stream_output_same_as_dumps(self):
+        class SomeComplexModel(ComplexModel):
+            i = Integer
+            s = Unicode
+            a = Array(Integer)
+
+        class SomeService(ServiceBase):
+            @srpc(_returns=Array(SomeComplexModel))
+            def yay():
+                return [SomeComplexModel(i=i, s=u'\u00fc%d' % i,
+                                               a=[i, i + 1]) for i in range(50)]
+
+        for kwargs in (dict(), dict(ignore_wrappers=False, sort_keys=True,
+                                                      separators=(',', ':'))):
+            out_strings = []
+            for stream_output in (False, True):
+                prot = JsonDocument(stream_output=stream_output, **kwargs)
+                app = Application([SomeService], 'tns',
+                               in_protocol=JsonDocument(), out_protocol=prot)
+                server = NullServer(app, ostr=True)
+                out_strings.append(b''.join(server.service.yay()))
+
+            plain, streamed = out_strings
+            assert plain == streamed
+
+    def test_stream_output_wsgi_chunked(self):
+        n = 1000
+        state = {'i': 0}
+
+        class SomeService(ServiceBase):
+            @srpc(Integer, _returns=Iterable(Integer))
+            def some_call(i):
+                for j in range(i):
+                    state['i'] = j
+                    yield j
+
+        prot = JsonDocument(stream_output=True)
+        prot.stream_chunk_size = 64
+
+        app = Application([SomeService], 'tns', in_protocol=HttpRpc(),
+                                                              out_protocol=prot)
+        server = WsgiApplication(app, chunked=True)
+
+        def start_response(code, headers):
+            assert not ('Content-Length' in dict(headers))
+
+        ret = iter(server({
+            'QUERY_STRING': 'i=%d' % n,
+            'PATH_INFO': '/some_call',
+            'REQUEST_METHOD': 'GET',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '0',
+            'wsgi.url_scheme': 'http',
+        }, start_response))
+
+        first = next(ret)
+        # only a few items must have been generated at this point
+        assert state['i'] < n // 10
+
+        data = first + b''.join(ret)
+        assert json.loads(data.decode('utf8')) == list(range(n))
+
+    def test_stream_output_indent(self):
+        self.assertRaises(ValueError, JsonDocument, stream_output=True,
+                                                                      indent=4)
+
+
+class TestJsonBackends(unittest.TestCase):
+    def test_unknown_backend(self):
+        self.assertRaises(ValueError, JsonDocument, backend='nope')
+
+    def test_default(self):
+        import datetime
+        import decimal
+        from spyne.model import AnyDict
+
+        class SomeService(ServiceBase):
+            @srpc(_returns=AnyDict)
+            def yay():
+                return {
+                    'd': decimal.Decimal('1.5'),
+                    't': datetime.datetime(2020, 1, 2, 3, 4, 5),
+                    'g': (i for i in range(3)),
+                }
+
+        for backend in json_backends:
+            if not _has_backend(backend):
+                continue
+
+            app = Application([SomeService], 'tns', in_protocol=JsonDocument(),
+                                   out_protocol=JsonDocument(backend=backend))
+            server = NullServer(app, ostr=True)
+            ret = json.loads(b''.join(server.service.yay()).decode('utf8'))
+            print(backend, ret)
+
+            if backend != 'ujson':  # ujson serializes Decimal as float
+                assert ret['d'] == '1.5'
+            assert ret['t'] == '2020-01-02T03:04:05'
+            assert ret['g'] == [0, 1, 2]
+
+    def test_roundtrip(self):
+        from spyne.model import Double, DateTime, Decimal
+        import datetime
+
+        class SomeComplexModel(ComplexModel):
+            i = Integer
+            s = Unicode
+            f = Double
+            t = DateTime
+            d = Decimal
+            a = Array(Integer)
+
+        class SomeService(ServiceBase):
+            @srpc(Array(SomeComplexModel), _returns=Array(SomeComplexModel))
+            def echo(cms):
+                return cms
+
+        now = datetime.datetime(2020, 1, 2, 3, 4, 5)
+        in_string = json.dumps({"echo": {"cms": [
+            dict(i=i, s=u'\u00fc%d' % i, f=i / 3.0, t=now.isoformat(),
+                              d=str(i), a=[i, i + 1, i + 2]) for i in range(5)
+        ]}}).encode('utf8')
+
+        docs = []
+        for backend in sorted(json_backends):
+            if not _has_backend(backend):
+                continue
+
+            app = Application([SomeService], 'tns',
+                                   in_protocol=JsonDocument(backend=backend),
+                                   out_protocol=JsonDocument(backend=backend))
+            server = ServerBase(app)
+
+            initial_ctx = MethodContext(server, MethodContext.SERVER)
+            initial_ctx.in_string = [in_string]
+            ctx, = server.generate_contexts(initial_ctx)
+            server.get_in_object(ctx)
+            server.get_out_object(ctx)
+            server.get_out_string(ctx)
+
+            docs.append(json.loads(b''.join(ctx.out_string).decode('utf8')))
+
+        assert len(docs[0]) == 5
+        for d in docs[1:]:
+            assert d == docs[0]
+
 
 class TestJsonP(unittest.TestCase):
     def test_callback_name(self):
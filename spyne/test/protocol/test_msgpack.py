@@ -33,6 +33,9 @@ from spyne.model.complex import Array
 from spyne.model.primitive import String
 from spyne.model.complex import ComplexModel
 from spyne.model.primitive import Unicode
+from spyne.model.primitive import Integer
+from spyne.model.binary import ByteArray
+from spyne.model.primitive import AnyDict
 from spyne.protocol.msgpack import MessagePackDocument
 from spyne.protocol.msgpack import MessagePackRpc
 from spyne.util.six import BytesIO
@@ -48,6 +51,103 @@ TestMessagePackDocument  = TDictDocumentTest(msgpack, MessagePackDocument,
                                           loads_kwargs=dict(use_list=False))
 
 
+class _UnicodeMessagePackDocument(MessagePackDocument):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('raw', False)
+        super(_UnicodeMessagePackDocument, self).__init__(*args, **kwargs)
+
+
+TestUnicodeMessagePackDocument = TDictDocumentTest(msgpack,
+                                  _UnicodeMessagePackDocument,
+                                  dumps_kwargs=dict(use_bin_type=True),
+                                  loads_kwargs=dict(use_list=False, raw=False))
+
+
+class TestMessagePackInput(unittest.TestCase):
+    def _get_ctx(self, in_string, **kwargs):
+        class SomeService(ServiceBase):
+            @srpc(ByteArray, _returns=Integer)
+            def some_call(b):
+                return len(b''.join(b))
+
+        app = Application([SomeService], 'tns',
+                                in_protocol=MessagePackDocument(**kwargs),
+                                out_protocol=MessagePackDocument())
+
+        server = ServerBase(app)
+        initial_ctx = MethodContext(server, MethodContext.SERVER)
+        initial_ctx.in_string = in_string
+        ctx, = server.generate_contexts(initial_ctx)
+        if ctx.in_error is None:
+            server.get_in_object(ctx)
+        return ctx
+
+    def test_chunks(self):
+        data = msgpack.packb({b'some_call': {b'b': b'x' * 10000}})
+
+        chunks = [data[i:i + 1000] for i in range(0, len(data), 1000)]
+        ctx = self._get_ctx(chunks)
+        assert ctx.in_error is None
+        assert b''.join(ctx.in_object.b) == b'x' * 10000
+
+    def test_mmap(self):
+        import mmap
+
+        data = msgpack.packb({b'some_call': {b'b': b'x' * 10000}})
+        buf = mmap.mmap(-1, len(data))
+        buf.write(data)
+
+        ctx = self._get_ctx([buf])
+        assert ctx.in_error is None
+        assert b''.join(ctx.in_object.b) == b'x' * 10000
+
+        buf.close()  # must not be held by the protocol
+
+    def test_max_buffer_size(self):
+        data = msgpack.packb({b'some_call': {b'b': b'x' * 10000}})
+
+        ctx = self._get_ctx([data], max_buffer_size=1000)
+        assert ctx.in_error.faultcode == 'Client.RequestTooLong'
+
+        ctx = self._get_ctx([data[:5000], data[5000:]], max_buffer_size=1000)
+        assert ctx.in_error.faultcode == 'Client.RequestTooLong'
+
+    def test_extra_data(self):
+        data = msgpack.packb({b'some_call': {b'b': b'x'}})
+
+        ctx = self._get_ctx([data, data])
+        assert ctx.in_error.faultcode == 'Client.MessagePackDecodeError'
+
+        ctx = self._get_ctx([data, data[:-1]])
+        assert ctx.in_error.faultcode == 'Client.MessagePackDecodeError'
+
+
+    def test_use_list(self):
+        class SomeService(ServiceBase):
+            @srpc(AnyDict, _returns=Integer)
+            def some_call(d):
+                return 0
+
+        data = msgpack.packb({b'some_call': {b'd': {b'a': [1, 2]}}})
+
+        for kwargs, expected in (({}, list), ({'use_list': True}, list),
+                                                 ({'use_list': False}, tuple)):
+            app = Application([SomeService], 'tns',
+                                in_protocol=MessagePackDocument(**kwargs),
+                                out_protocol=MessagePackDocument())
+
+            server = ServerBase(app)
+            initial_ctx = MethodContext(server, MethodContext.SERVER)
+            initial_ctx.in_string = [data]
+            ctx, = server.generate_contexts(initial_ctx)
+            server.get_in_object(ctx)
+
+            assert ctx.in_error is None
+            assert type(ctx.in_object.d[b'a']) is expected
+
+        assert MessagePackRpc().use_list is False
+
+
 class TestMessagePackRpc(unittest.TestCase):
     def test_invalid_input(self):
         class SomeService(ServiceBase):
@@ -121,6 +221,46 @@ class TestMessagePackRpc(unittest.TestCase):
         print(s)
         assert ret == s
 
+    def test_batch(self):
+        class Service(ServiceBase):
+            @srpc(Integer, _returns=Integer)
+            def div(i):
+                return 10 // i
+
+        application = Application([Service],
+            in_protocol=MessagePackRpc(),
+            out_protocol=MessagePackRpc(),
+            name='Service', tns='tns')
+        server = WsgiApplication(application, batch=True)
+
+        input_string = msgpack.packb([
+            [0, 1, "div", [5]],
+            [0, 2, "div", [0]],
+            [0, 3, "nope", []],
+            [0, 4, "div", [2]],
+        ])
+
+        ret = server({
+            'CONTENT_LENGTH': str(len(input_string)),
+            'CONTENT_TYPE': 'application/x-msgpack',
+            'PATH_INFO': '/',
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '7000',
+            'REQUEST_METHOD': 'POST',
+            'wsgi.url_scheme': 'http',
+            'wsgi.input': BytesIO(input_string),
+        }, start_response)
+
+        ret = msgpack.unpackb(b''.join(ret), raw=False)
+        print(ret)
+
+        assert len(ret) == 4
+        assert ret[0] == [1, 0, None, {'divResult': 2}]
+        assert ret[1][2]['faultcode'] == 'Server'
+        assert ret[2][2]['faultcode'] == 'Client.ResourceNotFound'
+        assert ret[3] == [1, 0, None, {'divResult': 5}]
+
 
 if __name__ == '__main__':
     unittest.main()
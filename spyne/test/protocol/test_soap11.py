@@ -33,6 +33,7 @@ from spyne.decorator import rpc
 from spyne.interface.wsdl import Wsdl11
 from spyne.model.complex import Array
 from spyne.model.complex import ComplexModel
+from spyne.model.complex import Iterable
 from spyne.model.primitive import Unicode
 from spyne.model.primitive import DateTime, Date
 from spyne.model.primitive import Float
@@ -496,5 +497,37 @@ class TestSoapHeader(unittest.TestCase):
         self.assertEquals(ctx.in_header[2], None)
 
 
+class TestSoap11StreamInput(unittest.TestCase):
+    def test_stream_input(self):
+        class SomeService(ServiceBase):
+            @rpc(Unicode, Iterable(Integer), _returns=Integer)
+            def some_call(ctx, s, ints):
+                return len(s) + sum(ints)
+
+        app = Application([SomeService], 'tns',
+                          in_protocol=Soap11(stream_input=True),
+                          out_protocol=Soap11())
+        server = ServerBase(app)
+
+        initial_ctx = MethodContext(server, MethodContext.SERVER)
+        initial_ctx.in_string = [
+            b'<senv:Envelope xmlns:tns="tns" '
+                  b'xmlns:senv="http://schemas.xmlsoap.org/soap/envelope/">'
+                b'<senv:Body><tns:some_call><tns:s>abc</tns:s><tns:ints>',
+        ] + [b'<tns:integer>%d</tns:integer>' % i for i in range(10)] + [
+                b'</tns:ints></tns:some_call></senv:Body>'
+            b'</senv:Envelope>'
+        ]
+
+        ctx, = server.generate_contexts(initial_ctx)
+        assert ctx.method_request_string == '{tns}some_call'
+
+        server.get_in_object(ctx)
+        assert ctx.in_error is None
+
+        server.get_out_object(ctx)
+        assert ctx.out_object[0] == 3 + sum(range(10))
+
+
 if __name__ == '__main__':
     unittest.main()
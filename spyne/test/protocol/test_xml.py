@@ -41,7 +41,7 @@ from spyne.application import Application
 from spyne.decorator import srpc
 from spyne.util.six import BytesIO
 from spyne.model import Fault, Integer, Decimal, Unicode, Date, DateTime, \
-    XmlData, Array, ComplexModel, XmlAttribute, Mandatory as M
+    XmlData, Array, Iterable, ComplexModel, XmlAttribute, Mandatory as M
 from spyne.protocol.xml import XmlDocument
 from spyne.protocol.xml import SchemaValidationError
 
@@ -545,5 +545,224 @@ class TestIncremental(unittest.TestCase):
         assert obj.b is None
 
 
+class TestCompiledPlans(unittest.TestCase):
+    def _to_string(self, prot, cls, inst):
+        parent = etree.Element('parent')
+        prot.to_parent(None, cls, inst, parent, 'tns')
+        return etree.tostring(parent)
+
+    def test_same_output(self):
+        class Base(ComplexModel):
+            __namespace__ = 'tns'
+            i = Integer
+            s = Unicode(sub_name='ss', default='def')
+
+        class C(Base):
+            __namespace__ = 'tns'
+            a = XmlAttribute(Unicode)
+            d = Decimal(sub_ns='other')
+            m = M(Unicode)
+            e = Unicode(exc=True)
+            l = Unicode(max_occurs='unbounded')
+            c = Array(Base)
+
+        inst = C(i=1, a='x', d=decimal.Decimal('1.5'), e='hidden',
+                           l=['a', 'b'], c=[Base(i=2), Base(i=3, s='t')])
+
+        assert self._to_string(XmlDocument(), C, inst) == \
+                      self._to_string(XmlDocument(compile_plans=True), C, inst)
+
+    def test_invalidation(self):
+        class C(ComplexModel):
+            __namespace__ = 'tns'
+            i = Integer
+
+        prot = XmlDocument(compile_plans=True)
+        assert self._to_string(prot, C, C(i=1)) == \
+                      b'<parent><ns0:C xmlns:ns0="tns"><ns0:i>1</ns0:i>' \
+                      b'</ns0:C></parent>'
+
+        C.append_field('s', Unicode)
+        inst = C(i=1, s='a')
+        assert self._to_string(prot, C, inst) == \
+                                      self._to_string(XmlDocument(), C, inst)
+
+        C.insert_field(0, 't', Unicode)
+        inst = C(i=1, s='a', t='b')
+        assert self._to_string(prot, C, inst) == \
+                                      self._to_string(XmlDocument(), C, inst)
+
+
+class TestNoPush(unittest.TestCase):
+    def test_can_push(self):
+        class Leaf(ComplexModel):
+            i = Integer
+
+        class Plain(ComplexModel):
+            leaves = Array(Leaf)
+
+        class Pushy(ComplexModel):
+            leaves = Iterable(Leaf)
+
+        class Nested(ComplexModel):
+            p = Array(Pushy)
+
+        prot = XmlDocument()
+        assert not prot.can_push(Unicode)
+        assert not prot.can_push(Leaf)
+        assert not prot.can_push(Leaf, arrays=True)
+        assert not prot.can_push(Plain)
+        assert prot.can_push(Plain, arrays=True)
+        assert prot.can_push(Pushy)
+        assert prot.can_push(Nested)
+
+        Plain.append_field('more', Iterable(Unicode))
+        assert prot.can_push(Plain)
+
+    def _push(self, prot, cls, inst, values):
+        from spyne.util import Break
+
+        parent = etree.Element('parent')
+        ret = prot.to_parent(None, cls, inst, parent, 'tns')
+        if ret is not None:
+            for v in values:
+                ret.send(v)
+            try:
+                ret.throw(Break())
+            except StopIteration:
+                pass
+
+        return etree.tostring(parent)
+
+    def test_push_in_array(self):
+        class C(ComplexModel):
+            __namespace__ = 'tns'
+            i = Integer
+            s = Array(Unicode)
+
+        class Outer(ComplexModel):
+            __namespace__ = 'tns'
+            c = Array(C)
+            j = Integer
+
+        prot = XmlDocument()
+
+        expected = self._push(prot, C, C(i=1, s=['a', 'b']), [])
+        assert self._push(prot, C, C(i=1, s=Iterable.Push()), ['a', 'b']) \
+                                                                     == expected
+
+        inst = Outer(c=[C(i=1, s=['a']), C(i=2, s=['b', 'c'])], j=3)
+        expected = self._push(prot, Outer, inst, [])
+
+        inst.c[1].s = Iterable.Push()
+        assert self._push(prot, Outer, inst, ['b', 'c']) == expected
+
+    def test_nested_array(self):
+        class PushXmlDocument(XmlDocument):
+            def can_push(self, cls, arrays=False):
+                return True
+
+        class Leaf(ComplexModel):
+            __namespace__ = 'tns'
+            i = Integer
+            s = Unicode
+
+        class Node(ComplexModel):
+            __namespace__ = 'tns'
+            leaves = Array(Leaf)
+
+        cls = Array(Node)
+        inst = [Node(leaves=[Leaf(i=i, s='x'), Leaf(i=i, s='y')])
+                                                              for i in range(3)]
+
+        results = []
+        for prot in (PushXmlDocument(), XmlDocument()):
+            parent = etree.Element('parent')
+            prot.to_parent(None, cls, inst, parent, 'tns')
+            results.append(etree.tostring(parent))
+
+        assert results[0] == results[1]
+        assert results[0].count(b'<Leaf>') == 6
+
+
+class TestStreamInput(unittest.TestCase):
+    def _get_ctx(self, server, chunks):
+        initial_ctx = MethodContext(server, MethodContext.SERVER)
+        initial_ctx.in_string = chunks
+        ctx, = server.generate_contexts(initial_ctx)
+        return ctx
+
+    def test_iterable(self):
+        seen = []
+
+        class SomeService(ServiceBase):
+            @rpc(Unicode, Iterable(Integer), _returns=Integer)
+            def some_call(ctx, s, ints):
+                assert s == 'x'
+                retval = 0
+                for i in ints:
+                    # the wrapper element never accumulates children
+                    seen.append(len(ctx.in_body_doc[-1]))
+                    retval += i
+                return retval
+
+        app = Application([SomeService], 'tns',
+                       in_protocol=XmlDocument(stream_input=True),
+                       out_protocol=XmlDocument())
+        server = ServerBase(app)
+
+        ctx = self._get_ctx(server,
+                       [b'<some_call xmlns="tns"><s>x</s><ints>'] +
+                       [b'<integer>%d</integer>' % i for i in range(100)] +
+                       [b'</ints></some_call>'])
+        server.get_in_object(ctx)
+        assert ctx.in_error is None
+        server.get_out_object(ctx)
+        assert ctx.out_error is None
+
+        assert ctx.out_object[0] == sum(range(100))
+        assert len(seen) == 100
+        assert max(seen) <= 2
+
+    def test_non_iterable(self):
+        class SomeService(ServiceBase):
+            @rpc(Unicode, Array(Integer), _returns=Integer)
+            def some_call(ctx, s, ints):
+                return len(s) + sum(ints)
+
+        app = Application([SomeService], 'tns',
+                       in_protocol=XmlDocument(stream_input=True),
+                       out_protocol=XmlDocument())
+        server = ServerBase(app)
+
+        ctx = self._get_ctx(server, [b'<some_call xmlns="tns"><s>xy</s>',
+                                     b'<ints><integer>1</integer>',
+                                     b'<integer>2</integer></ints>',
+                                     b'</some_call>'])
+        server.get_in_object(ctx)
+        assert ctx.in_error is None
+        server.get_out_object(ctx)
+        assert ctx.out_object[0] == 5
+
+    def test_syntax_error(self):
+        class SomeService(ServiceBase):
+            @rpc(Unicode)
+            def some_call(ctx, s):
+                pass
+
+        app = Application([SomeService], 'tns',
+                       in_protocol=XmlDocument(stream_input=True),
+                       out_protocol=XmlDocument())
+        server = ServerBase(app)
+
+        ctx = self._get_ctx(server, [b'<some_call xmlns="tns"><s>x</s'])
+        server.get_in_object(ctx)
+        assert ctx.in_error.faultcode == 'Client.XMLSyntaxError'
+
+    def test_no_validation(self):
+        self.assertRaises(ValueError, XmlDocument, stream_input=True,
+                                                          validator='lxml')
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+
+import json
+import asyncio
+import threading
+import unittest
+
+from spyne.application import Application
+from spyne.decorator import rpc, srpc
+from spyne.error import ResourceNotFoundError
+from spyne.model.complex import Iterable
+from spyne.model.primitive import Integer, Unicode
+from spyne.protocol.http import HttpRpc
+from spyne.protocol.json import JsonDocument
+from spyne.service import ServiceBase
+from spyne.server.asgi import AsgiApplication
+
+
+def _call(app, path, query_string=b'', method='GET', body=b'', headers=(),
+                                                                   chunks=None):
+    if chunks is None:
+        chunks = [body]
+
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'query_string': query_string,
+        'headers': list(headers),
+        'server': ('testserver', 80),
+        'client': ('127.0.0.1', 12345),
+    }
+
+    incoming = [{'type': 'http.request', 'body': c, 'more_body': True}
+                                                                for c in chunks]
+    incoming[-1]['more_body'] = False
+    incoming = iter(incoming)
+
+    outgoing = []
+
+    async def receive():
+        return next(incoming)
+
+    async def send(message):
+        outgoing.append(message)
+
+    return scope, receive, send, outgoing
+
+
+def _run(app, path, **kwargs):
+    scope, receive, send, outgoing = _call(app, path, **kwargs)
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(app(scope, receive, send))
+    finally:
+        loop.close()
+
+    start = outgoing[0]
+    assert start['type'] == 'http.response.start'
+    assert not outgoing[-1].get('more_body', False)
+
+    return start['status'], dict(start['headers']), outgoing[1:]
+
+
+def _body(messages):
+    return b''.join(m['body'] for m in messages)
+
+
+class SomeService(ServiceBase):
+    @srpc(Unicode, _returns=Unicode)
+    def echo(s):
+        return s
+
+    @srpc(Unicode, _returns=Unicode)
+    async def async_echo(s):
+        await asyncio.sleep(0)
+        return s
+
+    @rpc(_returns=Unicode)
+    def thread_name(ctx):
+        return threading.current_thread().name
+
+    @srpc(_returns=Unicode)
+    async def async_fault():
+        raise ResourceNotFoundError('thing')
+
+    @srpc(_returns=Unicode)
+    async def async_error():
+        raise ValueError('oops')
+
+    @srpc(Integer, _returns=Iterable(Integer))
+    def count(n):
+        for i in range(n):
+            yield i
+
+
+def _get_app(**kwargs):
+    return AsgiApplication(Application([SomeService], 'tns',
+               in_protocol=HttpRpc(), out_protocol=JsonDocument()), **kwargs)
+
+
+class TestAsgiApplication(unittest.TestCase):
+    def test_sync(self):
+        status, headers, messages = _run(_get_app(), '/echo',
+                                                       query_string=b's=abc')
+        assert status == 200
+        assert headers[b'Content-Type'] == b'application/json'
+        assert _body(messages) == b'"abc"'
+
+    def test_async(self):
+        status, headers, messages = _run(_get_app(), '/async_echo',
+                                                       query_string=b's=abc')
+        assert status == 200
+        assert _body(messages) == b'"abc"'
+
+    def test_thread_pool(self):
+        _, _, messages = _run(_get_app(), '/thread_name')
+        assert json.loads(_body(messages).decode('utf8')) != \
+                                               threading.current_thread().name
+
+    def test_concurrency(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+
+        waiting = []
+        event = asyncio.Event()
+
+        class SlowService(ServiceBase):
+            @srpc(Integer, _returns=Integer)
+            async def wait(i):
+                waiting.append(i)
+                if len(waiting) == 100:
+                    event.set()
+                await event.wait()
+                return i
+
+        app = AsgiApplication(Application([SlowService], 'tns',
+                            in_protocol=HttpRpc(), out_protocol=JsonDocument()))
+
+        calls = [_call(app, '/wait', query_string=b'i=%d' % i)
+                                                           for i in range(100)]
+        try:
+            # all requests are pending at the same time in a single thread
+            loop.run_until_complete(asyncio.wait_for(asyncio.gather(
+                    *[app(s, r, se) for s, r, se, _ in calls]), timeout=5))
+        finally:
+            loop.close()
+            asyncio.set_event_loop(None)
+
+        for i, (_, _, _, outgoing) in enumerate(calls):
+            assert _body(outgoing[1:]) == str(i).encode('ascii')
+
+    def test_fault(self):
+        status, _, messages = _run(_get_app(), '/async_fault')
+        assert status == 404
+        assert b'thing' in _body(messages)
+
+        status, _, messages = _run(_get_app(), '/async_error')
+        assert status == 500
+
+    def test_stream(self):
+        status, headers, messages = _run(_get_app(), '/count',
+                                                         query_string=b'n=3')
+        assert status == 200
+        assert b'Content-Length' not in headers
+        assert json.loads(_body(messages).decode('utf8')) == [0, 1, 2]
+
+        status, headers, messages = _run(_get_app(chunked=False), '/count',
+                                                         query_string=b'n=3')
+        assert int(headers[b'Content-Length']) == len(_body(messages))
+
+    def test_post(self):
+        status, _, messages = _run(_get_app(), '/echo', method='POST',
+                chunks=[b's=a', b'bc'], headers=[
+                      (b'content-type', b'application/x-www-form-urlencoded')])
+        assert status == 200
+        assert _body(messages) == b'"abc"'
+
+    def test_request_too_long(self):
+        status, _, _ = _run(_get_app(max_content_length=4), '/echo',
+                                     method='POST', chunks=[b's=a', b'bcdef'])
+        assert status == 413
+
+    def test_compression(self):
+        import zlib
+        from spyne.server.http import HttpCompression
+
+        app = _get_app(compression=HttpCompression(min_length=10))
+
+        status, headers, messages = _run(app, '/count', query_string=b'n=100',
+                                     headers=[(b'accept-encoding', b'deflate')])
+        assert status == 200
+        assert headers[b'Content-Encoding'] == b'deflate'
+        assert json.loads(zlib.decompress(_body(messages)).decode('utf8')) == \
+                                                                list(range(100))
+
+        status, _, messages = _run(app, '/echo', method='POST',
+                chunks=[zlib.compress(b's=abc')], headers=[
+                      (b'content-type', b'application/x-www-form-urlencoded'),
+                      (b'content-encoding', b'deflate')])
+        assert status == 200
+        assert _body(messages) == b'"abc"'
+
+    def test_batch(self):
+        from spyne.protocol.json import JsonRpc
+
+        app = AsgiApplication(Application([SomeService], 'tns',
+                  in_protocol=JsonRpc('spyne'), out_protocol=JsonRpc('spyne')),
+                                                                    batch=True)
+
+        body = json.dumps([
+            {"ver": 1, "body": {"async_echo": {"s": "a"}}},
+            {"ver": 1, "body": {"echo": {"s": "b"}}},
+            {"ver": 1, "body": {"async_fault": {}}},
+        ]).encode('utf8')
+
+        status, _, messages = _run(app, '/', method='POST', body=body)
+        assert status == 200
+        ret = json.loads(_body(messages).decode('utf8'))
+        assert ret[0] == {"ver": 1, "body": "a"}
+        assert ret[1] == {"ver": 1, "body": "b"}
+        assert ret[2]['fault']['faultcode'] == 'Client.ResourceNotFound'
+
+    def test_wsdl(self):
+        status, headers, messages = _run(_get_app(), '/', query_string=b'wsdl')
+        assert status == 200
+        assert b'http://testserver/' in _body(messages)
+
+    def test_wsdl_etag_gzip(self):
+        import gzip
+        from io import BytesIO
+
+        app = _get_app()
+        status, headers, messages = _run(app, '/', query_string=b'wsdl')
+        data = _body(messages)
+        assert not (b'Content-Encoding' in headers)
+        etag = headers[b'ETag']
+
+        status, headers, messages = _run(app, '/', query_string=b'wsdl',
+                                  headers=[(b'accept-encoding', b'gzip')])
+        gzipped = _body(messages)
+        assert status == 200
+        assert headers[b'Content-Encoding'] == b'gzip'
+        assert headers[b'Content-Length'] == str(len(gzipped)).encode('ascii')
+        assert gzip.GzipFile(fileobj=BytesIO(gzipped)).read() == data
+
+        status, headers, messages = _run(app, '/', query_string=b'wsdl',
+                                           headers=[(b'if-none-match', etag)])
+        assert status == 304
+        assert headers[b'ETag'] == etag
+        assert _body(messages) == b''
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+
+import os
+import time
+import signal
+import unittest
+
+from multiprocessing import Value
+from threading import Thread
+
+from spyne.util.six.moves.urllib.request import urlopen
+
+from spyne.application import Application
+from spyne.decorator import srpc
+from spyne.model.primitive import Double, Integer, Unicode
+from spyne.protocol.http import HttpRpc
+from spyne.protocol.json import JsonDocument
+from spyne.service import ServiceBase
+from spyne.server.prefork import PreforkServer
+
+
+class SomeService(ServiceBase):
+    @srpc(Unicode, _returns=Unicode)
+    def echo(s):
+        return s
+
+    @srpc(_returns=Integer)
+    def get_pid():
+        return os.getpid()
+
+    @srpc(Double, _returns=Unicode)
+    def sleep(t):
+        TestPreforkServer.sleeping.value = 1
+        time.sleep(t)
+        return 'done'
+
+
+def _get_app():
+    return Application([SomeService], 'tns', in_protocol=HttpRpc(),
+                                                   out_protocol=JsonDocument())
+
+
+@unittest.skipIf(not hasattr(os, 'fork'), "os.fork() is not available")
+class TestPreforkServer(unittest.TestCase):
+    # shared with the worker processes
+    sleeping = Value('i', 0)
+
+    def _start(self, **kwargs):
+        server = PreforkServer(_get_app(), port=0, **kwargs)
+        server.bind()
+
+        pid = os.fork()
+        if pid == 0:
+            status = 1
+            try:
+                server.serve_forever()
+                status = 0
+            finally:
+                os._exit(status)
+
+        server.socket.close()
+
+        def _stop():
+            self._stop = lambda: None
+            os.kill(pid, signal.SIGTERM)
+            _, status = os.waitpid(pid, 0)
+            assert status == 0
+
+        self._stop = _stop
+        self.addCleanup(lambda: self._stop())
+
+        return server, 'http://127.0.0.1:%d/' % server.address[1]
+
+    def _wait_for(self, cond, timeout=5):
+        deadline = time.time() + timeout
+        while not cond() and time.time() < deadline:
+            time.sleep(0.01)
+        assert cond()
+
+    def test_serve(self):
+        server, url = self._start(workers=2)
+
+        assert urlopen(url + 'echo?s=abc').read() == b'"abc"'
+
+        wsdl = urlopen(url + '?wsdl').read()
+        assert b'definitions' in wsdl
+        assert url.encode('ascii') in wsdl
+
+        self._wait_for(lambda: sum(server.get_request_counts()) == 2)
+
+    def test_wildcard_host(self):
+        server, url = self._start(workers=1, host='0.0.0.0')
+        assert server.url is None
+
+        wsdl = urlopen(url + '?wsdl').read()
+        assert url.encode('ascii') in wsdl
+        assert not b'0.0.0.0' in wsdl
+
+    def test_url(self):
+        server, url = self._start(workers=1, host='0.0.0.0',
+                                               url='http://example.com/soap/')
+
+        wsdl = urlopen(url + '?wsdl').read()
+        assert b'http://example.com/soap/' in wsdl
+
+    def test_max_requests(self):
+        server, url = self._start(workers=1, max_requests=2)
+
+        pids = set()
+        for _ in range(6):
+            pids.add(int(urlopen(url + 'get_pid').read()))
+
+        # every worker process serves two requests and gets replaced.
+        assert len(pids) == 3
+
+    def test_graceful_stop(self):
+        server, url = self._start(workers=1)
+
+        result = []
+        t = Thread(target=lambda: result.append(
+                                       urlopen(url + 'sleep?t=0.5').read()))
+        t.start()
+
+        self._wait_for(lambda: self.sleeping.value == 1)
+        self._stop()
+        t.join()
+
+        assert result == [b'"done"']
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -24,8 +24,14 @@
 import logging
 logging.basicConfig(level=logging.DEBUG)
 
+import os
+import shutil
+import sqlite3
 import unittest
 
+from tempfile import mkdtemp
+from tempfile import mkstemp
+
 from spyne.util.six import BytesIO
 
 from lxml import etree
@@ -38,12 +44,18 @@ from spyne.decorator import rpc, srpc
 from spyne.application import Application
 from spyne.auxproc.sync import SyncAuxProc
 from spyne.auxproc.thread import ThreadAuxProc
+from spyne.auxproc.process import ProcessAuxProc
+from spyne.auxproc.journal import JournalAuxProc
 from spyne.protocol.http import HttpRpc
 from spyne.protocol.soap import Soap11
 from spyne.server.null import NullServer
 from spyne.server.wsgi import WsgiApplication
 from spyne.model import Array, SelfReference, Iterable, ComplexModel, String, \
-    Unicode
+    Unicode, Integer
+from spyne.model.fault import Fault
+from spyne.protocol.json import JsonDocument
+from spyne.util.cache import ResponseCache, SingleFlight
+from spyne.util.test import call_wsgi_app_kwargs
 
 
 Application.transport = 'test'
@@ -168,6 +180,113 @@ class TestMultipleMethods(unittest.TestCase):
 
         assert data == set(['hey', 'heyaux'])
 
+    def __call_json(self, server, data):
+        return b''.join(server({
+            'QUERY_STRING': '',
+            'PATH_INFO': '/',
+            'REQUEST_METHOD': 'POST',
+            'CONTENT_TYPE': 'application/json; charset=utf8',
+            'SERVER_NAME': 'localhost',
+            'wsgi.input': BytesIO(data),
+        }, start_response, "http://null"))
+
+    def test_process_aux_wsgi(self):
+        fd, path = mkstemp()
+        os.close(fd)
+
+        class Service(ServiceBase):
+            @srpc(String, _returns=String)
+            def call(s):
+                return s
+
+        class AuxService(ServiceBase):
+            __aux__ = ProcessAuxProc()
+
+            @srpc(String, _returns=String)
+            def call(s):
+                with open(path, 'a') as f:
+                    f.write("%s %d\n" % (s, os.getpid()))
+
+        jobs = []
+        AuxService.__aux__.event_manager.add_listener('aux_done',
+                                                      lambda job: jobs.append(job))
+
+        app = Application([Service, AuxService], 'tns',
+                         in_protocol=JsonDocument(), out_protocol=JsonDocument())
+        server = WsgiApplication(app)
+        try:
+            ret = self.__call_json(server, b'{"call": {"s": "hey"}}')
+            assert ret == b'"hey"'
+        finally:
+            AuxService.__aux__.close()
+
+        with open(path) as f:
+            data = f.read().split()
+        os.unlink(path)
+
+        assert data[0] == 'hey'
+        assert int(data[1]) != os.getpid()
+
+        assert len(jobs) == 1
+        assert jobs[0].error is None
+        assert jobs[0].depth == 0
+        assert jobs[0].latency > 0
+
+    def test_journal_aux_wsgi(self):
+        data = []
+        tmpdir = mkdtemp()
+        path = os.path.join(tmpdir, 'journal.db')
+
+        class Service(ServiceBase):
+            @srpc(String, _returns=String)
+            def call(s):
+                return s
+
+        class AuxService(ServiceBase):
+            __aux__ = JournalAuxProc(path, interval=60, retry_delay=0)
+
+            @srpc(String, _returns=String)
+            def call(s):
+                data.append(s)
+                if s == 'fail' or len(data) == 1:
+                    raise Exception("boom")
+
+        events = []
+        for e in ('aux_enqueue', 'aux_retry', 'aux_done'):
+            AuxService.__aux__.event_manager.add_listener(e,
+                             lambda job, e=e: events.append((e, job.attempts)))
+
+        app = Application([Service, AuxService], 'tns',
+                         in_protocol=JsonDocument(), out_protocol=JsonDocument())
+        server = WsgiApplication(app)
+        try:
+            self.__call_json(server, b'{"call": {"s": "hey"}}')
+            AuxService.__aux__.close()
+
+            # the first attempt fails, the second one succeeds
+            assert data == ['hey', 'hey']
+            assert events == [('aux_enqueue', 0), ('aux_retry', 1),
+                                                               ('aux_done', 2)]
+
+            # jobs that keep failing stay in the journal
+            del data[:], events[:]
+            AuxService.__aux__.initialize(server)
+            self.__call_json(server, b'{"call": {"s": "fail"}}')
+            AuxService.__aux__.close()
+
+            assert data == ['fail'] * 3
+            assert events[-1] == ('aux_done', 3)
+
+            db = sqlite3.connect(path)
+            rows = db.execute("SELECT attempts, error FROM %s"
+                                   % JournalAuxProc.TABLE_NAME).fetchall()
+            db.close()
+            assert rows == [(3, "Fault(Server: 'Internal Error')")]
+
+        finally:
+            AuxService.__aux__.close()
+            shutil.rmtree(tmpdir)
+
     def test_mixing_primary_and_aux_methods(self):
         try:
             class Service(ServiceBase):
@@ -425,5 +544,343 @@ class TestBodyStyle(unittest.TestCase):
         else:
             raise Exception("Must fail with: "
                         "'SelfReference can't be used inside @rpc and its ilk'")
+
+
+class TestResponseCache(unittest.TestCase):
+    def _get_app(self, cache):
+        calls = []
+
+        class SomeClass(ComplexModel):
+            i = Integer
+            s = Unicode
+
+        class SomeService(ServiceBase):
+            @rpc(Unicode, SomeClass, _returns=Unicode, _cache=cache)
+            def some_call(ctx, s, c):
+                calls.append(s)
+                if s == 'error':
+                    raise Fault('Client.Error', 'error')
+                return '%s %s' % (s, c.i if c is not None else None)
+
+        app = Application([SomeService], 'tns', in_protocol=HttpRpc(),
+                                                   out_protocol=JsonDocument())
+
+        return WsgiApplication(app), calls
+
+    def test_hit(self):
+        cache = ResponseCache()
+        server, calls = self._get_app(cache)
+
+        for _ in range(3):
+            ret = call_wsgi_app_kwargs(server, s='a', **{'c.i': 5})
+            assert ret == b'"a 5"'
+
+        assert calls == ['a']
+        assert cache.hits == 2
+        assert cache.misses == 1
+
+        ret = call_wsgi_app_kwargs(server, s='a', **{'c.i': 6})
+        assert ret == b'"a 6"'
+        ret = call_wsgi_app_kwargs(server, s='b', **{'c.i': 5})
+        assert ret == b'"b 5"'
+
+        assert calls == ['a', 'a', 'b']
+
+    def test_fault(self):
+        cache = ResponseCache()
+        server, calls = self._get_app(cache)
+
+        call_wsgi_app_kwargs(server, s='error')
+        call_wsgi_app_kwargs(server, s='error')
+
+        assert calls == ['error', 'error']
+        assert len(cache.store) == 0
+
+    def test_eviction_and_events(self):
+        cache = ResponseCache(max_entries=2)
+        server, calls = self._get_app(cache)
+
+        events = []
+        app = server.app
+        app.event_manager.add_listener('method_cache_hit',
+                                          lambda ctx: events.append('hit'))
+        app.event_manager.add_listener('method_cache_miss',
+                                          lambda ctx: events.append('miss'))
+        app.event_manager.add_listener('method_cache_evict',
+                                 lambda ctx, n: events.append(('evict', n)))
+
+        for s in ('a', 'b', 'a', 'c', 'b'):
+            call_wsgi_app_kwargs(server, s=s)
+
+        assert calls == ['a', 'b', 'c', 'b']
+        assert events == ['miss', 'miss', 'hit', 'miss', ('evict', 1),
+                                                      'miss', ('evict', 1)]
+        assert cache.evictions == 2
+
+    def test_hit_finalization(self):
+        from spyne.server.metrics import Metrics
+
+        cache = ResponseCache()
+        server, calls = self._get_app(cache)
+        server.metrics = metrics = Metrics()
+
+        events = []
+        service = server.app.services[0]
+        service.event_manager.add_listener('method_return_document',
+                                        lambda ctx: events.append('document'))
+        service.event_manager.add_listener('method_return_string',
+                                        lambda ctx: events.append(ctx.cache_hit))
+
+        for _ in range(2):
+            ret = call_wsgi_app_kwargs(server, s='a')
+            assert ret == b'"a None"'
+
+        assert calls == ['a']
+        assert events == ['document', False, 'document', True]
+
+        _, counters = metrics.collect()
+        assert counters[('response_bytes_total', (('method', 'some_call'),))] \
+                                                                    == 2 * len(ret)
+
+    def test_protocol_headers(self):
+        from spyne.model import File
+        from spyne.protocol.csv import Csv
+
+        calls = []
+
+        class SomeClass(ComplexModel):
+            i = Integer
+
+        class SomeService(ServiceBase):
+            @rpc(Unicode, _returns=File, _cache=ResponseCache())
+            def get_file(ctx, s):
+                calls.append(s)
+                return File.Value(data=[s.encode('ascii')],
+                                                        type='application/pdf')
+
+            @rpc(Integer, _returns=Array(SomeClass), _cache=ResponseCache())
+            def get_csv(ctx, i):
+                calls.append(i)
+                return [SomeClass(i=i)]
+
+        def call(server, mn, qs):
+            headers = []
+            def start_response(status, h):
+                headers.extend(h)
+
+            body = server({
+                'QUERY_STRING': qs,
+                'PATH_INFO': '/%s' % mn,
+                'REQUEST_METHOD': 'GET',
+                'SERVER_NAME': 'spyne.test',
+                'SERVER_PORT': '0',
+                'wsgi.url_scheme': 'http',
+            }, start_response)
+
+            # Csv returns native strings
+            body = b''.join(b if isinstance(b, bytes) else b.encode('utf8')
+                                                                 for b in body)
+
+            return dict(headers), body
+
+        app = Application([SomeService], 'tns', in_protocol=HttpRpc(),
+                                                        out_protocol=HttpRpc())
+        server = WsgiApplication(app)
+
+        first = call(server, 'get_file', 's=abc')
+        assert first[0]['Content-Type'] == 'application/pdf'
+        assert first[1] == b'abc'
+        assert call(server, 'get_file', 's=abc') == first
+
+        app = Application([SomeService], 'tns', in_protocol=HttpRpc(),
+                                                            out_protocol=Csv())
+        server = WsgiApplication(app)
+
+        first = call(server, 'get_csv', 'i=5')
+        assert 'get_csv.csv' in first[0]['Content-Disposition']
+        assert call(server, 'get_csv', 'i=5') == first
+
+        assert calls == ['abc', 5]
+
+    def test_ttl(self):
+        cache = ResponseCache(ttl=0)
+        server, calls = self._get_app(cache)
+
+        call_wsgi_app_kwargs(server, s='a')
+        call_wsgi_app_kwargs(server, s='a')
+
+        assert calls == ['a', 'a']
+
+    def test_key(self):
+        cache = ResponseCache(key=lambda ctx: ctx.in_object.s[:1])
+        server, calls = self._get_app(cache)
+
+        assert call_wsgi_app_kwargs(server, s='ab') == b'"ab None"'
+        assert call_wsgi_app_kwargs(server, s='ac') == b'"ab None"'
+
+        assert calls == ['ab']
+
+
+class TestSingleFlight(unittest.TestCase):
+    def _get_app(self, coalesce, release):
+        calls = []
+
+        class SomeService(ServiceBase):
+            @rpc(Unicode, _returns=Unicode, _coalesce=coalesce)
+            def some_call(ctx, s):
+                calls.append(s)
+                release.wait()
+                if s == 'error':
+                    raise Fault('Client.Error', 'error')
+                return s * 2
+
+        app = Application([SomeService], 'tns', in_protocol=HttpRpc(),
+                                                   out_protocol=JsonDocument())
+
+        return WsgiApplication(app), calls
+
+    def _get_generator_app(self, coalesce, release):
+        calls = []
+
+        class SomeService(ServiceBase):
+            @rpc(Integer, _returns=Iterable(Integer), _coalesce=coalesce)
+            def some_call(ctx, s):
+                calls.append(s)
+                release.wait()
+                return (i for i in range(s))
+
+        app = Application([SomeService], 'tns', in_protocol=HttpRpc(),
+                                                   out_protocol=JsonDocument())
+
+        return WsgiApplication(app), calls
+
+    def _run_threads(self, coalesce, args, get_app=None):
+        import threading
+        import time
+
+        if get_app is None:
+            get_app = self._get_app
+
+        release = threading.Event()
+        server, calls = get_app(coalesce, release)
+
+        results = [None] * len(args)
+        def run(i, s):
+            results[i] = call_wsgi_app_kwargs(server, s=s)
+
+        threads = [threading.Thread(target=run, args=(i, s))
+                                                   for i, s in enumerate(args)]
+        for t in threads:
+            t.start()
+
+        expected = len(args) - len(set(args))
+        for _ in range(500):
+            if coalesce.coalesced == expected:
+                break
+            time.sleep(0.01)
+
+        release.set()
+        for t in threads:
+            t.join()
+
+        return calls, results
+
+    def test_threads(self):
+        coalesce = SingleFlight()
+        calls, results = self._run_threads(coalesce, ['a'] * 5 + ['b'] * 3)
+
+        assert sorted(calls) == ['a', 'b']
+        assert results == [b'"aa"'] * 5 + [b'"bb"'] * 3
+        assert coalesce.calls == 2
+        assert coalesce.coalesced == 6
+        assert len(coalesce._calls) == 0
+
+    def test_generator(self):
+        coalesce = SingleFlight()
+        calls, results = self._run_threads(coalesce, [3] * 3,
+                                               self._get_generator_app)
+
+        # generators can only be consumed once, so every caller runs its own
+        assert calls == [3] * 3
+        assert results == [b'[0, 1, 2]'] * 3
+        assert len(coalesce._calls) == 0
+
+    def test_fault(self):
+        coalesce = SingleFlight()
+        calls, results = self._run_threads(coalesce, ['error'] * 3)
+
+        assert calls == ['error']
+        assert len(set(results)) == 1
+        assert b'Client.Error' in results[0]
+
+    def test_deferred(self):
+        from twisted.internet.defer import Deferred
+        from twisted.python.failure import Failure
+
+        coalesce = SingleFlight()
+        leader = Deferred()
+        calls = []
+
+        def func(x):
+            calls.append(x)
+            return leader
+
+        d1 = coalesce.call('k', func, 1)
+        d2 = coalesce.call('k', func, 2)
+        d3 = coalesce.call('k', func, 3)
+        assert d1 is leader
+        assert d2 is not leader and d3 is not leader
+        assert calls == [1]
+
+        results = []
+        d2.addCallback(results.append)
+        d3.addCallback(results.append)
+        leader.callback('r')
+
+        assert results == ['r', 'r']
+        assert len(coalesce._calls) == 0
+
+        # the next call runs again
+        errors = []
+        leader = Deferred()
+        d4 = coalesce.call('k', func, 4)
+        d5 = coalesce.call('k', func, 5)
+        d5.addErrback(errors.append)
+        leader.errback(ValueError())
+        d4.addErrback(lambda f: None)
+
+        assert calls == [1, 4]
+        assert len(errors) == 1 and isinstance(errors[0], Failure)
+        assert errors[0].check(ValueError)
+
+    def test_deferred_generator(self):
+        from twisted.internet.defer import Deferred
+
+        coalesce = SingleFlight()
+        leader = Deferred()
+        calls = []
+
+        def func(x):
+            calls.append(x)
+            if x == 1:
+                return leader
+            return (i for i in range(x))
+
+        d1 = coalesce.call('k', func, 1)
+        d2 = coalesce.call('k', func, 2)
+        d3 = coalesce.call('k', func, 3)
+        assert calls == [1]
+
+        results = []
+        d2.addCallback(lambda r: results.append(list(r)))
+        d3.addCallback(lambda r: results.append(list(r)))
+        leader.callback(i for i in range(1))
+
+        assert d1 is leader
+        assert calls == [1, 2, 3]
+        assert results == [[0, 1], [0, 1, 2]]
+        assert len(coalesce._calls) == 0
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -23,6 +23,8 @@
 
 import unittest
 
+from decimal import Decimal as D
+
 from spyne.application import Application
 from spyne.decorator import srpc
 from spyne.error import ValidationError
@@ -31,6 +33,12 @@ from spyne.protocol.http import HttpRpc
 from spyne.protocol.soap import Soap11
 from spyne.model.primitive import Integer
 from spyne.model.primitive import String
+from spyne.model import ComplexModel, Unicode, Decimal, Double, Boolean, \
+    Array, Enum, Integer8, UnsignedInteger16, UnsignedInteger, DateTime
+from spyne.model.primitive.number import PositiveInteger
+from spyne.protocol._validation import gen_string_validator, \
+    gen_native_validator
+from spyne.protocol.xml import XmlDocument
 from spyne.server import ServerBase
 from spyne.server.wsgi import WsgiApplication
 
@@ -175,5 +183,124 @@ class TestSoap11SoftValidation(unittest.TestCase):
 
         self.assertEquals(isinstance(ctx.in_error, ValidationError), True)
 
+
+class TestCompiledValidators(unittest.TestCase):
+    TYPES = (
+        Unicode, Unicode(nillable=False), Unicode(min_len=2, max_len=4),
+        Unicode(max_len=3), Unicode(pattern='[a-z]+'), String(min_len=1),
+        Unicode(values=['a', 'bb']), Unicode(values=['a'], nillable=False),
+        Decimal, Decimal(gt=1, le=D('5.5')), Decimal(ge=0, lt=10),
+        Decimal(gt=0, ge=1, lt=10, le=9), Double(ge=0), Double,
+        Integer, Integer(gt=2), Integer(ge=-3, le=3, nillable=False),
+        Integer8, UnsignedInteger16, UnsignedInteger, PositiveInteger,
+        Boolean, DateTime(ge=None), Enum('a', 'b', type_name='SomeEnum'),
+    )
+
+    STRINGS = (None, '', 'a', 'bb', 'abc', 'abcde', '1', '12', 'a1', 5)
+    TEXTS = (None, '', 'a', 'bb', 'abc', 'abcde', 'a1', True, False)
+    NUMBERS = (None, -200, -1, 0, 1, D('1.5'), 2, 3, 5, D('5.5'), 6, 9, 10,
+        255, 65535, 65536, 2.5, float('inf'), float('-inf'), float('nan'))
+
+    def _result(self, f, *args):
+        # e.g. comparing float('nan') with Decimal('inf') raises, while the
+        # compiled validators just reject it.
+        try:
+            return bool(f(*args))
+        except Exception:
+            return False
+
+    def test_equivalence(self):
+        for cls in self.TYPES:
+            vs = gen_string_validator(cls)
+            vn = gen_native_validator(cls)
+
+            for v in self.STRINGS:
+                expected = self._result(cls.validate_string, cls, v)
+                if vs is None:
+                    assert expected is True, (cls, v)
+                else:
+                    assert self._result(vs, v) == expected, (cls, v)
+
+            # the native values are the ones the protocols can produce.
+            natives = self.NUMBERS if issubclass(cls, Decimal) else self.TEXTS
+            for v in natives:
+                expected = self._result(cls.validate_native, cls, v)
+                if vn is None:
+                    assert expected is True, (cls, v)
+                else:
+                    assert self._result(vn, v) == expected, (cls, v)
+
+    def test_noop(self):
+        assert gen_string_validator(Unicode(values=['a'])) is not None
+        assert gen_native_validator(Decimal) is not None # rejects nan
+        assert gen_string_validator(Boolean) is None
+        assert gen_native_validator(Boolean) is None
+        assert gen_native_validator(Unicode) is None
+
+    def test_custom(self):
+        class SomeType(Unicode):
+            @staticmethod
+            def validate_native(cls, value):
+                return value == 'x'
+
+        vn = gen_native_validator(SomeType)
+        assert vn('x')
+        assert not vn('y')
+
+    def test_freq(self):
+        class SomeClass(ComplexModel):
+            a = Integer
+            b = Integer(min_occurs=1)
+            c = Array(Integer)
+            d = Integer(max_occurs='unbounded')
+            e = Integer(min_occurs=1, max_occurs=3)
+
+        prot = XmlDocument()
+        freq = prot.get_freq_validator(SomeClass)
+        assert freq == [('a', 0, 1), ('b', 1, 1), ('c', 0, 1), ('e', 1, 3)]
+        assert prot.get_freq_validator(SomeClass) is freq
+
+        SomeClass.append_field('f', Integer(min_occurs=2))
+        assert prot.get_freq_validator(SomeClass)[-1] == ('f', 2, 1)
+
+    def test_uncompiled(self):
+        from lxml import etree
+        from spyne.util.xml import get_object_as_xml
+
+        class Address(ComplexModel):
+            street = Unicode(max_len=50, min_occurs=1)
+            zip = Unicode(pattern='[0-9]{5}')
+            number = Integer(ge=1, le=10000)
+
+        class Person(ComplexModel):
+            name = Unicode(min_len=1, max_len=40, min_occurs=1)
+            age = Integer(ge=0, le=150)
+            score = Decimal(gt=0, lt=100)
+            email = Unicode(pattern=r'[^@]+@[^@]+')
+            color = Enum('red', 'green', type_name='Color')
+            addresses = Array(Address)
+            tags = Unicode(max_len=10, max_occurs=20)
+
+        inst = Person(name='John', age=30, score=D('55.5'), email='a@b.c',
+            color='red', tags=['t%d' % i for i in range(3)],
+            addresses=[Address(street='Main %d' % i, zip='12345', number=i + 1)
+                                                             for i in range(3)])
+        elt = get_object_as_xml(inst, Person)
+
+        # the validators as they were called before being compiled
+        class UncompiledXmlDocument(XmlDocument):
+            def get_validators(self, cls):
+                return (lambda v: cls.validate_string(cls, v),
+                        lambda v: cls.validate_native(cls, v))
+
+        results = []
+        for prot in (XmlDocument(validator='soft'),
+                                         UncompiledXmlDocument(validator='soft')):
+            ret = prot.from_element(None, Person, elt)
+            results.append(etree.tostring(get_object_as_xml(ret)))
+
+        assert results[0] == results[1]
+
+
 if __name__ == '__main__':
     unittest.main()
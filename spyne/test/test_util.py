@@ -425,6 +425,27 @@ class TestJson(unittest.TestCase):
         assert json.loads(ret.decode('utf8')) == \
                                         json.loads(u'{"a": "burak", "b": "30"}')
 
+    def test_backend(self):
+        from spyne.util.dictdoc import json_loads
+        from spyne.protocol.json import RapidJsonBackend
+
+        class C(ComplexModel):
+            a = Unicode
+            b = Integer
+
+        try:
+            backend = RapidJsonBackend()
+        except ImportError:
+            backend = None  # the default one
+
+        ret = get_object_as_json(C(a='burak', b=30), C, complex_as=dict,
+                                                               backend=backend)
+        assert json.loads(ret.decode('utf8')) == {"a": "burak", "b": 30}
+
+        obj = json_loads(ret, C, backend=backend)
+        assert obj.a == 'burak'
+        assert obj.b == 30
+
 class TestFifo(unittest.TestCase):
     def test_msgpack_fifo(self):
         import msgpack
@@ -455,5 +476,51 @@ class TestFifo(unittest.TestCase):
         assert next(iter(unpacker)) == v3
 
 
+class TestLazy(unittest.TestCase):
+    def test_is_importable(self):
+        from spyne.util.lazy import is_importable
+
+        assert is_importable('spyne')
+        assert is_importable('lxml')
+        assert not is_importable('spyne_there_is_no_such_module')
+
+    def test_module_getattr(self):
+        import sys
+        from types import ModuleType
+        from spyne.util.lazy import enable_module_getattr
+
+        calls = []
+
+        def __getattr__(name):
+            if name == 'lazy':
+                calls.append(name)
+                return 42
+            raise AttributeError(name)
+
+        module = ModuleType('spyne_test_lazy')
+        module.__getattr__ = __getattr__
+        module.eager = 1
+
+        sys.modules[module.__name__] = module
+        try:
+            enable_module_getattr(module.__name__, ('lazy',))
+            assert module.eager == 1
+            assert module.lazy == 42
+            assert not hasattr(module, 'missing')
+            assert calls
+
+        finally:
+            del sys.modules[module.__name__]
+
+    def test_protocol_modules(self):
+        import msgpack
+        import yaml
+        from spyne.protocol import msgpack as msgpack_prot
+        from spyne.protocol import yaml as yaml_prot
+
+        assert msgpack_prot.msgpack is msgpack
+        assert yaml_prot.yaml is yaml
+
+
 if __name__ == '__main__':
     unittest.main()
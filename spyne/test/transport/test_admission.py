@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+import threading
+import unittest
+
+from time import time, sleep
+
+from spyne.util.six import BytesIO
+
+from spyne import Application, ServiceBase, rpc
+from spyne.model import Integer, Unicode
+from spyne.protocol.http import HttpRpc
+from spyne.protocol.json import JsonDocument
+from spyne.server.admission import AdmissionController, Limit
+from spyne.server.wsgi import WsgiApplication
+
+
+class SomeService(ServiceBase):
+    @rpc(Integer, _returns=Integer)
+    def echo(ctx, i):
+        return i
+
+
+class OtherService(ServiceBase):
+    @rpc(_returns=Unicode)
+    def other(ctx):
+        return u'other'
+
+
+def _call(server, name, qs=''):
+    env = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': '/%s' % name,
+        'QUERY_STRING': qs,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '7000',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+    }
+
+    ret = []
+    def start_response(code, headers):
+        ret.append(code)
+        ret.append(dict(headers))
+
+    data = b''.join(server(env, start_response))
+    return ret[0], ret[1], data
+
+
+def _get_server(admission):
+    app = Application([SomeService, OtherService], 'tns',
+                          in_protocol=HttpRpc(), out_protocol=JsonDocument())
+    return WsgiApplication(app, admission=admission)
+
+
+class TestLimit(unittest.TestCase):
+    def test_in_flight(self):
+        limit = Limit(max_in_flight=1)
+
+        assert limit.acquire()
+        assert not limit.acquire()
+        assert limit.in_flight == 1
+
+        limit.release()
+        assert limit.acquire()
+
+    def test_queue(self):
+        limit = Limit(max_in_flight=1, max_queued=1, timeout=2)
+        assert limit.acquire()
+
+        def release():
+            sleep(0.1)
+            limit.release()
+
+        threading.Thread(target=release).start()
+
+        t = time()
+        assert limit.acquire()
+        assert time() - t >= 0.05
+        assert limit.queued == 0
+
+    def test_queue_full(self):
+        limit = Limit(max_in_flight=1, max_queued=1, timeout=0.5)
+        assert limit.acquire()
+
+        ret = []
+        t = threading.Thread(target=lambda: ret.append(limit.acquire()))
+        t.start()
+        while limit.queued == 0:
+            sleep(0.01)
+
+        # the queue is full, so this one does not wait
+        t0 = time()
+        assert not limit.acquire()
+        assert time() - t0 < 0.25
+
+        t.join()
+        assert ret == [False]
+
+    def test_rate(self):
+        limit = Limit(rate=10, burst=2, max_queued=1, timeout=1)
+
+        assert limit.acquire()
+        assert limit.acquire()
+        assert not limit.acquire(block=False)
+        assert 0 < limit.get_retry_after() <= 0.1
+
+        t = time()
+        assert limit.acquire()
+        assert time() - t >= 0.05
+        assert limit.in_flight == 3
+
+
+class TestAdmissionController(unittest.TestCase):
+    def test_method_limit(self):
+        limit = Limit(rate=1, burst=1)
+        server = _get_server(AdmissionController(methods={'echo': limit}))
+
+        code, headers, data = _call(server, 'echo', 'i=1')
+        assert code.startswith('200'), code
+        assert data == b'1'
+        assert limit.in_flight == 0
+
+        code, headers, data = _call(server, 'echo', 'i=2')
+        assert code.startswith('503'), code
+        assert headers['Retry-After'] == '1'
+        assert b'Server.ServiceUnavailable' in data
+
+        # other methods are not affected
+        code, headers, data = _call(server, 'other')
+        assert code.startswith('200'), code
+
+    def test_service_limit(self):
+        limit = Limit(max_in_flight=0)
+        server = _get_server(AdmissionController(
+                                              services={OtherService: limit}))
+
+        code, headers, data = _call(server, 'echo', 'i=1')
+        assert code.startswith('200'), code
+
+        code, headers, data = _call(server, 'other')
+        assert code.startswith('503'), code
+        assert headers['Retry-After'] == '1'
+
+    def test_queue_wait(self):
+        default = Limit(max_in_flight=1, max_queued=1, timeout=2)
+        server = _get_server(AdmissionController(default=default))
+
+        waits = []
+        server.event_manager.add_listener('wsgi_close',
+                                         lambda ctx: waits.append(ctx.queue_wait))
+
+        assert default.acquire()
+        def release():
+            sleep(0.1)
+            default.release()
+        threading.Thread(target=release).start()
+
+        code, headers, data = _call(server, 'echo', 'i=1')
+        assert code.startswith('200'), code
+        assert waits[0] >= 0.05
+        assert default.in_flight == 0
+
+
+class TestTwistedAdmission(unittest.TestCase):
+    def test_in_flight(self):
+        from twisted.internet.defer import Deferred
+        from twisted.web.test.requesthelper import DummyRequest
+        from spyne.server.twisted import TwistedWebResource
+
+        deferreds = []
+
+        class DeferredService(ServiceBase):
+            @rpc(_returns=Integer)
+            def later(ctx):
+                d = Deferred()
+                deferreds.append(d)
+                return d
+
+        limit = Limit(max_in_flight=1, max_queued=10, timeout=10)
+        app = Application([DeferredService], 'tns',
+                        in_protocol=JsonDocument(), out_protocol=JsonDocument())
+        resource = TwistedWebResource(app,
+                                 admission=AdmissionController(default=limit))
+
+        def request():
+            retval = DummyRequest([b''])
+            retval.method = b'POST'
+            retval.uri = b'/'
+            retval.content = BytesIO(b'{"later": {}}')
+            return retval
+
+        first = request()
+        resource.render(first)
+        assert not first.finished
+        assert limit.in_flight == 1
+
+        # the reactor must not block, so the request is rejected right away
+        second = request()
+        ret = resource.render(second)
+        assert second.responseCode == 503
+        assert second.responseHeaders.getRawHeaders(b'Retry-After') == [b'10']
+        assert b'Server.ServiceUnavailable' in ret
+
+        deferreds[0].callback(42)
+        assert first.finished
+        assert limit.in_flight == 0
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+
+import json
+import threading
+import unittest
+
+from spyne.util.six import BytesIO
+
+from spyne import Application, ServiceBase, rpc
+from spyne.error import ArgumentError
+from spyne.model import Integer, Boolean
+from spyne.protocol.json import JsonRpc
+from spyne.server.admission import AdmissionController, Limit
+from spyne.server.batch import BatchProcessor
+from spyne.server.wsgi import WsgiApplication
+
+
+class SomeService(ServiceBase):
+    event = threading.Event()
+
+    @rpc(Integer, _returns=Integer)
+    def div(ctx, i):
+        return 10 // i
+
+    @rpc(Integer, _returns=Integer, _cache=True)
+    def cached_div(ctx, i):
+        return 10 // i
+
+    @rpc(_returns=Boolean)
+    def wait(ctx):
+        return SomeService.event.wait(2)
+
+    @rpc()
+    def notify(ctx):
+        SomeService.event.set()
+
+
+def _call(server, doc):
+    body = json.dumps(doc).encode('utf8')
+    env = {
+        'REQUEST_METHOD': 'POST',
+        'PATH_INFO': '/',
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '7000',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(body),
+    }
+
+    status = []
+    def start_response(code, headers):
+        status.append(code)
+
+    data = b''.join(server(env, start_response))
+    return status[0], json.loads(data.decode('utf8'))
+
+
+def _get_app():
+    return Application([SomeService], 'tns', in_protocol=JsonRpc('spyne'),
+                                               out_protocol=JsonRpc('spyne'))
+
+
+def _req(name, **kwargs):
+    return {"ver": 1, "body": {name: kwargs}}
+
+
+class TestWsgiBatch(unittest.TestCase):
+    def setUp(self):
+        SomeService.event.clear()
+
+    def test_batch(self):
+        server = WsgiApplication(_get_app(), batch=True)
+
+        code, ret = _call(server, [_req('div', i=5), _req('div', i=0),
+                                   _req('nope'), {"ver": 1}, _req('div', i=2)])
+
+        assert code.startswith('200'), code
+        assert ret[0] == {"ver": 1, "body": 2}
+        assert ret[1]['fault']['faultcode'] == 'Server'
+        assert ret[2]['fault']['faultcode'] == 'Client.ResourceNotFound'
+        assert ret[3]['fault']['faultcode'] == 'Client.ValidationError'
+        assert ret[4] == {"ver": 1, "body": 5}
+
+    def test_single(self):
+        server = WsgiApplication(_get_app(), batch=True)
+
+        code, ret = _call(server, _req('div', i=5))
+        assert ret == {"ver": 1, "body": 2}
+
+    def test_concurrent(self):
+        # wait would time out if the calls were run one after the other.
+        server = WsgiApplication(_get_app(),
+                                        batch=BatchProcessor(max_workers=2))
+
+        code, ret = _call(server, [_req('wait'), _req('notify')])
+        assert ret[0] == {"ver": 1, "body": True}
+
+    def test_limits(self):
+        server = WsgiApplication(_get_app(), batch=BatchProcessor(max_size=2))
+
+        code, ret = _call(server, [])
+        assert code.startswith('400'), code
+        assert ret['fault']['faultcode'] == 'Client.ValidationError'
+
+        code, ret = _call(server, [_req('div', i=1)] * 3)
+        assert code.startswith('413'), code
+        assert ret['fault']['faultcode'] == 'Client.RequestTooLong'
+
+    def test_cache(self):
+        server = WsgiApplication(_get_app(), batch=True)
+
+        # the second call is answered from the cache
+        for _ in range(2):
+            code, ret = _call(server, _req('cached_div', i=5))
+            assert ret == {"ver": 1, "body": 2}
+
+        code, ret = _call(server, [_req('cached_div', i=5)] * 2)
+        assert ret == [{"ver": 1, "body": 2}] * 2
+
+    def test_admission(self):
+        default = Limit(max_in_flight=1)
+        div = Limit(max_in_flight=1)
+        admission = AdmissionController(default=default, methods={'div': div})
+        server = WsgiApplication(_get_app(), batch=True, admission=admission)
+
+        # the request takes the only default slot, its calls don't need it.
+        # the method limit holds for calls inside the batch.
+        code, ret = _call(server, [_req('div', i=5), _req('div', i=2),
+                                                               _req('notify')])
+
+        assert code.startswith('200'), code
+        assert ret[0] == {"ver": 1, "body": 2}
+        assert ret[1]['fault']['faultcode'] == 'Server.ServiceUnavailable'
+        assert ret[2] == {"ver": 1, "body": {}}
+
+        assert default.in_flight == 0
+        assert div.in_flight == 0
+
+    def test_disabled(self):
+        server = WsgiApplication(_get_app())
+
+        code, ret = _call(server, [_req('div', i=5)])
+        assert ret['fault']['faultcode'] == 'Client.ValidationError'
+
+
+class TestTwistedBatch(unittest.TestCase):
+    def test_batch(self):
+        from twisted.internet.defer import Deferred
+        from twisted.web.test.requesthelper import DummyRequest
+        from spyne.server.twisted import TwistedWebResource
+
+        deferreds = []
+
+        class DeferredService(ServiceBase):
+            @rpc(Integer, _returns=Integer)
+            def later(ctx, i):
+                d = Deferred()
+                deferreds.append((d, i))
+                return d
+
+            @rpc(Integer, _returns=Integer)
+            def now(ctx, i):
+                return i
+
+        app = Application([DeferredService], 'tns',
+                  in_protocol=JsonRpc('spyne'), out_protocol=JsonRpc('spyne'))
+        resource = TwistedWebResource(app, batch=True)
+
+        request = DummyRequest([b''])
+        request.method = b'POST'
+        request.uri = b'/'
+        request.content = BytesIO(json.dumps([_req('later', i=1),
+                   _req('now', i=2), _req('later', i=3)]).encode('utf8'))
+
+        resource.render(request)
+        assert not request.finished
+        assert len(deferreds) == 2
+
+        deferreds[1][0].callback(3)
+        assert not request.finished
+
+        deferreds[0][0].errback(ArgumentError("no"))
+        assert request.finished
+
+        ret = json.loads(b''.join(request.written).decode('utf8'))
+        assert ret[0]['fault']['faultcode'] == 'Client.ArgumentError'
+        assert ret[1] == {"ver": 1, "body": 2}
+        assert ret[2] == {"ver": 1, "body": 3}
+
+
+if __name__ == '__main__':
+    unittest.main()
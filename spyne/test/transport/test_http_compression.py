@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+
+import gzip
+import json
+import zlib
+import unittest
+
+from spyne.util.six import BytesIO
+
+from spyne import Application, ServiceBase, rpc
+from spyne.model import Integer, Unicode, Iterable
+from spyne.protocol.json import JsonDocument
+from spyne.server.http import HttpCompression, negotiate_encoding
+from spyne.server.wsgi import WsgiApplication
+from spyne.util.compress import compress_chunks, decompress_chunks
+from spyne.error import InvalidInputError, RequestTooLongError
+
+
+class SomeService(ServiceBase):
+    @rpc(Unicode, Integer, _returns=Iterable(Unicode))
+    def some_call(ctx, s, n):
+        for _ in range(n):
+            yield s
+
+
+def _gunzip(data):
+    return gzip.GzipFile(fileobj=BytesIO(data)).read()
+
+
+def _call(server, body, **headers):
+    env = {
+        'REQUEST_METHOD': 'POST',
+        'PATH_INFO': '/',
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '7000',
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(body),
+    }
+    env.update(headers)
+
+    status = []
+    def start_response(code, headers):
+        status.append((code, dict(headers)))
+
+    chunks = list(server(env, start_response))
+    return status[0][0], status[0][1], chunks
+
+
+def _get_server(**kwargs):
+    app = Application([SomeService], 'tns', in_protocol=JsonDocument(),
+                                                    out_protocol=JsonDocument())
+    return WsgiApplication(app, **kwargs)
+
+
+def _body(s, n):
+    return json.dumps({"some_call": {"s": s, "n": n}}).encode('utf8')
+
+
+class TestCompressHelpers(unittest.TestCase):
+    def test_negotiate(self):
+        codings = ('gzip', 'deflate')
+
+        assert negotiate_encoding(None, codings) is None
+        assert negotiate_encoding('identity', codings) is None
+        assert negotiate_encoding('gzip, deflate', codings) == 'gzip'
+        assert negotiate_encoding('deflate, gzip;q=0.5', codings) == 'deflate'
+        assert negotiate_encoding('*', codings) == 'gzip'
+        assert negotiate_encoding('*, gzip;q=0', codings) == 'deflate'
+        assert negotiate_encoding('GZIP;q=0', codings) is None
+
+    def test_roundtrip(self):
+        data = [b'abc' * 1000, b'', b'def' * 1000]
+        for coding in ('gzip', 'deflate'):
+            compressed = list(compress_chunks(data, coding))
+            assert b''.join(decompress_chunks(compressed, coding)) == \
+                                                                b''.join(data)
+
+    def test_max_length(self):
+        bomb = zlib.compress(b'\0' * (1024 * 1024))
+
+        assert len(b''.join(decompress_chunks([bomb], 'deflate',
+                                                    max_length=1024 * 1024))) \
+                                                               == 1024 * 1024
+
+        gen = decompress_chunks([bomb], 'deflate', max_length=1024 * 1024 - 1)
+        self.assertRaises(RequestTooLongError, list, gen)
+
+    def test_invalid(self):
+        self.assertRaises(InvalidInputError, list,
+                                      decompress_chunks([b'abc'], 'gzip'))
+        self.assertRaises(InvalidInputError, list,
+                                     decompress_chunks([b'abc'], 'compress'))
+
+    def test_mime_types(self):
+        c = HttpCompression()
+        assert c.is_compressible('application/json; charset=utf8')
+        assert c.is_compressible('text/xml')
+        assert c.is_compressible('application/soap+xml; charset=utf-8')
+        assert not c.is_compressible('application/x-msgpack')
+        assert not c.is_compressible(None)
+
+
+class TestWsgiCompression(unittest.TestCase):
+    def test_response(self):
+        server = _get_server(compression=HttpCompression(min_length=100))
+
+        code, headers, chunks = _call(server, _body('a', 100),
+                                        HTTP_ACCEPT_ENCODING='gzip, deflate')
+        assert code.startswith('200')
+        assert headers['Content-Encoding'] == 'gzip'
+        assert headers['Vary'] == 'Accept-Encoding'
+        assert not ('Content-Length' in headers)
+        assert json.loads(_gunzip(b''.join(chunks)).decode('utf8')) == \
+                                                                    ['a'] * 100
+
+        code, headers, chunks = _call(server, _body('a', 100),
+                                        HTTP_ACCEPT_ENCODING='deflate')
+        assert headers['Content-Encoding'] == 'deflate'
+        assert json.loads(zlib.decompress(b''.join(chunks)).decode('utf8')) \
+                                                                 == ['a'] * 100
+
+    def test_response_streamed(self):
+        server = _get_server(compression=HttpCompression(min_length=10))
+
+        code, headers, chunks = _call(server, _body('a' * 10000, 100),
+                                                HTTP_ACCEPT_ENCODING='gzip')
+        assert headers['Content-Encoding'] == 'gzip'
+        # the response is not compressed as a single chunk.
+        assert len(chunks) > 1
+        assert json.loads(_gunzip(b''.join(chunks)).decode('utf8')) == \
+                                                            ['a' * 10000] * 100
+
+    def test_response_threshold(self):
+        server = _get_server(compression=HttpCompression(min_length=100))
+
+        code, headers, chunks = _call(server, _body('a', 2),
+                                                HTTP_ACCEPT_ENCODING='gzip')
+        assert not ('Content-Encoding' in headers)
+        assert headers['Vary'] == 'Accept-Encoding'
+        assert headers['Content-Length'] == str(len(b''.join(chunks)))
+        assert json.loads(b''.join(chunks).decode('utf8')) == ['a', 'a']
+
+    def test_response_disabled(self):
+        for server in (_get_server(),
+              _get_server(compression=HttpCompression(min_length=0,
+                                                     mime_types=['text/*']))):
+            code, headers, chunks = _call(server, _body('a', 100),
+                                                HTTP_ACCEPT_ENCODING='gzip')
+            assert not ('Content-Encoding' in headers)
+            assert json.loads(b''.join(chunks).decode('utf8')) == ['a'] * 100
+
+    def test_request(self):
+        server = _get_server()
+
+        body = gzip_body = _body('a', 3)
+        stream = BytesIO()
+        with gzip.GzipFile(fileobj=stream, mode='wb') as f:
+            f.write(body)
+        gzip_body = stream.getvalue()
+
+        code, headers, chunks = _call(server, gzip_body,
+                                                HTTP_CONTENT_ENCODING='gzip')
+        assert code.startswith('200')
+        assert json.loads(b''.join(chunks).decode('utf8')) == ['a'] * 3
+
+    def test_request_too_long(self):
+        server = _get_server(max_content_length=1024)
+
+        body = _body('a' * 2000, 1)
+        deflate_body = zlib.compress(body)
+        assert len(deflate_body) < 1024
+
+        code, headers, chunks = _call(server, deflate_body,
+                                             HTTP_CONTENT_ENCODING='deflate')
+        assert code.startswith('413'), code
+        assert b'RequestTooLong' in b''.join(chunks)
+
+    def test_request_invalid(self):
+        server = _get_server()
+
+        code, headers, chunks = _call(server, b'garbage',
+                                                HTTP_CONTENT_ENCODING='gzip')
+        assert code.startswith('4'), code
+        assert b'InvalidInput' in b''.join(chunks)
+
+
+class TestTwistedCompression(unittest.TestCase):
+    def test_response(self):
+        from twisted.web.test.requesthelper import DummyRequest
+        from spyne.server.twisted import TwistedWebResource
+
+        app = Application([SomeService], 'tns', in_protocol=JsonDocument(),
+                                                    out_protocol=JsonDocument())
+        resource = TwistedWebResource(app,
+                                  compression=HttpCompression(min_length=100))
+
+        stream = BytesIO()
+        with gzip.GzipFile(fileobj=stream, mode='wb') as f:
+            f.write(_body('a', 100))
+
+        request = DummyRequest([b''])
+        request.method = b'POST'
+        request.uri = b'/'
+        request.content = BytesIO(stream.getvalue())
+        request.requestHeaders.setRawHeaders(b'Content-Encoding', [b'gzip'])
+        request.requestHeaders.setRawHeaders(b'Accept-Encoding', [b'gzip'])
+
+        resource.render(request)
+
+        assert request.finished
+        assert request.responseHeaders.getRawHeaders(b'Content-Encoding') == \
+                                                                      [b'gzip']
+        data = _gunzip(b''.join(request.written))
+        assert json.loads(data.decode('utf8')) == ['a'] * 100
+
+
+if __name__ == '__main__':
+    unittest.main()
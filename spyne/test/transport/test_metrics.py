@@ -0,0 +1,163 @@
+#!/usr/bin/env python
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+import json
+import threading
+import unittest
+
+from spyne.util.six import BytesIO
+
+from spyne import Application, ServiceBase, rpc
+from spyne.model import Integer
+from spyne.protocol.json import JsonDocument
+from spyne.server.metrics import Metrics
+from spyne.server.wsgi import WsgiApplication
+
+
+class SomeService(ServiceBase):
+    @rpc(Integer, _returns=Integer)
+    def div(ctx, i):
+        return 10 // i
+
+
+def _get_app():
+    return Application([SomeService], 'tns', in_protocol=JsonDocument(),
+                                                   out_protocol=JsonDocument())
+
+
+def _call(server, method, path, body=b''):
+    env = {
+        'REQUEST_METHOD': method,
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '7000',
+        'CONTENT_TYPE': 'application/json',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(body),
+    }
+
+    ret = []
+    def start_response(code, headers):
+        ret.append(code)
+        ret.append(dict(headers))
+
+    data = b''.join(server(env, start_response))
+    return ret[0], ret[1], data
+
+
+def _parse(text):
+    retval = {}
+    for line in text.decode('utf8').splitlines():
+        if line.startswith('#'):
+            continue
+        key, value = line.rsplit(' ', 1)
+        retval[key] = float(value)
+    return retval
+
+
+class TestMetrics(unittest.TestCase):
+    def test_wsgi(self):
+        server = WsgiApplication(_get_app(), metrics=True)
+
+        req = json.dumps({"div": {"i": 2}}).encode('utf8')
+        code, headers, data = _call(server, 'POST', '/', req)
+        assert data == b'5'
+
+        code, headers, fault = _call(server, 'POST', '/', b'{"div": {"i": 0}}')
+        assert code.startswith('500'), code
+
+        code, headers, data = _call(server, 'GET', '/metrics')
+        assert code.startswith('200'), code
+        assert headers['Content-Type'] == Metrics.CONTENT_TYPE
+
+        m = _parse(data)
+        label = '{method="div"}'
+        assert m['spyne_request_duration_seconds_count' + label] == 2
+        assert m['spyne_request_duration_seconds_bucket'
+                                          '{method="div",le="+Inf"}'] == 2
+        assert m['spyne_request_bytes_total' + label] == len(req) + 17
+        assert m['spyne_response_bytes_total' + label] == 1 + len(fault)
+        assert m['spyne_errors_total{method="div",code="Server"}'] == 1
+
+        for phase in ('create_in_document', 'decompose_incoming_envelope',
+                       'deserialize', 'call', 'serialize', 'create_out_string'):
+            assert m['spyne_phase_duration_seconds_count'
+                          '{method="div",phase="%s"}' % phase] == 2, phase
+
+    def test_threads(self):
+        metrics = Metrics(buckets=(1,))
+        server = WsgiApplication(_get_app(), metrics=metrics)
+
+        def run():
+            for i in range(10):
+                _call(server, 'POST', '/', b'{"div": {"i": 1}}')
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        m = _parse(metrics.to_text())
+        assert m['spyne_request_duration_seconds_count{method="div"}'] == 40
+        assert m['spyne_response_bytes_total{method="div"}'] == 80
+
+    def test_histogram(self):
+        metrics = Metrics(buckets=(0.1, 1), prefix='x_')
+        metrics.observe_histogram('h', (('a', 'q"\\\n'),), 0.5)
+        metrics.observe_histogram('h', (('a', 'q"\\\n'),), 0.1)
+        metrics.observe_histogram('h', (('a', 'q"\\\n'),), 5)
+
+        lines = metrics.to_text().decode('utf8').splitlines()
+        assert lines == [
+            '# TYPE x_h histogram',
+            'x_h_bucket{a="q\\"\\\\\\n",le="0.1"} 1',
+            'x_h_bucket{a="q\\"\\\\\\n",le="1"} 2',
+            'x_h_bucket{a="q\\"\\\\\\n",le="+Inf"} 3',
+            'x_h_sum{a="q\\"\\\\\\n"} 5.6',
+            'x_h_count{a="q\\"\\\\\\n"} 3',
+        ]
+
+    def test_twisted(self):
+        from twisted.web.test.requesthelper import DummyRequest
+        from spyne.server.twisted import TwistedWebResource
+
+        resource = TwistedWebResource(_get_app(), metrics=True)
+
+        request = DummyRequest([b''])
+        request.method = b'POST'
+        request.uri = b'/'
+        request.content = BytesIO(b'{"div": {"i": 5}}')
+        resource.render(request)
+        assert b''.join(request.written) == b'2'
+
+        request = DummyRequest([b'metrics'])
+        request.method = b'GET'
+        request.path = b'/metrics'
+        child = resource.getChildWithDefault(b'metrics', request)
+        data = child.render(request)
+
+        m = _parse(data)
+        assert m['spyne_request_duration_seconds_count{method="div"}'] == 1
+        assert m['spyne_response_bytes_total{method="div"}'] == 1
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+import os
+import pstats
+import shutil
+import unittest
+
+from tempfile import mkdtemp
+
+from spyne.util.six import BytesIO
+
+from spyne import Application, ServiceBase, rpc
+from spyne.model import Integer
+from spyne.protocol.json import JsonDocument
+from spyne.server.profiler import Profiler
+from spyne.server.wsgi import WsgiApplication
+
+
+class SomeService(ServiceBase):
+    @rpc(Integer, _returns=Integer)
+    def div(ctx, i):
+        return 10 // i
+
+    @rpc(Integer, _returns=Integer)
+    def mul(ctx, i):
+        return 10 * i
+
+
+def _call(server, body, **headers):
+    env = {
+        'REQUEST_METHOD': 'POST',
+        'PATH_INFO': '/',
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '7000',
+        'CONTENT_TYPE': 'application/json',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(body),
+    }
+    env.update(headers)
+
+    return b''.join(server(env, lambda code, headers: None))
+
+
+def _get_server(profiler):
+    app = Application([SomeService], 'tns', in_protocol=JsonDocument(),
+                                                    out_protocol=JsonDocument())
+    return WsgiApplication(app, profiler=profiler)
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.path = mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_sample(self):
+        profiler = Profiler(self.path, methods=['div'], rate=1, dump_every=2,
+                                                                   max_files=2)
+        server = _get_server(profiler)
+
+        for i in range(1, 7):
+            assert _call(server, b'{"div": {"i": %d}}' % i) != b''
+            _call(server, b'{"mul": {"i": 1}}')
+
+        files = sorted(os.listdir(self.path))
+        assert len(files) == 2, files
+        assert all(f.startswith('div.') for f in files)
+
+        stats = pstats.Stats(os.path.join(self.path, files[-1]))
+        assert any(name == 'div' for _, _, name in stats.stats)
+        assert stats.total_calls > 0
+
+        # the session is stopped, so the next request can be profiled again
+        _call(server, b'{"div": {"i": 1}}')
+        assert profiler.counts['div'] == 1
+        assert profiler.dump() == [os.path.join(self.path,
+                                               sorted(os.listdir(self.path))[-1])]
+        assert len(os.listdir(self.path)) == 2
+
+    def test_header(self):
+        profiler = Profiler(self.path, rate=0, token='s3cret')
+        server = _get_server(profiler)
+
+        _call(server, b'{"mul": {"i": 1}}')
+        _call(server, b'{"mul": {"i": 1}}', HTTP_X_SPYNE_PROFILE='nope')
+        assert profiler.counts['mul'] == 0
+
+        _call(server, b'{"mul": {"i": 1}}', HTTP_X_SPYNE_PROFILE='s3cret')
+        assert profiler.counts['mul'] == 1
+
+    def test_error(self):
+        profiler = Profiler(self.path, rate=1)
+        server = _get_server(profiler)
+
+        _call(server, b'{"div": {"i": 0}}')
+        assert profiler.counts['div'] == 1
+
+        _call(server, b'{"div": {"i": 1}}')
+        assert profiler.counts['div'] == 2
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -38,18 +38,34 @@ from spyne.util.attrdict import AttrDict
 from spyne.util.attrdict import AttrDictColl
 from spyne.util.attrdict import DefaultAttrDict
 
+from spyne.util.lazy import enable_module_getattr
+
 try:
     import thread
 
     from urllib import splittype, splithost, quote, urlencode
-    from urllib2 import urlopen, Request, HTTPError
 
 except ImportError: # Python 3
     import _thread as thread
 
     from urllib.parse import splittype, splithost, quote, urlencode
-    from urllib.request import urlopen, Request
-    from urllib.error import HTTPError
+
+
+def __getattr__(name):
+    # urllib.request takes longer to import than most of Spyne itself and is
+    # only needed by clients, so it's imported on first use.
+    if name in ('urlopen', 'Request', 'HTTPError'):
+        try:
+            from urllib2 import urlopen, Request, HTTPError
+        except ImportError: # Python 3
+            from urllib.request import urlopen, Request
+            from urllib.error import HTTPError
+
+        return locals()[name]
+
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+enable_module_getattr(__name__, ('urlopen', 'Request', 'HTTPError'))
 
 
 def split_url(url):
@@ -0,0 +1,467 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""The ``spyne.util.cache`` module contains the response cache that can be
+attached to service methods via the ``_cache`` argument of the
+:func:`spyne.decorator.rpc` decorator, along with its default store. ::
+
+    class SomeService(ServiceBase):
+        @rpc(Unicode, _returns=Unicode, _cache=ResponseCache(ttl=60))
+        def get_name(ctx, key):
+            return expensive_lookup(key)
+
+It also contains the request coalescer that can be attached to service
+methods via the ``_coalesce`` argument. ::
+
+    class SomeService(ServiceBase):
+        @rpc(Unicode, _returns=Unicode, _coalesce=SingleFlight())
+        def get_name(ctx, key):
+            return expensive_lookup(key)
+"""
+
+import logging
+logger = logging.getLogger(__name__)
+
+import sys
+import threading
+
+from collections import OrderedDict
+from inspect import isgenerator
+from time import time
+
+from spyne.model import ComplexModelBase
+from spyne.util import six
+
+try:
+    from inspect import isawaitable
+except ImportError:  # Python 2
+    isawaitable = lambda _: False
+
+try:
+    from collections.abc import Iterator
+except ImportError:  # Python 2
+    from collections import Iterator
+
+try:
+    from twisted.internet.defer import Deferred
+    from twisted.python.failure import Failure
+except ImportError:
+    Deferred = Failure = None
+
+
+class LruStore(object):
+    """A thread-safe, in-memory key-value store that evicts the least
+    recently used entries when it's full.
+
+    Any object that implements the ``get()`` and ``set()`` methods below can
+    be used as a store for :class:`ResponseCache`. Its values are
+    ``(data, headers)`` tuples, where ``data`` is the response as a single
+    string and ``headers`` is a dict or ``None``.
+
+    :param max_entries: Maximum number of entries to keep.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns the value for the given key, or ``None`` when the key is not
+        there or its entry has expired."""
+
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time():
+                return None
+
+            # move to the end, as the most recently used entry.
+            self._data[key] = entry
+
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Stores the value for the given key for ``ttl`` seconds, or forever
+        when ``ttl`` is ``None``. Returns the number of evicted entries."""
+
+        expires_at = None
+        if ttl is not None:
+            expires_at = time() + ttl
+
+        retval = 0
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (value, expires_at)
+
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                retval += 1
+
+        return retval
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+def canonical(value):
+    """Returns a hashable representation of the given deserialized value.
+    Raises ``TypeError`` when that's not possible."""
+
+    if isinstance(value, ComplexModelBase):
+        cls = value.__class__
+        fti = cls.get_flat_type_info(cls)
+        return (cls,) + tuple(canonical(getattr(value, k, None)) for k in fti)
+
+    if isinstance(value, (list, tuple)):
+        return tuple(canonical(v) for v in value)
+
+    if isinstance(value, dict):
+        return frozenset((k, canonical(v)) for k, v in value.items())
+
+    if isinstance(value, (set, frozenset)):
+        return frozenset(canonical(v) for v in value)
+
+    if isgenerator(value) or hasattr(value, 'read'):
+        raise TypeError("%r can't be used in a cache key" % (value,))
+
+    hash(value)
+
+    return value
+
+
+class ResponseCache(object):
+    """Caches serialized responses of a service method. The cached bytes are
+    returned for requests with the same input, skipping both the user method
+    and the serialization of its return value.
+
+    Only use this for methods whose output depends only on their arguments.
+    Response headers that the output protocol sets during serialization, like
+    the ``Content-Type`` of a ``File`` return value or the
+    ``Content-Disposition`` of ``Csv``, are cached along with the response and
+    set again for cached responses. Response headers or codes set by the
+    method, as well as events fired during serialization, are not replayed.
+    The ``method_return_document`` and ``method_return_string`` events are
+    still fired, with ``ctx.out_document`` set to ``None``. Responses are
+    cached per output protocol instance and locale. Fault responses are never
+    cached.
+
+    The ``method_cache_hit``, ``method_cache_miss`` and ``method_cache_evict``
+    events are fired on the application's event manager. The counts are kept
+    in the ``hits``, ``misses`` and ``evictions`` attributes.
+
+    :param ttl: Number of seconds a response is cached for. ``None`` means
+        until it's evicted.
+    :param max_entries: Size of the default store.
+    :param key: A callable that takes the method context and returns a
+        hashable value to identify the request, or ``None`` when the request
+        should not be cached. Defaults to a canonical form of the deserialized
+        input headers and arguments.
+    :param store: The store for the cached responses. Defaults to a
+        :class:`LruStore` instance.
+    """
+
+    def __init__(self, ttl=None, max_entries=1024, key=None, store=None):
+        if store is None:
+            store = LruStore(max_entries)
+
+        self.ttl = ttl
+        self.key = key
+        self.store = store
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_key(self, ctx):
+        """Returns the cache key for the given context or ``None`` if the
+        request can't be cached."""
+
+        try:
+            if self.key is None:
+                key = canonical((ctx.in_header, ctx.in_object))
+            else:
+                key = self.key(ctx)
+                if key is None:
+                    return None
+
+        except TypeError as e:
+            logger.debug("Not caching %r: %r", ctx.method_request_string, e)
+            return None
+
+        return (ctx.descriptor.key, id(ctx.out_protocol), ctx.locale, key)
+
+    def get_response(self, ctx):
+        """Sets ``ctx.out_string`` if there's a cached response for the
+        request. Returns ``True`` in that case. Otherwise prepares the context
+        for :meth:`set_response` and returns ``False``."""
+
+        key = self.get_key(ctx)
+        if key is None:
+            return False
+
+        entry = self.store.get(key)
+        if entry is None:
+            ctx.cache_key = key
+            self.misses += 1
+            ctx.app.event_manager.fire_event('method_cache_miss', ctx)
+            return False
+
+        data, headers = entry
+        if headers is not None:
+            ctx.transport.resp_headers.update(headers)
+
+        self.hits += 1
+        ctx.out_object = [None]
+        ctx.out_string = [data]
+        ctx.cache_hit = True
+        ctx.app.event_manager.fire_event('method_cache_hit', ctx)
+        return True
+
+    def snapshot_headers(self, ctx):
+        """Remembers the response headers before serialization, so that
+        :meth:`set_response` can tell which ones the protocol set."""
+
+        headers = getattr(ctx.transport, 'resp_headers', None)
+        if headers is not None:
+            ctx.cache_headers = dict(headers)
+
+    def set_response(self, ctx):
+        """Stores ``ctx.out_string`` in the cache, along with the response
+        headers that were set or changed during serialization."""
+
+        out_string = list(ctx.out_string)
+        if len(out_string) > 0 and isinstance(out_string[0], six.text_type):
+            data = u''.join(out_string)  # e.g. Csv
+        else:
+            data = b''.join(out_string)
+        ctx.out_string = [data]
+
+        headers = None
+        if ctx.cache_headers is not None:
+            old = ctx.cache_headers
+            headers = dict((k, v) for k, v in
+                                ctx.transport.resp_headers.items()
+                                           if not (k in old and old[k] == v))
+            if len(headers) == 0:
+                headers = None
+
+        evicted = self.store.set(ctx.cache_key, (data, headers), self.ttl)
+        if evicted > 0:
+            self.evictions += evicted
+            ctx.app.event_manager.fire_event('method_cache_evict', ctx,
+                                                                        evicted)
+
+
+def _is_shareable(value):
+    """Generators, other iterators and awaitables can only be consumed once,
+    so they can't be handed to more than one caller."""
+
+    return not (isinstance(value, Iterator) or isawaitable(value))
+
+
+class _Call(object):
+    __slots__ = 'done', 'result', 'exc_info', 'deferreds', 'fired', 'shared'
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.exc_info = None
+        self.deferreds = None
+        self.fired = False
+        self.shared = True
+
+
+class SingleFlight(object):
+    """Coalesces concurrent identical calls to a service method. While a call
+    for a given input is in flight, later callers with the same input wait for
+    its result instead of running the method again. Their contexts get the same
+    return value, or the same exception is raised for them.
+
+    This works with threaded servers, where waiting callers block until the
+    first call returns, as well as with Twisted, where a method returning a
+    ``Deferred`` has its result passed to a new ``Deferred`` for every caller
+    that came in before it fired.
+
+    Only use this for methods whose output depends only on their arguments. The
+    return value is shared between requests, so it must not be modified by
+    later stages of the pipeline. Method events are still fired for every
+    request. Return values that can only be consumed once, like generators,
+    iterators or coroutines, are not shared: the waiting callers run the
+    method themselves instead.
+
+    The number of calls that actually ran and the number of calls that were
+    coalesced are kept in the ``calls`` and ``coalesced`` attributes.
+
+    :param key: A callable that takes the method context and returns a
+        hashable value to identify the request, or ``None`` when the request
+        should not be coalesced. Defaults to a canonical form of the
+        deserialized input headers and arguments.
+    """
+
+    def __init__(self, key=None):
+        self.key = key
+
+        self.calls = 0
+        self.coalesced = 0
+
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def get_key(self, ctx):
+        """Returns the coalescing key for the given context or ``None`` if the
+        request can't be coalesced."""
+
+        try:
+            if self.key is None:
+                key = canonical((ctx.in_header, ctx.in_object))
+            else:
+                key = self.key(ctx)
+                if key is None:
+                    return None
+
+        except TypeError as e:
+            logger.debug("Not coalescing %r: %r", ctx.method_request_string, e)
+            return None
+
+        return (ctx.descriptor.key, key)
+
+    def call(self, key, func, *args):
+        """Returns ``func(*args)``, or the return value of the call for the
+        same key that is already in flight."""
+
+        leader = False
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                if call.deferreds is not None:
+                    return self._wait_deferred(call, func, args)
+
+            else:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            return self._wait(call, func, args)
+
+        try:
+            retval = func(*args)
+
+        except BaseException:
+            call.exc_info = sys.exc_info()
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+            raise
+
+        if Deferred is not None and isinstance(retval, Deferred):
+            with self._lock:
+                call.deferreds = []
+            call.done.set()
+            retval.addBoth(self._fire, key, call)
+            return retval
+
+        if _is_shareable(retval):
+            call.result = retval
+        else:
+            call.shared = False
+
+        with self._lock:
+            del self._calls[key]
+        call.done.set()
+
+        return retval
+
+    def _wait(self, call, func, args):
+        call.done.wait()
+
+        if call.exc_info is not None:
+            six.reraise(*call.exc_info)
+
+        if call.deferreds is not None:
+            with self._lock:
+                return self._wait_deferred(call, func, args)
+
+        if not call.shared:
+            return func(*args)
+
+        return call.result
+
+    def _wait_deferred(self, call, func, args):
+        """Must be called with the lock held."""
+
+        d = Deferred()
+        if call.fired:
+            if call.shared:
+                self._relay(d, call.result)
+            else:
+                self._run(d, func, args)
+
+        else:
+            call.deferreds.append((d, func, args))
+
+        return d
+
+    @staticmethod
+    def _relay(d, result):
+        if isinstance(result, Failure):
+            d.errback(result)
+        else:
+            d.callback(result)
+
+    @staticmethod
+    def _run(d, func, args):
+        try:
+            result = func(*args)
+        except BaseException:
+            d.errback(Failure())
+            return
+
+        if isinstance(result, Deferred):
+            result.chainDeferred(d)
+        else:
+            d.callback(result)
+
+    def _fire(self, result, key, call):
+        with self._lock:
+            del self._calls[key]
+            if _is_shareable(result):
+                call.result = result
+            else:
+                call.shared = False
+            call.fired = True
+            deferreds, call.deferreds = call.deferreds, []
+
+        for d, func, args in deferreds:
+            if call.shared:
+                self._relay(d, result)
+            else:
+                self._run(d, func, args)
+
+        return result
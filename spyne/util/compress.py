@@ -0,0 +1,164 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+"""The ``spyne.util.compress`` module contains helpers for incrementally
+compressing and decompressing iterables of byte strings with the content
+codings of HTTP. ``br`` is only available when the ``brotli`` package is
+installed."""
+
+import zlib
+
+from spyne.error import InvalidInputError, RequestTooLongError
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+DECOMPRESS_BLOCK_LENGTH = 64 * 1024
+"""Maximum number of bytes a single decompression step can produce."""
+
+
+def get_codings():
+    """Returns the tuple of supported content codings in the order of
+    preference."""
+
+    if brotli is None:
+        return ('gzip', 'deflate')
+    return ('br', 'gzip', 'deflate')
+
+
+class _BrotliCompressor(object):
+    def __init__(self, level):
+        self._c = brotli.Compressor(quality=min(level, 11))
+
+    def compress(self, data):
+        return self._c.process(data)
+
+    def flush(self):
+        return self._c.finish()
+
+
+class _BrotliDecompressor(object):
+    # brotli can't limit the output size, so the input is fed in small slices
+    # instead.
+    INPUT_BLOCK_LENGTH = 1024
+
+    def __init__(self):
+        self._d = brotli.Decompressor()
+        self.unconsumed_tail = b''
+
+    def decompress(self, data, max_length=0):
+        self.unconsumed_tail = data[self.INPUT_BLOCK_LENGTH:]
+        return self._d.process(data[:self.INPUT_BLOCK_LENGTH])
+
+    def flush(self):
+        return b''
+
+
+def get_compressor(coding, level=6):
+    """Returns an object with ``compress()`` and ``flush()`` methods, like the
+    ones ``zlib.compressobj()`` returns, for the given content coding."""
+
+    if coding == 'gzip':
+        return zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    if coding == 'deflate':
+        return zlib.compressobj(level)
+
+    if coding == 'br' and brotli is not None:
+        return _BrotliCompressor(level)
+
+    raise ValueError("Unsupported content coding %r" % (coding,))
+
+
+def get_decompressor(coding):
+    """Returns an object that works like the ones ``zlib.decompressobj()``
+    returns for the given content coding, or ``None`` when it's not
+    supported."""
+
+    if coding == 'gzip' or coding == 'x-gzip':
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+    if coding == 'deflate':
+        return zlib.decompressobj()
+
+    if coding == 'br' and brotli is not None:
+        return _BrotliDecompressor()
+
+    return None
+
+
+def compress_chunks(chunks, coding, level=6):
+    """Compresses the given iterable of byte strings with the given content
+    coding, chunk by chunk."""
+
+    c = get_compressor(coding, level)
+
+    for chunk in chunks:
+        data = c.compress(chunk)
+        if data:
+            yield data
+
+    data = c.flush()
+    if data:
+        yield data
+
+
+def decompress_chunks(chunks, coding, max_length=None):
+    """Decompresses the given iterable of byte strings with the given content
+    coding, chunk by chunk.
+
+    :param max_length: Maximum length of the decompressed data.
+        ``RequestTooLongError`` is raised when it's exceeded.
+    """
+
+    d = get_decompressor(coding)
+    if d is None:
+        raise InvalidInputError("Unsupported Content-Encoding", coding)
+
+    length = 0
+    try:
+        for chunk in chunks:
+            while chunk:
+                limit = DECOMPRESS_BLOCK_LENGTH
+                if max_length is not None:
+                    limit = min(limit, max_length - length + 1)
+
+                data = d.decompress(chunk, limit)
+                chunk = d.unconsumed_tail
+
+                length += len(data)
+                if max_length is not None and length > max_length:
+                    raise RequestTooLongError()
+
+                if data:
+                    yield data
+
+        data = d.flush()
+
+    except (zlib.error, getattr(brotli, 'error', zlib.error)) as e:
+        raise InvalidInputError("Invalid %s data" % coding, str(e))
+
+    length += len(data)
+    if max_length is not None and length > max_length:
+        raise RequestTooLongError()
+
+    if data:
+        yield data
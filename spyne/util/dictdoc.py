@@ -96,12 +96,12 @@ def get_object_as_simple_dict(o, cls=None, hier_delim='.', prefix=None):
 
 
 def get_object_as_json(o, cls=None, ignore_wrappers=True, complex_as=list,
-                                            encoding='utf8', polymorphic=False):
+                          encoding='utf8', polymorphic=False, backend=None):
     if cls is None:
         cls = o.__class__
 
     prot = JsonDocument(ignore_wrappers=ignore_wrappers, complex_as=complex_as,
-                                                        polymorphic=polymorphic)
+                                     polymorphic=polymorphic, backend=backend)
     ctx = FakeContext(out_document=[prot._object_to_doc(cls, o)])
     prot.create_out_string(ctx, encoding)
     return b''.join(ctx.out_string)
@@ -131,11 +131,13 @@ def get_object_as_msgpack(o, cls=None, ignore_wrappers=False, complex_as=dict,
     return b''.join(ctx.out_string)
 
 
-def json_loads(s, cls, protocol=JsonDocument, **kwargs):
+def json_loads(s, cls, protocol=JsonDocument, backend=None, **kwargs):
     if s is None:
         return None
     if s == '':
         return None
+    if backend is not None:
+        kwargs['backend'] = backend
     prot = protocol(**kwargs)
     ctx = FakeContext(in_string=[s])
     prot.create_in_document(ctx)
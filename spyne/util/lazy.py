@@ -0,0 +1,77 @@
+
+#
+# spyne - Copyright (C) Spyne contributors.
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2.1 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the GNU
+# Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this library; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301
+#
+
+"""Helpers for deferring imports of heavy optional dependencies until they are
+actually needed.
+
+Modules that want to expose a name without importing it at import time define
+a module level ``__getattr__`` function as described in PEP 562 and call
+:func:`enable_module_getattr` right after it. This makes the function work on
+Python versions that predate PEP 562 as well.
+"""
+
+import sys
+
+
+def is_importable(name):
+    """Returns ``True`` when the top level package or module ``name`` can be
+    imported. The module itself is not imported."""
+
+    if name in sys.modules:
+        return sys.modules[name] is not None
+
+    try:
+        from importlib.util import find_spec
+    except ImportError:  # Python 2
+        import imp
+        try:
+            imp.find_module(name)
+        except ImportError:
+            return False
+        return True
+
+    return find_spec(name) is not None
+
+
+class _GetattrModule(type(sys)):
+    def __getattr__(self, name):
+        return self.__dict__['__getattr__'](name)
+
+
+def enable_module_getattr(module_name, names=()):
+    """Makes the module level ``__getattr__`` function of the module called
+    ``module_name`` work on Python versions older than 3.7. Where the class of
+    a module can't be changed (Python 2 and Python 3.4), the attributes listed
+    in ``names`` are resolved eagerly instead.
+    """
+
+    if sys.version_info >= (3, 7):
+        return
+
+    module = sys.modules[module_name]
+    try:
+        module.__class__ = _GetattrModule
+
+    except TypeError:
+        getattr_ = module.__dict__['__getattr__']
+        for name in names:
+            try:
+                setattr(module, name, getattr_(name))
+            except ImportError:
+                pass
@@ -25,12 +25,22 @@ import sys
 import inspect
 
 from functools import wraps
+from platform import python_implementation
 from itertools import chain
 from warnings import warn
 
 from spyne.util.odict import odict
 
 
+_IMPL = python_implementation()
+
+DICTS_ARE_ORDERED = sys.version_info >= (3, 7) or _IMPL == 'PyPy' or \
+                       (_IMPL == 'CPython' and sys.version_info >= (3, 6))
+"""``True`` when plain dicts remember insertion order. When that's the case,
+the attributes dict of a class is already in declaration order and the frame
+stack does not need to be inspected."""
+
+
 class ClassNotFoundException(Exception):
     """Raise when class declaration is not found in frame stack."""
 
@@ -56,6 +66,10 @@ class Prepareable(type):
             return type.__new__(cls, name, bases, attributes)
 
         def preparing_constructor(cls, name, bases, attributes):
+            if isinstance(attributes, odict):
+                # we create class dynamically with passed odict
+                return constructor(cls, name, bases, attributes)
+
             # Don't bother with this shit unless the user *explicitly* asked for
             # it
             for c in chain(bases, [cls]):
@@ -70,9 +84,10 @@ class Prepareable(type):
             except AttributeError:
                 return constructor(cls, name, bases, attributes)
 
-            if isinstance(attributes, odict):
-                # we create class dynamically with passed odict
-                return constructor(cls, name, bases, attributes)
+            if DICTS_ARE_ORDERED:
+                namespace = cls.__prepare__(name, bases)
+                namespace.update(attributes)
+                return constructor(cls, name, bases, namespace)
 
             current_frame = sys._getframe()
             class_declaration = None
@@ -31,33 +31,37 @@ support `__getitem__` -- i.e. getting nth variable from the ordered dict.
 class odict(dict):
     """Sort of an ordered dictionary implementation."""
 
+    # The methods below call dict's methods directly instead of going through
+    # super() as they are called for every field of every class that gets
+    # created and super() is comparatively slow.
+
     def __init__(self, data=[]):
         if isinstance(data, self.__class__):
             self.__list = list(data.__list)
-            super(odict, self).__init__(data)
+            dict.__init__(self, data)
 
         else:
             self.__list = []
-            super(odict, self).__init__()
+            dict.__init__(self)
             self.update(data)
 
     def __getitem__(self, key):
         if isinstance(key, int):
-            return super(odict, self).__getitem__(self.__list[key])
+            return dict.__getitem__(self, self.__list[key])
         else:
-            return super(odict, self).__getitem__(key)
+            return dict.__getitem__(self, key)
 
     def __setitem__(self, key, val):
         if isinstance(key, int):
-            super(odict, self).__setitem__(self.__list[key], val)
+            dict.__setitem__(self, self.__list[key], val)
 
         else:
             if not (key in self):
                 self.__list.append(key)
-            super(odict, self).__setitem__(key, val)
+            dict.__setitem__(self, key, val)
 
-        assert len(self.__list) == super(odict, self).__len__(), (
-            repr(self.__list), super(odict, self).__repr__())
+        assert len(self.__list) == dict.__len__(self), (
+            repr(self.__list), dict.__repr__(self))
 
     def __repr__(self):
         return "{%s}" % ','.join(["%r: %r" % (k, v) for k, v in self.items()])
@@ -66,7 +70,7 @@ class odict(dict):
         return repr(self)
 
     def __len__(self):
-        assert len(self.__list) == super(odict, self).__len__()
+        assert len(self.__list) == dict.__len__(self)
         return len(self.__list)
 
     def __iter__(self):
@@ -76,7 +80,7 @@ class odict(dict):
         if not isinstance(key, int):
             key = self.__list.index(key) # ouch.
 
-        super(odict, self).__delitem__(self.__list[key])
+        dict.__delitem__(self, self.__list[key])
         del self.__list[key]
 
     def __add__(self, other):
@@ -84,14 +88,13 @@ class odict(dict):
         return self
 
     def items(self):
-        retval = []
-        for k in self.__list:
-            retval.append( (k, super(odict, self).__getitem__(k)) )
-        return retval
+        get = dict.__getitem__
+        return [(k, get(self, k)) for k in self.__list]
 
     def iteritems(self):
+        get = dict.__getitem__
         for k in self.__list:
-            yield k, super(odict, self).__getitem__(k)
+            yield k, get(self, k)
 
     def keys(self):
         return self.__list
@@ -104,19 +107,20 @@ class odict(dict):
             self[k] = v
 
     def values(self):
-        retval = []
-        for l in self.__list:
-            retval.append(super(odict, self).__getitem__(l))
-        return retval
+        get = dict.__getitem__
+        return [get(self, k) for k in self.__list]
 
     def itervalues(self):
         for l in self.__list:
             yield self[l]
 
     def get(self, key, default=None):
-        if key in self:
-            return self[key]
-        return default
+        if isinstance(key, int):
+            if key in self:
+                return self[key]
+            return default
+
+        return dict.get(self, key, default)
 
     def append(self, t):
         k, v = t
@@ -127,4 +131,4 @@ class odict(dict):
         if k in self:
             del self.__list[self.__list.index(k)]
         self.__list.insert(index, k)
-        super(odict, self).__setitem__(k, v)
+        dict.__setitem__(self, k, v)